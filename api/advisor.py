@@ -19,6 +19,7 @@ from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 
 from monitoring.llm_router import route_llm
+from monitoring.llm_cache import get_llm_cache
 
 # -------- LLM clients / prompts (soft imports so advisor always loads) --------
 # Specialized: Grok (x.ai)
@@ -107,7 +108,7 @@ logging.basicConfig(level=logging.INFO)
 TEMPERATURE = CONFIG.llm.advisor_temperature
 
 # ---------- Model usage tracking ----------
-_model_usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "fallback": 0, "none": 0}
+_model_usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "fallback": 0, "none": 0, "cache": 0}
 
 # ---------- Domain priority ----------
 DOMAIN_PRIORITY = [
@@ -1034,12 +1035,15 @@ def get_llm_routing_stats():
         "primary_provider_success": round(_model_usage_counts.get("deepseek", 0) / max(total_requests, 1) * 100, 2) if total_requests > 0 else 0,
         "fallback_rate": round((_model_usage_counts.get("fallback", 0) + _model_usage_counts.get("handle_query_fallback", 0)) / max(total_requests, 1) * 100, 2) if total_requests > 0 else 0
     }
+    completion_cache = get_llm_cache()
+    if completion_cache is not None:
+        stats["completion_cache"] = completion_cache.stats()
     return stats
 
 def reset_llm_routing_stats():
     """Reset LLM routing statistics (useful for testing or periodic monitoring)"""
     global _model_usage_counts
-    _model_usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "fallback": 0, "handle_query_fallback": 0, "none": 0}
+    _model_usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "fallback": 0, "handle_query_fallback": 0, "none": 0, "cache": 0}
     logger.info("[Advisor] LLM routing statistics reset")
 
 def log_llm_routing_summary():
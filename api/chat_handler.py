@@ -28,6 +28,9 @@ from utils.db_utils import (
 # Geographic intelligence system
 from services.location_service_consolidated import enhance_geographic_query
 
+# Shared advisory cache (Redis-backed LRU, in-process fallback)
+from services.advisory_cache import get_advisory_cache
+
 # Optional single-value fetch for verification fallback
 try:
     from utils.db_utils import fetch_one
@@ -201,43 +204,21 @@ def put_pooled_conn(conn):
         except Exception:
             pass
 
-# ---------------- In-memory cache & background jobs ----------------
+# ---------------- Shared cache & background jobs ----------------
+# Advisories and background results live in the shared advisory cache
+# (Redis when REDIS_URL is set) so every worker sees them.
 CACHE_TTL = int(os.getenv("CHAT_CACHE_TTL", "1800"))  # seconds
-RESPONSE_CACHE: Dict[str, Any] = {}
-RESPONSE_CACHE_LOCK = threading.Lock()
+advisory_cache = get_advisory_cache()
 
 # Background job store: job_id -> metadata
 BACKGROUND_JOBS: Dict[str, Dict[str, Any]] = {}
 BACKGROUND_JOBS_LOCK = threading.Lock()
 
 def set_cache(key: str, value: Any) -> None:
-    with RESPONSE_CACHE_LOCK:
-        RESPONSE_CACHE[key] = (value, time.time())
+    advisory_cache.put_json("chat", key, value, ttl=CACHE_TTL)
 
 def get_cache(key: str) -> Optional[Any]:
-    with RESPONSE_CACHE_LOCK:
-        entry = RESPONSE_CACHE.get(key)
-        if not entry:
-            return None
-        value, ts = entry
-        if time.time() - ts > CACHE_TTL:
-            try:
-                del RESPONSE_CACHE[key]
-            except Exception:
-                pass
-            return None
-        return value
-
-# Add a simple memory limit to prevent cache bloat
-def cleanup_cache() -> None:
-    """Clean up cache if it gets too large"""
-    with RESPONSE_CACHE_LOCK:
-        if len(RESPONSE_CACHE) > 1000:
-            # Remove oldest 20% of entries
-            sorted_entries = sorted(RESPONSE_CACHE.items(), key=lambda x: x[1][1])
-            to_remove = int(len(sorted_entries) * 0.2)
-            for key, _ in sorted_entries[:to_remove]:
-                del RESPONSE_CACHE[key]
+    return advisory_cache.get_json("chat", key)
 
 # ---------------- Utils ----------------
 def json_default(obj):
@@ -497,6 +478,33 @@ def get_background_status(session_id: str) -> Dict[str, Any]:
     return {"job": meta or {"status": "unknown"}, "result": result}
 
 # ---------------- Core ----------------
+# Profile fields render_advisory reads: roles (_infer_roles) and the location check
+_ADVICE_PROFILE_FIELDS = ("role", "profession", "user_type", "location")
+
+def _advice_profile(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The part of a user profile an advisory depends on.
+
+    The advisor is given only these fields, so an advisory carries no name,
+    email or employer and can be shared by every user with the same role
+    and location.
+    """
+    return {k: profile[k] for k in _ADVICE_PROFILE_FIELDS if profile and profile.get(k)}
+
+def _advice_audience(profile: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Advisory cache key part: the normalized _advice_profile fields."""
+    return {k: " ".join(str(v).lower().split()) for k, v in _advice_profile(profile).items()}
+
+def _generate_advice_cached(advice_key: Optional[str], query, alerts, user_profile=None, **kwargs):
+    """generate_advice, storing the result in the shared advisory cache (also from background jobs)."""
+    result = generate_advice(query, alerts, user_profile, **kwargs)
+    if advice_key:
+        try:
+            advisory_cache.put(advice_key, result)
+        except Exception as e:
+            log.warning("Advisory cache store failed: %s", e)
+    return result
+
 def handle_user_query(
     message: str | Dict[str, Any],
     email: str,
@@ -626,20 +634,6 @@ def handle_user_query(
     # Session
     session_id = _session_id(email, body)
 
-    # Cache key (after filters)
-    cache_key = sha1(json.dumps(
-        {"query": query, "region": region, "category": threat_type, "session_id": session_id},
-        sort_keys=True, default=json_default
-    ).encode("utf-8")).hexdigest()
-    cached = get_cache(cache_key)
-    if cached is not None:
-        log.info("handle_user_query: cache HIT | user=%s session=%s", _short_id(email), session_id[:8] if session_id else "unk")
-        log_security_event(event_type="cache_hit", email=email, plan=plan_name, details=f"cache_key={cache_key}")
-        # Update quota in cached response
-        if isinstance(cached, dict):
-            cached["quota"] = _build_quota_obj(email, plan_name)
-        return cached
-
     # ---------------- Fetch alerts (with timeout) ----------------
     db_alerts: List[Dict[str, Any]] = []
     db_start = time.perf_counter()
@@ -712,7 +706,7 @@ def handle_user_query(
 
         # Run DB fetch in a worker with a hard timeout to avoid blocking the request forever
         if fetch_alerts_from_db_strict_geo:
-            db_timeout = int(os.getenv("CHAT_DB_TIMEOUT", "30"))  # seconds
+            db_timeout = int(os.getenv("CHAT_DB_TIMEOUT", "5"))  # seconds; keyed lookups take milliseconds
             try:
                 # Enhanced parameter logging with validation before DB call
                 log.info(
@@ -845,20 +839,6 @@ def handle_user_query(
             "session_id": session_id,
         }
 
-    # ---------------- Historical context ----------------
-    historical_alerts: List[Dict[str, Any]] = []
-    history_category = None
-    if db_alerts:
-        cats = {a.get("category") for a in db_alerts if a.get("category")}
-        history_category = next(iter(cats)) if cats else None
-    try:
-        historical_alerts = fetch_past_incidents(
-            region=region, category=history_category, days=int(os.getenv("CHAT_HISTORY_DAYS", "90")), limit=100
-        )
-        log.info("[HIST] %d historical for region=%s category=%s | user=%s", len(historical_alerts), region, history_category, _short_id(email))
-    except Exception as e:
-        log.warning("[HIST] fetch_past_incidents failed: %s", e)
-
     # ---------------- User profile ----------------
     user_profile: Dict[str, Any] = {}
     try:
@@ -968,7 +948,6 @@ def handle_user_query(
             "no_data": True,
             "metadata": {"requested_location": requested_loc},
         }
-        set_cache(cache_key, payload)
         try:
             log_security_event(event_type="no_data_response", email=email, plan=plan_name, details=f"query={query[:120]}")
         except Exception:
@@ -979,14 +958,6 @@ def handle_user_query(
     advisory_result: Dict[str, Any] = {}
     ADVISOR_TIMEOUT = int(os.getenv("ADVISOR_TIMEOUT", "45"))
     ASYNC_FALLBACK = os.getenv("ASYNC_FALLBACK", "true").lower() in ("1", "true", "yes", "y")
-    advisor_kwargs = {
-        "email": email,
-        "region": region,
-        "threat_type": threat_type,
-        "user_profile": user_profile,
-        "historical_alerts": historical_alerts,
-    }
-
     advisor_start = time.perf_counter()
     
     # ---- Timing checkpoint: Historical/geographic processing complete ----
@@ -1020,7 +991,6 @@ def handle_user_query(
                 "session_id": session_id,
                 "low_confidence": True,
             }
-            set_cache(cache_key, payload)
             try:
                 log_security_event(event_type="low_confidence_block", email=email, plan=plan_name, details=f"best_conf={best_conf:.2f}")
             except Exception:
@@ -1029,86 +999,138 @@ def handle_user_query(
     except Exception as e:
         log.warning("Low-confidence guard failed open: %s", e)
 
+    # ---------------- Shared advisory cache ----------------
+    # Keyed on intent, resolved location and the alert set's version stamp:
+    # new alerts for the location change the key, repeat questions about the
+    # same place are answered without calling the advisor/LLM.
+    advice_key = None
+    cached_advice = None
     try:
-        advisor_extra = dict(advisor_kwargs)
-        user_prof = advisor_extra.pop("user_profile", None)
+        advice_key = advisory_cache.advisory_key(
+            query,
+            threat_type,
+            country=country_param or extracted_country,
+            city=city_param or extracted_city,
+            region=region_param or region,
+            alerts=db_alerts,
+            audience=_advice_audience(user_profile),
+        )
+        cached_advice = advisory_cache.get(advice_key)
+    except Exception as e:
+        log.warning("Advisory cache lookup failed: %s", e)
+
+    if cached_advice is not None:
+        log.info("Advisory cache HIT | user=%s key=%s", _short_id(email), advice_key[:12])
+        advisory_result = dict(cached_advice)
+        advisory_result["proactive_triggered"] = bool(all_low or alerts_stale)
+        usage_info["advisory_cache"] = "hit"
+        if advisory_result["proactive_triggered"]:
+            usage_info["proactive_triggered"] = True
+        try:
+            log_security_event(event_type="cache_hit", email=email, plan=plan_name, details=f"advice_key={advice_key}")
+        except Exception:
+            pass
+    else:
+        usage_info["advisory_cache"] = "miss"
+        # ---------------- Historical context ----------------
+        historical_alerts: List[Dict[str, Any]] = []
+        history_category = None
+        if db_alerts:
+            cats = {a.get("category") for a in db_alerts if a.get("category")}
+            history_category = next(iter(cats)) if cats else None
+        try:
+            historical_alerts = fetch_past_incidents(
+                region=region, category=history_category, days=int(os.getenv("CHAT_HISTORY_DAYS", "90")), limit=100
+            )
+            log.info("[HIST] %d historical for region=%s category=%s | user=%s", len(historical_alerts), region, history_category, _short_id(email))
+        except Exception as e:
+            log.warning("[HIST] fetch_past_incidents failed: %s", e)
 
-        with ThreadPoolExecutor(max_workers=1) as ex:
-            if db_alerts and (all_low or alerts_stale):
-                log.info("[Proactive Mode] All alerts low or stale → proactive advisory | user=%s", _short_id(email))
-                future = ex.submit(generate_advice, query, db_alerts, user_prof, **advisor_extra)
-                try:
-                    advisory_result = future.result(timeout=ADVISOR_TIMEOUT) or {}
-                    advisory_result["proactive_triggered"] = True
-                    usage_info["proactive_triggered"] = True
-                except FuturesTimeout:
-                    adv_elapsed = time.perf_counter() - advisor_start
-                    log.error("Advisor timed out after %ss (proactive mode) [%.3fs elapsed]", ADVISOR_TIMEOUT, adv_elapsed)
-                    usage_info["fallback_reason"] = "advisor_timeout"
+        advisor_kwargs = {
+            "email": email,
+            "region": region,
+            "threat_type": threat_type,
+            "user_profile": _advice_profile(user_profile),
+            "historical_alerts": historical_alerts,
+        }
+        try:
+            advisor_extra = dict(advisor_kwargs)
+            user_prof = advisor_extra.pop("user_profile", None)
+
+            with ThreadPoolExecutor(max_workers=1) as ex:
+                if db_alerts and (all_low or alerts_stale):
+                    log.info("[Proactive Mode] All alerts low or stale → proactive advisory | user=%s", _short_id(email))
+                    future = ex.submit(_generate_advice_cached, advice_key, query, db_alerts, user_prof, **advisor_extra)
                     try:
-                        log_security_event(event_type="advice_generation_timeout", email=email, plan=plan_name, details=f"{ADVISOR_TIMEOUT}s timeout")
-                    except Exception:
-                        pass
-                    if ASYNC_FALLBACK:
-                        bg_session = session_id
-                        start_background_job(bg_session, generate_advice, query, db_alerts, user_prof, **advisor_extra)
-                        reply_text = "Accepted for background processing (proactive). Poll for results with session_id."
-                        payload = {
-                            "accepted": True,
-                            "session_id": bg_session,
-                            "message": reply_text,
-                            "plan": plan_name,
-                            "quota": _build_quota_obj(email, plan_name),
-                        }
-                        set_cache(cache_key, payload)
+                        advisory_result = future.result(timeout=ADVISOR_TIMEOUT) or {}
+                        advisory_result["proactive_triggered"] = True
+                        usage_info["proactive_triggered"] = True
+                    except FuturesTimeout:
+                        adv_elapsed = time.perf_counter() - advisor_start
+                        log.error("Advisor timed out after %ss (proactive mode) [%.3fs elapsed]", ADVISOR_TIMEOUT, adv_elapsed)
+                        usage_info["fallback_reason"] = "advisor_timeout"
                         try:
-                            log_security_event(event_type="response_accepted_bg", email=email, plan=plan_name, details=f"bg_session={bg_session}")
+                            log_security_event(event_type="advice_generation_timeout", email=email, plan=plan_name, details=f"{ADVISOR_TIMEOUT}s timeout")
                         except Exception:
                             pass
-                        return payload
-                    else:
-                        advisory_result = {"reply": "Request timed out. Please try a shorter or simpler query.", "timeout": True}
-            else:
-                future = ex.submit(generate_advice, query, db_alerts, user_prof, **advisor_extra)
-                try:
-                    advisory_result = future.result(timeout=ADVISOR_TIMEOUT) or {}
-                    advisory_result["proactive_triggered"] = False
-                except FuturesTimeout:
-                    adv_elapsed = time.perf_counter() - advisor_start
-                    log.error("Advisor timed out after %ss [%.3fs elapsed]", ADVISOR_TIMEOUT, adv_elapsed)
-                    usage_info["fallback_reason"] = "advisor_timeout"
+                        if ASYNC_FALLBACK:
+                            bg_session = session_id
+                            start_background_job(bg_session, _generate_advice_cached, advice_key, query, db_alerts, user_prof, **advisor_extra)
+                            reply_text = "Accepted for background processing (proactive). Poll for results with session_id."
+                            payload = {
+                                "accepted": True,
+                                "session_id": bg_session,
+                                "message": reply_text,
+                                "plan": plan_name,
+                                "quota": _build_quota_obj(email, plan_name),
+                            }
+                            try:
+                                log_security_event(event_type="response_accepted_bg", email=email, plan=plan_name, details=f"bg_session={bg_session}")
+                            except Exception:
+                                pass
+                            return payload
+                        else:
+                            advisory_result = {"reply": "Request timed out. Please try a shorter or simpler query.", "timeout": True}
+                else:
+                    future = ex.submit(_generate_advice_cached, advice_key, query, db_alerts, user_prof, **advisor_extra)
                     try:
-                        log_security_event(event_type="advice_generation_timeout", email=email, plan=plan_name, details=f"{ADVISOR_TIMEOUT}s timeout")
-                    except Exception:
-                        pass
-                    if ASYNC_FALLBACK:
-                        bg_session = session_id
-                        start_background_job(bg_session, generate_advice, query, db_alerts, user_prof, **advisor_extra)
-                        reply_text = "Accepted for background processing. Poll for results with session_id."
-                        payload = {
-                            "accepted": True,
-                            "session_id": bg_session,
-                            "message": reply_text,
-                            "plan": plan_name,
-                            "quota": _build_quota_obj(email, plan_name),
-                        }
-                        set_cache(cache_key, payload)
+                        advisory_result = future.result(timeout=ADVISOR_TIMEOUT) or {}
+                        advisory_result["proactive_triggered"] = False
+                    except FuturesTimeout:
+                        adv_elapsed = time.perf_counter() - advisor_start
+                        log.error("Advisor timed out after %ss [%.3fs elapsed]", ADVISOR_TIMEOUT, adv_elapsed)
+                        usage_info["fallback_reason"] = "advisor_timeout"
                         try:
-                            log_security_event(event_type="response_accepted_bg", email=email, plan=plan_name, details=f"bg_session={bg_session}")
+                            log_security_event(event_type="advice_generation_timeout", email=email, plan=plan_name, details=f"{ADVISOR_TIMEOUT}s timeout")
                         except Exception:
                             pass
-                        return payload
-                    else:
-                        advisory_result = {"reply": "Request timed out. Please try a shorter or simpler query.", "timeout": True}
-    except Exception as e:
-        adv_elapsed = time.perf_counter() - advisor_start
-        log.error("Advisor failed after %.3fs: %s", adv_elapsed, e)
-        advisory_result = {"reply": f"System error generating advice: {e}"}
-        usage_info["fallback_reason"] = "advisor_error"
-        try:
-            log_security_event(event_type="advice_generation_failed", email=email, plan=plan_name, details=str(e))
-        except Exception:
-            pass
+                        if ASYNC_FALLBACK:
+                            bg_session = session_id
+                            start_background_job(bg_session, _generate_advice_cached, advice_key, query, db_alerts, user_prof, **advisor_extra)
+                            reply_text = "Accepted for background processing. Poll for results with session_id."
+                            payload = {
+                                "accepted": True,
+                                "session_id": bg_session,
+                                "message": reply_text,
+                                "plan": plan_name,
+                                "quota": _build_quota_obj(email, plan_name),
+                            }
+                            try:
+                                log_security_event(event_type="response_accepted_bg", email=email, plan=plan_name, details=f"bg_session={bg_session}")
+                            except Exception:
+                                pass
+                            return payload
+                        else:
+                            advisory_result = {"reply": "Request timed out. Please try a shorter or simpler query.", "timeout": True}
+        except Exception as e:
+            adv_elapsed = time.perf_counter() - advisor_start
+            log.error("Advisor failed after %.3fs: %s", adv_elapsed, e)
+            advisory_result = {"reply": f"System error generating advice: {e}"}
+            usage_info["fallback_reason"] = "advisor_error"
+            try:
+                log_security_event(event_type="advice_generation_failed", email=email, plan=plan_name, details=str(e))
+            except Exception:
+                pass
 
     advisor_elapsed = time.perf_counter() - advisor_start
     log.info("Advisor phase: %.3fs | user=%s", advisor_elapsed, _short_id(email))
@@ -1297,7 +1319,6 @@ def handle_user_query(
         "session_id": session_id,
         "metadata": response_metadata  # NEW: Include response quality metadata
     }
-    set_cache(cache_key, payload)
     overall_elapsed = time.perf_counter() - overall_start
     
     # ---- Enhanced timing summary with phase breakdown ----
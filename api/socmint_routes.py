@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from utils.socmint_service import SocmintService, get_cache_metrics, reset_cache_metrics
+from utils.socmint_service import get_socmint_service, get_cache_metrics, reset_cache_metrics
 from utils import auth_utils
 from functools import wraps
 import logging
@@ -7,7 +7,7 @@ import urllib.parse
 from utils.db_utils import fetch_one
 
 socmint_bp = Blueprint('socmint', __name__)
-apify_service = SocmintService()
+apify_service = get_socmint_service()
 logger = logging.getLogger(__name__)
 
 # Try to import limiter for rate limiting
@@ -125,6 +125,9 @@ class TelegramConfig:
     max_msg_age_days: int = _getenv_int("TELEGRAM_MAX_MSG_AGE_DAYS", 7)
     batch_limit: int = _getenv_int("TELEGRAM_BATCH_LIMIT", 300)
     session: str = os.getenv("TELEGRAM_SESSION", "sentinel")
+    concurrency: int = _getenv_int("TELEGRAM_CONCURRENCY", 4)
+    save_batch_size: int = _getenv_int("TELEGRAM_SAVE_BATCH_SIZE", 200)
+    flood_wait_max_s: int = _getenv_int("TELEGRAM_FLOOD_WAIT_MAX_S", 120)
 
 
 @dataclass(frozen=True)
@@ -198,6 +201,7 @@ class ApplicationConfig:
     # Embedding quota
     embedding_quota_daily: int = _getenv_int("EMBEDDING_QUOTA_DAILY", 10000)
     embedding_requests_daily: int = _getenv_int("EMBEDDING_REQUESTS_DAILY", 5000)
+    embedding_backfill_concurrency: int = _getenv_int("EMBEDDING_BACKFILL_CONCURRENCY", 4)
 
 
 @dataclass(frozen=True)
@@ -146,6 +146,26 @@ if os.getenv('WEEKLY_DIGEST_ENABLED', 'true').lower() == 'true':
 else:
     logger.info("[main] Weekly digest scheduler disabled (WEEKLY_DIGEST_ENABLED=false)")
 
+# Warm the trimmed spaCy NER pipeline in the background so the first chat
+# query in this worker doesn't pay the model load
+if os.getenv('LOCATION_NER_WARM', 'true').lower() == 'true':
+    try:
+        import threading
+        from services.location_ner import warm_location_ner
+        threading.Thread(target=warm_location_ner, name="location-ner-warm", daemon=True).start()
+    except Exception as e:
+        logger.warning(f"[main] Location NER warmup not started: {e}")
+
+# Optionally start the PDF render pool now (templates and fonts load in each
+# pool process) instead of on the first export
+if os.getenv('PDF_RENDER_WARM', 'false').lower() == 'true':
+    try:
+        import threading
+        from services.pdf.renderer import get_pdf_renderer
+        threading.Thread(target=lambda: get_pdf_renderer().warm(), name="pdf-render-warm", daemon=True).start()
+    except Exception as e:
+        logger.warning(f"[main] PDF renderer warmup not started: {e}")
+
 # RSS scheduler removed - using Railway cron jobs instead (run_rss_ingest in railway_cron.py)
 logger.info("[main] RSS processing delegated to Railway cron jobs")
 
@@ -857,7 +877,8 @@ def run_opencage_migration():
 def rss_diagnostics():
     """Get RSS ingestion diagnostics (admin only).
     
-    Returns recent RSS ingest runs, skip reasons, and DB write stats.
+    Returns recent RSS ingest runs, skip reasons, DB write stats, and
+    per-host p50/p95 feed fetch latency for the latest run.
     
     Example:
         GET /admin/rss/diag?api_key=your_admin_key
@@ -886,15 +907,29 @@ def rss_diagnostics():
         diag_exists = cur.fetchone()[0]
         
         diag_runs = []
+        host_latency = None
         if diag_exists:
             cur.execute("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.columns
+                    WHERE table_name = 'rss_ingest_diag' AND column_name = 'host_latency'
+                );
+            """)
+            latency_col = "host_latency" if cur.fetchone()[0] else "NULL"
+            cur.execute(f"""
                 SELECT run_at, feeds_processed, entries_seen, alerts_built,
-                       skip_language, skip_keywords, skip_denylist, skip_duplicate
+                       skip_language, skip_keywords, skip_denylist, skip_duplicate,
+                       {latency_col}
                 FROM rss_ingest_diag 
                 ORDER BY run_at DESC 
                 LIMIT 20
             """)
             for row in cur.fetchall():
+                if host_latency is None and row[8]:
+                    host_latency = {
+                        "run_at": row[0].isoformat() if row[0] else None,
+                        "hosts": row[8],
+                    }
                 diag_runs.append({
                     "run_at": row[0].isoformat() if row[0] else None,
                     "feeds_processed": row[1],
@@ -929,9 +964,42 @@ def rss_diagnostics():
             "DATABASE_URL_SET": "yes" if os.getenv("DATABASE_URL") else "no"
         }
         
+        # Host latency/cooldowns persisted by fetch_scheduler; ingest runs in the
+        # cron process, so this process's in-memory scheduler is usually empty
+        fetch_scheduler = {}
+        cur.execute("SELECT to_regclass('public.feed_health') IS NOT NULL")
+        if cur.fetchone()[0]:
+            cur.execute("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.columns
+                    WHERE table_name = 'feed_health' AND column_name = 'host_latency_ewma_ms'
+                );
+            """)
+            ewma_col = "host_latency_ewma_ms" if cur.fetchone()[0] else "NULL::double precision"
+            cur.execute(f"""
+                SELECT host, MAX({ewma_col}), MAX(backoff_until), MIN(consecutive_fail)
+                FROM feed_health
+                WHERE host IS NOT NULL AND host <> ''
+                GROUP BY host
+                ORDER BY MAX(backoff_until) DESC NULLS LAST, MAX({ewma_col}) DESC NULLS LAST
+                LIMIT 50
+            """)
+            now_utc = datetime.utcnow()
+            for host, latency_ms, backoff_until, consecutive_fail in cur.fetchall():
+                fetch_scheduler[host] = {
+                    "ewma_ms": round(float(latency_ms), 1) if latency_ms is not None else None,
+                    "cooldown_s": round(max(0.0, (backoff_until - now_utc).total_seconds())) if backoff_until else 0,
+                    "backoff_until": backoff_until.isoformat() + "Z" if backoff_until else None,
+                    "consecutive_failures": consecutive_fail or 0,
+                }
+        
         cur.close()
         conn.close()
         
+        # Fetch latency of a run in this process (ingest may also run in a worker)
+        from services.feed_health import get_feed_health_buffer
+        from services.feed_cadence import get_feed_cadence
+        
         return jsonify({
             "diag_table_exists": diag_exists,
             "recent_runs": diag_runs,
@@ -940,6 +1008,10 @@ def rss_diagnostics():
                 "last_24h": recent_raw
             },
             "env_vars": env_check,
+            "host_latency": host_latency,
+            "feed_health_live": get_feed_health_buffer().snapshot(),
+            "fetch_scheduler": fetch_scheduler,
+            "feed_cadence_live": get_feed_cadence().snapshot(),
             "timestamp": datetime.utcnow().isoformat() + "Z"
         })
         
@@ -1542,7 +1614,8 @@ def admin_finalize_report(request_id):
             update_report_request_status,
             fetch_one,
         )
-        from services.pdf.intelligence_report import generate_intelligence_report_pdf
+        from services.pdf.intelligence_report import submit_intelligence_report_pdf
+        from services.pdf.renderer import PdfRenderQueueFull
 
         data = request.json or {}
         report_id = data.get("report_id")  # ID of the report to finalize
@@ -1593,60 +1666,71 @@ def admin_finalize_report(request_id):
         # Optionally get logo URL from environment or config
         logo_url = os.getenv("LOGO_URL")  # e.g., "https://cdn.example.com/logo.png"
         
-        pdf_path = generate_intelligence_report_pdf(
-            report_title=report_title,
-            report_body=report_body,
-            request_meta=request_details,
-            analyst_email=analyst_email,
-            user_email=user_email,
-            output_dir=output_dir,
-            file_tag=report_id,
-            logo_url=logo_url,
-        )
-
-        if not pdf_path or not os.path.exists(pdf_path):
-            logger.error(f"PDF generation failed for report {report_id}")
-            return make_response(jsonify({"error": "PDF generation failed"}), 500)
-
         pdf_url = f"/api/reports/{report_id}/download"
 
-        # Update report metadata and request status
-        update_report_pdf_url(report_id, pdf_url)
-        update_report_request_status(request_id, "delivered")
+        def _deliver(job):
+            # Runs when the render finishes: mark delivered and notify requester
+            if job.state != "done":
+                logger.error(f"PDF generation failed for report {report_id}: {job.error}")
+                return
+            update_report_pdf_url(report_id, pdf_url)
+            update_report_request_status(request_id, "delivered")
+            logger.info(f"Report {report_id} finalized: {job.size_bytes} bytes in {job.render_ms:.0f}ms")
 
-        file_size = os.path.getsize(pdf_path) if os.path.exists(pdf_path) else None
+            try:
+                if user_email:
+                    from utils.email_dispatcher import send_email
 
-        # Notify requester
+                    send_email(
+                        user_email=user_email,
+                        to_addr=user_email,
+                        subject=f"Your Intelligence Report is Ready for Download: {report_title}",
+                        html_body=f"""
+                        <h2>Your Intelligence Report is Now Ready</h2>
+                        <p><strong>Request ID:</strong> {request_id}</p>
+                        <p><strong>Report Title:</strong> {report_title}</p>
+                        <p><a href="https://sentinel-ai.com/app/reports/{report_id}/download" style="background-color: #0ea5e9; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; display: inline-block;">Download Report (PDF)</a></p>
+                        <p>Access your report in the Sentinel AI dashboard.</p>
+                        """,
+                        from_addr=None,
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to send user notification: {e}")
+
+        # Render off-request; delivery happens in _deliver once the PDF exists
         try:
-            if user_email:
-                from utils.email_dispatcher import send_email
+            submitted = submit_intelligence_report_pdf(
+                report_title=report_title,
+                report_body=report_body,
+                request_meta=request_details,
+                analyst_email=analyst_email,
+                user_email=user_email,
+                output_dir=output_dir,
+                file_tag=report_id,
+                logo_url=logo_url,
+                on_done=_deliver,
+            )
+        except PdfRenderQueueFull:
+            resp = make_response(jsonify({"error": "PDF renderer busy, try again shortly"}), 503)
+            resp.headers["Retry-After"] = "10"
+            return resp
 
-                send_email(
-                    user_email=user_email,
-                    to_addr=user_email,
-                    subject=f"Your Intelligence Report is Ready for Download: {report_title}",
-                    html_body=f"""
-                    <h2>Your Intelligence Report is Now Ready</h2>
-                    <p><strong>Request ID:</strong> {request_id}</p>
-                    <p><strong>Report Title:</strong> {report_title}</p>
-                    <p><a href="https://sentinel-ai.com/app/reports/{report_id}/download" style="background-color: #0ea5e9; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; display: inline-block;">Download Report (PDF)</a></p>
-                    <p>Access your report in the Sentinel AI dashboard.</p>
-                    """,
-                    from_addr=None,
-                )
-        except Exception as e:
-            logger.warning(f"Failed to send user notification: {e}")
+        if not submitted:
+            logger.error(f"PDF generation failed for report {report_id}")
+            return make_response(jsonify({"error": "PDF generation failed"}), 500)
+
+        job_id, pdf_path = submitted
 
-        return jsonify(
+        return make_response(jsonify(
             {
                 "ok": True,
-                "message": "Report finalized with PDF",
+                "message": "Report PDF rendering; request is marked delivered when done",
+                "job_id": job_id,
+                "status_url": f"/admin/reports/pdf-jobs/{job_id}",
                 "pdf_url": pdf_url,
-                "file_size": file_size,
                 "pdf_path": pdf_path,
-                "delivered_at": datetime.utcnow().isoformat(),
             }
-        )
+        ), 202)
 
     except Exception as e:
         logger.error(f"admin_finalize_report error: {e}")
@@ -1655,6 +1739,25 @@ def admin_finalize_report(request_id):
         return make_response(jsonify({"error": str(e)}), 500)
 
 
+@app.route("/admin/reports/pdf-jobs/<job_id>", methods=["GET"])
+def admin_report_pdf_job(job_id):
+    """Status of a report PDF render queued by this worker, plus renderer stats."""
+    api_key = request.headers.get("X-API-Key") or request.args.get("api_key")
+    expected_key = os.getenv("ADMIN_API_KEY")
+
+    if not expected_key or api_key != expected_key:
+        return jsonify({"error": "Unauthorized - valid API key required"}), 401
+
+    from services.pdf.renderer import get_pdf_renderer
+
+    renderer = get_pdf_renderer()
+    job = renderer.status(job_id)
+    if job is None:
+        return make_response(jsonify({"error": "Unknown job (finished long ago or queued by another worker)",
+                                      "renderer": renderer.stats()}), 404)
+    return jsonify({"ok": True, "job": job, "renderer": renderer.stats()})
+
+
 @app.route("/api/reports/<report_id>/download", methods=["GET"])
 def download_report_pdf(report_id):
     """Download finalized PDF report (authenticated users only)."""
@@ -3324,11 +3427,13 @@ def rss_run():
     groups = payload.get("groups") or None
     limit = int(payload.get("limit") or os.getenv("RSS_BATCH_LIMIT", 400))
     write_to_db = bool(payload.get("write_to_db", True))
+    # Fetch every feed instead of only those due by their polling cadence
+    full_sweep = bool(payload.get("full_sweep", False))
 
     try:
         import asyncio
         res = asyncio.get_event_loop().run_until_complete(
-            ingest_all_feeds_to_db(group_names=groups, limit=limit, write_to_db=write_to_db)
+            ingest_all_feeds_to_db(group_names=groups, limit=limit, write_to_db=write_to_db, full_sweep=full_sweep)
         )
         return _build_cors_response(jsonify({"ok": True, **res}))
     except RuntimeError:
@@ -3336,7 +3441,7 @@ def rss_run():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         res = loop.run_until_complete(
-            ingest_all_feeds_to_db(group_names=groups, limit=limit, write_to_db=write_to_db)
+            ingest_all_feeds_to_db(group_names=groups, limit=limit, write_to_db=write_to_db, full_sweep=full_sweep)
         )
         loop.close()
         return _build_cors_response(jsonify({"ok": True, **res}))
@@ -5328,10 +5433,12 @@ def get_coverage_gaps_endpoint():
 def get_monitoring_stats():
     try:
         from monitoring.coverage_monitor import get_coverage_monitor
+        from services.advisory_cache import get_advisory_cache
         monitor = get_coverage_monitor()
         return _build_cors_response(jsonify({
             "location_extraction": monitor.get_location_extraction_stats(),
             "advisory_gating": monitor.get_advisory_gating_stats(),
+            "advisory_cache": get_advisory_cache().stats(),
         }))
     except Exception as e:
         logger.error(f"/api/monitoring/stats error: {e}")
@@ -8361,15 +8468,20 @@ def export_pdf():
         }
     }
     
-    Response:
+    Response (202 Accepted; the PDF renders in the background, poll
+    status_url until "status" is "done", then download from url):
     {
         "ok": true,
         "id": "uuid",
+        "status": "queued",
+        "status_url": "/api/export/pdf/uuid/status",
         "url": "/downloads/uuid.pdf",
         "filename": "threat_alert_20251125.pdf",
         "expires_at": "2025-11-26T12:00:00Z",
         "usage": {"used": 1, "limit": 10, "remaining": 9}
     }
+    
+    503 with Retry-After when the render queue is full.
     """
     email = get_logged_in_email()
     
@@ -8425,14 +8537,6 @@ def export_pdf():
                 'available_templates': ['threat_alert', 'weekly_digest', 'travel_brief']
             }), 400))
         
-        # Generate PDF
-        from jinja2 import Environment, FileSystemLoader
-        from weasyprint import HTML
-        
-        # Setup Jinja2 environment
-        env = Environment(loader=FileSystemLoader('templates/pdf'))
-        template = env.get_template(f'{template_name}.html')
-        
         # Merge options with data for template rendering
         template_context = {
             **data,
@@ -8447,22 +8551,15 @@ def export_pdf():
             'logo_url': options.get('logo_url')
         }
         
-        # Render HTML
-        html_content = template.render(**template_context)
-        
         # Generate unique file ID and path
         file_id = str(uuid.uuid4())
-        pdf_filename = f"{file_id}.pdf"
-        pdf_path = os.path.join('downloads', pdf_filename)
-        
-        # Ensure downloads directory exists
-        os.makedirs('downloads', exist_ok=True)
+        pdf_path = os.path.join('downloads', f"{file_id}.pdf")
         
-        # Convert HTML to PDF
-        HTML(string=html_content, base_url=request.url_root).write_pdf(pdf_path)
-        
-        # Increment usage counter
         from utils.db_utils import execute_query
+        from services.pdf.renderer import get_pdf_renderer, PdfRenderQueueFull
+        
+        # Reserve the export and its download record before queueing, so a
+        # fast render failure always has something to release
         execute_query(
             'UPDATE user_usage SET pdf_exports_used = pdf_exports_used + 1 WHERE user_id=%s',
             (user_id,)
@@ -8480,16 +8577,51 @@ def export_pdf():
             (file_id, user_id, filename, template_name)
         )
         
+        def _release_export():
+            try:
+                execute_query('DELETE FROM pdf_exports WHERE id=%s', (file_id,))
+                execute_query(
+                    'UPDATE user_usage SET pdf_exports_used = GREATEST(pdf_exports_used - 1, 0) WHERE user_id=%s',
+                    (user_id,)
+                )
+            except Exception as cleanup_error:
+                logger.error(f"export_pdf cleanup failed: id={file_id}, error={cleanup_error}")
+        
+        def _on_render_done(job):
+            if job.state == 'failed':
+                logger.error(f"PDF export render failed: id={file_id}, error={job.error}")
+                metrics.increment("pdf_exports.error", 1, error_type="RenderFailed")
+                _release_export()
+        
+        # Render off-request in the shared PDF pool; the client polls the status URL
+        try:
+            get_pdf_renderer().submit(
+                f'{template_name}.html',
+                template_context,
+                output_path=pdf_path,
+                base_url=request.url_root,
+                job_id=file_id,
+                on_done=_on_render_done,
+            )
+        except PdfRenderQueueFull:
+            _release_export()
+            metrics.increment("pdf_exports.queue_full", 1, plan=plan, template=template_name)
+            resp = make_response(jsonify({'error': 'PDF renderer busy, try again shortly'}), 503)
+            resp.headers['Retry-After'] = '10'
+            return _build_cors_response(resp)
+        
         # Calculate remaining exports
         new_used = pdf_exports_used + 1
         remaining = None if monthly_limit is None else max(0, monthly_limit - new_used)
         
-        logger.info(f"PDF export generated: user={email}, plan={plan}, template={template_name}, id={file_id}")
+        logger.info(f"PDF export queued: user={email}, plan={plan}, template={template_name}, id={file_id}")
         metrics.increment("pdf_exports.generated", 1, plan=plan, template=template_name)
         
-        return _build_cors_response(jsonify({
+        return _build_cors_response(make_response(jsonify({
             'ok': True,
             'id': file_id,
+            'status': 'queued',
+            'status_url': f'/api/export/pdf/{file_id}/status',
             'url': f'/downloads/{file_id}.pdf',
             'filename': f'{filename}.pdf',
             'expires_at': expires_at,
@@ -8498,13 +8630,65 @@ def export_pdf():
                 'limit': monthly_limit,
                 'remaining': remaining
             }
-        }))
+        }), 202))
         
     except Exception as e:
         logger.error(f'export_pdf error: {e}', exc_info=True)
         metrics.increment("pdf_exports.error", 1, error_type=type(e).__name__)
         return _build_cors_response(make_response(jsonify({'error': 'PDF generation failed', 'details': str(e)}), 500))
 
+@app.route('/api/export/pdf/<file_id>/status', methods=['GET'])
+@login_required
+def export_pdf_status(file_id):
+    """
+    Poll a queued PDF export.
+    
+    Response:
+    {"ok": true, "id": "uuid", "status": "queued|running|done|failed",
+     "url": "/downloads/uuid.pdf" (when done), "render_ms": 840.2}
+    """
+    email = get_logged_in_email()
+    
+    try:
+        from utils.plan_utils import _get_user_id
+        from utils.db_utils import fetch_one
+        from services.pdf.renderer import get_pdf_renderer
+        
+        try:
+            uuid.UUID(file_id)
+        except ValueError:
+            return _build_cors_response(make_response(jsonify({'error': 'Invalid file ID'}), 400))
+        
+        user_id = _get_user_id(email)
+        job = get_pdf_renderer().status(file_id)
+        file_meta = fetch_one('SELECT user_id FROM pdf_exports WHERE id=%s', (file_id,))
+        
+        if not file_meta:
+            # Failed renders release their pdf_exports row
+            if job and job['state'] == 'failed':
+                return _build_cors_response(jsonify({'ok': False, 'id': file_id, 'status': 'failed',
+                                                     'error': 'PDF generation failed'}))
+            return _build_cors_response(make_response(jsonify({'error': 'File not found'}), 404))
+        if file_meta['user_id'] != user_id:
+            return _build_cors_response(make_response(jsonify({'error': 'Access denied'}), 403))
+        
+        if job is not None:
+            state = job['state']
+        else:
+            # Job was queued by another web worker: the file appears when it is done
+            state = 'done' if os.path.exists(os.path.join('downloads', f'{file_id}.pdf')) else 'queued'
+        
+        body = {'ok': state != 'failed', 'id': file_id, 'status': state}
+        if job is not None:
+            body['render_ms'] = job['render_ms']
+        if state == 'done':
+            body['url'] = f'/downloads/{file_id}.pdf'
+        return _build_cors_response(jsonify(body))
+        
+    except Exception as e:
+        logger.error(f'export_pdf_status error: {e}', exc_info=True)
+        return _build_cors_response(make_response(jsonify({'error': 'Status lookup failed'}), 500))
+
 @app.route('/downloads/<file_id>.pdf', methods=['GET'])
 @login_required
 def download_pdf(file_id):
@@ -8560,6 +8744,13 @@ def download_pdf(file_id):
         # Validate file exists on disk
         pdf_path = os.path.join('downloads', f'{file_id}.pdf')
         if not os.path.exists(pdf_path):
+            from services.pdf.renderer import get_pdf_renderer
+            job = get_pdf_renderer().status(file_id)
+            if job and job['state'] in ('queued', 'running'):
+                return _build_cors_response(make_response(jsonify({
+                    'status': job['state'],
+                    'status_url': f'/api/export/pdf/{file_id}/status'
+                }), 202))
             logger.error(f"PDF file missing from disk: {pdf_path}")
             return _build_cors_response(make_response(jsonify({'error': 'File not available'}), 404))
         
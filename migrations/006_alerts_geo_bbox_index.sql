@@ -0,0 +1,7 @@
+-- 006_alerts_geo_bbox_index.sql
+-- Supports the bounding-box prefilter in ThreatFusion._get_rss_threats
+-- (latitude/longitude BETWEEN ... AND published >= cutoff).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alerts_geo_bbox
+    ON alerts USING btree (latitude, longitude, published DESC NULLS LAST)
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
@@ -0,0 +1,17 @@
+-- 007_region_trends_window_key.sql
+-- Unique key for the region_trends upserts in utils/db_utils.py
+-- (save_region_trend / save_region_trends_batch). region is usually NULL,
+-- so the key coalesces it; windows are day-aligned by the enrichment
+-- trend aggregator, so one row per location and day is updated in place.
+
+-- Keep the most recent row of any existing duplicates
+DELETE FROM region_trends a
+USING region_trends b
+WHERE COALESCE(a.region, '') = COALESCE(b.region, '')
+  AND COALESCE(a.city, '') = COALESCE(b.city, '')
+  AND a.window_start IS NOT DISTINCT FROM b.window_start
+  AND a.window_end IS NOT DISTINCT FROM b.window_end
+  AND a.id < b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_region_trends_window
+    ON region_trends ((COALESCE(region, '')), (COALESCE(city, '')), window_start, window_end);
@@ -0,0 +1,35 @@
+-- 008_alerts_location_keys.sql
+-- Normalized location keys for fetch_alerts_from_db_strict_geo (chat retrieval).
+-- Written at ingest by save_alerts_to_db (see utils/location_keys.py); existing
+-- rows are filled by scripts/backfill_location_keys.py.
+
+ALTER TABLE alerts
+    ADD COLUMN IF NOT EXISTS country_code VARCHAR(2),
+    ADD COLUMN IF NOT EXISTS city_key TEXT,
+    ADD COLUMN IF NOT EXISTS is_sports_noise BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Same terms the retrieval query used to exclude, as word prefixes minus the
+-- exception words, like utils.location_keys.is_sports_noise: '%UCL%' matched
+-- "Nuclear", while whole words missed "championship" and "footballers"
+UPDATE alerts
+   SET is_sports_noise = TRUE
+ WHERE NOT is_sports_noise
+   AND title ~* '\m(?!(awarded|awarding|championed|championing|european|europeans)\M)(football|soccer|champion|award|hat-trick|hatrrick|ucl|europa)\w*';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alerts_country_code_published
+    ON alerts (country_code, published DESC NULLS LAST)
+    WHERE NOT is_sports_noise;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alerts_city_key_published
+    ON alerts (city_key, published DESC NULLS LAST)
+    WHERE NOT is_sports_noise;
+
+-- Region queries stay substring matches (region ILIKE '%Africa%')
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alerts_region_trgm
+    ON alerts USING gin (region gin_trgm_ops)
+    WHERE NOT is_sports_noise;
+
+COMMENT ON COLUMN alerts.country_code IS 'ISO 3166-1 alpha-2 code derived from country at ingest';
+COMMENT ON COLUMN alerts.city_key IS 'Canonical city slug derived from city at ingest';
+COMMENT ON COLUMN alerts.is_sports_noise IS 'Title matches sports/entertainment terms excluded from chat retrieval';
@@ -0,0 +1,17 @@
+-- Migration: Per-feed polling cadence
+-- Adds learned publish-cadence columns to feed_health (services/feed_cadence.py)
+-- Idempotent: safe to re-run
+
+ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS newest_entry_at TIMESTAMP WITHOUT TIME ZONE;
+ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS mean_interval_s DOUBLE PRECISION;
+ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS empty_polls INTEGER DEFAULT 0;
+ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS last_polled_at TIMESTAMP WITHOUT TIME ZONE;
+ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS next_due_at TIMESTAMP WITHOUT TIME ZONE;
+
+-- Due-feed lookups
+CREATE INDEX IF NOT EXISTS idx_feed_health_next_due ON feed_health(next_due_at);
+
+COMMENT ON COLUMN feed_health.newest_entry_at IS 'Newest entry timestamp seen in the feed (UTC)';
+COMMENT ON COLUMN feed_health.mean_interval_s IS 'EWMA of inter-arrival seconds between new entries';
+COMMENT ON COLUMN feed_health.empty_polls IS 'Consecutive polls that found no new entries';
+COMMENT ON COLUMN feed_health.next_due_at IS 'When ingest should fetch this feed next (UTC)';
@@ -0,0 +1,9 @@
+-- Migration: Persisted fetch_scheduler host latency
+-- services/fetch_scheduler.py keeps a latency EWMA per host; it is stored on
+-- every feed_health row of the host so a new ingest process can seed it.
+-- avg_latency_ms stays the per-feed running average kept by upsert_feed_health.
+-- Idempotent: safe to re-run
+
+ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS host_latency_ewma_ms DOUBLE PRECISION;
+
+COMMENT ON COLUMN feed_health.host_latency_ewma_ms IS 'Latency EWMA (ms) of the feed''s host, written by fetch_scheduler';
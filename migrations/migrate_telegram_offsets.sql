@@ -0,0 +1,13 @@
+-- Migration: Telegram channel high-water marks
+-- Last harvested message id per channel (utils/telegram_scraper.py), so each
+-- run only requests messages newer than it via min_id
+-- Idempotent: safe to re-run
+
+CREATE TABLE IF NOT EXISTS telegram_channel_offsets (
+    channel TEXT PRIMARY KEY,
+    last_message_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+COMMENT ON COLUMN telegram_channel_offsets.channel IS 'Channel as configured (lowercase, without @)';
+COMMENT ON COLUMN telegram_channel_offsets.last_message_id IS 'Highest message id already harvested';
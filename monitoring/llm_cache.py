@@ -0,0 +1,270 @@
+# llm_cache.py – Content-addressed LLM completion cache with in-flight dedup
+"""
+Syndicated stories reach us through several feeds with the same title and
+summary, so route_llm / route_llm_batch used to send identical prompts to the
+provider chain again and again, often concurrently. Completions are now
+cached under a key derived from:
+
+- task_type
+- messages, with whitespace collapsed per message
+- temperature, rounded to 2 decimals
+- model family, i.e. the provider chain configured for the task
+
+Two tiers: a bounded in-process LRU in front of a SQLite file that survives
+restarts and is shared by workers on the same host. Identical prompts already
+in flight are merged: one caller calls the providers and the others wait for
+its result (single-flight).
+
+Only real completions are stored; the "none" fallback is never cached.
+
+Environment:
+- LLM_CACHE_ENABLED             (default: true)
+- LLM_CACHE_PATH                (default: $ENGINE_CACHE_DIR/llm_completions.sqlite3)
+- LLM_CACHE_TTL                 (default: 604800) seconds a completion is reused
+- LLM_CACHE_MEMORY_ENTRIES      (default: 2048) in-process LRU size
+- LLM_SINGLEFLIGHT_TIMEOUT      (default: 60) seconds a duplicate waits for the leader
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("llm_cache")
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "y")
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.getenv("ENGINE_CACHE_DIR", "cache"), "llm_completions.sqlite3"),
+)
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "2048"))
+LLM_SINGLEFLIGHT_TIMEOUT = float(os.getenv("LLM_SINGLEFLIGHT_TIMEOUT", "60"))
+
+# Expired rows are purged every this many writes
+_PURGE_EVERY = 500
+
+_WS = re.compile(r"\s+")
+
+Completion = Tuple[str, str]  # (text, model_name)
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(role, content) pairs with whitespace runs collapsed and ends stripped."""
+    out = []
+    for m in messages or []:
+        content = m.get("content", "")
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, default=str)
+        out.append((str(m.get("role", "")), _WS.sub(" ", content).strip()))
+    return out
+
+
+def completion_key(task_type: str, messages: List[Dict[str, Any]], temperature: float, model_family: str) -> str:
+    """Content address of one completion request."""
+    payload = json.dumps(
+        [task_type or "general", normalize_messages(messages), round(float(temperature or 0), 2), model_family],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Completion] = None
+
+
+class LLMCompletionCache:
+    """Two-tier (memory LRU + SQLite) completion cache with single-flight."""
+
+    def __init__(
+        self,
+        path: Optional[str] = LLM_CACHE_PATH,
+        ttl: int = LLM_CACHE_TTL,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        flight_timeout: float = LLM_SINGLEFLIGHT_TIMEOUT,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.flight_timeout = flight_timeout
+        self._memory: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+        self._writes = 0
+        self._inflight: Dict[str, _Flight] = {}
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "stores": 0}
+
+    # ---- persistent tier ----
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._db_failed or not self.path:
+            return self._conn
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY, text TEXT NOT NULL, model TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        except Exception as e:
+            # Memory tier still works; don't retry the file on every call
+            self._db_failed = True
+            logger.warning(f"[LLM Cache] Persistent store unavailable at {self.path}: {e}")
+        return self._conn
+
+    def _db_get(self, key: str) -> Optional[Tuple[str, str, float]]:
+        with self._db_lock:
+            conn = self._db()
+            if conn is None:
+                return None
+            try:
+                return conn.execute(
+                    "SELECT text, model, created FROM completions WHERE key = ?", (key,)
+                ).fetchone()
+            except Exception as e:
+                logger.debug(f"[LLM Cache] read failed: {e}")
+                return None
+
+    def _db_put(self, key: str, text: str, model: str, created: float) -> None:
+        with self._db_lock:
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO completions (key, text, model, created) VALUES (?, ?, ?, ?)",
+                    (key, text, model, created),
+                )
+                self._writes += 1
+                if self._writes % _PURGE_EVERY == 0:
+                    conn.execute("DELETE FROM completions WHERE created < ?", (created - self.ttl,))
+                conn.commit()
+            except Exception as e:
+                logger.debug(f"[LLM Cache] write failed: {e}")
+
+    # ---- lookups ----
+
+    def get(self, key: str) -> Optional[Completion]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[2] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    return entry[0], entry[1]
+                del self._memory[key]
+        row = self._db_get(key)
+        if row is None or now - row[2] > self.ttl:
+            return None
+        self._remember(key, row[0], row[1], row[2])
+        with self._lock:
+            self._stats["disk_hits"] += 1
+        return row[0], row[1]
+
+    def put(self, key: str, text: str, model: str) -> None:
+        created = time.time()
+        self._remember(key, text, model, created)
+        self._db_put(key, text, model, created)
+        with self._lock:
+            self._stats["stores"] += 1
+
+    def _remember(self, key: str, text: str, model: str, created: float) -> None:
+        with self._lock:
+            self._memory[key] = (text, model, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # ---- routing entry point ----
+
+    def complete(
+        self,
+        key: str,
+        call: Callable[[], Completion],
+        usage_counts: Optional[Dict[str, int]] = None,
+    ) -> Completion:
+        """
+        Cached result for key, else call() once for all concurrent callers.
+
+        Cache hits and merged duplicates are counted under usage_counts["cache"]
+        so per-run model usage shows them next to provider calls.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self._count_hit(usage_counts, "hits")
+            return cached
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            self._stats["misses" if leader else "coalesced"] += 1
+
+        if not leader:
+            if flight.done.wait(self.flight_timeout) and flight.result is not None:
+                self._count_hit(usage_counts, None)
+                return flight.result
+            # Leader failed or is stuck: go to the providers ourselves
+            return call()
+
+        try:
+            text, model = call()
+            if text and model and model != "none":
+                self.put(key, text, model)
+                flight.result = (text, model)
+            return text, model
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _count_hit(self, usage_counts: Optional[Dict[str, int]], stat: Optional[str]) -> None:
+        if stat:
+            with self._lock:
+                self._stats[stat] += 1
+        if usage_counts is not None:
+            usage_counts["cache"] = usage_counts.get("cache", 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["memory_entries"] = len(self._memory)
+            out["inflight"] = len(self._inflight)
+        lookups = out["hits"] + out["misses"] + out["coalesced"]
+        out["hit_rate"] = round((out["hits"] + out["coalesced"]) / lookups, 4) if lookups else 0.0
+        return out
+
+
+_instance: Optional[LLMCompletionCache] = None
+_instance_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCompletionCache]:
+    """Process-wide completion cache, or None when LLM_CACHE_ENABLED is off."""
+    global _instance
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = LLMCompletionCache()
+    return _instance
@@ -0,0 +1,184 @@
+# llm_provider_health.py – Per-provider latency/error tracking for adaptive LLM routing
+"""
+route_llm used to walk providers in fixed env-configured order, so a slow or
+failing primary added its whole timeout to every call. ProviderHealth keeps,
+per provider:
+
+- an EWMA of successful call latency, plus a window of recent latencies for p90
+- an EWMA of the error rate (empty reply or exception), which decays back
+  towards zero while the provider is not being called, so a demoted provider
+  is retried eventually
+- the state and 5-minute failure rate of its EnhancedCircuitBreaker
+  (monitoring/llm_rate_limiter.py)
+
+order() sorts providers by expected time to a good answer,
+latency / (1 - error_rate). Open circuits go last. Providers with no history
+start from the same prior latency, so they keep the configured order.
+
+Environment:
+- LLM_HEALTH_EWMA_ALPHA        (default: 0.2) weight of the newest sample
+- LLM_HEALTH_PRIOR_LATENCY     (default: 3.0) seconds assumed before a provider has samples
+- LLM_HEALTH_MIN_SAMPLES       (default: 5) successes needed before p90 is trusted
+- LLM_HEALTH_ERROR_HALF_LIFE   (default: 300) seconds for an idle provider's error rate to halve
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("llm_provider_health")
+
+EWMA_ALPHA = float(os.getenv("LLM_HEALTH_EWMA_ALPHA", "0.2"))
+PRIOR_LATENCY = float(os.getenv("LLM_HEALTH_PRIOR_LATENCY", "3.0"))
+MIN_SAMPLES = int(os.getenv("LLM_HEALTH_MIN_SAMPLES", "5"))
+ERROR_HALF_LIFE = float(os.getenv("LLM_HEALTH_ERROR_HALF_LIFE", "300"))
+
+# Errors are capped so a failing provider still has a finite (large) cost
+_MAX_ERROR_RATE = 0.95
+
+
+def _default_circuits() -> Dict[str, Any]:
+    """Router provider name -> EnhancedCircuitBreaker."""
+    try:
+        from monitoring.llm_rate_limiter import deepseek_circuit, moonshot_circuit, openai_circuit, xai_circuit
+    except Exception:
+        return {}
+    return {"grok": xai_circuit, "openai": openai_circuit, "deepseek": deepseek_circuit, "moonshot": moonshot_circuit}
+
+
+class _Stats:
+    __slots__ = ("latency", "error", "samples", "calls", "failures", "hedges", "last_sample_at", "window")
+
+    def __init__(self):
+        self.latency = PRIOR_LATENCY
+        self.error = 0.0
+        self.samples = 0
+        self.calls = 0
+        self.failures = 0
+        self.hedges = 0
+        self.last_sample_at = 0.0
+        self.window = deque(maxlen=200)
+
+
+class ProviderHealth:
+    """Latency and error tracker used to order and hedge provider calls."""
+
+    def __init__(self, circuits: Optional[Dict[str, Any]] = None, alpha: float = EWMA_ALPHA):
+        self.alpha = alpha
+        self._circuits = circuits if circuits is not None else _default_circuits()
+        self._stats: Dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> _Stats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = _Stats()
+        return stats
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        """Record one provider call. Only successful calls update latency."""
+        with self._lock:
+            stats = self._get(name)
+            stats.calls += 1
+            stats.error = self._decayed_error(stats, time.time())
+            stats.error = (1 - self.alpha) * stats.error + self.alpha * (0.0 if ok else 1.0)
+            stats.last_sample_at = time.time()
+            if ok:
+                stats.latency = latency if stats.samples == 0 else (1 - self.alpha) * stats.latency + self.alpha * latency
+                stats.samples += 1
+                stats.window.append(latency)
+            else:
+                stats.failures += 1
+
+    def record_hedge(self, name: str) -> None:
+        """Count a hedged request sent to this provider."""
+        with self._lock:
+            self._get(name).hedges += 1
+
+    @staticmethod
+    def _decayed_error(stats: _Stats, now: float) -> float:
+        if not stats.error or ERROR_HALF_LIFE <= 0:
+            return stats.error
+        idle = max(0.0, now - stats.last_sample_at)
+        return stats.error * math.pow(0.5, idle / ERROR_HALF_LIFE)
+
+    def _circuit_view(self, name: str):
+        """(is_open, failure_rate) from the provider's circuit breaker."""
+        circuit = self._circuits.get(name)
+        if circuit is None:
+            return False, 0.0
+        try:
+            is_open = circuit.state == "open" and (
+                time.time() - (circuit.last_failure_time or 0) < circuit.recovery_timeout
+            )
+            recent = [r for r in list(circuit.request_history) if time.time() - r["timestamp"] < 300]
+            failure_rate = (sum(1 for r in recent if not r["success"]) / len(recent)) if recent else 0.0
+            return is_open, failure_rate
+        except Exception:
+            return False, 0.0
+
+    def expected_cost(self, name: str) -> float:
+        """Expected seconds to a good answer from this provider."""
+        is_open, circuit_rate = self._circuit_view(name)
+        with self._lock:
+            stats = self._get(name)
+            error = max(self._decayed_error(stats, time.time()), circuit_rate)
+            cost = stats.latency / (1.0 - min(error, _MAX_ERROR_RATE))
+        return cost + (1e6 if is_open else 0.0)
+
+    def order(self, providers: List[str]) -> List[str]:
+        """Providers fastest-healthy first; ties keep the configured order."""
+        seen = []
+        for name in providers:
+            if name not in seen:
+                seen.append(name)
+        costs = {name: self.expected_cost(name) for name in seen}
+        return sorted(seen, key=lambda name: (costs[name], seen.index(name)))
+
+    def p90(self, name: str) -> Optional[float]:
+        """90th percentile of recent successful latencies, or None until MIN_SAMPLES."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None or len(stats.window) < MIN_SAMPLES:
+                return None
+            ordered = sorted(stats.window)
+        return ordered[min(len(ordered) - 1, int(math.ceil(0.9 * len(ordered))) - 1)]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider view for logs and health endpoints."""
+        out = {}
+        for name in list(self._stats):
+            is_open, circuit_rate = self._circuit_view(name)
+            with self._lock:
+                stats = self._stats[name]
+                out[name] = {
+                    "ewma_latency": round(stats.latency, 3),
+                    "error_rate": round(self._decayed_error(stats, time.time()), 3),
+                    "calls": stats.calls,
+                    "failures": stats.failures,
+                    "hedges": stats.hedges,
+                    "circuit_open": is_open,
+                    "circuit_failure_rate": round(circuit_rate, 3),
+                }
+            out[name]["p90"] = self.p90(name)
+            out[name]["expected_cost"] = round(self.expected_cost(name), 3)
+        return out
+
+
+_instance: Optional[ProviderHealth] = None
+_instance_lock = threading.Lock()
+
+
+def get_provider_health() -> ProviderHealth:
+    """Process-wide ProviderHealth."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = ProviderHealth()
+    return _instance
@@ -917,6 +917,8 @@ def get_system_performance_report() -> Dict[str, Any]:
         circuit_stats = get_comprehensive_circuit_breaker_stats()
         analysis = analyze_frequent_issues()
         health = get_health_status()
+        from monitoring.llm_provider_health import get_provider_health
+        routing = get_provider_health().snapshot()
         
         # Calculate aggregate metrics
         total_requests = sum(cb["total_requests"] for cb in circuit_stats.values() if isinstance(cb, dict))
@@ -949,7 +951,8 @@ def get_system_performance_report() -> Dict[str, Any]:
             },
             "service_details": {
                 "rate_limiting": rate_stats,
-                "circuit_breakers": circuit_stats
+                "circuit_breakers": circuit_stats,
+                "routing": routing
             },
             "issue_analysis": analysis,
             "health_status": health,
@@ -1,13 +1,27 @@
 import os
+import time
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from llm.deepseek_client import deepseek_chat
 from llm.openai_client_wrapper import openai_chat
 from llm.xai_client import grok_chat
 from llm.moonshot_client import moonshot_chat
 from monitoring.llm_rate_limiter import rate_limited
+from monitoring.llm_cache import completion_key, get_llm_cache
+from monitoring.llm_provider_health import get_provider_health
 
 logger = logging.getLogger("llm_router")
 
+# Hedging: when the provider being waited on passes its p90 latency, the next
+# provider is asked too and the first good reply wins
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes", "y")
+LLM_HEDGE_MAX_PARALLEL = int(os.getenv("LLM_HEDGE_MAX_PARALLEL", "2"))
+LLM_HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", "16"))
+
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
 # Create rate-limited wrapper functions for the router
 @rate_limited("deepseek")
 def deepseek_chat_limited(messages, temperature=0.4, timeout=15):
@@ -25,8 +39,101 @@ def grok_chat_limited(messages, temperature=0.4, timeout=15):
 def moonshot_chat_limited(messages, temperature=0.4, timeout=15):
     return moonshot_chat(messages, temperature=temperature, timeout=timeout)
 
+def _hedge_executor():
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=LLM_HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+    return _hedge_pool
+
+def _provider_fns(name):
+    """(client, rate-limited call) for a router provider name."""
+    return {
+        "deepseek": (deepseek_chat, deepseek_chat_limited),
+        "openai": (openai_chat, openai_chat_limited),
+        "grok": (grok_chat, grok_chat_limited),
+        "moonshot": (moonshot_chat, moonshot_chat_limited),
+    }.get(name, (None, None))
+
+def _first_good_reply(order, try_provider, hedge=None):
+    """
+    (text, provider) from the first provider in order that answers, or (None, None).
+
+    Without hedging providers are tried one after another. With hedging each
+    call runs on the shared pool; if the newest one is still running after its
+    p90 latency the next provider is started alongside it (up to
+    LLM_HEDGE_MAX_PARALLEL at once). The p90 clock starts when a worker picks
+    the call up, so time queued behind other requests never triggers a hedge.
+    The loser's reply is discarded; a call already on the wire runs until its
+    own timeout.
+    """
+    if hedge is None:
+        hedge = LLM_HEDGE_ENABLED
+    if not hedge or len(order) < 2:
+        for name in order:
+            text = try_provider(name)
+            if text:
+                return text, name
+        return None, None
+
+    health = get_provider_health()
+    pool = _hedge_executor()
+    remaining = list(order)
+    pending = {}
+    newest = {"name": None, "started": None}
+
+    def run(name):
+        if newest["name"] == name:
+            newest["started"] = time.monotonic()
+        return try_provider(name)
+
+    def launch(hedged=False):
+        name = remaining.pop(0)
+        if hedged:
+            health.record_hedge(name)
+        newest.update(name=name, started=None)
+        pending[pool.submit(run, name)] = name
+
+    launch()
+    while pending:
+        timeout = p90 = None
+        if remaining and len(pending) < LLM_HEDGE_MAX_PARALLEL:
+            p90 = health.p90(newest["name"])
+            if p90 is not None:
+                started = newest["started"]
+                # Still queued: look again after p90 at the latest
+                timeout = p90 if started is None else max(0.0, started + p90 - time.monotonic())
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            started = newest["started"]
+            if started is None or time.monotonic() - started < p90:
+                continue
+            logger.info(f"[LLM Router] {newest['name']} past p90, hedging with {remaining[0]}")
+            launch(hedged=True)
+            continue
+        for future in done:
+            name = pending.pop(future)
+            text = future.result()
+            if text:
+                for loser in pending:
+                    loser.cancel()
+                return text, name
+        # Failed outright: move on without waiting for p90
+        if remaining and len(pending) < LLM_HEDGE_MAX_PARALLEL:
+            launch()
+    return None, None
+
+def _cached(key_parts, call, usage_counts):
+    """Serve call() through the completion cache (identical prompts share one result)."""
+    cache = get_llm_cache()
+    if cache is None:
+        return call()
+    return cache.complete(completion_key(*key_parts), call, usage_counts=usage_counts)
+
 def route_llm(messages, temperature=0.4, usage_counts=None, task_type="general"):
-    usage_counts = usage_counts or {"deepseek": 0, "openai": 0, "grok": 0, "moonshot": 0, "none": 0}
+    if usage_counts is None:
+        usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "moonshot": 0, "none": 0, "cache": 0}
 
     # New specialized routing based on task type - OPTIMIZED FOR PAID PROVIDERS
     if task_type == "enrichment" or task_type == "search":
@@ -50,44 +157,44 @@ def route_llm(messages, temperature=0.4, usage_counts=None, task_type="general")
     
     provider_order = [PROVIDER_PRIMARY, PROVIDER_SECONDARY, PROVIDER_TERTIARY, PROVIDER_QUATERNARY]
 
-    logger.info(f"[LLM Router] Using provider order: {provider_order}")
+    timeouts = {
+        "deepseek": TIMEOUT_DEEPSEEK,
+        "openai": TIMEOUT_OPENAI,
+        "grok": TIMEOUT_GROK,
+        "moonshot": TIMEOUT_MOONSHOT,
+    }
+    health = get_provider_health()
 
     def try_provider(name):
+        client, call = _provider_fns(name)
+        if not client:
+            return None
+        start = time.monotonic()
+        text = None
         try:
-            if name == "deepseek" and deepseek_chat:
-                s = deepseek_chat_limited(messages, temperature=temperature, timeout=TIMEOUT_DEEPSEEK)
-                if s and s.strip():
-                    usage_counts["deepseek"] += 1
-                    return s.strip(), "deepseek"
-            elif name == "openai" and openai_chat:
-                s = openai_chat_limited(messages, temperature=temperature, timeout=TIMEOUT_OPENAI)
-                if s and s.strip():
-                    usage_counts["openai"] += 1
-                    return s.strip(), "openai"
-            elif name == "grok" and grok_chat:
-                s = grok_chat_limited(messages, temperature=temperature, timeout=TIMEOUT_GROK)
-                if s and s.strip():
-                    usage_counts["grok"] += 1
-                    return s.strip(), "grok"
-            elif name == "moonshot" and moonshot_chat:
-                s = moonshot_chat_limited(messages, temperature=temperature, timeout=TIMEOUT_MOONSHOT)
-                if s and s.strip():
-                    usage_counts["moonshot"] += 1
-                    return s.strip(), "moonshot"
+            s = call(messages, temperature=temperature, timeout=timeouts[name])
+            text = s.strip() if s and s.strip() else None
         except Exception as e:
             logger.error(f"[LLM Router][{name} error] {e}")
-        return None, None
+        health.record(name, time.monotonic() - start, bool(text))
+        return text
 
-    for provider in provider_order:
-        summary, model_name = try_provider(provider)
+    def call_providers():
+        # Fastest healthy provider first; the configured order breaks ties
+        order = health.order(provider_order)
+        logger.info(f"[LLM Router] Using provider order: {order}")
+        summary, model_name = _first_good_reply(order, try_provider)
         if summary:
+            usage_counts[model_name] = usage_counts.get(model_name, 0) + 1
             return summary, model_name
 
-    # Ensure 'none' key exists before incrementing
-    if "none" not in usage_counts:
-        usage_counts["none"] = 0
-    usage_counts["none"] += 1
-    return "", "none"
+        # Ensure 'none' key exists before incrementing
+        if "none" not in usage_counts:
+            usage_counts["none"] = 0
+        usage_counts["none"] += 1
+        return "", "none"
+
+    return _cached((task_type, messages, temperature, ">".join(provider_order)), call_providers, usage_counts)
 
 def route_llm_search(query, context="", usage_counts=None):
     """
@@ -176,7 +283,7 @@ def route_llm_batch(alerts_batch, usage_counts=None):
     Uses paid providers first: Moonshot → OpenAI → Grok → DeepSeek.
     """
     if usage_counts is None:
-        usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "moonshot": 0, "none": 0}
+        usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "moonshot": 0, "none": 0, "cache": 0}
     elif "none" not in usage_counts:
         usage_counts["none"] = 0
     
@@ -203,38 +310,41 @@ def route_llm_batch(alerts_batch, usage_counts=None):
         }
     ]
     
-    logger.info(f"[LLM Batch Router] Processing {len(alerts_batch)} alerts with {batch_provider}")
+    def call_provider():
+        logger.info(f"[LLM Batch Router] Processing {len(alerts_batch)} alerts with {batch_provider}")
     
-    try:
-        if batch_provider == "grok" and grok_chat:
-            result = grok_chat_limited(batch_messages, temperature=0.2, timeout=12)
-            if result and result.strip():
-                usage_counts["grok"] += 1
-                return result.strip(), "grok"
-        elif batch_provider == "openai" and openai_chat:
-            result = openai_chat_limited(batch_messages, temperature=0.2, timeout=15)
-            if result and result.strip():
-                usage_counts["openai"] += 1
-                return result.strip(), "openai"
-        elif batch_provider == "moonshot" and moonshot_chat:
-            result = moonshot_chat_limited(batch_messages, temperature=0.2, timeout=8)
-            if result and result.strip():
-                usage_counts["moonshot"] += 1
-                return result.strip(), "moonshot"
-        elif batch_provider == "deepseek" and deepseek_chat:
-            result = deepseek_chat_limited(batch_messages, temperature=0.2, timeout=10)
-            if result and result.strip():
-                usage_counts["deepseek"] += 1
-                return result.strip(), "deepseek"
+        try:
+            if batch_provider == "grok" and grok_chat:
+                result = grok_chat_limited(batch_messages, temperature=0.2, timeout=12)
+                if result and result.strip():
+                    usage_counts["grok"] += 1
+                    return result.strip(), "grok"
+            elif batch_provider == "openai" and openai_chat:
+                result = openai_chat_limited(batch_messages, temperature=0.2, timeout=15)
+                if result and result.strip():
+                    usage_counts["openai"] += 1
+                    return result.strip(), "openai"
+            elif batch_provider == "moonshot" and moonshot_chat:
+                result = moonshot_chat_limited(batch_messages, temperature=0.2, timeout=8)
+                if result and result.strip():
+                    usage_counts["moonshot"] += 1
+                    return result.strip(), "moonshot"
+            elif batch_provider == "deepseek" and deepseek_chat:
+                result = deepseek_chat_limited(batch_messages, temperature=0.2, timeout=10)
+                if result and result.strip():
+                    usage_counts["deepseek"] += 1
+                    return result.strip(), "deepseek"
         
-        # Fallback to single-alert processing if batch fails
-        logger.warning("[LLM Batch Router] Batch processing failed, falling back to single alerts")
-        return "Batch processing unavailable, use single alert processing", "none"
-    except Exception as e:
-        logger.error(f"[LLM Batch Router][{batch_provider} error] {e}")
+            # Fallback to single-alert processing if batch fails
+            logger.warning("[LLM Batch Router] Batch processing failed, falling back to single alerts")
+            return "Batch processing unavailable, use single alert processing", "none"
+        except Exception as e:
+            logger.error(f"[LLM Batch Router][{batch_provider} error] {e}")
     
-    # Ensure 'none' key exists before incrementing
-    if "none" not in usage_counts:
-        usage_counts["none"] = 0
-    usage_counts["none"] += 1
-    return "Batch processing temporarily unavailable", "none"
\ No newline at end of file
+        # Ensure 'none' key exists before incrementing
+        if "none" not in usage_counts:
+            usage_counts["none"] = 0
+        usage_counts["none"] += 1
+        return "Batch processing temporarily unavailable", "none"
+
+    return _cached(("batch", batch_messages, 0.2, batch_provider), call_provider, usage_counts)
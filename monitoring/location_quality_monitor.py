@@ -333,22 +333,10 @@ def validate_alert_with_opencage(alert: Dict) -> Optional[Dict]:
 def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate distance between two coordinates in kilometers.
-    Uses Haversine formula.
+    Delegates to the shared implementation in utils.geo_utils.
     """
-    from math import radians, sin, cos, sqrt, atan2
-    
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1_rad = radians(lat1)
-    lat2_rad = radians(lat2)
-    delta_lat = radians(lat2 - lat1)
-    delta_lon = radians(lon2 - lon1)
-    
-    a = sin(delta_lat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    
-    distance = R * c
-    return distance
+    from utils.geo_utils import haversine_distance
+    return haversine_distance(lat1, lon1, lat2, lon2)
 
 
 def log_validation_result(alert_id: int, validation: Dict) -> None:
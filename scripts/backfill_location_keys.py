@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Backfill alerts.country_code / city_key / is_sports_noise.
+
+Run once after migrations/008_alerts_location_keys.sql so alerts ingested
+before it can be found by fetch_alerts_from_db_strict_geo. New alerts get
+their keys from save_alerts_to_db.
+
+Idempotent: only rows still missing a key are touched.
+
+Usage:
+  DATABASE_URL=postgres://... python scripts/backfill_location_keys.py [--batch-size 5000]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_utils import backfill_alert_location_keys
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        print("DATABASE_URL not set", file=sys.stderr)
+        return 1
+    updated = backfill_alert_location_keys(batch_size=args.batch_size)
+    print(f"Backfilled location keys for {updated} alerts")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -23,17 +23,21 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def populate_embeddings(
-    batch_size: int = 10, 
+    batch_size: int = 100, 
     max_alerts: int = 500,
-    dry_run: bool = False
+    dry_run: bool = False,
+    checkpoint_path: Optional[str] = None,
+    concurrency: Optional[int] = None
 ) -> int:
     """
     Populate embeddings for existing alerts.
     
     Args:
-        batch_size: Number of alerts to process per batch (smaller to respect quotas)
+        batch_size: Alerts per multi-input embedding request and bulk UPDATE
         max_alerts: Maximum alerts to process in this run
         dry_run: If True, only simulate without making changes
+        checkpoint_path: Resume file; reruns continue where the last one stopped
+        concurrency: Embedding requests in flight at once
         
     Returns:
         Number of embeddings successfully created
@@ -85,7 +89,9 @@ def populate_embeddings(
     success_count = vector_dedup.populate_embeddings_batch(
         openai_client=openai_client,
         batch_size=batch_size,
-        max_alerts=max_alerts
+        max_alerts=max_alerts,
+        checkpoint_path=checkpoint_path,
+        concurrency=concurrency
     )
     
     # Report final quota status
@@ -98,9 +104,11 @@ if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Populate embeddings for existing alerts")
-    parser.add_argument("--batch-size", type=int, default=10, help="Batch size for processing")
+    parser.add_argument("--batch-size", type=int, default=100, help="Alerts per embedding request")
     parser.add_argument("--max-alerts", type=int, default=100, help="Maximum alerts to process")
     parser.add_argument("--dry-run", action="store_true", help="Simulate without making changes")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file for resumable backfills")
+    parser.add_argument("--concurrency", type=int, default=None, help="Embedding requests in flight")
     
     args = parser.parse_args()
     
@@ -108,7 +116,9 @@ if __name__ == "__main__":
         result = populate_embeddings(
             batch_size=args.batch_size,
             max_alerts=args.max_alerts,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            checkpoint_path=args.checkpoint,
+            concurrency=args.concurrency
         )
         print(f"Successfully processed {result} alerts")
     except Exception as e:
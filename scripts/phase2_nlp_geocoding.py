@@ -26,12 +26,16 @@ Usage:
   
   # With OpenCage API (faster, better quality)
   OPENCAGE_API_KEY=your_key python scripts/phase2_nlp_geocoding.py --use-opencage
+  
+  # spaCy NER over all texts in a 4-process pool before geocoding
+  python scripts/phase2_nlp_geocoding.py --ner-processes 4
 """
 import os
 import re
+import sys
 import time
 import argparse
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import psycopg2
 from dotenv import load_dotenv
 
@@ -39,6 +43,8 @@ from dotenv import load_dotenv
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 def load_env():
     if os.path.exists('.env.production'):
         load_dotenv('.env.production', override=True)
@@ -162,11 +168,15 @@ KNOWN_LOCATIONS = {
     'montreal': 'Montreal, Canada',
 }
 
-def extract_location_from_text(title: str, summary: str, gpt_summary: str, en_snippet: str) -> Optional[str]:
+def extract_location_from_text(title: str, summary: str, gpt_summary: str, en_snippet: str,
+                               ner_places: Optional[List[str]] = None) -> Optional[str]:
     """
     Extract location name from article text using multiple strategies.
     Returns location string for geocoding, or None if not found.
     
+    ner_places: GPE/LOC spans for title+summary precomputed in batch by
+    services.location_ner (None to skip the NER strategy).
+    
     Note: 'content' column doesn't exist; using gpt_summary + en_snippet instead.
     """
     text_lower = f"{title or ''} {summary or ''} {gpt_summary or ''} {en_snippet or ''}".lower()
@@ -205,7 +215,15 @@ def extract_location_from_text(title: str, summary: str, gpt_summary: str, en_sn
         if re.search(rf'\b{re.escape(keyword)}\b', text_lower):
             return full_location
     
-    # Strategy 3: Extract capitalized words that might be cities
+    # Strategy 3: spaCy NER places (first span wins)
+    for place in ner_places or []:
+        place_lower = place.lower()
+        if place_lower in KNOWN_LOCATIONS:
+            return KNOWN_LOCATIONS[place_lower]
+    if ner_places:
+        return ner_places[0]
+    
+    # Strategy 4: Extract capitalized words that might be cities
     caps_words = re.findall(r'\b([A-Z][a-z]{3,}(?:\s+[A-Z][a-z]+)?)\b', text_original)
     for word in caps_words[:5]:  # Check first 5
         word_lower = word.lower()
@@ -280,7 +298,31 @@ def geocode_opencage(location_string: str, api_key: str) -> Optional[Dict]:
     
     return None
 
-def process_alerts(cur, limit: Optional[int], dry_run: bool, use_opencage: bool):
+def extract_ner_places(alerts, n_process: int) -> List[Optional[List[str]]]:
+    """Run batched spaCy NER over title+summary for all alerts up front."""
+    try:
+        from services.location_ner import get_location_ner
+    except Exception as e:
+        print(f"spaCy NER unavailable ({e}); using pattern matching only")
+        return [None] * len(alerts)
+    
+    ner = get_location_ner()
+    if not ner.available:
+        print("spaCy NER model not loaded; using pattern matching only")
+        return [None] * len(alerts)
+    
+    texts = [f"{row[1] or ''}. {row[2] or ''}" for row in alerts]
+    start = time.perf_counter()
+    places = ner.extract_many(texts, n_process=n_process)
+    elapsed = time.perf_counter() - start
+    stats = ner.stats()
+    print(f"NER: {len(texts)} texts in {elapsed:.1f}s "
+          f"(p50 {stats['latency_ms_p50']} ms/doc, p95 {stats['latency_ms_p95']} ms/doc, "
+          f"processes={n_process})")
+    return places
+
+def process_alerts(cur, limit: Optional[int], dry_run: bool, use_opencage: bool,
+                   ner_processes: int = 1):
     """
     Process alerts with missing coordinates using NLP extraction + geocoding.
     """
@@ -319,9 +361,13 @@ def process_alerts(cur, limit: Optional[int], dry_run: bool, use_opencage: bool)
     failed = 0
     batch_size = 50
     
+    ner_places = extract_ner_places(alerts, ner_processes)
+    
     for i, (aid, title, summary, gpt_summary, en_snippet, method) in enumerate(alerts):
         # Extract location from text
-        location_string = extract_location_from_text(title, summary, gpt_summary, en_snippet)
+        location_string = extract_location_from_text(
+            title, summary, gpt_summary, en_snippet, ner_places=ner_places[i]
+        )
         
         if not location_string:
             failed += 1
@@ -391,6 +437,7 @@ def main():
     parser.add_argument('--limit', type=int, help='Limit number of alerts to process')
     parser.add_argument('--dry-run', action='store_true', help='Show results without updating database')
     parser.add_argument('--use-opencage', action='store_true', help='Use OpenCage API instead of Nominatim')
+    parser.add_argument('--ner-processes', type=int, default=1, help='spaCy NER worker processes (default: 1)')
     args = parser.parse_args()
 
     load_env()
@@ -398,7 +445,8 @@ def main():
     with get_conn() as conn:
         conn.autocommit = False
         with conn.cursor() as cur:
-            geocoded, failed = process_alerts(cur, args.limit, args.dry_run, args.use_opencage)
+            geocoded, failed = process_alerts(cur, args.limit, args.dry_run, args.use_opencage,
+                                             ner_processes=args.ner_processes)
             
             print(f"\n=== Results ===")
             total = geocoded + failed
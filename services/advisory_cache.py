@@ -0,0 +1,337 @@
+"""
+advisory_cache.py — Shared chat advisory cache.
+
+Chat advisories used to be cached in a per-process dict keyed by session, so
+every gunicorn worker (and every user) paid for its own LLM call for the same
+question about the same place. Advisories are now cached once for all workers
+under a key built from:
+
+- intent:   the query lowercased with whitespace collapsed; word order is
+            kept ("from A to B" and "from B to A" are different questions)
+- threat:   the requested threat type / category
+- location: country_code / city_key (utils/location_keys.py) and region
+- audience: the profile fields the advisory depends on (role, profession,
+            user_type, location); the advisor is given only those, so
+            users with the same role share one advisory and none carries
+            another user's identity
+- alerts:   a version stamp of the alert set the advisory was written from
+
+The alert stamp hashes the uuids and published times of the alerts fetched
+for the location, so a new alert for that location changes the key and the
+stale advisory is simply never read again (it ages out by TTL / LRU).
+
+Values are zlib-compressed JSON. With REDIS_URL set they live in Redis under
+advisory:v:<key>, with a sorted set of last-access times (advisory:lru)
+trimmed to ADVISORY_CACHE_MAX_ENTRIES; hit/miss counters are shared across
+workers in advisory:stats. Without Redis an in-process LRU of the same size
+is used.
+
+    cache = get_advisory_cache()
+    key = cache.advisory_key(query, threat_type, country=..., city=...,
+                             region=..., alerts=db_alerts, audience=...)
+    advice = cache.get(key)
+    if advice is None:
+        advice = generate_advice(...)
+        cache.put(key, advice)
+
+get_json()/put_json() store arbitrary namespaced values (e.g. background job
+results) in the same backend.
+
+Environment:
+- REDIS_URL                      (optional) shared backend; in-process LRU if unset/unreachable
+- ADVISORY_CACHE_TTL             (default: CHAT_CACHE_TTL or 1800) seconds an entry lives
+- ADVISORY_CACHE_MAX_ENTRIES     (default: 5000) entries kept before least-recently-used eviction
+- ADVISORY_CACHE_PREFIX          (default: advisory) Redis key prefix
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from hashlib import sha1
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+
+from utils.location_keys import city_key, country_code
+
+logger = logging.getLogger(__name__)
+
+try:
+    from core.logging_config import get_metrics_logger
+    metrics = get_metrics_logger("advisory_cache")
+except Exception:  # pragma: no cover - logging config optional in scripts
+    metrics = None
+
+ADVISORY_CACHE_TTL = int(os.getenv("ADVISORY_CACHE_TTL", os.getenv("CHAT_CACHE_TTL", "1800")))
+ADVISORY_CACHE_MAX_ENTRIES = int(os.getenv("ADVISORY_CACHE_MAX_ENTRIES", "5000"))
+ADVISORY_CACHE_PREFIX = os.getenv("ADVISORY_CACHE_PREFIX", "advisory")
+
+def normalize_intent(query: Optional[str]) -> str:
+    """Canonical form of a chat question: lowercased, whitespace collapsed, word order kept."""
+    if not query:
+        return ""
+    return " ".join(query.lower().split())
+
+
+def alert_set_version(alerts: Optional[Iterable[Dict[str, Any]]]) -> str:
+    """Stamp of an alert set: changes when an alert is added, removed or republished."""
+    parts: List[str] = []
+    for alert in alerts or ():
+        published = alert.get("published")
+        if hasattr(published, "isoformat"):
+            published = published.isoformat()
+        parts.append(f"{alert.get('uuid') or alert.get('link') or ''}@{published or ''}")
+    return sha1("|".join(sorted(parts)).encode("utf-8")).hexdigest()[:16]
+
+
+def _encode(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(raw: bytes) -> Any:
+    return json.loads(zlib.decompress(raw).decode("utf-8"))
+
+
+class AdvisoryCache:
+    """Bounded LRU of compressed advisories, shared through Redis when available."""
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        prefix: Optional[str] = None,
+    ):
+        self.ttl = ttl or ADVISORY_CACHE_TTL
+        self.max_entries = max_entries or ADVISORY_CACHE_MAX_ENTRIES
+        self.prefix = prefix or ADVISORY_CACHE_PREFIX
+        self._redis = redis_client
+        self._redis_retry_at = 0.0
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    # ---- backend ----
+
+    def _client(self):
+        """Redis client, or None to use the in-process LRU."""
+        if self._redis is not None:
+            return self._redis
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url or time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            import redis
+            # Values are compressed bytes, so no decode_responses
+            client = redis.from_url(redis_url, socket_timeout=1)
+            client.ping()
+            self._redis = client
+            return client
+        except Exception as e:
+            # Don't pay a connect timeout on every chat request while Redis is down
+            self._redis_retry_at = time.monotonic() + 60
+            logger.debug(f"[ADVISORY_CACHE] Redis unavailable, using in-process LRU: {e}")
+            return None
+
+    def _value_key(self, key: str) -> str:
+        return f"{self.prefix}:v:{key}"
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{self.prefix}:lru"
+
+    @property
+    def _stats_key(self) -> str:
+        return f"{self.prefix}:stats"
+
+    def _count(self, name: str, n: int = 1, shared: bool = False) -> None:
+        with self._lock:
+            self._counts[name] += n
+        if metrics:
+            metrics.increment(f"advisory_cache.{name}", n)
+        if shared:
+            client = self._client()
+            if client is not None:
+                try:
+                    client.hincrby(self._stats_key, name, n)
+                except Exception:
+                    pass
+
+    # ---- raw get/put ----
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        client = self._client()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.get(self._value_key(key))
+                pipe.zadd(self._lru_key, {key: time.time()}, xx=True)
+                raw, _ = pipe.execute()
+                return raw
+            except Exception as e:
+                logger.debug(f"[ADVISORY_CACHE] Redis read failed for {key}: {e}")
+                return None
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            raw, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return raw
+
+    def _put_raw(self, key: str, raw: bytes, ttl: int) -> None:
+        client = self._client()
+        if client is not None:
+            try:
+                now = time.time()
+                pipe = client.pipeline(transaction=False)
+                pipe.setex(self._value_key(key), ttl, raw)
+                pipe.zadd(self._lru_key, {key: now})
+                # Entries untouched for a whole TTL have already expired
+                pipe.zremrangebyscore(self._lru_key, "-inf", now - self.ttl)
+                pipe.zcard(self._lru_key)
+                size = pipe.execute()[-1]
+                if size > self.max_entries:
+                    self._evict_redis(client, size - self.max_entries)
+                return
+            except Exception as e:
+                logger.debug(f"[ADVISORY_CACHE] Redis write failed for {key}: {e}")
+                return
+        evicted = 0
+        with self._lock:
+            self._local[key] = (raw, time.monotonic() + ttl)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _evict_redis(self, client, excess: int) -> None:
+        """Drop the least recently used entries beyond max_entries."""
+        victims = client.zrange(self._lru_key, 0, excess - 1)
+        if not victims:
+            return
+        pipe = client.pipeline(transaction=False)
+        pipe.zrem(self._lru_key, *victims)
+        pipe.delete(*[self._value_key(v.decode() if isinstance(v, bytes) else v) for v in victims])
+        pipe.execute()
+        self._count("evictions", len(victims))
+
+    # ---- advisories ----
+
+    def advisory_key(
+        self,
+        query: Optional[str],
+        threat_type: Optional[str] = None,
+        country: Optional[str] = None,
+        city: Optional[str] = None,
+        region: Optional[str] = None,
+        alerts: Optional[Iterable[Dict[str, Any]]] = None,
+        audience: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Cache key for one advisory (see module docstring)."""
+        parts = {
+            "intent": normalize_intent(query),
+            "threat": (threat_type or "").strip().lower(),
+            "country": country_code(country) or (country or "").strip().lower(),
+            "city": city_key(city) or "",
+            "region": (region or "").strip().lower(),
+            "audience": audience or {},
+            "alerts": alert_set_version(alerts),
+        }
+        return sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached advisory for key, or None; counts a hit or a miss."""
+        value = self.get_json("a", key)
+        self._count("hits" if value is not None else "misses", shared=True)
+        return value
+
+    def put(self, key: str, advisory: Dict[str, Any]) -> None:
+        """Cache an advisory (the generate_advice result minus its alert list)."""
+        if not isinstance(advisory, dict) or not advisory.get("reply"):
+            return
+        value = {k: v for k, v in advisory.items() if k != "alerts"}
+        self.put_json("a", key, value)
+        self._count("writes")
+
+    # ---- generic namespaced values ----
+
+    def get_json(self, namespace: str, key: str) -> Optional[Any]:
+        raw = self._get_raw(f"{namespace}:{key}")
+        if raw is None:
+            return None
+        try:
+            return _decode(raw)
+        except Exception as e:
+            logger.debug(f"[ADVISORY_CACHE] Undecodable entry {namespace}:{key}: {e}")
+            return None
+
+    def put_json(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        try:
+            raw = _encode(value)
+        except Exception as e:
+            logger.debug(f"[ADVISORY_CACHE] Unencodable value for {namespace}:{key}: {e}")
+            return
+        self._put_raw(f"{namespace}:{key}", raw, ttl or self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts for this process and, with Redis, across all workers."""
+        with self._lock:
+            local = dict(self._counts)
+            entries = len(self._local)
+        lookups = local["hits"] + local["misses"]
+        out: Dict[str, Any] = {
+            "backend": "memory",
+            "process": local,
+            "hit_rate": round(local["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
+        client = self._client()
+        if client is not None:
+            try:
+                shared = {
+                    (k.decode() if isinstance(k, bytes) else k): int(v)
+                    for k, v in (client.hgetall(self._stats_key) or {}).items()
+                }
+                shared_lookups = shared.get("hits", 0) + shared.get("misses", 0)
+                out.update({
+                    "backend": "redis",
+                    "shared": shared,
+                    "shared_hit_rate": round(shared.get("hits", 0) / shared_lookups, 4) if shared_lookups else 0.0,
+                    "entries": client.zcard(self._lru_key),
+                })
+            except Exception as e:
+                logger.debug(f"[ADVISORY_CACHE] Redis stats failed: {e}")
+        return out
+
+
+_instance: Optional[AdvisoryCache] = None
+_instance_lock = threading.Lock()
+
+
+def get_advisory_cache() -> AdvisoryCache:
+    """Process-wide AdvisoryCache."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = AdvisoryCache()
+    return _instance
+
+
+__all__ = [
+    "AdvisoryCache",
+    "alert_set_version",
+    "get_advisory_cache",
+    "normalize_intent",
+]
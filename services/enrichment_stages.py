@@ -4,10 +4,15 @@
 
 from __future__ import annotations
 
+import bisect
 import logging
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 
 from utils.risk_shared import likely_sports_context
@@ -23,6 +28,95 @@ _VERSUS_PATTERN = re.compile(r"\bvs\.?\b|\bversus\b", re.IGNORECASE)
 # Input validation
 from utils.validation import validate_alert, validate_enrichment_data
 
+# Threads shared by all pipelines for running independent I/O-bound stages
+# of the same wave concurrently (1 = run every stage inline).
+ENRICHMENT_STAGE_WORKERS = int(os.getenv("ENRICHMENT_STAGE_WORKERS", "4"))
+
+# Upper bounds (ms) of the per-stage latency histogram buckets
+_LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_stage_executor: Optional[ThreadPoolExecutor] = None
+_stage_executor_lock = threading.Lock()
+
+def _get_stage_executor() -> ThreadPoolExecutor:
+    global _stage_executor
+    if _stage_executor is None:
+        with _stage_executor_lock:
+            if _stage_executor is None:
+                _stage_executor = ThreadPoolExecutor(
+                    max_workers=max(1, ENRICHMENT_STAGE_WORKERS),
+                    thread_name_prefix="enrich-stage",
+                )
+    return _stage_executor
+
+class StageLatencyHistogram:
+    """Cumulative latency histogram (ms) for one stage; thread-safe."""
+
+    def __init__(self, buckets: Tuple[float, ...] = _LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, duration_ms: float) -> None:
+        idx = bisect.bisect_left(self.buckets, duration_ms)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum_ms += duration_ms
+            self._max_ms = max(self._max_ms, duration_ms)
+
+    def _quantile(self, counts: List[int], total: int, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the q-th observation
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for idx, n in enumerate(counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[idx] if idx < len(self.buckets) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total, sum_ms, max_ms = self._count, self._sum_ms, self._max_ms
+        labels = [f"le_{b:g}" for b in self.buckets] + ["le_inf"]
+        return {
+            "count": total,
+            "sum_ms": round(sum_ms, 3),
+            "avg_ms": round(sum_ms / total, 3) if total else None,
+            "max_ms": round(max_ms, 3),
+            "p50_ms": self._quantile(counts, total, 0.50),
+            "p95_ms": self._quantile(counts, total, 0.95),
+            "buckets": dict(zip(labels, counts)),
+        }
+
+class _BatchMemo:
+    """Per-thread memo that is only active inside a stage's process_batch."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @contextmanager
+    def active(self):
+        self._local.values = {}
+        try:
+            yield
+        finally:
+            self._local.values = None
+
+    def get(self, key, compute: Callable[[], Any]) -> Any:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            return compute()
+        if key not in values:
+            values[key] = compute()
+        return values[key]
+
 @dataclass
 class EnrichmentContext:
     """Container for shared enrichment context and configuration."""
@@ -36,11 +130,23 @@ class EnrichmentContext:
     user_email: Optional[str] = None
 
 class EnrichmentStage:
-    """Base class for all enrichment stages."""
+    """Base class for all enrichment stages.
+
+    Stages declare the alert fields they read (``requires``) and write
+    (``provides``) so EnrichmentPipeline can run independent stages in the
+    same wave. A stage that leaves either as None runs on its own, after
+    every stage before it.
+    """
+
+    requires: Optional[Tuple[str, ...]] = None
+    provides: Optional[Tuple[str, ...]] = None
+    # Dominated by DB/network waits: run on the stage thread pool
+    io_bound: bool = False
     
     def __init__(self, name: str):
         self.name = name
         self.logger = get_logger(f"enrichment_stages.{name}")
+        self.latency = StageLatencyHistogram()
     
     def process(self, alert: dict, context: EnrichmentContext) -> dict:
         """Process the alert through this enrichment stage.
@@ -62,6 +168,7 @@ class EnrichmentStage:
             result = self._enrich(alert, context)
             
             duration_ms = (datetime.now() - start_time).total_seconds() * 1000
+            self.latency.observe(duration_ms)
             self.logger.info("stage_completed",
                            alert_uuid=context.alert_uuid,
                            stage=self.name,
@@ -71,6 +178,7 @@ class EnrichmentStage:
             
         except Exception as e:
             duration_ms = (datetime.now() - start_time).total_seconds() * 1000
+            self.latency.observe(duration_ms)
             self.logger.error("stage_failed",
                             alert_uuid=context.alert_uuid,
                             stage=self.name,
@@ -79,6 +187,13 @@ class EnrichmentStage:
             # Return alert unchanged on failure
             return alert
     
+    def process_batch(self, alerts: List[dict], contexts: List[EnrichmentContext]) -> List[dict]:
+        """Process several alerts; override for vectorized or DB-batched stages.
+
+        Returns one enriched alert per input, in order.
+        """
+        return [self.process(alert, context) for alert, context in zip(alerts, contexts)]
+    
     def _enrich(self, alert: dict, context: EnrichmentContext) -> dict:
         """Implement the actual enrichment logic in subclasses."""
         raise NotImplementedError("Subclasses must implement _enrich method")
@@ -86,6 +201,10 @@ class EnrichmentStage:
 class LocationEnhancementStage(EnrichmentStage):
     """Enhance location confidence and reliability data."""
     
+    requires = ("city", "country", "latitude", "longitude", "location_method", "location_confidence")
+    provides = ("latitude", "longitude", "location_sharing", "location_method",
+                "location_reliability", "location_source", "geo_precision")
+    
     def __init__(self):
         super().__init__("location_enhancement")
     
@@ -96,6 +215,9 @@ class LocationEnhancementStage(EnrichmentStage):
 class RelevanceFilterStage(EnrichmentStage):
     """Add relevance flags for diagnostics (sports/info-ops filtering)."""
     
+    requires = ()
+    provides = ("relevance_flags",)
+    
     def __init__(self):
         super().__init__("relevance_filter")
     
@@ -111,6 +233,12 @@ class RelevanceFilterStage(EnrichmentStage):
 class ThreatScoringStage(EnrichmentStage):
     """Assess threat level and merge scoring data."""
     
+    requires = ("kw_match", "title", "source", "source_kind", "location_confidence",
+                "enrichments", "threat_score", "threat_score_components")
+    provides = ("label", "threat_label", "threat_level", "score", "confidence", "reasoning",
+                "sentiment", "domains", "kw_rule", "kw_matches", "score_breakdown",
+                "is_noise", "noise_type", "threat_score", "threat_score_components")
+    
     def __init__(self):
         super().__init__("threat_scoring")
     
@@ -158,6 +286,11 @@ class ThreatScoringStage(EnrichmentStage):
 class ConfidenceCalculationStage(EnrichmentStage):
     """Calculate overall confidence using centralized function."""
     
+    requires = ("category", "category_confidence", "location_reliability", "location_method",
+                "location_confidence", "latitude", "longitude", "kw_match", "keyword_weight",
+                "domains", "threat_score", "triggers", "title", "summary")
+    provides = ("overall_confidence",)
+    
     def __init__(self):
         super().__init__("confidence_calculation")
     
@@ -180,6 +313,10 @@ class ConfidenceCalculationStage(EnrichmentStage):
 class RiskAnalysisStage(EnrichmentStage):
     """Run various risk analysis functions from risk_shared."""
     
+    requires = ()
+    provides = ("sentiment", "forecast", "legal_risk", "cyber_ot_risk",
+                "environmental_epidemic_risk", "keyword_weight")
+    
     def __init__(self):
         super().__init__("risk_analysis")
     
@@ -211,6 +348,9 @@ class RiskAnalysisStage(EnrichmentStage):
 class LLMSummaryStage(EnrichmentStage):
     """LLM summary DISABLED to save tokens - uses existing summary instead."""
     
+    requires = ("summary", "en_snippet")
+    provides = ("gpt_summary", "model_used")
+    
     def __init__(self):
         super().__init__("llm_summary")
     
@@ -237,6 +377,10 @@ class LLMSummaryStage(EnrichmentStage):
 class LocationValidationStage(EnrichmentStage):
     """Validate location quality with 1% OpenCage sampling."""
     
+    requires = ("id", "city", "country", "latitude", "longitude", "location_method", "location_confidence")
+    provides = ("_opencage_validation", "_location_flagged")
+    io_bound = True
+    
     def __init__(self):
         super().__init__("location_validation")
         self._validation_enabled = True
@@ -296,6 +440,10 @@ class LocationValidationStage(EnrichmentStage):
 class CategoryClassificationStage(EnrichmentStage):
     """Extract category and subcategory with fallbacks."""
     
+    # Fields compute_confidence(alert, "category") reads on the fallback path
+    requires = ("category", "category_confidence", "kw_match", "domains", "title", "summary")
+    provides = ("category", "category_confidence")
+    
     def __init__(self):
         super().__init__("category_classification")
     
@@ -319,6 +467,9 @@ class CategoryClassificationStage(EnrichmentStage):
 class ContentFilterStage(EnrichmentStage):
     """Filter out sports/entertainment content."""
     
+    requires = ("category", "relevance_flags")
+    provides = ("_filtered",)
+    
     def __init__(self):
         super().__init__("content_filter")
     
@@ -413,6 +564,9 @@ class ContentFilterStage(EnrichmentStage):
 class DomainDetectionStage(EnrichmentStage):
     """Detect domains using canonical risk_shared function."""
     
+    requires = ("domains",)
+    provides = ("domains",)
+    
     def __init__(self):
         super().__init__("domain_detection")
     
@@ -430,8 +584,19 @@ class DomainDetectionStage(EnrichmentStage):
 class HistoricalAnalysisStage(EnrichmentStage):
     """Fetch and analyze historical incidents for trends."""
     
+    requires = ("category", "threat_label", "_filtered")
+    provides = ("historical_incidents_count", "avg_severity_past_week", "early_warning_indicators",
+                "early_warning_signal", "future_risk_probability")
+    io_bound = True
+    
     def __init__(self):
         super().__init__("historical_analysis")
+        self._memo = _BatchMemo()
+    
+    def process_batch(self, alerts: List[dict], contexts: List[EnrichmentContext]) -> List[dict]:
+        # Alerts sharing a location/category share one past-incidents query
+        with self._memo.active():
+            return super().process_batch(alerts, contexts)
     
     def _enrich(self, alert: dict, context: EnrichmentContext) -> dict:
         from services.threat_engine import (
@@ -439,12 +604,16 @@ class HistoricalAnalysisStage(EnrichmentStage):
             _compute_future_risk_prob
         )
         
-        historical_incidents = fetch_past_incidents(
-            region=context.location, 
-            category=alert.get("category") or alert.get("threat_label"), 
-            days=7, 
-            limit=100
-        ) or []
+        category = alert.get("category") or alert.get("threat_label")
+        historical_incidents = self._memo.get(
+            (context.location, category),
+            lambda: fetch_past_incidents(
+                region=context.location, 
+                category=category, 
+                days=7, 
+                limit=100
+            ) or []
+        )
         
         alert["historical_incidents_count"] = len(historical_incidents)
         alert["avg_severity_past_week"] = stats_average_score(historical_incidents)
@@ -463,8 +632,20 @@ class HistoricalAnalysisStage(EnrichmentStage):
 class BaselineMetricsStage(EnrichmentStage):
     """Calculate baseline metrics and filter zero-incident alerts."""
     
+    requires = ("city", "region", "country", "category", "threat_label",
+                "incident_count_30d", "recent_count_7d", "_filtered")
+    provides = ("incident_count_30d", "recent_count_7d", "baseline_avg_7d",
+                "baseline_ratio", "trend_direction")
+    io_bound = True
+    
     def __init__(self):
         super().__init__("baseline_metrics")
+        self._memo = _BatchMemo()
+    
+    def process_batch(self, alerts: List[dict], contexts: List[EnrichmentContext]) -> List[dict]:
+        # Baselines depend only on (location, category); compute each once per batch
+        with self._memo.active():
+            return super().process_batch(alerts, contexts)
     
     def _enrich(self, alert: dict, context: EnrichmentContext) -> dict:
         from services.threat_engine import _baseline_metrics
@@ -473,8 +654,10 @@ class BaselineMetricsStage(EnrichmentStage):
         original_incident_count = alert.get("incident_count_30d")
         original_recent_count = alert.get("recent_count_7d")
         
-        # Baseline metrics
-        alert.update(_baseline_metrics(alert))
+        # Baseline metrics (same key _baseline_metrics queries by)
+        key = (alert.get("city") or alert.get("region") or alert.get("country"),
+               alert.get("category") or alert.get("threat_label"))
+        alert.update(self._memo.get(key, lambda: _baseline_metrics(alert)))
         
         # Preserve original test data if it was provided (testing mode)
         if original_incident_count is not None and alert.get("incident_count_30d", 0) == 0:
@@ -501,6 +684,11 @@ class BaselineMetricsStage(EnrichmentStage):
 class MetadataEnrichmentStage(EnrichmentStage):
     """Add structured sources, cluster info, and metadata."""
     
+    requires = ("sources", "source", "source_name", "link", "source_url", "reports_analyzed",
+                "num_reports", "cluster_id", "series_id", "incident_series",
+                "anomaly_flag", "is_anomaly")
+    provides = ("sources", "reports_analyzed", "cluster_id", "anomaly_flag")
+    
     def __init__(self):
         super().__init__("metadata_enrichment")
     
@@ -518,17 +706,43 @@ class MetadataEnrichmentStage(EnrichmentStage):
         return alert
 
 class SocmintEnrichmentStage(EnrichmentStage):
-    """Extract social media IOCs and enrich with SOCMINT data."""
+    """Extract social media IOCs and enrich with SOCMINT data.
+
+    process_batch looks up every IOC in the batch up front, so cache misses
+    across all alerts share one Apify run per platform.
+    """
+    
+    requires = ("enrichments",)
+    provides = ("enrichments",)
+    io_bound = True
     
     def __init__(self):
         super().__init__("socmint_enrichment")
+        self._memo = _BatchMemo()
+    
+    def _iocs(self, context: EnrichmentContext) -> list:
+        from utils.ioc_extractor import extract_social_media_iocs
+        return self._memo.get(("iocs", context.full_text),
+                              lambda: extract_social_media_iocs(context.full_text))
+    
+    def process_batch(self, alerts: List[dict], contexts: List[EnrichmentContext]) -> List[dict]:
+        with self._memo.active():
+            try:
+                from utils.ioc_extractor import fetch_socmint_for_iocs
+                iocs = [ioc for context in contexts for ioc in self._iocs(context)]
+                if iocs:
+                    self._memo.get("socmint", lambda: fetch_socmint_for_iocs(iocs))
+            except Exception as e:
+                # Fall back to per-alert lookups
+                self.logger.error("socmint_prefetch_failed", batch_size=len(alerts), error=str(e))
+            return super().process_batch(alerts, contexts)
     
     def _enrich(self, alert: dict, context: EnrichmentContext) -> dict:
         try:
-            from utils.ioc_extractor import extract_social_media_iocs, enrich_alert_with_socmint
+            from utils.ioc_extractor import enrich_alert_with_socmint
             
             # Extract social media handles/URLs from alert text
-            iocs = extract_social_media_iocs(context.full_text)
+            iocs = self._iocs(context)
             
             if iocs:
                 self.logger.info("social_media_iocs_found",
@@ -536,8 +750,8 @@ class SocmintEnrichmentStage(EnrichmentStage):
                                ioc_count=len(iocs),
                                platforms=[ioc['platform'] for ioc in iocs])
                 
-                # Enrich with SOCMINT data
-                alert = enrich_alert_with_socmint(alert, iocs)
+                # Enrich with SOCMINT data, prefetched for the batch when available
+                alert = enrich_alert_with_socmint(alert, iocs, results=self._memo.get("socmint", lambda: None))
             
         except Exception as e:
             self.logger.error("socmint_enrichment_failed",
@@ -547,45 +761,59 @@ class SocmintEnrichmentStage(EnrichmentStage):
         return alert
 
 class RegionTrendStage(EnrichmentStage):
-    """Save region trend data (non-critical)."""
+    """Record region trend keys (non-critical).
+
+    Alerts only add their (location, category) to the shared
+    RegionTrendAggregator; counts and region_trends upserts happen once per
+    batch, or once per run when the caller wraps enrichment in
+    aggregator.run().
+    """
     
-    def __init__(self):
+    requires = ("city", "region", "country", "category", "threat_label", "_filtered")
+    provides = ()
+    io_bound = True
+    
+    def __init__(self, aggregator=None):
         super().__init__("region_trend")
+        self._aggregator = aggregator
     
-    def _enrich(self, alert: dict, context: EnrichmentContext) -> dict:
-        from services.threat_engine import fetch_past_incidents, save_region_trend
-        from datetime import timedelta
-        
-        city = context.location or alert.get("city") or alert.get("region") or alert.get("country")
-        threat_type = alert.get("category") or alert.get("threat_label")
-        
+    @property
+    def aggregator(self):
+        if self._aggregator is None:
+            from services.region_trends import get_region_trend_aggregator
+            self._aggregator = get_region_trend_aggregator()
+        return self._aggregator
+    
+    def process_batch(self, alerts: List[dict], contexts: List[EnrichmentContext]) -> List[dict]:
+        results = super().process_batch(alerts, contexts)
         try:
-            incidents_365 = fetch_past_incidents(
-                region=city, 
-                category=threat_type, 
-                days=365, 
-                limit=1000
-            ) or []
-            
-            save_region_trend(
-                region=None,
-                city=city,
-                trend_window_start=datetime.utcnow() - timedelta(days=365),
-                trend_window_end=datetime.utcnow(),
-                incident_count=len(incidents_365),
-                categories=[threat_type] if threat_type else None
-            )
+            self.aggregator.flush_if_idle()
         except Exception as e:
             self.logger.error("region_trend_save_failed", error=str(e))
-        
+        return results
+    
+    def _enrich(self, alert: dict, context: EnrichmentContext) -> dict:
+        city = context.location or alert.get("city") or alert.get("region") or alert.get("country")
+        threat_type = alert.get("category") or alert.get("threat_label")
+        self.aggregator.add(city, threat_type)
         return alert
 
 class EnrichmentPipeline:
-    """Main enrichment pipeline orchestrator."""
+    """Main enrichment pipeline orchestrator.
+
+    Stages are grouped into waves from their declared requires/provides:
+    a stage runs after every earlier stage whose output it reads or
+    overwrites, and no earlier than a stage that reads a field it writes.
+    Stages in one wave work on a snapshot of the alert taken at the start
+    of the wave; their changes are merged back in declared order, so the
+    result matches running the stages one by one. I/O-bound stages of a
+    wave run concurrently on the shared stage thread pool.
+    """
     
     def __init__(self, stages: Optional[List[EnrichmentStage]] = None):
         self.logger = get_logger("enrichment_pipeline")
         self.stages = stages or self._get_default_stages()
+        self.waves = self._plan_waves(self.stages)
     
     def _get_default_stages(self) -> List[EnrichmentStage]:
         """Get the default enrichment stages in processing order."""
@@ -607,60 +835,162 @@ class EnrichmentPipeline:
             RegionTrendStage()
         ]
     
-    def enrich_alert(self, alert: dict) -> Optional[dict]:
-        """Enrich a single alert through all stages.
-        
-        Args:
-            alert: The raw alert to enrich
-            
-        Returns:
-            Enriched alert dict or None if filtered/failed validation
-        """
-        start_time = datetime.now()
-        
-        # Validate input alert structure
-        is_valid, error = validate_alert(alert)
-        if not is_valid:
-            self.logger.error("input_validation_failed", 
-                            alert_uuid=alert.get("uuid", "no-uuid"),
-                            error=error)
-            return None
+    @staticmethod
+    def _plan_waves(stages: List[EnrichmentStage]) -> List[List[EnrichmentStage]]:
+        """Group stages into dependency waves, keeping declared order within a wave."""
+        levels: List[int] = []
+        for i, stage in enumerate(stages):
+            level = 0
+            for j in range(i):
+                prev = stages[j]
+                if None in (stage.requires, stage.provides, prev.requires, prev.provides):
+                    # Undeclared stages act as barriers
+                    level = max(level, levels[j] + 1)
+                    continue
+                writes = set(stage.provides)
+                if set(stage.requires) & set(prev.provides) or writes & set(prev.provides):
+                    level = max(level, levels[j] + 1)
+                elif writes & set(prev.requires):
+                    level = max(level, levels[j])
+            levels.append(level)
         
-        # Build enrichment context
+        waves: List[List[EnrichmentStage]] = [[] for _ in range(max(levels, default=-1) + 1)]
+        for stage, level in zip(stages, levels):
+            waves[level].append(stage)
+        return waves
+    
+    def plan(self) -> List[List[str]]:
+        """Stage names per wave, in execution order."""
+        return [[stage.name for stage in wave] for wave in self.waves]
+    
+    def stage_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage latency histograms (ms) since process start."""
+        return {stage.name: stage.latency.snapshot() for stage in self.stages}
+    
+    def _build_context(self, alert: dict) -> EnrichmentContext:
         title = alert.get("title", "") or ""
         summary = alert.get("summary", "") or ""
-        full_text = f"{title}\n{summary}".strip()
-        location = alert.get("city") or alert.get("region") or alert.get("country")
-        triggers = alert.get("tags", [])
-        
-        context = EnrichmentContext(
+        return EnrichmentContext(
             alert_uuid=alert.get("uuid", "no-uuid"),
-            full_text=full_text,
+            full_text=f"{title}\n{summary}".strip(),
             title=title,
             summary=summary,
-            location=location,
-            triggers=triggers,
+            location=alert.get("city") or alert.get("region") or alert.get("country"),
+            triggers=alert.get("tags", []),
             plan="FREE",
             user_email=None
         )
+    
+    def _run_stage_batch(self, stage: EnrichmentStage, alerts: List[dict],
+                         contexts: List[EnrichmentContext]) -> List[dict]:
+        try:
+            return stage.process_batch(alerts, contexts)
+        except Exception as e:
+            # process() already contains per-alert failures; this is a broken batch hook
+            self.logger.error("stage_batch_failed", stage=stage.name, error=str(e))
+            return [stage.process(alert, context) for alert, context in zip(alerts, contexts)]
+    
+    def _run_wave(self, wave: List[EnrichmentStage], alerts: List[dict],
+                  contexts: List[EnrichmentContext]) -> None:
+        """Run one wave over the batch, updating `alerts` in place."""
+        if len(wave) == 1:
+            results = self._run_stage_batch(wave[0], alerts, contexts)
+            for alert, result in zip(alerts, results):
+                if result is not alert:
+                    alert.clear()
+                    alert.update(result)
+            return
         
-        self.logger.info("enrichment_started",
-                        alert_uuid=context.alert_uuid,
-                        stages_count=len(self.stages))
+        snapshots = [dict(alert) for alert in alerts]
+        
+        def run(stage: EnrichmentStage) -> List[dict]:
+            return self._run_stage_batch(stage, [dict(a) for a in snapshots], contexts)
+        
+        concurrent = [stage for stage in wave if stage.io_bound]
+        futures = {}
+        if ENRICHMENT_STAGE_WORKERS > 1 and len(concurrent) > 1:
+            executor = _get_stage_executor()
+            futures = {stage.name: executor.submit(run, stage) for stage in concurrent}
+        outputs = {stage.name: run(stage) for stage in wave if stage.name not in futures}
+        for name, future in futures.items():
+            outputs[name] = future.result()
+        
+        # Merge each stage's changes in declared order
+        for stage in wave:
+            for alert, base, result in zip(alerts, snapshots, outputs[stage.name]):
+                for key, value in result.items():
+                    if key not in base or base[key] is not value:
+                        alert[key] = value
+                for key in base:
+                    if key not in result:
+                        alert.pop(key, None)
+    
+    def enrich_batch(self, alerts: List[dict]) -> List[Optional[dict]]:
+        """Enrich several alerts, running each stage wave over the whole batch.
         
-        # Process through all stages
-        enriched_alert = alert.copy()
+        Args:
+            alerts: Raw alerts to enrich
+            
+        Returns:
+            One entry per input: the enriched alert, or None if it was
+            filtered or failed validation
+        """
+        start_time = datetime.now()
+        results: List[Optional[dict]] = [None] * len(alerts)
+        active: List[int] = []
+        working: Dict[int, dict] = {}
+        contexts: Dict[int, EnrichmentContext] = {}
+        invalid = 0
+        
+        for i, alert in enumerate(alerts):
+            # Validate input alert structure
+            is_valid, error = validate_alert(alert)
+            if not is_valid:
+                self.logger.error("input_validation_failed", 
+                                alert_uuid=alert.get("uuid", "no-uuid"),
+                                error=error)
+                invalid += 1
+                continue
+            contexts[i] = self._build_context(alert)
+            working[i] = alert.copy()
+            active.append(i)
+            self.logger.info("enrichment_started",
+                            alert_uuid=contexts[i].alert_uuid,
+                            stages_count=len(self.stages))
         
-        for stage in self.stages:
-            enriched_alert = stage.process(enriched_alert, context)
+        # Process through all stage waves
+        for wave in self.waves:
+            if not active:
+                break
+            self._run_wave(wave, [working[i] for i in active], [contexts[i] for i in active])
             
-            # Check if alert was filtered out by any stage
-            if enriched_alert.get("_filtered"):
-                self.logger.info("alert_filtered",
-                               alert_uuid=context.alert_uuid,
-                               filter_stage=stage.name)
-                return None
+            # Drop alerts filtered out by any stage of this wave
+            remaining = []
+            for i in active:
+                if working[i].get("_filtered"):
+                    filter_stage = next((s.name for s in wave if "_filtered" in (s.provides or ())),
+                                        wave[-1].name)
+                    self.logger.info("alert_filtered",
+                                   alert_uuid=contexts[i].alert_uuid,
+                                   filter_stage=filter_stage)
+                else:
+                    remaining.append(i)
+            active = remaining
+        
+        for i in active:
+            results[i] = self._finalize(working[i], contexts[i], start_time)
+            if results[i] is None:
+                invalid += 1
         
+        if invalid:
+            metrics.increment("enrichment.validation_failed", invalid)
+            self.logger.warning("enrichment_batch_validation_failed",
+                              failed=invalid,
+                              batch_size=len(alerts))
+        return results
+    
+    def _finalize(self, enriched_alert: dict, context: EnrichmentContext,
+                  start_time: datetime) -> Optional[dict]:
         # Normalize score fields for validation compatibility
         # Some enrichment stages may set score fields outside 0-1 range
         if "score" in enriched_alert:
@@ -698,6 +1028,17 @@ class EnrichmentPipeline:
                         stages_completed=len(self.stages))
         
         return enriched_alert
+    
+    def enrich_alert(self, alert: dict) -> Optional[dict]:
+        """Enrich a single alert through all stages.
+        
+        Args:
+            alert: The raw alert to enrich
+            
+        Returns:
+            Enriched alert dict or None if filtered/failed validation
+        """
+        return self.enrich_batch([alert])[0]
 
 # Global pipeline instance
 _default_pipeline = None
@@ -716,3 +1057,7 @@ def enrich_single_alert(alert: dict) -> Optional[dict]:
     """
     pipeline = get_enrichment_pipeline()
     return pipeline.enrich_alert(alert)
+
+def enrich_alerts_batch(alerts: List[dict]) -> List[Optional[dict]]:
+    """Enrich a batch of alerts with the default pipeline (one result per input)."""
+    return get_enrichment_pipeline().enrich_batch(alerts)
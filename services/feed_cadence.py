@@ -0,0 +1,291 @@
+"""
+feed_cadence.py — Per-feed polling cadence learned from publish frequency.
+
+ingest_all_feeds_to_db used to fetch every feed spec on every cron tick,
+whether the feed posts hourly or monthly. FeedCadence keeps, per feed:
+
+- newest_entry_at: newest entry timestamp seen so far
+- mean_interval_s: EWMA of inter-arrival times of new entries. On the
+  first poll it is bootstrapped from the gaps between the entries already
+  in the feed.
+- empty_polls: consecutive polls that found nothing new. Undated entries
+  count as new when their uuid is not stored yet; they reset the stretch
+  but carry no timing for the mean.
+- next_due_at: when the feed should be fetched again
+
+After a poll the next due time is polled_at + mean_interval_s x
+RSS_CADENCE_POLL_FACTOR. It is clamped to [RSS_CADENCE_MIN_MINUTES,
+RSS_CADENCE_MAX_MINUTES] and stretched by 1.5x per empty poll. Active
+feeds are therefore checked more often than the cron interval would
+suggest, and quiet ones drop out until due. Failed fetches are retried
+after the minimum interval; host-level backoff is handled by
+fetch_scheduler.
+
+due() hands ingest only the feeds that are due. It orders them by
+priority (KIND_PRIORITY, then local > country > global) and then by how
+overdue they are, capped at RSS_MAX_FEEDS_PER_RUN. Passing
+full_sweep=True (admin override, or RSS_FULL_SWEEP=true) returns every
+feed.
+
+State lives in feed_health (migrations/migrate_feed_cadence.sql). It is
+loaded once per run and written back with one bulk upsert. Feeds whose
+upsert failed stay dirty and go out with the next flush.
+
+    cadence = get_feed_cadence()
+    cadence.load()
+    specs, deferred = cadence.due(all_specs, priority=_spec_priority)
+    ...
+    cadence.observe(url, [entry timestamps], undated_new=n)   # or cadence.mark_failed(url)
+    cadence.flush()
+
+Environment:
+- RSS_CADENCE_ENABLED        (default: true) false = every feed, every run
+- RSS_CADENCE_MIN_MINUTES    (default: 10)
+- RSS_CADENCE_MAX_MINUTES    (default: 720)
+- RSS_CADENCE_POLL_FACTOR    (default: 0.5) fraction of the mean inter-arrival time
+- RSS_MAX_FEEDS_PER_RUN      (default: 0) cap on due feeds per run, 0 = no cap
+- RSS_FULL_SWEEP             (default: false) force every run to fetch every feed
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from core.logging_config import get_metrics_logger
+    metrics = get_metrics_logger("feed_cadence")
+except Exception:  # pragma: no cover - logging config optional in scripts
+    metrics = None
+
+CADENCE_ENABLED = os.getenv("RSS_CADENCE_ENABLED", "true").lower() in ("1", "true", "yes", "y")
+MIN_INTERVAL_S = float(os.getenv("RSS_CADENCE_MIN_MINUTES", "10")) * 60
+MAX_INTERVAL_S = float(os.getenv("RSS_CADENCE_MAX_MINUTES", "720")) * 60
+POLL_FACTOR = float(os.getenv("RSS_CADENCE_POLL_FACTOR", "0.5"))
+MAX_FEEDS_PER_RUN = int(os.getenv("RSS_MAX_FEEDS_PER_RUN", "0"))
+FULL_SWEEP = os.getenv("RSS_FULL_SWEEP", "false").lower() in ("1", "true", "yes", "y")
+
+# Weight of the newest inter-arrival sample
+_EWMA_ALPHA = 0.3
+# Entries published together (bulk imports, same-minute posts) count as one minute apart
+_MIN_GAP_S = 60.0
+# Entries used to bootstrap a feed on its first poll
+_BOOTSTRAP_ENTRIES = 20
+_EMPTY_POLL_STRETCH = 1.5
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def _to_db_ts(epoch: Optional[float]) -> Optional[datetime]:
+    # feed_health uses naive UTC timestamps
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None)
+
+
+class _FeedState:
+    __slots__ = ("newest_entry_at", "mean_interval_s", "empty_polls", "last_polled_at", "next_due_at")
+
+    def __init__(self):
+        self.newest_entry_at: Optional[float] = None
+        self.mean_interval_s: Optional[float] = None
+        self.empty_polls = 0
+        self.last_polled_at: Optional[float] = None
+        self.next_due_at: Optional[float] = None
+
+
+class FeedCadence:
+    """Learns each feed's publish cadence and decides which feeds are due."""
+
+    def __init__(self, enabled: bool = CADENCE_ENABLED, min_interval_s: float = MIN_INTERVAL_S,
+                 max_interval_s: float = MAX_INTERVAL_S, poll_factor: float = POLL_FACTOR,
+                 max_feeds_per_run: int = MAX_FEEDS_PER_RUN):
+        self.enabled = enabled
+        self.min_interval_s = min_interval_s
+        self.max_interval_s = max(max_interval_s, min_interval_s)
+        self.poll_factor = poll_factor
+        self.max_feeds_per_run = max_feeds_per_run
+        self._lock = threading.Lock()
+        self._feeds: Dict[str, _FeedState] = {}
+        self._dirty: set = set()
+        self.last_run: Dict[str, Any] = {}
+
+    # ---- persistence ----
+
+    def load(self, fetch: Optional[Callable[[], List[Dict[str, Any]]]] = None) -> int:
+        """Replace in-memory state with the stored one. Blocking; run off the event loop."""
+        if fetch is None:
+            from utils.db_utils import fetch_feed_cadence as fetch
+        try:
+            rows = fetch()
+        except Exception as e:
+            logger.warning(f"[feed_cadence] load failed, treating all feeds as due: {e}")
+            return 0
+        feeds = {}
+        for row in rows or []:
+            state = _FeedState()
+            state.newest_entry_at = _to_epoch(row.get("newest_entry_at"))
+            state.mean_interval_s = row.get("mean_interval_s")
+            state.mean_interval_s = float(state.mean_interval_s) if state.mean_interval_s is not None else None
+            state.empty_polls = int(row.get("empty_polls") or 0)
+            state.last_polled_at = _to_epoch(row.get("last_polled_at"))
+            state.next_due_at = _to_epoch(row.get("next_due_at"))
+            feeds[row["feed_url"]] = state
+        with self._lock:
+            self._feeds = feeds
+            self._dirty.clear()
+        return len(feeds)
+
+    def flush(self, upsert: Optional[Callable[[List[tuple]], int]] = None) -> int:
+        """Write feeds observed since the last flush with one bulk upsert."""
+        if upsert is None:
+            from utils.db_utils import upsert_feed_cadence as upsert
+        with self._lock:
+            urls, self._dirty = self._dirty, set()
+            rows = [
+                (url, _to_db_ts(s.newest_entry_at), s.mean_interval_s, s.empty_polls,
+                 _to_db_ts(s.last_polled_at), _to_db_ts(s.next_due_at))
+                for url, s in ((u, self._feeds[u]) for u in urls)
+            ]
+        if not rows:
+            return 0
+        written = 0
+        try:
+            written = upsert(rows)
+        finally:
+            # upsert_feed_cadence returns 0 on error; write these feeds with the next flush
+            if not written:
+                with self._lock:
+                    self._dirty |= urls
+        return written
+
+    # ---- scheduling ----
+
+    def due(self, specs: Iterable[Dict[str, Any]], priority: Callable[[Dict[str, Any]], Any] = lambda s: 0,
+            full_sweep: bool = False, now: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """(specs to fetch this run in priority order, number deferred)."""
+        specs = list(specs)
+        now = time.time() if now is None else now
+        sweep = full_sweep or FULL_SWEEP or not self.enabled
+        with self._lock:
+            def next_due(spec):
+                state = self._feeds.get(spec["url"])
+                return state.next_due_at if state and state.next_due_at is not None else 0.0
+            if sweep:
+                due = specs
+            else:
+                due = [s for s in specs if next_due(s) <= now]
+            due = sorted(due, key=lambda s: (priority(s), next_due(s)))
+        if self.max_feeds_per_run > 0 and not sweep:
+            due = due[:self.max_feeds_per_run]
+        deferred = len(specs) - len(due)
+        self.last_run = {"at": now, "total": len(specs), "due": len(due), "deferred": deferred,
+                         "full_sweep": sweep}
+        if metrics:
+            metrics.increment("feed_cadence.due", len(due))
+            metrics.increment("feed_cadence.deferred", deferred)
+        logger.info(f"[feed_cadence] {len(due)}/{len(specs)} feeds due"
+                    f"{' (full sweep)' if sweep else ''}, {deferred} deferred")
+        return due, deferred
+
+    def _interval(self, state: _FeedState) -> float:
+        base = state.mean_interval_s * self.poll_factor if state.mean_interval_s else self.min_interval_s
+        base *= _EMPTY_POLL_STRETCH ** min(state.empty_polls, 20)
+        return min(self.max_interval_s, max(self.min_interval_s, base))
+
+    def observe(self, url: str, published: Iterable[Any], polled_at: Optional[float] = None,
+                undated_new: int = 0) -> None:
+        """
+        Record a successful poll.
+
+        Args:
+            url: Feed URL
+            published: The feed's entry timestamps (undated entries excluded)
+            polled_at: Poll time (defaults to now)
+            undated_new: Undated entries not stored before (matched by uuid).
+                They count as activity, so the poll is not empty, but leave
+                mean_interval_s unchanged.
+        """
+        polled_at = time.time() if polled_at is None else polled_at
+        stamps = sorted({min(t, polled_at) for t in (_to_epoch(p) for p in published) if t is not None})
+        with self._lock:
+            state = self._feeds.get(url)
+            if state is None:
+                state = self._feeds[url] = _FeedState()
+            if state.newest_entry_at is None:
+                new = stamps[-_BOOTSTRAP_ENTRIES:]
+                chain = new
+            else:
+                new = [t for t in stamps if t > state.newest_entry_at]
+                chain = [state.newest_entry_at] + new
+            for prev, cur in zip(chain, chain[1:]):
+                gap = max(_MIN_GAP_S, cur - prev)
+                state.mean_interval_s = gap if state.mean_interval_s is None else (
+                    (1 - _EWMA_ALPHA) * state.mean_interval_s + _EWMA_ALPHA * gap)
+            if new:
+                state.newest_entry_at = new[-1]
+            if new or undated_new > 0:
+                state.empty_polls = 0
+            else:
+                state.empty_polls += 1
+            state.last_polled_at = polled_at
+            state.next_due_at = polled_at + self._interval(state)
+            self._dirty.add(url)
+
+    def mark_failed(self, url: str, polled_at: Optional[float] = None) -> None:
+        """Retry a feed whose fetch failed after the minimum interval."""
+        polled_at = time.time() if polled_at is None else polled_at
+        with self._lock:
+            state = self._feeds.get(url)
+            if state is None:
+                state = self._feeds[url] = _FeedState()
+            state.last_polled_at = polled_at
+            state.next_due_at = polled_at + self.min_interval_s
+            self._dirty.add(url)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            intervals = sorted(s.mean_interval_s for s in self._feeds.values() if s.mean_interval_s)
+            due_now = sum(1 for s in self._feeds.values() if (s.next_due_at or 0) <= now)
+            tracked = len(self._feeds)
+        return {
+            "enabled": self.enabled,
+            "tracked_feeds": tracked,
+            "due_now": due_now,
+            "median_interval_min": round(intervals[len(intervals) // 2] / 60, 1) if intervals else None,
+            "last_run": dict(self.last_run),
+        }
+
+
+_instance: Optional[FeedCadence] = None
+_instance_lock = threading.Lock()
+
+
+def get_feed_cadence() -> FeedCadence:
+    """Process-wide FeedCadence."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = FeedCadence()
+    return _instance
+
+
+__all__ = [
+    "FeedCadence",
+    "get_feed_cadence",
+]
@@ -0,0 +1,232 @@
+"""
+feed_health.py — In-memory feed health telemetry for RSS ingest runs.
+
+_record_health used to upsert feed_health synchronously from inside the
+async fetch coroutine, once per feed (plus a second UPDATE on failure),
+so every fetch paid a blocking Postgres round-trip on the event loop.
+Fetch outcomes are now buffered in memory for the run:
+
+- per feed: ok/error counts, mean ok latency, last status and error,
+  failures since the last success
+- per host: a latency histogram (fixed log-spaced buckets) from which
+  p50/p95 are estimated, plus fetch and error counts
+
+ingest_feeds flushes the feed rows once at the end of the run with a single
+bulk upsert (db_utils.upsert_feed_health). If the upsert writes nothing, the
+drained rows are put back and retried with the next flush. The per-host summary is stored
+with the run's rss_ingest_diag row and served by /admin/rss/diag.
+
+    buffer = get_feed_health_buffer()
+    buffer.start_run()
+    buffer.record(url, host, ok=True, latency_ms=182.0)
+    ...
+    buffer.flush()              # one upsert for all feeds
+    buffer.host_summary()       # {"example.com": {"p50_ms": ..., "p95_ms": ...}}
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from core.logging_config import get_metrics_logger
+    metrics = get_metrics_logger("feed_health")
+except Exception:  # pragma: no cover - logging config optional in scripts
+    metrics = None
+
+# Upper bounds (ms) of the latency buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (50, 100, 200, 400, 800, 1600, 3200, 6400, 12800, 25600)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with interpolated percentiles."""
+
+    __slots__ = ("counts", "total", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.max_ms = 0.0
+
+    def add(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS_MS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+                upper = min(upper, self.max_ms)
+                return round(lower + (upper - lower) * (rank - seen) / count, 1)
+            seen += count
+        return round(self.max_ms, 1)
+
+    def to_dict(self) -> Dict[str, int]:
+        labels = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["inf"]
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+
+class _FeedStats:
+    __slots__ = ("host", "ok_count", "error_count", "latency_sum", "last_status", "last_error", "trailing")
+
+    def __init__(self, host: str):
+        self.host = host
+        self.ok_count = 0
+        self.error_count = 0
+        self.latency_sum = 0.0
+        self.last_status = None
+        self.last_error = None
+        self.trailing = 0
+
+    def merge_older(self, older: "_FeedStats") -> None:
+        """Fold in counters recorded before this entry (a failed flush put back)."""
+        if not self.ok_count:
+            # No success since the older window: its trailing failures still count
+            self.trailing += older.trailing
+        self.ok_count += older.ok_count
+        self.error_count += older.error_count
+        self.latency_sum += older.latency_sum
+
+
+class FeedHealthBuffer:
+    """Collects fetch outcomes during a run; flushes them in one upsert."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._feeds: Dict[str, _FeedStats] = {}
+        self._hosts: Dict[str, LatencyHistogram] = {}
+        self._host_errors: Dict[str, int] = {}
+        self.run_started_at: Optional[float] = None
+        self.last_flush: Dict[str, Any] = {}
+
+    def start_run(self) -> None:
+        """Reset per-host latency for a new run (unflushed feed rows are kept)."""
+        with self._lock:
+            self._hosts.clear()
+            self._host_errors.clear()
+            self.run_started_at = time.time()
+
+    def record(self, url: str, host: str, ok: bool, latency_ms: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            feed = self._feeds.get(url)
+            if feed is None:
+                feed = self._feeds[url] = _FeedStats(host)
+            feed.host = host
+            if ok:
+                feed.ok_count += 1
+                feed.latency_sum += latency_ms
+                feed.last_status, feed.last_error, feed.trailing = "ok", None, 0
+                hist = self._hosts.get(host)
+                if hist is None:
+                    hist = self._hosts[host] = LatencyHistogram()
+                hist.add(latency_ms)
+            else:
+                feed.error_count += 1
+                feed.last_status, feed.last_error = "error", (error or "")[:240]
+                feed.trailing += 1
+                self._host_errors[host] = self._host_errors.get(host, 0) + 1
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._feeds)
+
+    def _drain(self) -> Dict[str, _FeedStats]:
+        with self._lock:
+            feeds, self._feeds = self._feeds, {}
+        return feeds
+
+    def _restore(self, feeds: Dict[str, _FeedStats]) -> None:
+        # Outcomes recorded after the drain are newer; the drained ones go underneath
+        with self._lock:
+            for url, older in feeds.items():
+                feed = self._feeds.get(url)
+                if feed is None:
+                    self._feeds[url] = older
+                else:
+                    feed.merge_older(older)
+
+    def flush(self, upsert: Optional[Callable[[List[tuple]], int]] = None) -> int:
+        """Write buffered feed rows with one bulk upsert. Blocking; run off the event loop."""
+        if upsert is None:
+            from utils.db_utils import upsert_feed_health as upsert
+        feeds = self._drain()
+        if not feeds:
+            return 0
+        rows = [
+            (url, f.host, f.last_status, f.last_error, f.ok_count, f.error_count,
+             (f.latency_sum / f.ok_count) if f.ok_count else None, f.trailing)
+            for url, f in feeds.items()
+        ]
+        start = time.perf_counter()
+        written = 0
+        try:
+            written = upsert(rows)
+        finally:
+            # upsert_feed_health returns 0 on error; keep the counters for the next flush
+            if not written:
+                self._restore(feeds)
+        duration_ms = (time.perf_counter() - start) * 1000.0
+        self.last_flush = {"at": time.time(), "feeds": len(rows), "written": written,
+                           "duration_ms": round(duration_ms, 1)}
+        if metrics:
+            metrics.timing("feed_health.flush", int(duration_ms), feeds=len(rows))
+        logger.info(f"[feed_health] flushed {written}/{len(rows)} feeds in {duration_ms:.0f}ms")
+        return written
+
+    def host_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host fetch latency (p50/p95/max ms) and counts for the current run."""
+        with self._lock:
+            hosts = set(self._hosts) | set(self._host_errors)
+            out = {}
+            for host in sorted(hosts):
+                hist = self._hosts.get(host) or LatencyHistogram()
+                out[host] = {
+                    "fetches": hist.total + self._host_errors.get(host, 0),
+                    "errors": self._host_errors.get(host, 0),
+                    "p50_ms": hist.percentile(0.50),
+                    "p95_ms": hist.percentile(0.95),
+                    "max_ms": round(hist.max_ms, 1) if hist.total else None,
+                    "histogram": hist.to_dict(),
+                }
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "run_started_at": self.run_started_at,
+            "pending_feeds": self.pending(),
+            "last_flush": dict(self.last_flush),
+            "hosts": self.host_summary(),
+        }
+
+
+_instance: Optional[FeedHealthBuffer] = None
+_instance_lock = threading.Lock()
+
+
+def get_feed_health_buffer() -> FeedHealthBuffer:
+    """Process-wide FeedHealthBuffer."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = FeedHealthBuffer()
+    return _instance
+
+
+__all__ = [
+    "FeedHealthBuffer",
+    "LatencyHistogram",
+    "LATENCY_BUCKETS_MS",
+    "get_feed_health_buffer",
+]
@@ -0,0 +1,303 @@
+"""
+fetch_scheduler.py — Host-aware scheduling of RSS feed fetches.
+
+rss_processor used one TokenBucket per host at a fixed rate. Its acquire()
+awaited between reading and updating the token count, so concurrent
+coroutines on the same host overdrew it. It also knew nothing about how a
+host was actually behaving, and _should_skip_by_backoff always returned
+False, so a dead host cost every run a full timeout per feed.
+
+FetchScheduler keeps per-host state across runs. RSS ingest usually runs
+as a one-off cron process, so the latency EWMA and cooldowns are also
+persisted to feed_health (host_latency_ewma_ms, backoff_until) by flush() after
+each run. begin_run() seeds them back from fetch_host_schedule() rows, so a
+dead host stays skipped and slow hosts keep their learned timeout and
+ordering in the next process:
+
+- rate: requests/second, starting at RSS_HOST_RATE_PER_SEC. It rises
+  additively after successes and halves on 429/503 or host-level errors
+  (5xx, timeouts, connection failures), between min_rate and max_rate.
+  Tokens are reserved synchronously, so concurrent callers queue up
+  instead of overdrawing the bucket.
+- concurrency: at most RSS_HOST_MAX_CONCURRENCY fetches in flight per host,
+  1 for hosts whose latency EWMA exceeds RSS_HOST_SLOW_MS.
+- timeout: 4x the host's latency EWMA, kept between RSS_HOST_MIN_TIMEOUT
+  and the default fetch timeout, so slow hosts stop holding the run open.
+- cooldown: Retry-After on 429/503 is honoured. After FAILURE_THRESHOLD
+  consecutive host-level failures the host is skipped for
+  BACKOFF_BASE_MIN minutes, doubling per further failure up to
+  BACKOFF_MAX_MIN. 4xx responses are problems with a single feed and do
+  not count against the host.
+
+order() sorts feed specs by KIND_PRIORITY, then fast hosts first.
+
+    async with scheduler.slot(host):
+        r = await client.get(url, timeout=scheduler.timeout_for(host))
+    scheduler.record(host, latency_ms, status=r.status_code, retry_after=r.headers.get("Retry-After"))
+
+    scheduler.begin_run(seed=fetch_host_schedule())   # start of each run
+    scheduler.flush()                                  # end of run, after feed_health
+
+Environment (read by rss_processor):
+- RSS_HOST_MAX_CONCURRENCY     (default: 2) fetches in flight per host
+- RSS_HOST_MAX_RATE_PER_SEC    (default: 2.0) ceiling for the learned rate
+- RSS_HOST_MIN_RATE_PER_SEC    (default: 0.05) floor for the learned rate
+- RSS_HOST_SLOW_MS             (default: 5000) latency EWMA above which a host gets one slot
+- RSS_HOST_MIN_TIMEOUT         (default: 5) seconds, floor for learned timeouts
+- RSS_HOST_BACKOFF_ENABLED     (default: true) skip hosts in cooldown
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest latency sample
+_EWMA_ALPHA = 0.3
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _to_epoch(value: Any) -> float:
+    """Epoch seconds from a stored naive-UTC timestamp (0.0 when unset)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return 0.0
+
+
+class _HostState:
+    __slots__ = ("rate", "tokens", "updated", "ewma_ms", "consecutive_failures",
+                 "cooldown_until", "fetches", "errors", "throttled", "last_status")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.ewma_ms: Optional[float] = None
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.fetches = 0
+        self.errors = 0
+        self.throttled = 0
+        self.last_status: Optional[int] = None
+
+
+class FetchScheduler:
+    """Per-host concurrency caps, adaptive rates, timeouts and cooldowns."""
+
+    def __init__(
+        self,
+        base_rate: float = 0.5,
+        burst: int = 2,
+        max_per_host: int = 2,
+        max_rate: float = 2.0,
+        min_rate: float = 0.05,
+        slow_ms: float = 5000.0,
+        default_timeout: float = 20.0,
+        min_timeout: float = 5.0,
+        failure_threshold: int = 3,
+        backoff_base_s: float = 15 * 60,
+        backoff_max_s: float = 180 * 60,
+        throttle_enabled: bool = True,
+        backoff_enabled: bool = True,
+    ):
+        self.base_rate = max(base_rate, 0.0001)
+        self.burst = max(burst, 1)
+        self.max_per_host = max(max_per_host, 1)
+        self.max_rate = max(max_rate, self.base_rate)
+        self.min_rate = min(max(min_rate, 0.0001), self.base_rate)
+        self.slow_ms = slow_ms
+        self.default_timeout = default_timeout
+        self.min_timeout = min(min_timeout, default_timeout)
+        self.failure_threshold = max(failure_threshold, 1)
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.throttle_enabled = throttle_enabled
+        self.backoff_enabled = backoff_enabled
+        self._hosts: Dict[str, _HostState] = {}
+        # asyncio primitives belong to one event loop, so they are per run
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        # Hosts recorded since begin_run(); flush() persists only these
+        self._touched: set = set()
+
+    def host(self, name: str) -> _HostState:
+        state = self._hosts.get(name)
+        if state is None:
+            state = self._hosts[name] = _HostState(self.base_rate, self.burst)
+        return state
+
+    def begin_run(self, seed: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        """
+        Call at the start of each ingest run (each event loop).
+
+        seed: stored host rows (host, latency_ewma_ms, backoff_until,
+        consecutive_fail) from db_utils.fetch_host_schedule. Stored cooldowns
+        are kept if later than the in-memory ones; latency and failure counts
+        only fill hosts this process has not measured yet.
+        """
+        self._slots = {}
+        self._touched = set()
+        now = time.time()
+        for row in seed or ():
+            name = row.get("host")
+            if not name:
+                continue
+            state = self.host(name)
+            cooldown = _to_epoch(row.get("backoff_until"))
+            if cooldown > now:
+                state.cooldown_until = max(state.cooldown_until, cooldown)
+            if state.fetches:
+                continue
+            if state.ewma_ms is None and row.get("latency_ewma_ms") is not None:
+                state.ewma_ms = float(row["latency_ewma_ms"])
+            state.consecutive_failures = int(row.get("consecutive_fail") or 0)
+
+    # ---- admission ----
+
+    def should_skip(self, name: str) -> bool:
+        return self.backoff_enabled and self.host(name).cooldown_until > time.time()
+
+    def order(self, specs: Iterable[Dict[str, Any]], priority: Callable[[Dict[str, Any]], Any],
+              host_of: Callable[[str], str]) -> List[Dict[str, Any]]:
+        """Specs by priority, then fastest host first; stable otherwise."""
+        def key(spec):
+            state = self._hosts.get(host_of(spec.get("url", "")))
+            return priority(spec), (state.ewma_ms if state and state.ewma_ms is not None else self.slow_ms / 2)
+        return sorted(specs, key=key)
+
+    def timeout_for(self, name: str) -> float:
+        ewma = self.host(name).ewma_ms
+        if ewma is None:
+            return self.default_timeout
+        return min(self.default_timeout, max(self.min_timeout, 4.0 * ewma / 1000.0))
+
+    def _reserve(self, state: _HostState) -> float:
+        """Take one token (possibly going negative); seconds to wait for it."""
+        now = time.monotonic()
+        state.tokens = min(float(self.burst), state.tokens + (now - state.updated) * state.rate)
+        state.updated = now
+        state.tokens -= 1.0
+        return 0.0 if state.tokens >= 0 else -state.tokens / state.rate
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        """Hold one of the host's concurrency slots, paced by its current rate."""
+        state = self.host(name)
+        sem = self._slots.get(name)
+        if sem is None:
+            slow = state.ewma_ms is not None and state.ewma_ms > self.slow_ms
+            sem = self._slots[name] = asyncio.Semaphore(1 if slow else self.max_per_host)
+        async with sem:
+            if self.throttle_enabled:
+                wait = self._reserve(state)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            yield
+
+    # ---- feedback ----
+
+    def record(self, name: str, latency_ms: float, status: Optional[int] = None,
+               retry_after: Optional[str] = None) -> None:
+        """
+        Feed back one fetch. status None means no response (timeout or
+        connection error).
+        """
+        state = self.host(name)
+        state.fetches += 1
+        state.last_status = status
+        self._touched.add(name)
+        if status is not None and status < 400:
+            state.ewma_ms = latency_ms if state.ewma_ms is None else (
+                (1 - _EWMA_ALPHA) * state.ewma_ms + _EWMA_ALPHA * latency_ms)
+            state.consecutive_failures = 0
+            state.cooldown_until = 0.0
+            ceiling = self.base_rate if state.ewma_ms > self.slow_ms else self.max_rate
+            state.rate = min(ceiling, state.rate + self.base_rate * 0.5)
+            return
+
+        state.errors += 1
+        if status is not None and status not in (429, 503) and status < 500:
+            return  # 404/410/403...: this feed, not the host
+
+        state.rate = max(self.min_rate, state.rate / 2.0)
+        delay = parse_retry_after(retry_after) if status in (429, 503) else None
+        if status == 429:
+            state.throttled += 1
+        else:
+            state.consecutive_failures += 1
+            if status is None:
+                # A timeout tells us at least this much about the host's latency
+                state.ewma_ms = max(state.ewma_ms or 0.0, latency_ms)
+            if state.consecutive_failures >= self.failure_threshold:
+                extra = state.consecutive_failures - self.failure_threshold
+                backoff = min(self.backoff_max_s, self.backoff_base_s * math.pow(2, extra))
+                delay = max(delay or 0.0, backoff)
+        if delay:
+            state.cooldown_until = max(state.cooldown_until, time.time() + min(delay, self.backoff_max_s))
+            logger.info(f"[fetch_scheduler] {name} cooling down {delay:.0f}s "
+                        f"(status={status}, failures={state.consecutive_failures})")
+
+    def persist_rows(self) -> List[tuple]:
+        """(host, ewma_ms, backoff_until naive UTC or None) for hosts recorded this run."""
+        now = time.time()
+        rows = []
+        for name in sorted(self._touched):
+            state = self._hosts[name]
+            backoff_until = None
+            if state.cooldown_until > now:
+                backoff_until = datetime.fromtimestamp(state.cooldown_until, timezone.utc).replace(tzinfo=None)
+            rows.append((name, state.ewma_ms, backoff_until))
+        return rows
+
+    def flush(self, update: Optional[Callable[[List[tuple]], int]] = None) -> int:
+        """Persist this run's host latency and cooldowns. Blocking; run off the event loop."""
+        if update is None:
+            from utils.db_utils import update_host_schedule as update
+        rows = self.persist_rows()
+        if not rows:
+            return 0
+        written = update(rows)
+        logger.info(f"[fetch_scheduler] persisted {written}/{len(rows)} hosts")
+        return written
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        return {
+            name: {
+                "rate_per_sec": round(s.rate, 3),
+                "ewma_ms": round(s.ewma_ms, 1) if s.ewma_ms is not None else None,
+                "timeout_s": round(self.timeout_for(name), 1),
+                "fetches": s.fetches,
+                "errors": s.errors,
+                "throttled": s.throttled,
+                "consecutive_failures": s.consecutive_failures,
+                "cooldown_s": round(max(0.0, s.cooldown_until - now)),
+                "last_status": s.last_status,
+            }
+            for name, s in sorted(self._hosts.items())
+        }
+
+
+__all__ = ["FetchScheduler", "parse_retry_after"]
@@ -0,0 +1,251 @@
+"""
+fulltext_extractor.py — Bounded-memory article fulltext download and extraction.
+
+_fetch_article_fulltext used to read the whole response into r.text before
+truncating it to ARTICLE_MAX_BYTES. It then ran trafilatura or
+BeautifulSoup/lxml on the event loop, which blocked every other feed
+coroutine for tens of milliseconds per article.
+
+- fetch_capped() streams the body and stops reading at max_bytes, so
+  memory per download is bounded by the cap and not by the page size.
+  Non-HTML responses (PDFs, images, feeds) are skipped unread.
+- FulltextExtractor runs extraction (trafilatura, then BeautifulSoup, then
+  a regex strip) in a small process pool, so parsing holds neither the
+  event loop nor the parent's GIL. Extracted text is cached by content
+  hash (bounded by RSS_FULLTEXT_CACHE_MB), and identical pages extracted
+  concurrently share one job.
+
+    raw, charset = await fetch_capped(client, url, max_bytes, timeout)
+    text = await get_fulltext_extractor().extract(raw, charset, max_chars)
+
+Environment:
+- RSS_FULLTEXT_WORKERS       (default: 2) extraction processes
+- RSS_FULLTEXT_CACHE_MB      (default: 16) extracted text kept by content hash
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    from core.logging_config import get_metrics_logger
+    metrics = get_metrics_logger("fulltext_extractor")
+except Exception:  # pragma: no cover - logging config optional in scripts
+    metrics = None
+
+FULLTEXT_WORKERS = int(os.getenv("RSS_FULLTEXT_WORKERS", "2"))
+FULLTEXT_CACHE_MB = int(os.getenv("RSS_FULLTEXT_CACHE_MB", "16"))
+
+# Responses worth extracting; anything else is skipped before the body is read
+_HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+_STREAM_CHUNK = 64 * 1024
+
+
+async def fetch_capped(client: httpx.AsyncClient, url: str, max_bytes: int,
+                       timeout: float) -> Tuple[bytes, Optional[str]]:
+    """
+    GET url, reading at most max_bytes of the body.
+
+    Returns:
+        (body, charset from Content-Type); body is b"" for non-HTML responses
+
+    Raises:
+        httpx.HTTPError: transport errors and non-2xx statuses
+    """
+    async with client.stream("GET", url, timeout=timeout) as r:
+        r.raise_for_status()
+        content_type = r.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in _HTML_CONTENT_TYPES:
+            return b"", None
+        buf = bytearray()
+        async for chunk in r.aiter_bytes(_STREAM_CHUNK):
+            buf += chunk[:max_bytes - len(buf)]
+            if len(buf) >= max_bytes:
+                break
+        return bytes(buf), r.charset_encoding
+
+
+# ---------------------------------------------------------------- worker side
+_SCRIPT_RE = re.compile(r"(?is)<script.*?>.*?</script>")
+_STYLE_RE = re.compile(r"(?is)<style.*?>.*?</style>")
+_TAG_RE = re.compile(r"(?is)<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+
+def _strip_html_basic(html: str) -> str:
+    text = _SCRIPT_RE.sub(" ", html)
+    text = _STYLE_RE.sub(" ", text)
+    text = _TAG_RE.sub(" ", text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _init_worker() -> None:
+    """Pool initializer: import the extractors once per process."""
+    for module in ("trafilatura", "bs4", "lxml"):
+        try:
+            __import__(module)
+        except Exception:
+            pass
+
+
+def _extract_in_worker(raw: bytes, charset: Optional[str], max_chars: int) -> str:
+    """Decode and extract readable text from one page."""
+    try:
+        html = raw.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        html = raw.decode("utf-8", errors="replace")
+    try:
+        import trafilatura
+        extracted = trafilatura.extract(html, include_comments=False, favor_recall=True) or ""
+        if extracted:
+            return extracted[:max_chars]
+    except Exception:
+        pass
+    try:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "lxml")
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+        return soup.get_text(separator=" ", strip=True)[:max_chars]
+    except Exception:
+        pass
+    return _strip_html_basic(html)[:max_chars]
+
+
+# ---------------------------------------------------------------- parent side
+class FulltextExtractor:
+    """Extraction pool with a content-hash cache and in-flight dedupe."""
+
+    def __init__(
+        self,
+        max_workers: int = FULLTEXT_WORKERS,
+        cache_bytes: int = FULLTEXT_CACHE_MB * 1024 * 1024,
+        use_processes: bool = True,
+        extract_fn: Callable[[bytes, Optional[str], int], str] = _extract_in_worker,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.cache_bytes = cache_bytes
+        self.use_processes = use_processes
+        self._extract_fn = extract_fn
+        self._pool = None  # started on first use
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_size = 0
+        self._counts = {"extracted": 0, "cache_hits": 0, "dedupe_inflight": 0, "failed": 0}
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.use_processes:
+                # spawn: the parent may be a threaded web server, so never fork it
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fulltext")
+        return self._pool
+
+    async def extract(self, raw: bytes, charset: Optional[str], max_chars: int) -> str:
+        """Readable text of one page ("" when nothing could be extracted)."""
+        if not raw:
+            return ""
+        key = f"{hashlib.sha1(raw).hexdigest()}:{max_chars}"
+        submitted = False
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._counts["cache_hits"] += 1
+                return cached
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counts["dedupe_inflight"] += 1
+            else:
+                pool = self._get_pool()
+                future = self._inflight[key] = pool.submit(self._extract_fn, raw, charset, max_chars)
+                submitted = True
+        if submitted:
+            # Outside the lock: the callback runs inline if the job already finished
+            future.add_done_callback(lambda f, k=key: self._on_done(k, f))
+        start = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception as e:
+            logger.debug("Fulltext extraction failed: %s", e)
+            return ""
+        finally:
+            if metrics:
+                metrics.timing("fulltext.extract_ms", int((time.perf_counter() - start) * 1000))
+
+    def _on_done(self, key: str, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            try:
+                text = future.result()
+            except Exception as e:
+                self._counts["failed"] += 1
+                if isinstance(e, BrokenProcessPool):
+                    # A crashed worker poisons the pool; start a fresh one next time
+                    self._pool = None
+                return
+            self._counts["extracted"] += 1
+            size = len(text.encode("utf-8"))
+            if size > self.cache_bytes:
+                return
+            self._cache[key] = text
+            self._cache_size += size
+            while self._cache_size > self.cache_bytes:
+                _, old = self._cache.popitem(last=False)
+                self._cache_size -= len(old.encode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counts,
+                "inflight": len(self._inflight),
+                "cache_entries": len(self._cache),
+                "cache_bytes": self._cache_size,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+_instance: Optional[FulltextExtractor] = None
+_instance_lock = threading.Lock()
+
+
+def get_fulltext_extractor() -> FulltextExtractor:
+    """Process-wide FulltextExtractor."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = FulltextExtractor()
+    return _instance
+
+
+__all__ = [
+    "FulltextExtractor",
+    "fetch_capped",
+    "get_fulltext_extractor",
+]
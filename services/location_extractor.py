@@ -9,21 +9,20 @@ Primary approach:
 Robust fallbacks:
 - If spaCy model unavailable, use simple regex + pycountry + city_utils
 
+NER runs through the shared trimmed pipeline in services.location_ner;
+extract_locations_from_queries() batches many texts through nlp.pipe.
+
 Returns dict with keys: {city, region, country, method, notes}
 """
 from __future__ import annotations
 
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
 import re
 
-logger = logging.getLogger(__name__)
+from services.location_ner import get_location_ner
 
-# Optional deps (guarded)
-try:
-    import spacy  # type: ignore
-except Exception:
-    spacy = None  # type: ignore
+logger = logging.getLogger(__name__)
 
 try:
     import pycountry  # type: ignore
@@ -38,19 +37,9 @@ except Exception:
     def fuzzy_match_city(text: str) -> Optional[str]:
         return None
 
-_nlp = None
 def _ensure_spacy():
-    global _nlp
-    if _nlp is not None:
-        return _nlp
-    if spacy is None:
-        return None
-    try:
-        _nlp = spacy.load("en_core_web_sm")
-        return _nlp
-    except Exception as e:
-        logger.warning("spaCy model en_core_web_sm not loaded: %s", e)
-        return None
+    """Shared trimmed (NER-only) spaCy pipeline, or None if unavailable."""
+    return get_location_ner().nlp
 
 
 def _resolve_country(name: str) -> Optional[str]:
@@ -98,6 +87,38 @@ def extract_location_from_query(query: str) -> Dict[str, Optional[str]]:
         'notes': Optional[str],
       }
     """
+    q = (query or "").strip()
+    places = None
+    if q:
+        ner = get_location_ner()
+        if ner.available:
+            try:
+                places = ner.extract(q)
+            except Exception as e:
+                logger.debug("spaCy extraction failed: %s", e)
+    return _extract_with_places(q, places)
+
+
+def extract_locations_from_queries(queries: List[str], n_process: int = 1) -> List[Dict[str, Optional[str]]]:
+    """
+    Batch version of extract_location_from_query.
+
+    Runs NER over all texts in one nlp.pipe pass (optionally in a process
+    pool for backfills) and then applies the same resolution/fallbacks.
+    """
+    texts = [(q or "").strip() for q in queries]
+    places_per_text: List[Optional[List[str]]] = [None] * len(texts)
+    ner = get_location_ner()
+    if ner.available:
+        try:
+            places_per_text = list(ner.extract_many(texts, n_process=n_process))
+        except Exception as e:
+            logger.debug("spaCy batch extraction failed: %s", e)
+    return [_extract_with_places(q, places) for q, places in zip(texts, places_per_text)]
+
+
+def _extract_with_places(q: str, places: Optional[List[str]]) -> Dict[str, Optional[str]]:
+    """Resolve NER places (None when spaCy is unavailable) plus fallbacks."""
     res: Dict[str, Optional[str]] = {
         "city": None,
         "region": None,
@@ -106,18 +127,13 @@ def extract_location_from_query(query: str) -> Dict[str, Optional[str]]:
         "notes": None,
     }
 
-    q = (query or "").strip()
     if not q:
         res["method"] = "empty"
         return res
 
-    # 1) Try spaCy NER
-    nlp = _ensure_spacy()
-    if nlp is not None:
+    # 1) spaCy NER (GPE/LOC spans in order)
+    if places is not None:
         try:
-            doc = nlp(q)
-            # collect GPE/LOC spans in order
-            places = [ent.text.strip() for ent in doc.ents if ent.label_ in ("GPE", "LOC")]
             for place in places:
                 # Country first
                 country = _resolve_country(place)
@@ -0,0 +1,217 @@
+"""
+location_ner.py — Shared spaCy NER service for place-name extraction.
+
+Loads a trimmed en_core_web_sm pipeline (NER only) once per process and
+exposes single-text and batched extraction:
+
+- extract(text)            -> ["Kyiv", "Ukraine"]
+- extract_many(texts)      -> one list of GPE/LOC spans per input, via nlp.pipe
+- extract_many(texts, n_process=4) for backfills (spaCy process pool)
+
+Call warm_location_ner() at worker start so the first chat query doesn't pay
+the model load. Per-document latency (batch time divided by batch length) is
+tracked and available from stats().
+
+Environment:
+- SPACY_NER_MODEL       (default: en_core_web_sm)
+- SPACY_NER_BATCH_SIZE  (default: 64)
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Optional dep (guarded)
+try:
+    import spacy  # type: ignore
+except Exception:
+    spacy = None  # type: ignore
+
+LOCATION_LABELS = ("GPE", "LOC")
+
+# Components not needed for entity recognition; excluded at load time so they
+# are neither loaded into memory nor run per document.
+_EXCLUDED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter", "morphologizer"]
+
+DEFAULT_MODEL = os.getenv("SPACY_NER_MODEL", "en_core_web_sm")
+DEFAULT_BATCH_SIZE = int(os.getenv("SPACY_NER_BATCH_SIZE", "64"))
+
+# Number of recent per-doc latencies kept for p50/p95 reporting
+_LATENCY_WINDOW = 2048
+
+
+class LocationNER:
+    """Process-wide NER pipeline restricted to place entities."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._nlp = None
+        self._load_failed = False
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies_ms: deque = deque(maxlen=_LATENCY_WINDOW)
+        self._docs = 0
+        self._batches = 0
+        self._load_seconds: Optional[float] = None
+
+    # ------------------------------------------------------------------ loading
+    @property
+    def nlp(self):
+        """Loaded spaCy pipeline, or None if spaCy/model is unavailable."""
+        if self._nlp is None and not self._load_failed:
+            self.warm()
+        return self._nlp
+
+    def warm(self) -> bool:
+        """Load the trimmed pipeline if not loaded yet. Returns availability."""
+        if self._nlp is not None:
+            return True
+        with self._load_lock:
+            if self._nlp is not None:
+                return True
+            if self._load_failed or spacy is None:
+                return False
+            start = time.perf_counter()
+            try:
+                nlp = spacy.load(self.model_name, exclude=_EXCLUDED_PIPES)
+                self._disable_unused_tok2vec(nlp)
+            except Exception as e:
+                logger.warning("spaCy model %s not loaded: %s", self.model_name, e)
+                self._load_failed = True
+                return False
+            self._load_seconds = time.perf_counter() - start
+            self._nlp = nlp
+            logger.info("[NER] Loaded %s (pipes=%s) in %.2fs",
+                        self.model_name, nlp.pipe_names, self._load_seconds)
+            return True
+
+    @staticmethod
+    def _disable_unused_tok2vec(nlp) -> None:
+        # In en_core_web_sm the ner component carries its own tok2vec; the
+        # shared one only feeds tagger/parser, which are excluded above.
+        if "tok2vec" not in nlp.pipe_names:
+            return
+        try:
+            if not nlp.get_pipe("tok2vec").listening_components:
+                nlp.disable_pipe("tok2vec")
+        except Exception as e:
+            logger.debug("[NER] Could not inspect tok2vec listeners: %s", e)
+
+    @property
+    def available(self) -> bool:
+        return self.nlp is not None
+
+    # --------------------------------------------------------------- extraction
+    @staticmethod
+    def _places(doc) -> List[str]:
+        return [ent.text.strip() for ent in doc.ents if ent.label_ in LOCATION_LABELS]
+
+    def extract(self, text: str) -> List[str]:
+        """GPE/LOC spans for a single text, in document order."""
+        return self.extract_many([text])[0]
+
+    def extract_many(self, texts: Iterable[str], batch_size: Optional[int] = None,
+                     n_process: int = 1) -> List[List[str]]:
+        """
+        GPE/LOC spans for many texts using nlp.pipe batching.
+
+        Args:
+            texts: Input texts; None is treated as empty
+            batch_size: Docs per batch (defaults to SPACY_NER_BATCH_SIZE)
+            n_process: >1 runs spaCy's multiprocessing pool (for backfills)
+
+        Returns:
+            One list of place strings per input text (empty lists when the
+            model is unavailable)
+        """
+        texts = [t or "" for t in texts]
+        nlp = self.nlp
+        if nlp is None or not texts:
+            return [[] for _ in texts]
+
+        size = batch_size or self.batch_size
+        results: List[List[str]] = []
+        latencies: List[float] = []
+        # nlp.pipe processes a whole batch before yielding its first doc, so
+        # the gaps between yielded docs are not per-doc costs. Time each batch
+        # (closed by its last doc) and attribute batch_ms / batch_len per doc.
+        batch_start = time.perf_counter()
+        pending = 0
+        for doc in nlp.pipe(texts, batch_size=size, n_process=n_process):
+            results.append(self._places(doc))
+            pending += 1
+            if pending == size or len(results) == len(texts):
+                now = time.perf_counter()
+                latencies.extend([(now - batch_start) * 1000.0 / pending] * pending)
+                batch_start = now
+                pending = 0
+
+        with self._stats_lock:
+            self._latencies_ms.extend(latencies)
+            self._docs += len(results)
+            self._batches += 1
+        return results
+
+    # -------------------------------------------------------------------- stats
+    def stats(self) -> Dict[str, object]:
+        """Load state and amortized per-document latency (ms) over the recent window."""
+        with self._stats_lock:
+            samples = sorted(self._latencies_ms)
+            docs, batches = self._docs, self._batches
+
+        def pct(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 3)
+
+        return {
+            "model": self.model_name,
+            "loaded": self._nlp is not None,
+            "pipes": list(self._nlp.pipe_names) if self._nlp is not None else [],
+            "load_seconds": round(self._load_seconds, 3) if self._load_seconds else None,
+            "docs": docs,
+            "calls": batches,
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p95": pct(0.95),
+        }
+
+
+_instance: Optional[LocationNER] = None
+_instance_lock = threading.Lock()
+
+
+def get_location_ner() -> LocationNER:
+    """Process-wide LocationNER singleton (model loads on first use)."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = LocationNER()
+    return _instance
+
+
+def warm_location_ner() -> bool:
+    """Load the NER model now (call at worker start)."""
+    return get_location_ner().warm()
+
+
+def extract_places_many(texts: Iterable[str], batch_size: Optional[int] = None,
+                        n_process: int = 1) -> List[List[str]]:
+    """Convenience wrapper around get_location_ner().extract_many()."""
+    return get_location_ner().extract_many(texts, batch_size=batch_size, n_process=n_process)
+
+
+__all__ = [
+    "LOCATION_LABELS",
+    "LocationNER",
+    "get_location_ner",
+    "warm_location_ner",
+    "extract_places_many",
+]
@@ -0,0 +1,597 @@
+"""
+notification_dispatcher.py — Shared outbound notification queue.
+
+Email, mobile push, Telegram and web push notifications are queued here
+instead of being sent inline or on a thread per message. A fixed set of
+worker threads drains the queue, groups what it picks up per channel and
+hands each group to the channel in one call:
+
+- email:    one Brevo request per sender (messageVersions), falling back to a
+            persistent SMTP connection reused across messages
+- telegram: Bot API sendMessage over one pooled HTTP session
+- webpush:  pywebpush over one pooled HTTP session; expired subscriptions
+            are deleted in one statement per batch
+- push:     FCM/APNS placeholder (logs only, as before)
+
+Transient failures are retried with exponential backoff; delivered, failed,
+retried and dropped counts are kept per channel and logged as metrics.
+
+    dispatcher = get_notification_dispatcher()
+    dispatcher.submit("email", "ops@example.com",
+                      {"subject": "...", "html_body": "...", "from_addr": None})
+    dispatcher.flush(timeout=30)   # e.g. before a cron process exits
+
+Plan gating stays in utils/email_dispatcher.py, push_dispatcher.py,
+telegram_dispatcher.py and webpush_send.py, which queue through here.
+
+Environment:
+- NOTIFY_WORKERS             (default: 4) worker threads
+- NOTIFY_MAX_QUEUE           (default: 10000) queued notifications before submit() waits
+- NOTIFY_ENQUEUE_TIMEOUT     (default: 5) seconds submit() waits for room before dropping
+- NOTIFY_BATCH_MAX           (default: 200) notifications a worker takes per pass
+- NOTIFY_MAX_ATTEMPTS        (default: 4) sends per notification, including retries
+- NOTIFY_RETRY_BASE_SECONDS  (default: 2) first retry delay, doubled per attempt
+- NOTIFY_SMTP_IDLE_SECONDS   (default: 60) idle time before the SMTP connection is closed
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import atexit
+import heapq
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+
+logger = logging.getLogger(__name__)
+
+try:
+    from core.logging_config import get_metrics_logger
+    metrics = get_metrics_logger("notification_dispatcher")
+except Exception:  # pragma: no cover - logging config optional in scripts
+    metrics = None
+
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "4"))
+NOTIFY_MAX_QUEUE = int(os.getenv("NOTIFY_MAX_QUEUE", "10000"))
+NOTIFY_ENQUEUE_TIMEOUT = float(os.getenv("NOTIFY_ENQUEUE_TIMEOUT", "5"))
+NOTIFY_BATCH_MAX = int(os.getenv("NOTIFY_BATCH_MAX", "200"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "4"))
+NOTIFY_RETRY_BASE_SECONDS = float(os.getenv("NOTIFY_RETRY_BASE_SECONDS", "2"))
+NOTIFY_SMTP_IDLE_SECONDS = float(os.getenv("NOTIFY_SMTP_IDLE_SECONDS", "60"))
+
+BREVO_SEND_URL = "https://api.brevo.com/v3/smtp/email"
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+
+# Delivery outcomes returned by channels, one per notification (the same
+# convention as webpush_send.send_web_push)
+DELIVERED = True
+REJECTED = False  # permanent: bad address, blocked bot, expired subscription
+RETRY = None      # transient: network error, 429, 5xx
+
+
+@dataclass
+class Notification:
+    """One queued message for one recipient."""
+    channel: str
+    target: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class NotificationChannel:
+    """Sends a batch of notifications for one channel."""
+
+    name = ""
+    batch_size = 100
+
+    def send_batch(self, items: List[Notification]) -> List[Optional[bool]]:
+        """Return DELIVERED, REJECTED or RETRY for each item, in order."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+def _http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(NOTIFY_WORKERS, 4))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _retryable_status(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+class EmailChannel(NotificationChannel):
+    """Brevo batch sends with a persistent SMTP connection as fallback.
+
+    Payload: {"subject", "html_body", "from_addr"}.
+    """
+
+    name = "email"
+    batch_size = 100
+
+    def __init__(self, config=None, brevo_api_key: Optional[str] = None, session=None):
+        if config is None:
+            from core.config import CONFIG
+            config = CONFIG
+        self.config = config.email
+        self.brevo_api_key = brevo_api_key if brevo_api_key is not None else (
+            os.getenv("BREVO_API_KEY") or getattr(self.config, "brevo_api_key", None))
+        self._session = session
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_used_at = 0.0
+        self._smtp_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = _http_session()
+        return self._session
+
+    def _sender(self, item: Notification) -> str:
+        return item.payload.get("from_addr") or self.config.email_from or "no-reply@sentinel.local"
+
+    def send_batch(self, items: List[Notification]) -> List[Optional[bool]]:
+        outcomes: List[Optional[bool]] = [RETRY] * len(items)
+        if self.brevo_api_key:
+            by_sender: Dict[str, List[int]] = {}
+            for i, item in enumerate(items):
+                by_sender.setdefault(self._sender(item), []).append(i)
+            for sender, indexes in by_sender.items():
+                results = self._send_brevo(sender, [items[i] for i in indexes])
+                for i, result in zip(indexes, results):
+                    outcomes[i] = result
+
+        fallback = [i for i, outcome in enumerate(outcomes) if outcome is not DELIVERED]
+        if fallback:
+            if self.config.smtp_host and self.config.smtp_user and self.config.smtp_pass:
+                with self._smtp_lock:
+                    for i in fallback:
+                        outcomes[i] = self._send_smtp(items[i])
+            elif not self.brevo_api_key:
+                logger.warning("SMTP creds missing; dropping %d emails", len(fallback))
+                for i in fallback:
+                    outcomes[i] = REJECTED
+        return outcomes
+
+    def _send_brevo(self, sender: str, items: List[Notification]) -> List[Optional[bool]]:
+        """One transactional request for every message from this sender.
+
+        Brevo rejects the whole request when one recipient is invalid, so a
+        rejected batch is split in halves until the bad addresses are isolated.
+        """
+        first = items[0].payload
+        payload = {
+            "sender": {"email": sender, "name": self.config.email_from_name or "Sentinel"},
+            "subject": first["subject"],
+            "htmlContent": first["html_body"],
+            "messageVersions": [
+                {
+                    "to": [{"email": item.target}],
+                    "subject": item.payload["subject"],
+                    "htmlContent": item.payload["html_body"],
+                }
+                for item in items
+            ],
+        }
+        try:
+            resp = self.session.post(
+                BREVO_SEND_URL,
+                headers={
+                    "api-key": self.brevo_api_key,
+                    "accept": "application/json",
+                    "content-type": "application/json",
+                },
+                data=json.dumps(payload),
+                timeout=20,
+            )
+        except Exception as e:
+            logger.error("Brevo batch send error (%d emails): %s", len(items), e)
+            return [RETRY] * len(items)
+        if 200 <= resp.status_code < 300:
+            logger.debug("Brevo batch sent: %d emails from %s", len(items), sender)
+            return [DELIVERED] * len(items)
+        logger.warning("Brevo batch send failed: %s %s", resp.status_code, resp.text[:300])
+        if _retryable_status(resp.status_code):
+            return [RETRY] * len(items)
+        # Auth/account errors fail every request alike; only bisect content rejections
+        if len(items) > 1 and resp.status_code not in (401, 403):
+            mid = len(items) // 2
+            return self._send_brevo(sender, items[:mid]) + self._send_brevo(sender, items[mid:])
+        return [REJECTED] * len(items)
+
+    def _smtp_connection(self) -> smtplib.SMTP:
+        """Open SMTP connection, reused until idle for NOTIFY_SMTP_IDLE_SECONDS."""
+        now = time.monotonic()
+        if self._smtp is not None and now - self._smtp_used_at > NOTIFY_SMTP_IDLE_SECONDS:
+            self._close_smtp()
+        if self._smtp is None:
+            conn = smtplib.SMTP(self.config.smtp_host, self.config.smtp_port, timeout=15)
+            if self.config.smtp_tls:
+                conn.starttls()
+            conn.login(self.config.smtp_user, self.config.smtp_pass)
+            self._smtp = conn
+        self._smtp_used_at = now
+        return self._smtp
+
+    def _close_smtp(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def _send_smtp(self, item: Notification) -> Optional[bool]:
+        from_addr = item.payload.get("from_addr") or self.config.email_from or self.config.smtp_user or "no-reply@sentinel.local"
+        msg = MIMEText(item.payload["html_body"], "html", "utf-8")
+        msg["Subject"] = item.payload["subject"]
+        msg["From"] = from_addr
+        msg["To"] = item.target
+        for attempt in range(2):
+            try:
+                self._smtp_connection().sendmail(from_addr, [item.target], msg.as_string())
+                logger.debug("SMTP email sent successfully to %s", item.target)
+                return DELIVERED
+            except smtplib.SMTPRecipientsRefused as e:
+                logger.warning("SMTP recipient refused %s: %s", item.target, e)
+                return REJECTED
+            except smtplib.SMTPServerDisconnected:
+                # Server dropped the kept-alive connection; reconnect once
+                self._smtp = None
+                if attempt:
+                    return RETRY
+            except Exception as e:
+                logger.error("SMTP send failed for %s: %s", item.target, e)
+                self._close_smtp()
+                return RETRY
+        return RETRY
+
+    def close(self) -> None:
+        with self._smtp_lock:
+            self._close_smtp()
+
+
+class TelegramChannel(NotificationChannel):
+    """Bot API sendMessage over a pooled session.
+
+    Target is the chat id; payload: {"text", "parse_mode"}.
+    """
+
+    name = "telegram"
+    batch_size = 50
+
+    def __init__(self, bot_token: Optional[str] = None, session=None):
+        if bot_token is None:
+            from core.config import CONFIG
+            bot_token = CONFIG.telegram.bot_token
+        self.bot_token = bot_token
+        self._session = session
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = _http_session()
+        return self._session
+
+    def send_batch(self, items: List[Notification]) -> List[Optional[bool]]:
+        if not self.bot_token:
+            logger.warning("TELEGRAM_BOT_TOKEN missing; dropping %d telegram messages", len(items))
+            return [REJECTED] * len(items)
+        url = TELEGRAM_API_URL.format(token=self.bot_token)
+        outcomes: List[Optional[bool]] = []
+        for item in items:
+            try:
+                resp = self.session.post(url, json={
+                    "chat_id": item.target,
+                    "text": item.payload["text"],
+                    "parse_mode": item.payload.get("parse_mode") or "HTML",
+                    "disable_web_page_preview": True,
+                }, timeout=10)
+            except Exception as e:
+                logger.error("telegram send failed for %s: %s", item.target, e)
+                outcomes.append(RETRY)
+                continue
+            if resp.status_code == 200:
+                outcomes.append(DELIVERED)
+            else:
+                logger.warning("telegram send failed for %s: %s %s", item.target, resp.status_code, resp.text[:200])
+                outcomes.append(RETRY if _retryable_status(resp.status_code) else REJECTED)
+        return outcomes
+
+
+class WebPushChannel(NotificationChannel):
+    """pywebpush over a pooled session; expired subscriptions are removed.
+
+    Target is the subscription endpoint; payload: {"subscription", "message"}.
+    """
+
+    name = "webpush"
+    batch_size = 200
+
+    def __init__(self, session=None):
+        self._session = session
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = _http_session()
+        return self._session
+
+    def send_batch(self, items: List[Notification]) -> List[Optional[bool]]:
+        from utils.webpush_send import remove_subscriptions, send_web_push
+
+        outcomes = [send_web_push(item.payload["subscription"], item.payload["message"],
+                                  requests_session=self.session)
+                    for item in items]
+        dead = [item.target for item, outcome in zip(items, outcomes) if outcome is REJECTED]
+        if dead:
+            remove_subscriptions(dead)
+        return outcomes
+
+
+class PushChannel(NotificationChannel):
+    """Mobile push. Target is the device token; payload is the push payload."""
+
+    name = "push"
+
+    def send_batch(self, items: List[Notification]) -> List[Optional[bool]]:
+        # TODO: implement real FCM/APNS call here
+        for item in items:
+            logger.info("Pretend push to %s: %s", item.target, item.payload)
+        return [DELIVERED] * len(items)
+
+
+def default_channels() -> Dict[str, NotificationChannel]:
+    return {
+        channel.name: channel
+        for channel in (EmailChannel(), TelegramChannel(), WebPushChannel(), PushChannel())
+    }
+
+
+class NotificationDispatcher:
+    """Bounded notification queue drained by a fixed pool of batching workers."""
+
+    def __init__(
+        self,
+        channels: Optional[Dict[str, NotificationChannel]] = None,
+        workers: int = NOTIFY_WORKERS,
+        max_queue: int = NOTIFY_MAX_QUEUE,
+        enqueue_timeout: float = NOTIFY_ENQUEUE_TIMEOUT,
+        batch_max: int = NOTIFY_BATCH_MAX,
+        max_attempts: int = NOTIFY_MAX_ATTEMPTS,
+        retry_base: float = NOTIFY_RETRY_BASE_SECONDS,
+    ):
+        self._channels = channels
+        self._workers_n = max(1, workers)
+        self._enqueue_timeout = enqueue_timeout
+        self._batch_max = max(1, batch_max)
+        self._max_attempts = max(1, max_attempts)
+        self._retry_base = retry_base
+
+        self._queue: "queue.Queue[Notification]" = queue.Queue(maxsize=max_queue)
+        self._retries: List[Any] = []  # heap of (due, seq, Notification)
+        self._retry_seq = itertools.count()
+        self._retry_cond = threading.Condition()
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    @property
+    def channels(self) -> Dict[str, NotificationChannel]:
+        if self._channels is None:
+            self._channels = default_channels()
+        return self._channels
+
+    def _count(self, channel: str, key: str, n: int = 1) -> None:
+        counts = self._counts.setdefault(channel, {
+            "queued": 0, "sent": 0, "failed": 0, "retried": 0, "dropped": 0})
+        counts[key] += n
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self._workers_n):
+                t = threading.Thread(target=self._work, name=f"notify-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            t = threading.Thread(target=self._retry_loop, name="notify-retry", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, channel: str, target: str, payload: Dict[str, Any]) -> bool:
+        """Queue one notification; False if the channel is unknown or the queue stayed full."""
+        if channel not in self.channels:
+            raise ValueError(f"Unknown notification channel: {channel}")
+        self._ensure_started()
+        item = Notification(channel, target, payload)
+        with self._lock:
+            self._outstanding += 1
+        try:
+            self._queue.put(item, timeout=self._enqueue_timeout)
+        except queue.Full:
+            logger.warning("notification queue full; dropping %s to %s", channel, target)
+            self._settle(item, "dropped")
+            return False
+        with self._lock:
+            self._count(channel, "queued")
+        return True
+
+    def submit_many(self, channel: str, items: List[tuple]) -> int:
+        """Queue (target, payload) pairs; returns how many were queued."""
+        return sum(1 for target, payload in items if self.submit(channel, target, payload))
+
+    def _settle(self, item: Notification, outcome: str) -> None:
+        with self._lock:
+            self._count(item.channel, outcome)
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._idle.notify_all()
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self._batch_max:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # Sampled once per pass rather than on every submit()
+            if metrics:
+                metrics.gauge("notify.queue_depth", self._queue.qsize())
+
+            by_channel: Dict[str, List[Notification]] = {}
+            for item in batch:
+                by_channel.setdefault(item.channel, []).append(item)
+            for name, items in by_channel.items():
+                channel = self.channels[name]
+                size = max(1, channel.batch_size)
+                for start in range(0, len(items), size):
+                    self._deliver(channel, items[start:start + size])
+
+    def _deliver(self, channel: NotificationChannel, items: List[Notification]) -> None:
+        started = time.monotonic()
+        try:
+            outcomes = channel.send_batch(items)
+        except Exception as e:
+            logger.error("%s batch of %d failed: %s", channel.name, len(items), e)
+            outcomes = [RETRY] * len(items)
+        duration_ms = int((time.monotonic() - started) * 1000)
+
+        sent = failed = retried = 0
+        for item, outcome in zip(items, outcomes):
+            item.attempts += 1
+            if outcome is DELIVERED:
+                sent += 1
+                self._settle(item, "sent")
+            elif outcome is RETRY and item.attempts < self._max_attempts:
+                retried += 1
+                with self._lock:
+                    self._count(item.channel, "retried")
+                self._schedule_retry(item)
+            else:
+                failed += 1
+                self._settle(item, "failed")
+
+        if metrics:
+            metrics.timing("notify.batch_ms", duration_ms, channel=channel.name, size=len(items))
+            if sent:
+                metrics.increment("notify.sent", sent, channel=channel.name)
+            if failed:
+                metrics.increment("notify.failed", failed, channel=channel.name)
+            if retried:
+                metrics.increment("notify.retried", retried, channel=channel.name)
+
+    def _schedule_retry(self, item: Notification) -> None:
+        delay = self._retry_base * (2 ** (item.attempts - 1)) * random.uniform(0.8, 1.2)
+        with self._retry_cond:
+            heapq.heappush(self._retries, (time.monotonic() + delay, next(self._retry_seq), item))
+            self._retry_cond.notify()
+
+    def _retry_loop(self) -> None:
+        while not self._stop.is_set():
+            with self._retry_cond:
+                now = time.monotonic()
+                due = []
+                while self._retries and self._retries[0][0] <= now:
+                    due.append(heapq.heappop(self._retries)[2])
+                if not due:
+                    wait = self._retries[0][0] - now if self._retries else 1.0
+                    self._retry_cond.wait(min(wait, 1.0))
+                    continue
+            for item in due:
+                # Retries may wait for room; they are already counted as outstanding
+                self._queue.put(item)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted notification is delivered, failed or dropped."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._outstanding:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, pending retries and per-channel counters."""
+        with self._retry_cond:
+            retry_pending = len(self._retries)
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "retry_pending": retry_pending,
+                "outstanding": self._outstanding,
+                "workers": self._workers_n,
+                "channels": {name: dict(counts) for name, counts in self._counts.items()},
+            }
+
+    def shutdown(self, timeout: Optional[float] = 10) -> None:
+        """Drain for up to timeout seconds, then stop workers and close channels."""
+        if self._threads:
+            self.flush(timeout)
+        self._stop.set()
+        with self._retry_cond:
+            self._retry_cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=1)
+        self._threads = []
+        for channel in (self._channels or {}).values():
+            channel.close()
+
+
+_instance: Optional[NotificationDispatcher] = None
+_instance_lock = threading.Lock()
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Process-wide NotificationDispatcher (workers start on first submit)."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = NotificationDispatcher()
+                # Short-lived cron processes exit right after queueing
+                atexit.register(_instance.shutdown, float(os.getenv("NOTIFY_EXIT_DRAIN_SECONDS", "30")))
+    return _instance
+
+
+__all__ = [
+    "DELIVERED",
+    "REJECTED",
+    "RETRY",
+    "Notification",
+    "NotificationChannel",
+    "EmailChannel",
+    "TelegramChannel",
+    "WebPushChannel",
+    "PushChannel",
+    "NotificationDispatcher",
+    "get_notification_dispatcher",
+]
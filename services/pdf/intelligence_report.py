@@ -3,9 +3,9 @@ import logging
 import os
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from services.pdf.renderer import REPORT_TEMPLATE_DIR, PdfJob, get_pdf_renderer
 
 logger = logging.getLogger(__name__)
 
@@ -67,15 +67,84 @@ def generate_intelligence_report_pdf(
         logger.error("Cannot generate intelligence PDF: WeasyPrint missing")
         return None
 
+    context = build_intelligence_report_context(
+        report_title, report_body, request_meta, analyst_email, user_email, file_tag, logo_url
+    )
+    pdf_path = _report_output_path(output_dir, file_tag, request_meta)
+    path = get_pdf_renderer().render(
+        "intelligence_report.html",
+        context,
+        template_dir=REPORT_TEMPLATE_DIR,
+        autoescape=True,
+        base_url=TEMPLATE_DIR,
+        output_path=pdf_path,
+    )
+    if path:
+        logger.info("Generated intelligence report PDF at %s", path)
+    return path
+
+
+def submit_intelligence_report_pdf(
+    report_title: str,
+    report_body: str,
+    request_meta: Dict[str, Any],
+    analyst_email: Optional[str] = None,
+    user_email: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    file_tag: Optional[str] = None,
+    logo_url: Optional[str] = None,
+    on_done: Optional[Callable[[PdfJob], None]] = None,
+) -> Optional[Tuple[str, str]]:
+    """Queue an intelligence report render without waiting for it.
+
+    Takes the same arguments as generate_intelligence_report_pdf plus an
+    on_done callback run with the finished PdfJob.
+
+    Returns:
+        (job_id, absolute pdf path) or None if WeasyPrint is missing.
+
+    Raises:
+        PdfRenderQueueFull: the render queue is full
+    """
+    if not _HAVE_WEASY:
+        logger.error("Cannot generate intelligence PDF: WeasyPrint missing")
+        return None
+
+    context = build_intelligence_report_context(
+        report_title, report_body, request_meta, analyst_email, user_email, file_tag, logo_url
+    )
+    pdf_path = os.path.abspath(_report_output_path(output_dir, file_tag, request_meta))
+    job_id = get_pdf_renderer().submit(
+        "intelligence_report.html",
+        context,
+        template_dir=REPORT_TEMPLATE_DIR,
+        autoescape=True,
+        base_url=TEMPLATE_DIR,
+        output_path=pdf_path,
+        on_done=on_done,
+    )
+    return job_id, pdf_path
+
+
+def _report_output_path(output_dir: Optional[str], file_tag: Optional[str],
+                        request_meta: Optional[Dict[str, Any]]) -> str:
     output_dir = output_dir or OUTPUT_DIR_DEFAULT
     os.makedirs(output_dir, exist_ok=True)
+    tag = file_tag or (request_meta or {}).get("id") or uuid.uuid4().hex
+    filename = f"{tag}_{int(datetime.utcnow().timestamp())}.pdf"
+    return os.path.join(output_dir, filename)
 
-    env = Environment(
-        loader=FileSystemLoader(TEMPLATE_DIR),
-        autoescape=select_autoescape(["html", "xml"])
-    )
-    template = env.get_template("intelligence_report.html")
 
+def build_intelligence_report_context(
+    report_title: str,
+    report_body: str,
+    request_meta: Dict[str, Any],
+    analyst_email: Optional[str] = None,
+    user_email: Optional[str] = None,
+    file_tag: Optional[str] = None,
+    logo_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Template variables for intelligence_report.html."""
     meta: Dict[str, Any] = request_meta or {}
     def _m(key: str, default: Any = None) -> Any:
         return meta.get(key, default) if isinstance(meta, dict) else default
@@ -136,14 +205,4 @@ def generate_intelligence_report_pdf(
         "engine_version": _m("engine_version"),
     }
 
-    try:
-        html_str = template.render(**context)
-        tag = file_tag or request_meta.get("id") or uuid.uuid4().hex
-        filename = f"{tag}_{int(datetime.utcnow().timestamp())}.pdf"
-        pdf_path = os.path.join(output_dir, filename)
-        HTML(string=html_str, base_url=TEMPLATE_DIR).write_pdf(pdf_path)
-        logger.info("Generated intelligence report PDF at %s", pdf_path)
-        return os.path.abspath(pdf_path)
-    except Exception as e:  # pragma: no cover - IO heavy
-        logger.error("Failed to render intelligence report PDF: %s", e)
-        return None
+    return context
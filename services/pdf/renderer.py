@@ -0,0 +1,468 @@
+"""
+renderer.py — Shared off-request PDF rendering service.
+
+Jinja rendering and WeasyPrint layout run in a bounded process pool, so web
+workers only enqueue a job and poll its status. Each pool process keeps:
+
+- one Jinja Environment per template directory (templates compiled at start)
+- one WeasyPrint FontConfiguration, parsed stylesheets and an image cache
+
+Identical renders (same template, context and base URL, by content hash)
+share one in-flight job, and recent results are served from a bounded
+in-memory cache.
+
+    renderer = get_pdf_renderer()
+    job_id = renderer.submit("threat_alert.html", context, output_path="downloads/x.pdf")
+    renderer.status(job_id)   # {"state": "queued"|"running"|"done"|"failed", ...}
+    path = renderer.render(...)  # blocking helper for background jobs
+
+Environment:
+- PDF_RENDER_WORKERS        (default: 2) pool processes
+- PDF_RENDER_MAX_QUEUE      (default: 32) pending jobs before submit() refuses
+- PDF_RENDER_CACHE_MB       (default: 64) rendered PDFs kept for dedupe
+- PDF_RENDER_JOB_HISTORY    (default: 500) finished jobs kept for status polling
+"""
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+try:
+    from core.logging_config import get_metrics_logger
+    metrics = get_metrics_logger("pdf_renderer")
+except Exception:  # pragma: no cover - logging config optional in scripts
+    metrics = None
+
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_RENDER_MAX_QUEUE = int(os.getenv("PDF_RENDER_MAX_QUEUE", "32"))
+PDF_RENDER_CACHE_MB = int(os.getenv("PDF_RENDER_CACHE_MB", "64"))
+PDF_RENDER_JOB_HISTORY = int(os.getenv("PDF_RENDER_JOB_HISTORY", "500"))
+
+# Template directories compiled in every pool process at start, with the
+# autoescape setting their callers have always used.
+EXPORT_TEMPLATE_DIR = os.path.abspath(os.path.join("templates", "pdf"))
+REPORT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+WARM_TEMPLATE_DIRS: Tuple[Tuple[str, bool], ...] = (
+    (EXPORT_TEMPLATE_DIR, False),
+    (REPORT_TEMPLATE_DIR, True),
+)
+
+# Number of recent render times kept for p50/p95 reporting
+_LATENCY_WINDOW = 512
+# Images cached per pool process before the cache is reset
+_IMAGE_CACHE_MAX = 256
+
+
+class PdfRenderQueueFull(RuntimeError):
+    """Raised by submit() when PDF_RENDER_MAX_QUEUE jobs are already pending."""
+
+
+# ---------------------------------------------------------------- worker side
+# State below lives in each pool process and persists across jobs.
+_worker_envs: Dict[Tuple[str, bool], Environment] = {}
+_worker_stylesheets: Dict[str, Any] = {}
+_worker_image_cache: Dict[str, Any] = {}
+_worker_font_config = None
+
+
+def _worker_env(template_dir: str, autoescape: bool) -> Environment:
+    key = (template_dir, autoescape)
+    env = _worker_envs.get(key)
+    if env is None:
+        env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(["html", "xml"]) if autoescape else False,
+            auto_reload=False,
+            cache_size=-1,
+        )
+        _worker_envs[key] = env
+    return env
+
+
+def _worker_fonts():
+    global _worker_font_config
+    if _worker_font_config is None:
+        from weasyprint.text.fonts import FontConfiguration
+        _worker_font_config = FontConfiguration()
+    return _worker_font_config
+
+
+def _worker_stylesheet(path: str):
+    css = _worker_stylesheets.get(path)
+    if css is None:
+        from weasyprint import CSS
+        css = CSS(filename=path, font_config=_worker_fonts())
+        _worker_stylesheets[path] = css
+    return css
+
+
+def _init_worker(template_dirs: Tuple[Tuple[str, bool], ...]) -> None:
+    """Pool initializer: import WeasyPrint, load fonts and compile templates."""
+    try:
+        _worker_fonts()
+    except Exception as e:
+        logger.warning("PDF worker could not load WeasyPrint: %s", e)
+    for template_dir, autoescape in template_dirs:
+        if not os.path.isdir(template_dir):
+            continue
+        env = _worker_env(template_dir, autoescape)
+        for name in env.list_templates(extensions=["html"]):
+            try:
+                env.get_template(name)
+            except Exception as e:
+                logger.debug("PDF worker skipped template %s: %s", name, e)
+
+
+def _render_in_worker(spec: Dict[str, Any]) -> Tuple[bytes, float]:
+    """Render one job spec to PDF bytes; returns (pdf, render_ms)."""
+    start = time.perf_counter()
+    from weasyprint import HTML
+
+    env = _worker_env(spec["template_dir"], spec.get("autoescape", False))
+    html_str = env.get_template(spec["template"]).render(**spec["context"])
+    if len(_worker_image_cache) > _IMAGE_CACHE_MAX:
+        _worker_image_cache.clear()
+    pdf = HTML(string=html_str, base_url=spec.get("base_url")).write_pdf(
+        stylesheets=[_worker_stylesheet(p) for p in spec.get("stylesheets") or ()] or None,
+        font_config=_worker_fonts(),
+        cache=_worker_image_cache,
+    )
+    return pdf, (time.perf_counter() - start) * 1000.0
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+# ---------------------------------------------------------------- parent side
+class PdfJob:
+    """Status record for one submitted render."""
+
+    def __init__(self, job_id: str, key: str, template: str, output_path: Optional[str],
+                 on_done: Optional[Callable[["PdfJob"], None]] = None):
+        self.id = job_id
+        self.key = key
+        self.template = template
+        self.output_path = output_path
+        self.on_done = on_done
+        self.state = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.render_ms: Optional[float] = None
+        self.size_bytes: Optional[int] = None
+        self.deduped = False
+        self.error: Optional[str] = None
+        self.event = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "state": self.state,
+            "template": self.template,
+            "output_path": self.output_path,
+            "deduped": self.deduped,
+            "render_ms": round(self.render_ms, 1) if self.render_ms is not None else None,
+            "size_bytes": self.size_bytes,
+            "queued_ms": round(((self.finished_at or time.time()) - self.created_at) * 1000.0, 1),
+            "error": self.error,
+        }
+
+
+def _content_key(spec: Dict[str, Any]) -> str:
+    blob = json.dumps(
+        [spec["template_dir"], spec["template"], spec.get("autoescape"), spec.get("base_url"),
+         list(spec.get("stylesheets") or ()), spec["context"]],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class PdfRenderService:
+    """Bounded render pool with job tracking and content-hash dedupe."""
+
+    def __init__(
+        self,
+        max_workers: int = PDF_RENDER_WORKERS,
+        max_queue: int = PDF_RENDER_MAX_QUEUE,
+        cache_bytes: int = PDF_RENDER_CACHE_MB * 1024 * 1024,
+        job_history: int = PDF_RENDER_JOB_HISTORY,
+        use_processes: bool = True,
+        render_fn: Callable[[Dict[str, Any]], Tuple[bytes, float]] = _render_in_worker,
+        warm_template_dirs: Tuple[Tuple[str, bool], ...] = WARM_TEMPLATE_DIRS,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(1, max_queue)
+        self.cache_bytes = cache_bytes
+        self.job_history = job_history
+        self._render_fn = render_fn
+        if use_processes:
+            # spawn: the parent is a threaded web server, so never fork it
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(warm_template_dirs,),
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pdf-render")
+        # Completion work (file writes, on_done callbacks) stays off the pool's manager thread
+        self._callbacks = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf-render-done")
+
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, PdfJob]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[Future, List[PdfJob]]] = {}
+        self._cache: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._cache_size = 0
+        self._render_ms: deque = deque(maxlen=_LATENCY_WINDOW)
+        self._counts = {"submitted": 0, "rendered": 0, "failed": 0, "dedupe_inflight": 0,
+                        "dedupe_cache": 0, "rejected": 0}
+
+    # ------------------------------------------------------------------ submit
+    def submit(
+        self,
+        template: str,
+        context: Dict[str, Any],
+        *,
+        template_dir: str = EXPORT_TEMPLATE_DIR,
+        output_path: Optional[str] = None,
+        base_url: Optional[str] = None,
+        autoescape: bool = False,
+        stylesheets: Optional[List[str]] = None,
+        job_id: Optional[str] = None,
+        on_done: Optional[Callable[[PdfJob], None]] = None,
+    ) -> str:
+        """
+        Queue a render and return its job id.
+
+        Args:
+            template: Template file name inside template_dir
+            context: Template variables (must be JSON-serializable via str())
+            template_dir: Jinja loader directory
+            output_path: Where to write the PDF when done (optional)
+            base_url: WeasyPrint base URL for relative assets
+            autoescape: Enable HTML autoescaping for this template
+            stylesheets: Extra CSS files, parsed once per pool process
+            job_id: Caller-chosen id (e.g. the pdf_exports row id)
+            on_done: Called with the finished PdfJob (done or failed)
+
+        Raises:
+            PdfRenderQueueFull: PDF_RENDER_MAX_QUEUE renders already pending
+        """
+        spec = {
+            "template_dir": os.path.abspath(template_dir),
+            "template": template,
+            "context": context,
+            "base_url": base_url,
+            "autoescape": autoescape,
+            "stylesheets": [os.path.abspath(p) for p in stylesheets or ()],
+        }
+        key = _content_key(spec)
+        job = PdfJob(job_id or uuid.uuid4().hex, key, template, output_path, on_done)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._counts["dedupe_cache"] += 1
+            elif key in self._inflight:
+                self._inflight[key][1].append(job)
+                self._counts["dedupe_inflight"] += 1
+                job.deduped = True
+            elif len(self._inflight) >= self.max_queue:
+                self._counts["rejected"] += 1
+                raise PdfRenderQueueFull(f"{len(self._inflight)} PDF renders pending")
+            else:
+                future = self._pool.submit(self._render_fn, spec)
+                self._inflight[key] = (future, [job])
+            self._remember(job)
+            self._counts["submitted"] += 1
+            depth = len(self._inflight)
+
+        if cached is not None:
+            job.deduped = True
+            self._callbacks.submit(self._complete, job, cached[0], cached[1], None)
+        elif not job.deduped:
+            future.add_done_callback(lambda f, k=key: self._callbacks.submit(self._on_future_done, k, f))
+        if metrics:
+            metrics.gauge("pdf_render.queue_depth", depth)
+        return job.id
+
+    def _remember(self, job: PdfJob) -> None:
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.job_history:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.state in ("queued", "running"):
+                break
+            self._jobs.pop(oldest_id)
+
+    # -------------------------------------------------------------- completion
+    def _on_future_done(self, key: str, future: Future) -> None:
+        try:
+            pdf, render_ms = future.result()
+        except Exception as e:
+            with self._lock:
+                _, jobs = self._inflight.pop(key, (None, []))
+                self._counts["failed"] += 1
+            logger.error("PDF render failed (%s): %s", jobs[0].template if jobs else key[:12], e)
+            for job in jobs:
+                self._complete(job, None, None, str(e))
+            return
+
+        # Cache before leaving in-flight so a concurrent identical submit always dedupes
+        with self._lock:
+            _, jobs = self._inflight.pop(key, (None, []))
+            self._counts["rendered"] += 1
+            self._render_ms.append(render_ms)
+            self._cache_put(key, pdf, render_ms)
+        if metrics:
+            metrics.timing("pdf_render.duration_ms", int(render_ms),
+                           template=jobs[0].template if jobs else None, size_bytes=len(pdf))
+        for job in jobs:
+            self._complete(job, pdf, render_ms, None)
+
+    def _cache_put(self, key: str, pdf: bytes, render_ms: float) -> None:
+        if len(pdf) > self.cache_bytes:
+            return
+        self._cache[key] = (pdf, render_ms)
+        self._cache_size += len(pdf)
+        while self._cache_size > self.cache_bytes:
+            _, (old, _) = self._cache.popitem(last=False)
+            self._cache_size -= len(old)
+
+    def _complete(self, job: PdfJob, pdf: Optional[bytes], render_ms: Optional[float],
+                  error: Optional[str]) -> None:
+        if error is None and job.output_path:
+            try:
+                _write_atomic(job.output_path, pdf)
+            except Exception as e:
+                error = f"write failed: {e}"
+        job.render_ms = render_ms
+        job.size_bytes = len(pdf) if pdf is not None else None
+        job.error = error
+        job.finished_at = time.time()
+        job.state = "failed" if error else "done"
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                logger.error("PDF job %s on_done callback failed: %s", job.id, e)
+        job.event.set()
+
+    # ------------------------------------------------------------------ status
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status dict, or None if this process does not know the job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.state == "queued" and not job.deduped:
+                entry = self._inflight.get(job.key)
+                if entry is not None and entry[0].running():
+                    job.state = "running"
+            return job.to_dict()
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until the job finishes (or timeout); returns its status."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.event.wait(timeout)
+        return self.status(job_id)
+
+    def render(self, template: str, context: Dict[str, Any], *, output_path: str,
+               timeout: Optional[float] = 300, **kwargs) -> Optional[str]:
+        """Submit and wait; returns the absolute output path or None on failure.
+
+        For background jobs (schedulers, workers) that need the file inline.
+        """
+        job_id = self.submit(template, context, output_path=output_path, **kwargs)
+        status = self.wait(job_id, timeout)
+        if not status or status["state"] != "done":
+            logger.error("PDF render %s did not complete: %s", template, status)
+            return None
+        return os.path.abspath(output_path)
+
+    def warm(self) -> None:
+        """Start every pool process now so the first request skips the cold start."""
+        for future in [self._pool.submit(_ping) for _ in range(self.max_workers)]:
+            try:
+                future.result(timeout=120)
+            except Exception as e:
+                logger.warning("PDF renderer warm-up failed: %s", e)
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, counters, cache usage and render latency (ms)."""
+        with self._lock:
+            samples = sorted(self._render_ms)
+            running = sum(1 for f, _ in self._inflight.values() if f.running())
+            stats = {
+                "workers": self.max_workers,
+                "queue_depth": len(self._inflight),
+                "running": running,
+                "max_queue": self.max_queue,
+                "cache_entries": len(self._cache),
+                "cache_bytes": self._cache_size,
+                **self._counts,
+            }
+
+        def pct(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 1)
+
+        stats["render_ms_p50"] = pct(0.50)
+        stats["render_ms_p95"] = pct(0.95)
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+        self._callbacks.shutdown(wait=wait)
+
+
+_instance: Optional[PdfRenderService] = None
+_instance_lock = threading.Lock()
+
+
+def get_pdf_renderer() -> PdfRenderService:
+    """Process-wide PdfRenderService (pool processes start on first use)."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = PdfRenderService()
+    return _instance
+
+
+__all__ = [
+    "EXPORT_TEMPLATE_DIR",
+    "REPORT_TEMPLATE_DIR",
+    "PdfJob",
+    "PdfRenderQueueFull",
+    "PdfRenderService",
+    "get_pdf_renderer",
+]
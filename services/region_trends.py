@@ -0,0 +1,132 @@
+"""
+region_trends.py — Run-scoped region trend aggregation.
+
+Enrichment used to run a 365-day fetch_past_incidents scan and a
+region_trends upsert for every alert. The aggregator instead collects the
+distinct (location, category) pairs seen while enriching, then on flush
+counts every pair with one COUNT query and writes one row per location with
+one batched upsert.
+
+    aggregator = get_region_trend_aggregator()
+    with aggregator.run():          # e.g. around one enrich_and_store_alerts cycle
+        ... aggregator.add(city, category) ...
+    # flushed when the outermost run() exits
+
+Outside a run(), callers use flush_if_idle() so trends are still written
+per batch. Windows are aligned to UTC midnight, so repeated flushes on the
+same day update the same region_trends row.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+import logging
+import threading
+
+from utils.db_utils import count_incidents_by_location_category, save_region_trends_batch
+
+logger = logging.getLogger(__name__)
+
+TREND_WINDOW_DAYS = 365
+
+
+class RegionTrendAggregator:
+    """Collects trend keys during enrichment and writes them in one batch."""
+
+    def __init__(self, window_days: int = TREND_WINDOW_DAYS):
+        self.window_days = window_days
+        self._pending: Dict[str, Set[Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._depth = 0
+
+    def add(self, location: Optional[str], category: Optional[str]) -> None:
+        """Record that an alert for this location/category was enriched."""
+        if not location:
+            return
+        with self._lock:
+            self._pending.setdefault(location, set()).add(category or None)
+
+    @property
+    def in_run(self) -> bool:
+        return self._depth > 0
+
+    @contextmanager
+    def run(self):
+        """Defer flushing until the outermost run() exits."""
+        with self._lock:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                outermost = self._depth == 0
+            if outermost:
+                self.flush()
+
+    def flush_if_idle(self) -> int:
+        """Flush now unless a run() is collecting; returns rows written."""
+        return 0 if self.in_run else self.flush()
+
+    def window(self, now: Optional[datetime] = None):
+        """(start, end) of the trend window: the last window_days days through today (UTC)."""
+        now = now or datetime.utcnow()
+        end = datetime(now.year, now.month, now.day) + timedelta(days=1)
+        return end - timedelta(days=self.window_days), end
+
+    def flush(self) -> int:
+        """Count all pending pairs and upsert one row per location."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        window_start, window_end = self.window()
+        pairs = [(loc, cat) for loc, cats in pending.items() for cat in cats]
+        try:
+            counts = count_incidents_by_location_category(pairs, window_start, window_end)
+        except Exception as e:
+            logger.error("Failed to count region trends for %d pairs: %s", len(pairs), e)
+            return 0
+
+        rows = []
+        for loc, cats in pending.items():
+            named = sorted(c for c in cats if c)
+            incident_count = sum(counts.get((loc, c), 0) for c in named)
+            if None in cats:
+                # An uncategorised alert counts the location across all categories
+                incident_count = max(incident_count, counts.get((loc, None), 0))
+            rows.append({
+                "region": None,
+                "city": loc,
+                "window_start": window_start,
+                "window_end": window_end,
+                "incident_count": incident_count,
+                "categories": named,
+            })
+
+        written = save_region_trends_batch(rows)
+        logger.info("[REGION_TREND] Flushed %d locations (%d pairs)", written, len(pairs))
+        return written
+
+
+_instance: Optional[RegionTrendAggregator] = None
+_instance_lock = threading.Lock()
+
+
+def get_region_trend_aggregator() -> RegionTrendAggregator:
+    """Process-wide RegionTrendAggregator."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = RegionTrendAggregator()
+    return _instance
+
+
+__all__ = [
+    "TREND_WINDOW_DAYS",
+    "RegionTrendAggregator",
+    "get_region_trend_aggregator",
+]
@@ -1,7 +1,9 @@
 # rss_processor.py — Aggressive diagnostics, fetch, and ingest for production debugging
 # v2025-08-24 PATCHED+COUNTRY+NO-BACKOFF+MATCHER (2025-08-31) + FULL
-# - No backoff (ever)
-# - Optional per-host throttle (can be fully disabled via HOST_THROTTLE_ENABLED=false)
+# - Per-feed polling cadence: only feeds due by their learned publish frequency are fetched
+#   (services/feed_cadence.py; full_sweep / RSS_FULL_SWEEP=true fetches everything)
+# - Adaptive per-host fetch scheduling: concurrency caps, learned rates/timeouts, cooldown for dead hosts
+#   (services/fetch_scheduler.py; throttle disabled via HOST_THROTTLE_ENABLED=false)
 # - Postgres geocode cache
 # - Proper source_tag threading (local:city[, country] & country:country)
 # - City→Country defaults for common cities
@@ -13,7 +15,7 @@
 from __future__ import annotations
 import os, re, time, hashlib, contextlib, asyncio, json, sys, threading
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional, Iterable, Tuple
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Union
 from collections import defaultdict
 from urllib.parse import urlparse
 
@@ -30,14 +32,10 @@ except Exception:
 
 import feedparser
 import httpx
-try:
-    from langdetect import detect, DetectorFactory
-    DetectorFactory.seed = 42
-except Exception:
-    def detect(_: str) -> str:  # type: ignore
-        return "en"
-    class DetectorFactory:       # type: ignore
-        seed = 42
+from utils.lang_id import detect as detect_language
+# Precompiled single-pass cleaner; still importable from here as _clean_html_content
+from utils.html_cleaner import clean_html_content as _clean_html_content
+from utils.feed_parser import parse_feed as _parse_feed_fast
 
 try:
     from unidecode import unidecode
@@ -48,6 +46,10 @@ except Exception as e:
 
 # Core imports for timer-based batch processing
 from utils.batch_state_manager import get_batch_state_manager, reset_batch_state_manager
+from services.feed_health import get_feed_health_buffer
+from services.fetch_scheduler import FetchScheduler
+from services.feed_cadence import get_feed_cadence
+from services.fulltext_extractor import fetch_capped, get_fulltext_extractor
 
 # Metrics integration for performance monitoring
 try:
@@ -176,14 +178,13 @@ def _normalize(s: str) -> str:
 # -----------------------------------------------------------------------------
 
 # ---------------------------- spaCy NER Setup -------------------------
+# NER lives in services.location_ner (trimmed pipeline, loaded once per process
+# on first use); don't load the full en_core_web_sm model at import here.
 try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-    logger.info("[NER] spaCy model loaded successfully")
-    SPACY_AVAILABLE = True
+    import importlib.util as _ilu
+    SPACY_AVAILABLE = _ilu.find_spec("spacy") is not None
 except Exception as e:
     logger.warning("[NER] spaCy not available: %s - falling back to keywords/LLM", e)
-    nlp = None
     SPACY_AVAILABLE = False
 
 # ---------------------------- Location Keywords Setup -------------------------
@@ -358,13 +359,14 @@ GEOCODE_ENABLED = config.geocode_enabled
 
 # Standardized database access - using db_utils.py only
 try:
-    from utils.db_utils import save_raw_alerts_to_db, fetch_one, execute
+    from utils.db_utils import save_raw_alerts_to_db, fetch_one, execute, existing_raw_alert_uuids
     logger.info("Database utilities loaded successfully from db_utils.py")
 except Exception as e:
     logger.error("db_utils import failed: %s", e)
     save_raw_alerts_to_db = None
     fetch_one = None
     execute = None
+    existing_raw_alert_uuids = None
 
 try:
     from utils.city_utils import get_city_coords as _cu_get_city_coords
@@ -603,12 +605,19 @@ DEFAULT_TIMEOUT        = config.timeout_sec
 MAX_CONCURRENCY        = config.max_concurrency
 BATCH_LIMIT            = config.batch_limit
 
-# Per-host throttle (NOT backoff). Can be disabled completely.
+# Per-host fetch scheduling (services/fetch_scheduler.py). The rate is the starting point;
+# it is learned per host from latency and 429/5xx responses within [MIN, MAX].
 HOST_RATE_PER_SEC      = getattr(config, 'host_rate_per_sec', float(os.getenv("RSS_HOST_RATE_PER_SEC", "0.5")))
 HOST_BURST             = getattr(config, 'host_burst', int(os.getenv("RSS_HOST_BURST", "2")))
 HOST_THROTTLE_ENABLED  = config.host_throttle_enabled
-
-# Backoff knobs left for schema compatibility only (unused)
+HOST_MAX_CONCURRENCY   = int(os.getenv("RSS_HOST_MAX_CONCURRENCY", "2"))
+HOST_MAX_RATE_PER_SEC  = float(os.getenv("RSS_HOST_MAX_RATE_PER_SEC", "2.0"))
+HOST_MIN_RATE_PER_SEC  = float(os.getenv("RSS_HOST_MIN_RATE_PER_SEC", "0.05"))
+HOST_SLOW_MS           = float(os.getenv("RSS_HOST_SLOW_MS", "5000"))
+HOST_MIN_TIMEOUT       = float(os.getenv("RSS_HOST_MIN_TIMEOUT", "5"))
+HOST_BACKOFF_ENABLED   = os.getenv("RSS_HOST_BACKOFF_ENABLED", "true").lower() in ("1", "true", "yes", "y")
+
+# Host cooldown after FAILURE_THRESHOLD consecutive timeouts/5xx (doubles per further failure)
 BACKOFF_BASE_MIN       = int(os.getenv("RSS_BACKOFF_BASE_MIN", "15"))
 BACKOFF_MAX_MIN        = int(os.getenv("RSS_BACKOFF_MAX_MIN", "180"))
 FAILURE_THRESHOLD      = int(os.getenv("RSS_BACKOFF_FAILS", "3"))
@@ -617,6 +626,9 @@ FRESHNESS_DAYS         = getattr(config, 'freshness_days', int(os.getenv("RSS_FR
 
 RSS_FILTER_STRICT      = getattr(config, 'filter_strict', True)
 
+# Streaming parser for plain RSS/Atom; anything it can't map exactly goes to feedparser
+RSS_FAST_PARSER        = str(os.getenv("RSS_FAST_PARSER", "true")).lower() in ("1","true","yes","y")
+
 RSS_USE_FULLTEXT       = getattr(config, 'use_fulltext', str(os.getenv("RSS_USE_FULLTEXT", "true")).lower() in ("1","true","yes","y"))
 ARTICLE_TIMEOUT_SEC    = getattr(config, 'fulltext_timeout', float(os.getenv("RSS_FULLTEXT_TIMEOUT_SEC", "12")))
 ARTICLE_MAX_BYTES      = getattr(config, 'fulltext_max_bytes', int(os.getenv("RSS_FULLTEXT_MAX_BYTES", "800000")))
@@ -812,6 +824,14 @@ except Exception:
 ALL_FEEDS_PRIORITY = 10  # All feeds equal - let filters determine quality
 KIND_PRIORITY = {"global": ALL_FEEDS_PRIORITY, "native": ALL_FEEDS_PRIORITY, "env": ALL_FEEDS_PRIORITY, "fallback": ALL_FEEDS_PRIORITY, "unknown": 999}
 
+# Within equal KIND_PRIORITY: city feeds, then country feeds, then the rest
+_TAG_PRIORITY = (("local:", 0), ("country:", 1))
+
+def _spec_priority(spec: Dict[str, Any]) -> Tuple[int, int]:
+    tag = spec.get("tag") or ""
+    tag_rank = next((rank for prefix, rank in _TAG_PRIORITY if tag.startswith(prefix)), 2)
+    return KIND_PRIORITY.get(spec.get("kind", "unknown"), 999), tag_rank
+
 def _wrap_spec(url: str, priority: int, kind: str, tag: str = "") -> Dict[str, Any]:
     return {"url": url.strip(), "priority": priority, "kind": kind, "tag": tag}
 
@@ -874,8 +894,7 @@ def _uuid_for(source: str, title: str, link: str) -> str:
 def _safe_lang(text: str, default: str = "en") -> str:
     t = (text or "").strip()
     if not t: return default
-    try: return detect(t[:1000]) or default
-    except Exception: return default
+    return detect_language(t, default=default)
 
 def _first_sentence(text: str) -> str:
     t = (text or "").strip()
@@ -887,66 +906,6 @@ def _first_sentence(text: str) -> str:
 def _normalize_summary(title: str, summary: str) -> str:
     return summary.strip() if summary and len(summary) >= 20 else (title or "").strip()
 
-def _clean_html_content(text: str) -> str:
-    """
-    Clean HTML tags, entities, and unwanted content from RSS text.
-    
-    Args:
-        text: Raw HTML/RSS content
-        
-    Returns:
-        Clean, readable text suitable for frontend display
-    """
-    if not text:
-        return ""
-    
-    import html
-    import re
-    
-    # Decode HTML entities first (&#8211; → –, &nbsp; → space, etc.)
-    text = html.unescape(text)
-    
-    # Remove HTML tags but preserve spacing
-    text = re.sub(r'<[^>]+>', ' ', text)
-    
-    # Remove common RSS footer patterns
-    patterns_to_remove = [
-        r'The post.*?appeared first on.*?\.',
-        r'\[&#?8230;?\]',  # [...] truncation markers
-        r'\[…\]',
-        r'\[\.\.\.\]',
-        r'<a\s+href[^>]*>.*?</a>',  # Any remaining link tags
-        r'Continue reading.*',
-        r'Read more.*',
-        r'Full article.*',
-    ]
-    
-    for pattern in patterns_to_remove:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
-    
-    # Clean up excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove leading/trailing whitespace and common prefixes
-    text = text.strip()
-    
-    # Remove empty parentheses or brackets that might be left
-    text = re.sub(r'\(\s*\)', '', text)
-    text = re.sub(r'\[\s*\]', '', text)
-    
-    # Ensure the text ends properly (not with incomplete sentences)
-    if text and not text[-1] in '.!?':
-        # Try to find the last complete sentence
-        last_sentence_end = max(
-            text.rfind('.'),
-            text.rfind('!'), 
-            text.rfind('?')
-        )
-        if last_sentence_end > len(text) * 0.5:  # Only truncate if we keep most of the content
-            text = text[:last_sentence_end + 1]
-    
-    return text.strip()
-
 def _extract_source(url: str) -> str:
     try: return re.sub(r"^www\.", "", urlparse(url).netloc)
     except Exception: return "unknown"
@@ -983,99 +942,46 @@ def _db_execute(q: str, args: tuple) -> None:
     except Exception as e:
         logger.warning(f"[DB] Database execute failed for query '{q}': {e}")
 
-# ------------- NO BACKOFF, EVER --------------
+# ------------- Per-host scheduling --------------
+FETCH_SCHEDULER = FetchScheduler(
+    base_rate=HOST_RATE_PER_SEC,
+    burst=HOST_BURST,
+    max_per_host=HOST_MAX_CONCURRENCY,
+    max_rate=HOST_MAX_RATE_PER_SEC,
+    min_rate=HOST_MIN_RATE_PER_SEC,
+    slow_ms=HOST_SLOW_MS,
+    default_timeout=DEFAULT_TIMEOUT,
+    min_timeout=HOST_MIN_TIMEOUT,
+    failure_threshold=FAILURE_THRESHOLD,
+    backoff_base_s=BACKOFF_BASE_MIN * 60,
+    backoff_max_s=BACKOFF_MAX_MIN * 60,
+    throttle_enabled=HOST_THROTTLE_ENABLED,
+    backoff_enabled=HOST_BACKOFF_ENABLED,
+)
+
+def _load_host_schedule() -> List[Dict[str, Any]]:
+    """Stored host latency/cooldowns to seed FETCH_SCHEDULER with (blocking)."""
+    try:
+        from utils.db_utils import fetch_host_schedule
+        return fetch_host_schedule()
+    except Exception as e:
+        logger.warning(f"[fetch_scheduler] host state load failed, starting fresh: {e}")
+        return []
+
 def _should_skip_by_backoff(url: str) -> bool:
-    return False
+    return FETCH_SCHEDULER.should_skip(_host(url))
 
 def _record_health(url: str, ok: bool, latency_ms: float, error: Optional[str] = None):
-    host = _host(url)
-    if ok:
-        _db_execute("""
-        INSERT INTO feed_health (feed_url, host, last_status, last_error, last_ok, last_checked, ok_count, avg_latency_ms, consecutive_fail, backoff_until)
-        VALUES (%s,%s,'ok',NULL,NOW(),NOW(),1,%s,0,NULL)
-        ON CONFLICT (feed_url) DO UPDATE SET
-          last_status='ok',
-          last_error=NULL,
-          last_ok=NOW(),
-          last_checked=NOW(),
-          ok_count=feed_health.ok_count+1,
-          consecutive_fail=0,
-          avg_latency_ms = CASE WHEN feed_health.ok_count=0 THEN EXCLUDED.avg_latency_ms
-                                ELSE (feed_health.avg_latency_ms*feed_health.ok_count + EXCLUDED.avg_latency_ms) / (feed_health.ok_count+1)
-                           END,
-          host=EXCLUDED.host
-        """, (url, host, float(latency_ms)))
-    else:
-        _db_execute("""
-        INSERT INTO feed_health (feed_url, host, last_status, last_error, last_checked, error_count, consecutive_fail)
-        VALUES (%s,%s,'error',%s,NOW(),1,1)
-        ON CONFLICT (feed_url) DO UPDATE SET
-          last_status='error',
-          last_error=EXCLUDED.last_error,
-          last_checked=NOW(),
-          error_count=feed_health.error_count+1,
-          consecutive_fail=feed_health.consecutive_fail+1,
-          host=EXCLUDED.host
-        """, (url, host, (error or "")[:240]))
-        _db_execute("""UPDATE feed_health SET backoff_until=NULL WHERE feed_url=%s""", (url,))
-
-class TokenBucket:
-    def __init__(self, rate_per_sec: float, burst: int):
-        self.rate = max(rate_per_sec, 0.0001)
-        self.capacity = max(burst, 1)
-        self.tokens = float(self.capacity)
-        self.updated = _now_utc().timestamp()
-    
-    async def acquire(self):
-        if not HOST_THROTTLE_ENABLED:
-            return
-        now = _now_utc().timestamp()
-        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
-        self.updated = now
-        if self.tokens < 1.0:
-            await asyncio.sleep((1.0 - self.tokens) / self.rate)
-            self.tokens = 0.0
-        self.tokens -= 1.0
-
-HOST_BUCKETS: Dict[str, TokenBucket] = {}
-def _bucket_for(url: str) -> TokenBucket:
-    host = _host(url)
-    if host not in HOST_BUCKETS:
-        HOST_BUCKETS[host] = TokenBucket(HOST_RATE_PER_SEC, HOST_BURST)
-    return HOST_BUCKETS[host]
-
-def _strip_html_basic(html: str) -> str:
-    text = re.sub(r"(?is)<script.*?>.*?</script>", " ", html)
-    text = re.sub(r"(?is)<style.*?>.*?</style>", " ", text)
-    text = re.sub(r"(?is)<[^>]+>", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    # Buffered; ingest_feeds flushes feed_health once per run (services/feed_health.py)
+    get_feed_health_buffer().record(url, _host(url), ok, latency_ms, error)
 
 async def _fetch_article_fulltext(client: httpx.AsyncClient, url: str) -> str:
     if not RSS_USE_FULLTEXT or not url:
         return ""
     try:
-        r = await client.get(url, timeout=ARTICLE_TIMEOUT_SEC)
-        r.raise_for_status()
-        html = r.text
-        if len(html) > ARTICLE_MAX_BYTES:
-            html = html[:ARTICLE_MAX_BYTES]
-        try:
-            import trafilatura
-            extracted = trafilatura.extract(html, include_comments=False, favor_recall=True) or ""
-            if extracted:
-                return extracted[:ARTICLE_MAX_CHARS]
-        except Exception:
-            pass
-        try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, "lxml")
-            for tag in soup(["script","style","noscript"]): tag.decompose()
-            txt = soup.get_text(separator=" ", strip=True)
-            return txt[:ARTICLE_MAX_CHARS]
-        except Exception:
-            pass
-        return _strip_html_basic(html)[:ARTICLE_MAX_CHARS]
+        # Streamed up to ARTICLE_MAX_BYTES; parsing runs in the extraction pool (services/fulltext_extractor.py)
+        raw, charset = await fetch_capped(client, url, ARTICLE_MAX_BYTES, ARTICLE_TIMEOUT_SEC)
+        return await get_fulltext_extractor().extract(raw, charset, ARTICLE_MAX_CHARS)
     except Exception as e:
         logger.debug("Fulltext fetch failed for %s: %s", url, e)
         return ""
@@ -1091,11 +997,26 @@ def _dedupe_batch(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         out.append(it)
     return out
 
-def _extract_entries(feed_text: str, feed_url: str) -> Tuple[List[Dict[str, Any]], str]:
-    fp = feedparser.parse(feed_text)
+_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([^\"';\s]+)", re.IGNORECASE)
+
+def _extract_entries(feed_text: Union[bytes, str], feed_url: str,
+                     content_type: str = "") -> Tuple[List[Dict[str, Any]], str]:
+    # Raw bytes keep the HTTP charset only through content_type (e.g. cp1251 feeds
+    # declaring no encoding); parse_feed defers to feedparser when the two disagree
+    charset_m = _CHARSET_RE.search(content_type or "")
+    charset = charset_m.group(1) if charset_m else None
+    parsed = (_parse_feed_fast(feed_text, charset=charset)
+              if RSS_FAST_PARSER and isinstance(feed_text, bytes) else None)
+    if parsed is not None:
+        source_url, raw_entries = parsed
+        metrics.increment("rss.parser.fast", 1)
+    else:
+        fp = feedparser.parse(feed_text, response_headers={"content-type": content_type or ""})
+        source_url = fp.feed.get("link") if fp and fp.feed else feed_url
+        raw_entries = fp.entries or []
+        metrics.increment("rss.parser.feedparser", 1)
     entries = []
-    source_url = fp.feed.get("link") if fp and fp.feed else feed_url
-    for e in fp.entries or []:
+    for e in raw_entries:
         # Clean HTML content for frontend display
         raw_title = (e.get("title") or "").strip()
         raw_summary = (e.get("summary") or e.get("description") or "").strip()
@@ -1105,6 +1026,8 @@ def _extract_entries(feed_text: str, feed_url: str) -> Tuple[List[Dict[str, Any]
             "summary": _clean_html_content(raw_summary),
             "link": (e.get("link") or feed_url or "").strip(),
             "published": _parse_published(e),
+            # False when published is the fetch time stand-in; feed_cadence ignores those
+            "dated": bool(e.get("published_parsed") or e.get("updated_parsed")),
         })
     return entries, (source_url or feed_url)
 
@@ -1624,15 +1547,66 @@ def _is_denylisted(text: str) -> Optional[str]:
             return token
     return None
 
+class _SeenUuids:
+    """
+    Run-local record of which alert uuids are already known.
+
+    ingest_feeds prefetches every entry uuid of a feed with one
+    `uuid = ANY(...)` query in a worker thread, so _build_alert_from_entry
+    no longer blocks the event loop on a SELECT per entry. A uuid is also
+    claimed once per run, so the same story syndicated by two feeds is
+    built only once.
+    """
+
+    def __init__(self):
+        self._existing: set = set()
+        self._checked: set = set()
+        self._claimed: set = set()
+
+    async def prefetch(self, uuids: Iterable[str]) -> None:
+        pending = [u for u in dict.fromkeys(uuids) if u and u not in self._checked]
+        if not pending or not existing_raw_alert_uuids:
+            return
+        try:
+            found = await asyncio.to_thread(existing_raw_alert_uuids, pending)
+        except Exception as e:
+            # Unchecked uuids fall back to ON CONFLICT in save_raw_alerts_to_db
+            logger.warning("Duplicate prefetch failed (%d uuids): %s", len(pending), e)
+            return
+        self._existing.update(found)
+        self._checked.update(pending)
+
+    def is_checked(self, uuid: str) -> bool:
+        return uuid in self._checked
+
+    def is_new(self, uuid: str) -> bool:
+        """True unless uuid is already stored (unchecked uuids count as new)."""
+        return uuid not in self._existing
+
+    def claim(self, uuid: str) -> bool:
+        """True if uuid is new to the DB and to this run; marks it seen."""
+        if uuid in self._existing or uuid in self._claimed:
+            return False
+        self._claimed.add(uuid)
+        return True
+
+def _entry_uuid(entry: Dict[str, Any], source_url: str) -> str:
+    link = entry.get("link", "")
+    return _uuid_for(_extract_source(source_url or link), entry.get("title", ""), link)
+
 async def _build_alert_from_entry(
     entry: Dict[str, Any],
     source_url: str,
     client: httpx.AsyncClient,
     source_tag: Optional[str] = None,
-    batch_mode: bool = False
+    batch_mode: bool = False,
+    seen: Optional[_SeenUuids] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Build alert from RSS entry with integrated batch processing.
+
+    seen: run-local _SeenUuids from ingest_feeds; without it the entry's
+    uuid is checked on its own (still off the event loop).
     """
     start_time = time.time()
     _diag_inc('entries_seen', 1)
@@ -1650,42 +1624,28 @@ async def _build_alert_from_entry(
         source = _extract_source(source_url or link)
         uuid = _uuid_for(source, title, link)
         
-        # Check for duplicate
-        try:
-            if fetch_one:
-                exists = fetch_one("SELECT 1 FROM raw_alerts WHERE uuid=%s", (uuid,))
-                if exists:
-                    _diag_inc('skip_duplicate', 1)
-                    if os.getenv("RSS_DEBUG", "false").strip().lower() in ("1","true","yes","y"):
-                        logger.info(f"[RSS_DEBUG] skip: duplicate uuid={uuid} title='{title[:120]}'")
-                    return None
-        except Exception:
-            pass
+        # Check for duplicate (batched per feed when ingest_feeds passes `seen`)
+        if seen is None:
+            seen = _SeenUuids()
+        if not seen.is_checked(uuid):
+            await seen.prefetch([uuid])
+        if not seen.claim(uuid):
+            _diag_inc('skip_duplicate', 1)
+            if os.getenv("RSS_DEBUG", "false").strip().lower() in ("1","true","yes","y"):
+                logger.info(f"[RSS_DEBUG] skip: duplicate uuid={uuid} title='{title[:120]}'")
+            return None
         
-        # Language detection + gating
+        # Language detection + gating (deterministic, memoized; see utils/lang_id.py)
         text_blob = f"{title}\n{summary}"
-        try:
-            language = detect(text_blob[:500]) if text_blob.strip() else "en"
-        except Exception:
-            language = "en"
+        language = detect_language(text_blob)
         
         # Language filter: Only skip if EXPLICITLY set to filter AND detected language is NOT in allowed list
         # If RSS_ALLOWED_LANGS is empty/not set, allow all languages (permissive default)
-        #
-        # NOTE: langdetect is unreliable for short English text with foreign names (e.g., "Hezbollah" -> Danish)
-        # When "en" is in allowed langs, we also allow commonly misdetected European languages
-        # to avoid false filtering of English content. Use script-based detection in threat_scorer for accuracy.
         allowed_langs_env = os.getenv("RSS_ALLOWED_LANGS", "").strip()
         _rss_debug = os.getenv("RSS_DEBUG", "false").strip().lower() in ("1","true","yes","y")
         if allowed_langs_env:
-            allowed_langs = [l.strip().lower() for l in allowed_langs_env.split(",") if l.strip()]
-            
-            # If "en" is allowed, also allow commonly misdetected European languages
-            # langdetect often mistakes short English security text for: da (Danish), no (Norwegian), 
-            # nl (Dutch), sv (Swedish), de (German), fr (French), it (Italian), es (Spanish), pt (Portuguese)
-            if "en" in allowed_langs:
-                misdetected_as_english = {"da", "no", "nl", "sv", "de", "fr", "it", "es", "pt", "ca", "ro", "af", "cy"}
-                allowed_langs = list(set(allowed_langs) | misdetected_as_english)
+            # Region suffixes are ignored ("zh-cn" allows "zh")
+            allowed_langs = [l.strip().lower().split("-")[0] for l in allowed_langs_env.split(",") if l.strip()]
             
             if allowed_langs and language.lower() not in allowed_langs:
                 if _rss_debug:
@@ -1741,15 +1701,15 @@ async def _build_alert_from_entry(
                     metrics.timing("location_extraction", int((time.time() - location_start_time) * 1000), method="batch_queue")
                 else:
                     # Fallback if queueing failed
-                    location_data = _extract_location_fallback(text_blob, source_tag)
+                    location_data = await asyncio.to_thread(_extract_location_fallback, text_blob, source_tag)
                     metrics.timing("location_extraction", int((time.time() - location_start_time) * 1000), method="fallback")
             else:
                 # Direct processing (not in batch mode)
-                location_data = _extract_location_fallback(text_blob, source_tag)
+                location_data = await asyncio.to_thread(_extract_location_fallback, text_blob, source_tag)
                 metrics.timing("location_extraction", int((time.time() - location_start_time) * 1000), method="direct")
         else:
             # Use deterministic location extraction
-            location_data = _extract_location_fallback(text_blob, source_tag)
+            location_data = await asyncio.to_thread(_extract_location_fallback, text_blob, source_tag)
             metrics.timing("location_extraction", int((time.time() - location_start_time) * 1000), method="deterministic")
         
         # Build final alert
@@ -1818,6 +1778,11 @@ async def ingest_feeds(feed_specs: List[Dict[str, Any]], limit: int = BATCH_LIMI
         metrics.increment("feed_processing.no_feed_specs", 1)
         return []
     results_alerts: List[Dict[str, Any]] = []
+    feed_health = get_feed_health_buffer()
+    feed_health.start_run()
+    # Cron runs are fresh processes: carry cooldowns and latency over via feed_health
+    FETCH_SCHEDULER.begin_run(seed=await asyncio.to_thread(_load_host_schedule))
+    cadence = get_feed_cadence()
     limits = httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY)
     async with httpx.AsyncClient(follow_redirects=True, limits=limits) as client:
         
@@ -1850,34 +1815,61 @@ async def ingest_feeds(feed_specs: List[Dict[str, Any]], limit: int = BATCH_LIMI
         batch_state.set_flush_callback(batch_callback)
         logger.info(f"Configured optimized batch processing: {_BATCH_SIZE_THRESHOLD} items or {_BATCH_TIMEOUT_SECONDS}s timeout")
         
-        async def _fetch_feed(spec):
-            logger.info("Fetching feed: %s", spec["url"])
-            await _bucket_for(spec["url"]).acquire()
-            start = time.perf_counter()
-            try:
-                r = await client.get(spec["url"], timeout=DEFAULT_TIMEOUT)
-                r.raise_for_status()
-                txt = r.text
-                logger.info("Fetched feed OK: %s", spec["url"])
-                _record_health(spec["url"], ok=True, latency_ms=(time.perf_counter()-start)*1000.0)
-                return txt, spec
-            except Exception as e:
-                logger.error("Feed fetch failed for %s: %r", spec["url"], e)
-                _record_health(spec["url"], ok=False, latency_ms=(time.perf_counter()-start)*1000.0, error=str(e))
-                return None, spec
+        # Fetch slots are handed out in priority order; hosts additionally cap their own concurrency
+        fetch_sem = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
 
-        feed_results = await asyncio.gather(*[_fetch_feed(s) for s in feed_specs], return_exceptions=False)
+        async def _fetch_feed(spec):
+            host = _host(spec["url"])
+            if FETCH_SCHEDULER.should_skip(host):
+                logger.info("Skipping feed (host cooling down): %s", spec["url"])
+                _diag_inc('skip_host_backoff', 1)
+                return None, "", spec
+            async with FETCH_SCHEDULER.slot(host), fetch_sem:
+                logger.info("Fetching feed: %s", spec["url"])
+                start = time.perf_counter()
+                r = None
+                try:
+                    r = await client.get(spec["url"], timeout=FETCH_SCHEDULER.timeout_for(host))
+                    latency_ms = (time.perf_counter()-start)*1000.0
+                    FETCH_SCHEDULER.record(host, latency_ms, status=r.status_code,
+                                           retry_after=r.headers.get("Retry-After"))
+                    r.raise_for_status()
+                    txt = r.content
+                    logger.info("Fetched feed OK: %s", spec["url"])
+                    _record_health(spec["url"], ok=True, latency_ms=latency_ms)
+                    return txt, r.headers.get("content-type", ""), spec
+                except Exception as e:
+                    latency_ms = (time.perf_counter()-start)*1000.0
+                    if r is None:
+                        FETCH_SCHEDULER.record(host, latency_ms, status=None)
+                    logger.error("Feed fetch failed for %s: %r", spec["url"], e)
+                    _record_health(spec["url"], ok=False, latency_ms=latency_ms, error=str(e))
+                    return None, "", spec
+
+        ordered_specs = FETCH_SCHEDULER.order(feed_specs, _spec_priority, _host)
+        feed_results = await asyncio.gather(*[_fetch_feed(s) for s in ordered_specs], return_exceptions=False)
 
         sem = asyncio.Semaphore(max(1, ARTICLE_CONCURRENCY))
+        seen = _SeenUuids()
         async def _process_entry(entry, source_url, source_tag):
             async with sem:
-                return await _build_alert_from_entry(entry, source_url, client, source_tag, batch_mode=True)
+                return await _build_alert_from_entry(entry, source_url, client, source_tag, batch_mode=True, seen=seen)
 
-        for txt, spec in feed_results:
+        for txt, content_type, spec in feed_results:
             if not txt:
+                cadence.mark_failed(spec["url"])
                 continue
-            entries, source_url = _extract_entries(txt, spec["url"])
+            entries, source_url = _extract_entries(txt, spec["url"], content_type)
             tag = spec.get("tag", "")
+            # One existence query per feed instead of one per entry
+            uuids = [_entry_uuid(e, source_url) for e in entries]
+            await seen.prefetch(uuids)
+            # Undated entries have no publish time; detect new ones by uuid instead
+            cadence.observe(
+                spec["url"],
+                [e["published"] for e in entries if e.get("dated")],
+                undated_new=sum(1 for e, u in zip(entries, uuids) if not e.get("dated") and seen.is_new(u)),
+            )
             tasks = [asyncio.create_task(_process_entry(e, source_url, tag)) for e in entries]
             for coro in asyncio.as_completed(tasks):
                 res = await coro
@@ -1943,6 +1935,21 @@ async def ingest_feeds(feed_specs: List[Dict[str, Any]], limit: int = BATCH_LIMI
 
     logger.info("Total processed alerts: %d (with %d batch results applied)", len(results_alerts), len(batch_results))
     
+    # One bulk feed_health upsert for the whole run
+    try:
+        await asyncio.to_thread(feed_health.flush)
+    except Exception as e:
+        logger.warning(f"[feed_health] flush failed: {e}")
+    try:
+        await asyncio.to_thread(cadence.flush)
+    except Exception as e:
+        logger.warning(f"[feed_cadence] flush failed: {e}")
+    # After feed_health, whose upsert would otherwise overwrite the host latency
+    try:
+        await asyncio.to_thread(FETCH_SCHEDULER.flush)
+    except Exception as e:
+        logger.warning(f"[fetch_scheduler] flush failed: {e}")
+
     # Record metrics (wrapped to avoid crashes)
     try:
         processing_time = time.time() - start_time
@@ -1958,6 +1965,9 @@ def _passes_keyword_filter(text: str) -> tuple[bool, dict]:
     """
     Deterministic keyword filter with whole-word matching; no permissive fallback.
     Returns (passes: bool, match_info: dict with quality metrics)
+
+    Base + translated keywords are matched in one pass by the compiled
+    filter in utils/keyword_matcher.py.
     """
     if not text:
         return False, {}
@@ -1965,75 +1975,11 @@ def _passes_keyword_filter(text: str) -> tuple[bool, dict]:
     matched: Optional[str] = None
     match_type: Optional[str] = None
     
-    # Use word boundary regex for accurate matching
-    import re
-    
-    # FBI high-value keywords for filtering press releases
-    FBI_HIGH_VALUE_KEYWORDS = [
-        "extremist", "terrorist", "terrorism", "extremist network",
-        "laser incident", "airport", "critical infrastructure",
-        "human trafficking", "child exploitation", "violent gang",
-        "ransomware", "cyberattack", "data breach", "crypto scam",
-        "bribery", "insider threat", "corruption",
-        "active shooter", "mass casualty", "bomb threat",
-        "north korea", "iran", "china", "russia", "foreign intelligence",
-        "organized crime", "cartel", "drug trafficking ring",
-        "national guard", "soldier", "military personnel", "service member",
-        "attack on", "killed", "wounded", "shooting", "stabbing",
-        "federal agent", "fbi agent", "police officer", "law enforcement",
-        "military facility", "government building", "federal building"
-    ]
-    
     try:
-        # Use base keywords from JSON ONLY (most selective for RSS filtering)
-        from utils.keywords_loader import KEYWORD_DATA
-        
-        # Get base keywords from threat_keywords.json
-        base_keywords = KEYWORD_DATA.get("keywords", [])
-        
-        # Get translated keywords (all languages)
-        translated = KEYWORD_DATA.get("translated", {})
-        translated_keywords = []
-        for category_translations in translated.values():
-            for lang_terms in category_translations.values():
-                translated_keywords.extend(lang_terms)
-        
-        # Combine: base + translated only
-        all_keywords = set(base_keywords + translated_keywords)
-        
-        # Track match quality
-        for kw in all_keywords:
-            k = kw.lower()
-            if not k:
-                continue
-            # Use word boundaries for multi-word phrases and single words
-            # This prevents "ot" from matching "shooting" or "cardinals"
-            pattern = r'\b' + re.escape(k) + r'\b'
-            if re.search(pattern, text_lower):
-                matched = kw
-                # Determine match type for quality scoring
-                if kw in base_keywords:
-                    match_type = "base"  # Direct base keyword match (highest quality)
-                else:
-                    match_type = "translated"  # Translated keyword match
-                
-                # For FBI sources, apply high-value filter to reduce noise
-                # FBI press releases are verbose; we only want critical incidents
-                if "fbi.gov" in text_lower or "sentenced to" in text_lower:
-                    # Check if this matches FBI high-value criteria
-                    is_high_value = any(
-                        hv_kw in text_lower for hv_kw in FBI_HIGH_VALUE_KEYWORDS
-                    )
-                    # Exclude routine sentencing unless high-value case
-                    if "sentenced to" in text_lower and not is_high_value:
-                        # Skip routine sentencing press releases
-                        continue
-                    # Exclude batch immigration charges (weekly routine)
-                    if "charges" in text_lower and "individuals" in text_lower and "immigration" in text_lower:
-                        # Skip "District of Arizona charges 180 individuals for immigration"
-                        continue
-                
-                break
+        from utils.keyword_matcher import get_keyword_filter
+        hit = get_keyword_filter().match(text_lower)
+        if hit:
+            matched, match_type = hit
     except Exception as e:
         logger.debug(f"Keyword loader failed: {e}")
         # Load static threat keywords file
@@ -2283,7 +2229,8 @@ def _map_country_to_region(country: str) -> Optional[str]:
 async def ingest_all_feeds_to_db(
     group_names: Optional[Iterable[str]] = None,
     limit: int = BATCH_LIMIT,
-    write_to_db: bool = True
+    write_to_db: bool = True,
+    full_sweep: bool = False
 ) -> Dict[str, Any]:
     """
     Main entry point for RSS processing called by main.py.
@@ -2292,6 +2239,7 @@ async def ingest_all_feeds_to_db(
         group_names: Optional list of feed group names to process (currently unused)
         limit: Maximum number of alerts to process
         write_to_db: Whether to write results to database
+        full_sweep: Fetch every feed, not only those due by their polling cadence
     
     Returns:
         Dict with processing statistics and results
@@ -2302,9 +2250,12 @@ async def ingest_all_feeds_to_db(
     start_time = time.time()  # Add timing for the entire operation
     
     try:
-        # Get all feed specifications
-        feed_specs = _coalesce_all_feed_specs(group_names)
-        logger.info(f"Processing {len(feed_specs)} feed specifications")
+        # Get all feed specifications; fetch only those due by their publish cadence
+        all_specs = _coalesce_all_feed_specs(group_names)
+        cadence = get_feed_cadence()
+        await asyncio.to_thread(cadence.load)
+        feed_specs, deferred = cadence.due(all_specs, priority=_spec_priority, full_sweep=full_sweep)
+        logger.info(f"Processing {len(feed_specs)} of {len(all_specs)} feed specifications ({deferred} not due)")
         _diag_inc('feeds_processed', len(feed_specs))
         
         # Process feeds using the main ingest function
@@ -2313,6 +2264,8 @@ async def ingest_all_feeds_to_db(
         result = {
             "alerts_processed": len(alerts),
             "feeds_processed": len(feed_specs),
+            "feeds_total": len(all_specs),
+            "feeds_deferred": deferred,
             "written_to_db": 0,
             "batch_stats": {}
         }
@@ -2368,12 +2321,14 @@ async def ingest_all_feeds_to_db(
                         skip_duplicate INT
                     )
                 """)
+                execute("ALTER TABLE rss_ingest_diag ADD COLUMN IF NOT EXISTS host_latency JSONB")
                 execute(
                     """
                     INSERT INTO rss_ingest_diag (
                         feeds_processed, entries_seen, alerts_built,
-                        skip_language, skip_keywords, skip_denylist, skip_duplicate
-                    ) VALUES (%s,%s,%s,%s,%s,%s,%s)
+                        skip_language, skip_keywords, skip_denylist, skip_duplicate,
+                        host_latency
+                    ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
                     """,
                     (
                         _RSS_DIAG.get('feeds_processed', 0),
@@ -2383,6 +2338,7 @@ async def ingest_all_feeds_to_db(
                         _RSS_DIAG.get('skip_keywords', 0),
                         _RSS_DIAG.get('skip_denylist', 0),
                         _RSS_DIAG.get('skip_duplicate', 0),
+                        json.dumps(get_feed_health_buffer().host_summary()),
                     )
                 )
         except Exception as e:
@@ -15,6 +15,7 @@ import fcntl
 import tempfile
 from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
 
 import numpy as np
 import pycountry
@@ -90,6 +91,8 @@ from utils.db_utils import (
     save_region_trend,
 )
 
+from services.region_trends import get_region_trend_aggregator
+
 from services.threat_scorer import (
     assess_threat_level,
     compute_trend_direction,
@@ -413,7 +416,7 @@ def compute_confidence(
 # Logging already configured in imports
 
 # New: simple per-run counters for model usage & a safe bucket state
-_model_usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "moonshot": 0, "none": 0}
+_model_usage_counts = {"deepseek": 0, "openai": 0, "grok": 0, "moonshot": 0, "none": 0, "cache": 0}
 _bucket_daily_counts = {}  # prevents earlier NameError if referenced by external utils
 
 def json_default(obj):
@@ -490,6 +493,7 @@ XAI_MODEL = os.getenv("XAI_MODEL", "grok-3-mini")  # hint for your xai client; n
 
 # Configuration for enrichment pipeline
 USE_MODULAR_ENRICHMENT = os.getenv("USE_MODULAR_ENRICHMENT", "true").lower() == "true"
+ENRICHMENT_BATCH_SIZE = int(os.getenv("ENRICHMENT_BATCH_SIZE", "16"))  # alerts per modular pipeline batch
 
 if RAILWAY_ENV:
     logger.info("environment_check", railway_env=RAILWAY_ENV)
@@ -517,12 +521,17 @@ if openai_client is None and ENABLE_SEMANTIC_DEDUP:
 
 # New modular enrichment system
 try:
-    from services.enrichment_stages import get_enrichment_pipeline, enrich_single_alert as modular_enrich_alert
+    from services.enrichment_stages import (
+        get_enrichment_pipeline,
+        enrich_single_alert as modular_enrich_alert,
+        enrich_alerts_batch as modular_enrich_batch,
+    )
     MODULAR_ENRICHMENT_AVAILABLE = True
 except ImportError as e:
     logger.warning("modular_enrichment_unavailable", error=str(e))
     MODULAR_ENRICHMENT_AVAILABLE = False
     modular_enrich_alert = None
+    modular_enrich_batch = None
 
 # ---------- Static Data ----------
 CATEGORIES = [
@@ -1253,24 +1262,54 @@ def summarize_single_alert(alert: dict) -> dict:
     alert["cluster_id"] = alert.get("cluster_id") or alert.get("series_id") or alert.get("incident_series")
     alert["anomaly_flag"] = alert.get("anomaly_flag", alert.get("is_anomaly", False))
 
-    # Region trend (non-critical)
+    # Region trend (non-critical); counted and written in one batch per run
     city = alert.get("city") or alert.get("region") or alert.get("country")
     threat_type = alert.get("category") or alert.get("threat_label")
     try:
-        incidents_365 = fetch_past_incidents(region=city, category=threat_type, days=365, limit=1000) or []
-        save_region_trend(
-            region=None,
-            city=city,
-            trend_window_start=datetime.utcnow() - timedelta(days=365),
-            trend_window_end=datetime.utcnow(),
-            incident_count=len(incidents_365),
-            categories=[threat_type] if threat_type else None
-        )
+        trends = get_region_trend_aggregator()
+        trends.add(city, threat_type)
+        trends.flush_if_idle()
     except Exception as e:
         logger.error(f"Failed to save region trend: {e}")
 
     return alert
 
+def summarize_alert_batch(alerts: list[dict],
+                          on_error: Optional[Callable[[dict, Exception], None]] = None) -> list[Optional[dict]]:
+    """Enrich a batch through the modular pipeline's batch executor.
+
+    Falls back to summarize_single_alert per alert when modular enrichment is
+    disabled or the batch call fails, and for alerts the batch rejected as
+    invalid (as summarize_single_alert does for a single alert). Returns one
+    entry per input (None for filtered or failed alerts); on_error(alert,
+    exc) is called for every alert that failed.
+    """
+    results: list[Optional[dict]] = [None] * len(alerts)
+    retry = range(len(alerts))
+    if USE_MODULAR_ENRICHMENT and MODULAR_ENRICHMENT_AVAILABLE and modular_enrich_batch:
+        try:
+            results = list(modular_enrich_batch(alerts))
+            # None is either filtered (keep) or failed validation (legacy fallback)
+            retry = [i for i, result in enumerate(results)
+                     if result is None and not validate_alert(alerts[i])[0]]
+        except Exception as e:
+            logger.error("modular_batch_enrichment_failed_fallback",
+                        count=len(alerts),
+                        error=str(e))
+    
+    for i in retry:
+        alert = alerts[i]
+        try:
+            results[i] = summarize_single_alert(alert)
+        except Exception as e:
+            logger.error("alert_processing_failed",
+                        alert_uuid=alert.get("uuid", "no-uuid"),
+                        error=str(e))
+            results[i] = None
+            if on_error:
+                on_error(alert, e)
+    return results
+
 def summarize_alerts(alerts: list[dict]) -> list[dict]:
     start_time = datetime.now()
     
@@ -1433,12 +1472,13 @@ def summarize_alerts(alerts: list[dict]) -> list[dict]:
     try:
         total_proc = len(summarized)
         logger.info(
-            "[Model usage summary] deepseek=%s, openai=%s, grok=%s, moonshot=%s, none=%s | Total processed: %s",
+            "[Model usage summary] deepseek=%s, openai=%s, grok=%s, moonshot=%s, none=%s, cache=%s | Total processed: %s",
             _model_usage_counts["deepseek"],
             _model_usage_counts["openai"],
             _model_usage_counts["grok"],
             _model_usage_counts["moonshot"],
             _model_usage_counts["none"],
+            _model_usage_counts.get("cache", 0),
             total_proc
         )
     except Exception:
@@ -1537,32 +1577,49 @@ def enrich_and_store_alerts(region=None, country=None, city=None, category=None,
     
     # Use ThreadPoolExecutor but with semaphore to limit concurrent LLM calls
     max_llm_workers = 3  # Limit concurrent LLM calls to prevent API throttling
-    workers = min(max_llm_workers, len(new_alerts))
+    
+    # Modular pipeline: each worker enriches a batch stage-wave by stage-wave
+    batch_size = max(1, ENRICHMENT_BATCH_SIZE) if (USE_MODULAR_ENRICHMENT and MODULAR_ENRICHMENT_AVAILABLE) else 1
+    batches = [new_alerts[i:i + batch_size] for i in range(0, len(new_alerts), batch_size)]
+    workers = min(max_llm_workers, len(batches))
     
     enrich_start = datetime.now()
     
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        # Submit with timeout
-        futures = [executor.submit(summarize_single_alert, alert) for alert in new_alerts]
+    # Region trends from every batch are counted and upserted once, on exit
+    with get_region_trend_aggregator().run(), ThreadPoolExecutor(max_workers=workers) as executor:
+        def record_failure(alert: dict, error) -> None:
+            with failed_alerts_lock:
+                failed_alerts.append({"uuid": alert.get("uuid"), "error": str(error),
+                                      "timestamp": datetime.utcnow().isoformat()})
+        
+        # Submit with timeout; each future maps back to its batch
+        futures = {executor.submit(summarize_alert_batch, batch, on_error=record_failure): batch
+                   for batch in batches}
+        done = set()
         
         try:
             # Process with overall timeout of 5 minutes
             for future in as_completed(futures, timeout=300):
+                done.add(future)
                 try:
-                    # Individual alert timeout of 1 minute
-                    result = future.result(timeout=60)
-                    if result:  # Our modular pipeline returns None for filtered alerts
-                        summarized.append(result)
+                    # Individual batch timeout of 1 minute
+                    results = future.result(timeout=60)
+                    # Our modular pipeline returns None for filtered alerts
+                    summarized.extend(result for result in results if result)
                 except Exception as e:
-                    logger.error("alert_processing_timeout", error=str(e))
-                    with failed_alerts_lock:
-                        failed_alerts.append({"error": str(e), "timestamp": datetime.utcnow().isoformat()})
+                    logger.error("alert_processing_timeout", count=len(futures[future]), error=str(e))
+                    for alert in futures[future]:
+                        record_failure(alert, e)
                         
         except Exception as e:
             logger.error("enrichment_executor_failed", error=str(e))
-            # Cancel remaining futures
-            for future in futures:
+            # Cancel remaining futures; every alert in an unfinished batch failed
+            for future, batch in futures.items():
+                if future in done:
+                    continue
                 future.cancel()
+                for alert in batch:
+                    record_failure(alert, e)
     
     enrich_duration = (datetime.now() - enrich_start).total_seconds() * 1000
     
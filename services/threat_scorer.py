@@ -15,6 +15,8 @@ except ImportError as e:
     def unidecode(s: str) -> str:  # type: ignore
         return s
 
+from utils.lang_id import script_counts
+
 # Import defensive score handling
 try:
     from utils.score_type_safety import safe_numeric_score, safe_score_comparison
@@ -384,16 +386,14 @@ def _detect_noise_content(text_norm: str, title: str = "") -> Tuple[bool, str]:
     
     # Non-Latin script detection (Arabic, Hebrew, Cyrillic, Chinese, etc.)
     # These should be filtered before reaching threat scoring, but catch stragglers
-    import re
-    # Arabic: \u0600-\u06FF, Hebrew: \u0590-\u05FF, Cyrillic: \u0400-\u04FF
-    # Chinese: \u4E00-\u9FFF, Japanese Hiragana/Katakana: \u3040-\u30FF
-    if re.search(r'[\u0600-\u06FF]', title or ""):  # Arabic in title
+    scripts = script_counts(title or "")
+    if scripts.get("arabic"):  # Arabic in title
         return True, "non_english_arabic"
-    if re.search(r'[\u0590-\u05FF]', title or ""):  # Hebrew in title  
+    if scripts.get("hebrew"):  # Hebrew in title
         return True, "non_english_hebrew"
-    if re.search(r'[\u0400-\u04FF]{3,}', title or ""):  # 3+ Cyrillic chars in title
+    if scripts.get("cyrillic", 0) >= 3:  # 3+ Cyrillic letters in title
         return True, "non_english_cyrillic"
-    if re.search(r'[\u4E00-\u9FFF]', title or ""):  # Chinese in title
+    if scripts.get("han"):  # Chinese in title
         return True, "non_english_chinese"
     
     # News digest/roundup detection - aggregated content not suitable for single-incident tracking
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized geodesic helpers in utils/geo_utils.
+
+Batch results must agree with the scalar haversine_distance they replace.
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from utils.geo_utils import (
+    bounding_box,
+    bounding_boxes,
+    haversine_distance,
+    haversine_many,
+    haversine_matrix,
+    nearest_k,
+    within_radius,
+)
+
+
+def _random_points(n, seed=7):
+    rng = random.Random(seed)
+    return [rng.uniform(-89, 89) for _ in range(n)], [rng.uniform(-180, 180) for _ in range(n)]
+
+
+def test_haversine_many_matches_scalar():
+    lats, lons = _random_points(500)
+    distances = haversine_many(48.85, 2.35, lats, lons)
+
+    expected = [haversine_distance(48.85, 2.35, la, lo) for la, lo in zip(lats, lons)]
+    assert np.allclose(distances, expected, atol=1e-6)
+
+
+def test_haversine_matrix_shape_and_values():
+    lats1, lons1 = _random_points(20, seed=1)
+    lats2, lons2 = _random_points(30, seed=2)
+    matrix = haversine_matrix(lats1, lons1, lats2, lons2)
+
+    assert matrix.shape == (20, 30)
+    assert np.isclose(matrix[3, 17], haversine_distance(lats1[3], lons1[3], lats2[17], lons2[17]))
+
+
+def test_within_radius_and_nearest_k():
+    # Points roughly 0, ~11, ~22 and ~111 km north of the origin
+    lats = [0.0, 0.1, 0.2, 1.0]
+    lons = [0.0, 0.0, 0.0, 0.0]
+
+    indices, distances = within_radius(0.0, 0.0, lats, lons, 25)
+    assert indices.tolist() == [0, 1, 2]
+    assert distances[2] < 25
+
+    indices, distances = nearest_k(0.05, 0.0, lats, lons, k=2)
+    assert sorted(indices.tolist()) == [0, 1]
+    assert distances[0] <= distances[1]
+
+    indices, _ = nearest_k(0.0, 0.0, lats, lons, k=10, max_km=50)
+    assert indices.tolist() == [0, 1, 2]
+
+
+def test_bounding_boxes_matches_scalar():
+    lats, lons = _random_points(50, seed=3)
+    boxes = bounding_boxes(lats, lons, 40)
+
+    for i in (0, 10, 49):
+        assert np.allclose(boxes[i], bounding_box(lats[i], lons[i], 40))
+
+
+if __name__ == "__main__":
+    test_haversine_many_matches_scalar()
+    test_haversine_matrix_shape_and_values()
+    test_within_radius_and_nearest_k()
+    test_bounding_boxes_matches_scalar()
+    print("✅ geo_utils batch tests passed")
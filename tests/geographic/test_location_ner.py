@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test the batched location NER service (services/location_ner.py).
+
+Uses a blank spaCy pipeline with an entity ruler so the test does not
+depend on en_core_web_sm being installed.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+spacy = pytest.importorskip("spacy")
+
+from services.location_ner import LocationNER
+
+
+def _ruler_ner():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "GPE", "pattern": "Kyiv"},
+        {"label": "GPE", "pattern": "Ukraine"},
+        {"label": "LOC", "pattern": "Red Sea"},
+        {"label": "ORG", "pattern": "NATO"},
+    ])
+    ner = LocationNER(model_name="blank-test", batch_size=2)
+    ner._nlp = nlp
+    return ner
+
+
+def test_extract_many_returns_places_per_text():
+    ner = _ruler_ner()
+    texts = [
+        "Explosions reported in Kyiv, Ukraine overnight",
+        "NATO meeting postponed",
+        None,
+        "Shipping attacked in the Red Sea",
+    ]
+
+    results = ner.extract_many(texts)
+
+    assert results == [["Kyiv", "Ukraine"], [], [], ["Red Sea"]]
+    assert ner.extract("Kyiv update") == ["Kyiv"]
+
+
+def test_stats_report_latency():
+    ner = _ruler_ner()
+    ner.extract_many(["Kyiv"] * 10)
+
+    stats = ner.stats()
+    assert stats["docs"] == 10
+    assert stats["calls"] == 1
+    assert stats["latency_ms_p50"] is not None
+    assert stats["latency_ms_p95"] >= stats["latency_ms_p50"]
+
+
+def test_latency_is_amortized_per_batch():
+    ner = _ruler_ner()
+    inner = ner._nlp
+
+    class BatchingNLP:
+        # Mimics nlp.pipe: all work for a batch happens before its first doc
+        def pipe(self, texts, batch_size, n_process=1):
+            for i in range(0, len(texts), batch_size):
+                time.sleep(0.02)
+                yield from inner.pipe(texts[i:i + batch_size])
+
+    ner._nlp = BatchingNLP()
+    ner.extract_many(["Kyiv"] * 5)
+
+    samples = list(ner._latencies_ms)
+    assert len(samples) == 5
+    # Each doc carries its share of the batch, not ~0 ms or the whole sleep
+    assert all(8.0 <= s < 20.0 for s in samples[:4])
+    assert samples[4] >= 18.0
+
+
+def test_unavailable_model_returns_empty_lists():
+    ner = LocationNER(model_name="definitely-not-a-model")
+
+    assert ner.extract_many(["Kyiv", "Ukraine"]) == [[], []]
+    assert ner.stats()["loaded"] is False
+
+
+if __name__ == "__main__":
+    test_extract_many_returns_places_per_text()
+    test_stats_report_latency()
+    test_latency_is_amortized_per_batch()
+    test_unavailable_model_returns_empty_lists()
+    print("✅ Location NER tests passed")
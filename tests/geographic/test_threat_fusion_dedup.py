@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test ThreatFusion cross-source deduplication.
+
+Verifies the grid-bucketed matcher gives the same result as the original
+linear scan (same day, within MATCH_DISTANCE_KM), including across the
+antimeridian.
+"""
+
+import copy
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from utils.threat_fusion import MATCH_DISTANCE_KM, ThreatFusion, _ThreatGrid
+
+
+def _make_threats(n, seed):
+    rng = random.Random(seed)
+    threats = []
+    for i in range(n):
+        lon = rng.choice([rng.uniform(179.8, 180.0), rng.uniform(-180.0, -179.8), rng.uniform(30.0, 30.3)])
+        threats.append({
+            'event_id': f"{seed}-{i}",
+            'date': f"2025010{rng.randint(1, 3)}",
+            'lat': rng.uniform(10.0, 10.4),
+            'lon': lon,
+            'severity': rng.uniform(1, 9),
+        })
+    return threats
+
+
+def _linear_dedup(gdelt, rss, acled):
+    """Reference implementation using the O(n^2) linear matcher."""
+    class LinearGrid:
+        def __init__(self):
+            self.items = []
+
+        def add(self, threat):
+            self.items.append(threat)
+
+        def find(self, threat):
+            date = str(threat.get('date', ''))[:8]
+            for existing in self.items:
+                if str(existing.get('date', ''))[:8] != date:
+                    continue
+                distance = ThreatFusion._haversine_distance(
+                    threat.get('lat', 0), threat.get('lon', 0), existing.get('lat', 0), existing.get('lon', 0))
+                if distance < MATCH_DISTANCE_KM:
+                    return existing
+            return None
+
+    import utils.threat_fusion as tf
+    original = tf._ThreatGrid
+    tf._ThreatGrid = LinearGrid
+    try:
+        return ThreatFusion._deduplicate_threats(gdelt, rss, acled)
+    finally:
+        tf._ThreatGrid = original
+
+
+def test_grid_dedup_matches_linear_scan():
+    """Grid matcher merges exactly the same threats as the linear scan"""
+    sources = (_make_threats(200, 1), _make_threats(200, 2), _make_threats(40, 3))
+
+    expected = _linear_dedup(*copy.deepcopy(sources))
+    actual = ThreatFusion._deduplicate_threats(*copy.deepcopy(sources))
+
+    assert [(t['event_id'], t['source'], t['source_count']) for t in actual] == \
+        [(t['event_id'], t['source'], t['source_count']) for t in expected]
+
+
+def test_grid_finds_match_across_antimeridian():
+    """Threats a few km apart on either side of 180° are matched"""
+    grid = _ThreatGrid()
+    west = {'date': '20250101', 'lat': 0.0, 'lon': 179.99}
+    grid.add(west)
+
+    assert grid.find({'date': '20250101', 'lat': 0.0, 'lon': -179.99}) is west
+    assert grid.find({'date': '20250102', 'lat': 0.0, 'lon': -179.99}) is None
+    assert grid.find({'date': '20250101', 'lat': 1.0, 'lon': 179.99}) is None
+
+
+if __name__ == "__main__":
+    test_grid_dedup_matches_linear_scan()
+    test_grid_finds_match_across_antimeridian()
+    print("✅ ThreatFusion dedup tests passed")
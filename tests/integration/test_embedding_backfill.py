@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test the bulk embedding backfill in VectorDeduplicator.populate_embeddings_batch.
+
+DB access and the OpenAI client are mocked: each batch must produce exactly one
+multi-input embedding request and one bulk UPDATE, and the keyset checkpoint
+must let a second run resume where the first stopped.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+import utils.vector_dedup as vd
+from utils.risk_shared import embedding_manager
+
+
+class FakeEmbeddingsClient:
+    """Minimal stand-in for openai.OpenAI().embeddings"""
+
+    def __init__(self):
+        self.calls = []
+        self.embeddings = self
+
+    def create(self, model, input, timeout=None):
+        self.calls.append(list(input))
+        # Return out of order to check index-based mapping
+        data = [SimpleNamespace(index=i, embedding=[float(i)] * 4) for i in range(len(input))]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+def _alerts(n):
+    return [{"id": 1000 - i, "uuid": f"u{1000 - i}", "title": f"Alert {i}", "summary": "s", "en_snippet": ""}
+            for i in range(n)]
+
+
+def _fake_fetch_all(rows):
+    def fetch(query, params):
+        limit = params[-1]
+        before = params[0] if len(params) == 2 else None
+        pending = [r for r in rows if before is None or r["id"] < before]
+        return pending[:limit]
+    return fetch
+
+
+def test_backfill_batches_requests_and_updates():
+    rows = _alerts(45)
+    client = FakeEmbeddingsClient()
+    stored = []
+
+    def fake_store(items):
+        stored.append(items)
+        return len(items)
+
+    with patch.object(vd, "fetch_all", side_effect=_fake_fetch_all(rows)), \
+         patch.object(vd, "store_alert_embeddings_bulk", side_effect=fake_store), \
+         patch.object(embedding_manager, "_reserve_quota", return_value=True), \
+         patch("utils.risk_shared.OpenAI", object):
+        created = vd.VectorDeduplicator().populate_embeddings_batch(
+            openai_client=client, batch_size=20, max_alerts=100, concurrency=2
+        )
+
+    assert created == 45
+    assert sorted(len(c) for c in client.calls) == [5, 20, 20]
+    assert sorted(len(s) for s in stored) == [5, 20, 20]
+    # Embeddings are mapped back by response index
+    first = next(s for s in stored if len(s) == 20)
+    assert first[3][1] == [3.0] * 4
+
+
+def test_backfill_resumes_from_checkpoint():
+    rows = _alerts(30)
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "backfill.json")
+        with patch.object(vd, "fetch_all", side_effect=_fake_fetch_all(rows)), \
+             patch.object(vd, "store_alert_embeddings_bulk", side_effect=lambda items: len(items)):
+            first = vd.VectorDeduplicator().populate_embeddings_batch(
+                batch_size=10, max_alerts=10, checkpoint_path=checkpoint, concurrency=1
+            )
+            with open(checkpoint) as f:
+                saved = json.load(f)
+            second = vd.VectorDeduplicator().populate_embeddings_batch(
+                batch_size=10, max_alerts=100, checkpoint_path=checkpoint, concurrency=1
+            )
+
+    assert first == 10
+    assert saved["last_id"] == rows[9]["id"]
+    assert second == 20
+
+
+def test_failed_batches_hold_checkpoint_and_outage_stops_run():
+    rows = _alerts(30)
+    stored_ids = []
+
+    def flaky_store(items):
+        # The batch holding u990..u981 fails to store
+        if any(uuid == "u985" for uuid, _ in items):
+            return 0
+        stored_ids.extend(uuid for uuid, _ in items)
+        return len(items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, "backfill.json")
+        with patch.object(vd, "fetch_all", side_effect=_fake_fetch_all(rows)), \
+             patch.object(vd, "store_alert_embeddings_bulk", side_effect=flaky_store):
+            created = vd.VectorDeduplicator().populate_embeddings_batch(
+                batch_size=10, max_alerts=100, checkpoint_path=checkpoint, concurrency=1
+            )
+        with open(checkpoint) as f:
+            saved = json.load(f)
+    assert created == 20 and len(stored_ids) == 20
+    # Resuming below rows[9] retries the failed batch
+    assert saved["last_id"] == rows[9]["id"]
+
+    fetches = []
+    fetch = _fake_fetch_all(_alerts(200))
+
+    def counting_fetch(query, params):
+        fetches.append(params)
+        return fetch(query, params)
+
+    with patch.object(vd, "fetch_all", side_effect=counting_fetch), \
+         patch.object(vd, "store_alert_embeddings_bulk", side_effect=lambda items: 0):
+        created = vd.VectorDeduplicator().populate_embeddings_batch(
+            batch_size=10, max_alerts=200, concurrency=1, max_failed_pages=3
+        )
+    assert created == 0 and len(fetches) == 3
+
+
+if __name__ == "__main__":
+    test_backfill_batches_requests_and_updates()
+    test_backfill_resumes_from_checkpoint()
+    test_failed_batches_hold_checkpoint_and_outage_stops_run()
+    print("✅ Embedding backfill tests passed")
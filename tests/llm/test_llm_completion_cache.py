@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test the LLM completion cache (monitoring/llm_cache.py) behind route_llm.
+
+Providers are faked: identical prompts must reach a provider once, survive a
+restart through the SQLite store, and concurrent duplicates must be merged.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from monitoring import llm_router
+from monitoring.llm_cache import LLMCompletionCache
+
+MESSAGES = [
+    {"role": "system", "content": "Summarize the threat."},
+    {"role": "user", "content": "Title: Explosion near port\nSummary: Two injured."},
+]
+
+
+def _fake_provider(calls, reply="Two injured in port blast.", delay=0.0):
+    def chat(messages, temperature=0.4, timeout=15):
+        calls.append(messages)
+        time.sleep(delay)
+        return reply
+    return chat
+
+
+def _patched(cache, provider):
+    return [
+        patch.object(llm_router, "get_llm_cache", lambda: cache),
+        patch.object(llm_router, "grok_chat_limited", provider),
+        patch.dict(os.environ, {"LLM_PRIMARY_ENRICHMENT": "grok"}),
+    ]
+
+
+def _run(patches, fn):
+    for p in patches:
+        p.start()
+    try:
+        return fn()
+    finally:
+        for p in reversed(patches):
+            p.stop()
+
+
+def test_identical_prompts_hit_cache_and_persist():
+    calls = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm.sqlite3")
+        usage = {"deepseek": 0, "openai": 0, "grok": 0, "moonshot": 0, "none": 0, "cache": 0}
+        reworded = [dict(MESSAGES[0]), {"role": "user", "content": "Title:  Explosion near port\n\nSummary: Two injured.  "}]
+
+        def go():
+            first = llm_router.route_llm(MESSAGES, temperature=0.2, usage_counts=usage, task_type="enrichment")
+            second = llm_router.route_llm(reworded, temperature=0.2, usage_counts=usage, task_type="enrichment")
+            return first, second
+
+        first, second = _run(_patched(LLMCompletionCache(path=path), _fake_provider(calls)), go)
+        assert first == second == ("Two injured in port blast.", "grok")
+        assert len(calls) == 1
+        assert usage["grok"] == 1 and usage["cache"] == 1
+
+        # A fresh process reads the completion back from disk
+        restarted = LLMCompletionCache(path=path)
+        again = _run(_patched(restarted, _fake_provider(calls)),
+                     lambda: llm_router.route_llm(MESSAGES, temperature=0.2, task_type="enrichment"))
+        assert again == first and len(calls) == 1
+        assert restarted.stats()["disk_hits"] == 1
+
+        # Different temperature or task type is a different completion
+        _run(_patched(restarted, _fake_provider(calls)),
+             lambda: llm_router.route_llm(MESSAGES, temperature=0.7, task_type="enrichment"))
+        assert len(calls) == 2
+
+
+def test_concurrent_duplicates_share_one_provider_call():
+    calls = []
+    cache = LLMCompletionCache(path=None)
+    results = []
+
+    def go():
+        threads = [threading.Thread(target=lambda: results.append(
+            llm_router.route_llm(MESSAGES, task_type="enrichment"))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+
+    _run(_patched(cache, _fake_provider(calls, delay=0.3)), go)
+    assert len(calls) == 1
+    assert results == [("Two injured in port blast.", "grok")] * 5
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 4
+
+
+def test_failures_are_not_cached():
+    calls = []
+    cache = LLMCompletionCache(path=None)
+    patches = _patched(cache, _fake_provider(calls, reply=""))
+    patches += [patch.object(llm_router, name, _fake_provider(calls, reply=""))
+                for name in ("openai_chat_limited", "moonshot_chat_limited", "deepseek_chat_limited")]
+
+    def go():
+        return [llm_router.route_llm(MESSAGES, task_type="enrichment") for _ in range(2)]
+
+    assert _run(patches, go) == [("", "none"), ("", "none")]
+    assert len(calls) == 8  # every provider, both times
+    assert cache.stats()["stores"] == 0
+
+
+if __name__ == "__main__":
+    test_identical_prompts_hit_cache_and_persist()
+    test_concurrent_duplicates_share_one_provider_call()
+    test_failures_are_not_cached()
+    print("✅ LLM completion cache tests passed")
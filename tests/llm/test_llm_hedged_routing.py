@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test latency-aware provider ordering and hedged requests in route_llm
+(monitoring/llm_provider_health.py, monitoring/llm_router.py).
+
+Providers are faked with fixed latencies: a degraded or open-circuit
+provider must be demoted, and a call stuck past the primary's p90 must be
+answered by the hedge instead of waiting out the primary's timeout.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from monitoring import llm_router
+from monitoring.llm_provider_health import ProviderHealth
+
+MESSAGES = [{"role": "user", "content": "Assess: protest near embassy"}]
+CONFIGURED = ["grok", "openai", "moonshot", "deepseek"]
+
+
+def _provider(name, calls, delay=0.0, reply=None, error=None):
+    def chat(messages, temperature=0.4, timeout=15):
+        calls.append(name)
+        time.sleep(delay)
+        if error:
+            raise error
+        return reply if reply is not None else f"reply from {name}"
+    return chat
+
+
+def _route(health, providers, **env):
+    patches = [
+        patch.object(llm_router, "get_llm_cache", lambda: None),
+        patch.object(llm_router, "get_provider_health", lambda: health),
+        patch.dict(os.environ, env),
+    ] + [patch.object(llm_router, f"{name}_chat_limited", fn) for name, fn in providers.items()]
+    for p in patches:
+        p.start()
+    try:
+        usage = {}
+        start = time.monotonic()
+        result = llm_router.route_llm(MESSAGES, task_type="enrichment", usage_counts=usage)
+        return result, usage, time.monotonic() - start
+    finally:
+        for p in reversed(patches):
+            p.stop()
+
+
+def test_order_prefers_fast_healthy_providers():
+    open_circuit = SimpleNamespace(state="open", last_failure_time=time.time(), recovery_timeout=300,
+                                   request_history=[])
+    health = ProviderHealth(circuits={"moonshot": open_circuit})
+    assert health.order(CONFIGURED) == ["grok", "openai", "deepseek", "moonshot"]
+
+    for _ in range(5):
+        health.record("grok", 6.0, True)
+        health.record("openai", 0.8, True)
+    health.record("deepseek", 0.5, True)
+    for _ in range(3):
+        health.record("deepseek", 10.0, False)
+    order = health.order(CONFIGURED)
+    assert order[0] == "openai"
+    assert order[-1] == "moonshot"
+    assert health.p90("openai") == 0.8 and health.p90("deepseek") is None
+
+
+def test_slow_primary_is_hedged_past_its_p90():
+    health = ProviderHealth(circuits={})
+    for _ in range(5):
+        health.record("grok", 0.05, True)
+    calls = []
+    providers = {
+        "grok": _provider("grok", calls, delay=1.5),
+        "openai": _provider("openai", calls, delay=0.01),
+    }
+    (text, model), usage, elapsed = _route(health, providers, LLM_PRIMARY_ENRICHMENT="grok")
+    assert model == "openai" and text == "reply from openai"
+    assert elapsed < 1.0
+    assert calls[:2] == ["grok", "openai"]
+    assert usage == {"openai": 1}
+    assert health.snapshot()["openai"]["hedges"] == 1
+
+
+def test_failed_provider_falls_through_immediately():
+    health = ProviderHealth(circuits={})
+    calls = []
+    providers = {
+        "grok": _provider("grok", calls, error=RuntimeError("503 upstream")),
+        "openai": _provider("openai", calls, reply=""),
+        "moonshot": _provider("moonshot", calls, delay=0.01),
+    }
+    (text, model), usage, elapsed = _route(health, providers)
+    assert model == "moonshot"
+    assert calls == ["grok", "openai", "moonshot"]
+    assert elapsed < 1.0
+    # Both failures count against the providers for the next ordering
+    assert health.order(CONFIGURED)[:2] == ["moonshot", "deepseek"]
+
+
+def test_queue_wait_on_busy_pool_does_not_trigger_hedge():
+    health = ProviderHealth(circuits={})
+    for _ in range(5):
+        health.record("grok", 0.2, True)
+    pool = ThreadPoolExecutor(max_workers=1)
+    pool.submit(time.sleep, 0.3)  # another request holds the only worker
+    calls = []
+
+    def try_provider(name):
+        calls.append(name)
+        time.sleep(0.1)
+        return f"reply from {name}"
+
+    try:
+        with patch.object(llm_router, "get_provider_health", lambda: health), \
+                patch.object(llm_router, "_hedge_executor", lambda: pool):
+            result = llm_router._first_good_reply(["grok", "openai"], try_provider, hedge=True)
+    finally:
+        pool.shutdown(wait=True)
+    assert result == ("reply from grok", "grok")
+    assert calls == ["grok"]
+    assert "openai" not in health.snapshot()  # never hedged
+
+
+if __name__ == "__main__":
+    test_order_prefers_fast_healthy_providers()
+    test_slow_primary_is_hedged_past_its_p90()
+    test_failed_provider_falls_through_immediately()
+    test_queue_wait_on_busy_pool_does_not_trigger_hedge()
+    print("✅ Hedged routing tests passed")
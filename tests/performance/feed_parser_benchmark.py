@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the streaming feed parser (utils/feed_parser.py).
+
+Builds large feeds by repeating the items of the recorded feeds in
+tests/performance/fixtures/feeds. Each feed then goes through
+utils.feed_parser.parse_feed and feedparser.parse, and the report gives
+wall time, feeds/s and tracemalloc peak for both parsers. It also records
+whether parse_feed handled the feed or fell back, and whether
+_extract_entries output matches between the two paths.
+
+    python tests/performance/feed_parser_benchmark.py --items 2000 --iterations 5
+    python tests/performance/feed_parser_benchmark.py --output parser.json
+
+The exit status is 1 if any feed parsed by parse_feed differs from feedparser.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+from unittest.mock import patch
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, ROOT)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'feeds')
+
+import feedparser
+
+from utils.feed_parser import parse_feed
+
+_ITEM_RE = re.compile(rb"<(item|entry)\b.*?</\1>", re.DOTALL)
+
+
+def scaled_feed(data: bytes, items: int) -> bytes:
+    """Repeat the item/entry elements of a recorded feed until it holds `items` of them."""
+    matches = list(_ITEM_RE.finditer(data))
+    if not matches:
+        return data
+    found = [m.group(0) for m in matches]
+    body = b"\n".join(found[i % len(found)] for i in range(items))
+    return data[:matches[0].start()] + body + data[matches[-1].end():]
+
+
+def load_corpus(items: int) -> List[Tuple[str, bytes]]:
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.xml"))):
+        with open(path, "rb") as f:
+            corpus.append((os.path.basename(path), scaled_feed(f.read(), items)))
+    return corpus
+
+
+def _measure(fn: Callable[[bytes], Any], data: bytes, iterations: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(data)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        fn(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "wall_s": round(elapsed, 4),
+        "feeds_per_s": round(iterations / elapsed, 2) if elapsed > 0 else None,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def _extract(data: bytes, fast: bool):
+    from services import rss_processor as rp
+
+    with patch.object(rp, "RSS_FAST_PARSER", fast), patch.object(rp, "_now_utc", lambda: None):
+        return rp._extract_entries(data, "https://fallback.example/feed")
+
+
+def run_benchmark(items: int = 1000, iterations: int = 3) -> Dict[str, Any]:
+    feeds = []
+    mismatches = []
+    for name, data in load_corpus(items):
+        handled = parse_feed(data) is not None
+        if handled and _extract(data, fast=True) != _extract(data, fast=False):
+            mismatches.append(name)
+        fast = _measure(parse_feed, data, iterations)
+        legacy = _measure(feedparser.parse, data, iterations)
+        feeds.append({
+            "feed": name,
+            "bytes": len(data),
+            "items": items,
+            "fast_path": handled,
+            "parse_feed": fast,
+            "feedparser": legacy,
+            # Only meaningful when parse_feed handled the feed (a fallback bails out early)
+            "speedup": round(legacy["wall_s"] / fast["wall_s"], 2) if handled and fast["wall_s"] else None,
+            "peak_ratio": round(legacy["peak_kb"] / fast["peak_kb"], 2) if handled and fast["peak_kb"] else None,
+        })
+    return {"iterations": iterations, "feeds": feeds, "mismatches": mismatches}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Streaming feed parser benchmark")
+    parser.add_argument("--items", type=int, default=1000, help="Items per generated feed")
+    parser.add_argument("--iterations", type=int, default=3, help="Timed parses per feed and parser")
+    parser.add_argument("--output", help="Write the JSON report to this path (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(items=args.items, iterations=args.iterations)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if report["mismatches"]:
+        print(f"❌ Entries differ from feedparser for: {', '.join(report['mismatches'])}", file=sys.stderr)
+        return 1
+    for row in report["feeds"]:
+        if row["fast_path"]:
+            print(f"✅ {row['feed']}: {row['speedup']}x faster, {row['peak_ratio']}x less peak memory",
+                  file=sys.stderr)
+        else:
+            print(f"✅ {row['feed']}: handed to feedparser", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
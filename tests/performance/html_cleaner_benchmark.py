@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the RSS text cleaner (utils/html_cleaner.py).
+
+Runs utils.html_cleaner.clean_html_content and a frozen copy of the
+previous rss_processor._clean_html_content over the same corpus:
+
+- raw titles and summaries from the recorded feeds in
+  tests/performance/fixtures/feeds (as _extract_entries sees them)
+- hand-written edge cases (nested truncation markers, encoded tags, ...)
+- a seeded fuzz corpus built from HTML/footer fragments
+
+The report lists every input whose output differs, plus throughput for
+both implementations:
+
+    python tests/performance/html_cleaner_benchmark.py --iterations 200
+    python tests/performance/html_cleaner_benchmark.py --output cleaner.json
+
+The exit status is 1 if any output differs.
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, ROOT)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'feeds')
+
+from utils.html_cleaner import clean_html_content
+
+
+def legacy_clean_html_content(text: str) -> str:
+    """rss_processor._clean_html_content before utils/html_cleaner.py (reference output)."""
+    if not text:
+        return ""
+
+    import html
+    import re
+
+    text = html.unescape(text)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    patterns_to_remove = [
+        r'The post.*?appeared first on.*?\.',
+        r'\[&#?8230;?\]',
+        r'\[…\]',
+        r'\[\.\.\.\]',
+        r'<a\s+href[^>]*>.*?</a>',
+        r'Continue reading.*',
+        r'Read more.*',
+        r'Full article.*',
+    ]
+    for pattern in patterns_to_remove:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    text = re.sub(r'\(\s*\)', '', text)
+    text = re.sub(r'\[\s*\]', '', text)
+    if text and not text[-1] in '.!?':
+        last_sentence_end = max(
+            text.rfind('.'),
+            text.rfind('!'),
+            text.rfind('?')
+        )
+        if last_sentence_end > len(text) * 0.5:
+            text = text[:last_sentence_end + 1]
+    return text.strip()
+
+
+EDGE_CASES = [
+    "",
+    "Plain headline without markup",
+    "Headline with trailing clause, officials said",
+    "Iraq&#8217;s forces &amp; allies &#8211; update [&#8230;]",
+    "&lt;b&gt;Encoded tags&lt;/b&gt; become real tags.",
+    "[The post X appeared first on Y....]",
+    "[[&#8230;]…] nested markers.",
+    "Empty [()] and ( ) and [ ] groups. Tail",
+    "Story <a href='x'>link</a> Continue reading → more. Read more",
+    "FULL ARTICLE at the site",
+    "<>odd < brackets > and <unclosed",
+    "Line with unicode\nspaces\tand tabs.",
+    "Ends with question? Then a fragment",
+    "The post <a href=\"https://a\">T</a> appeared first on <a href=\"https://b\">B</a>.",
+]
+
+_FUZZ_TOKENS = [
+    "<p>", "</p>", "<a href='x'>", "</a>", "<br/>", "<", ">", "&amp;", "&#8230;", "&lt;i&gt;", "&nbsp;",
+    "[", "]", "(", ")", "...", "…", ".", "!", "?", " ", "  ", "\n", "\t",
+    "Read more", "continue reading", "Full article", "The post", "appeared first on",
+    "bombing", "Beirut", "police said", "Niamey", "protest",
+]
+
+
+def fuzz_corpus(count: int = 2000, seed: int = 1234) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(_FUZZ_TOKENS) for _ in range(rng.randint(1, 30))) for _ in range(count)]
+
+
+def feed_corpus() -> List[str]:
+    import feedparser
+
+    texts = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.xml"))):
+        with open(path, "r", encoding="utf-8") as f:
+            parsed = feedparser.parse(f.read())
+        for e in parsed.entries:
+            texts.append((e.get("title") or "").strip())
+            texts.append((e.get("summary") or e.get("description") or "").strip())
+    return texts
+
+
+def _time(fn: Callable[[str], str], texts: List[str], iterations: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for t in texts:
+            fn(t)
+    elapsed = time.perf_counter() - start
+    calls = len(texts) * iterations
+    return {
+        "calls": calls,
+        "wall_s": round(elapsed, 4),
+        "texts_per_s": round(calls / elapsed, 1) if elapsed > 0 else None,
+        "us_per_text": round(elapsed / calls * 1e6, 3) if calls else None,
+    }
+
+
+def run_benchmark(iterations: int = 50, fuzz: int = 2000) -> Dict[str, Any]:
+    corpora = {"feeds": feed_corpus(), "edge_cases": list(EDGE_CASES), "fuzz": fuzz_corpus(fuzz)}
+    mismatches = []
+    for name, texts in corpora.items():
+        for t in texts:
+            expected, got = legacy_clean_html_content(t), clean_html_content(t)
+            if expected != got:
+                mismatches.append({"corpus": name, "input": t, "legacy": expected, "current": got})
+
+    # Throughput on what ingest actually sees: the recorded feed texts
+    texts = corpora["feeds"]
+    legacy = _time(legacy_clean_html_content, texts, iterations)
+    current = _time(clean_html_content, texts, iterations)
+    return {
+        "texts": {name: len(t) for name, t in corpora.items()},
+        "mismatches": mismatches,
+        "legacy": legacy,
+        "current": current,
+        "speedup": round(legacy["wall_s"] / current["wall_s"], 2) if current["wall_s"] else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="RSS text cleaner micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=50,
+                        help="Passes over the recorded feed corpus for the timing")
+    parser.add_argument("--fuzz", type=int, default=2000, help="Fuzz inputs checked for identical output")
+    parser.add_argument("--output", help="Write the JSON report to this path (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(iterations=args.iterations, fuzz=args.fuzz)
+    text = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if report["mismatches"]:
+        print(f"❌ {len(report['mismatches'])} outputs differ from the previous cleaner", file=sys.stderr)
+        return 1
+    print(f"✅ Identical output, {report['speedup']}x faster", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
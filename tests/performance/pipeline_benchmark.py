@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark for the ingest -> enrich -> store pipeline.
+
+Replays the recorded RSS/Atom payloads in tests/performance/fixtures/feeds
+through services.rss_processor.ingest_feeds and
+services.threat_engine.enrich_and_store_alerts with no external services:
+
+- feeds are served by a local HTTP stand-in (ThreadingHTTPServer on 127.0.0.1)
+- LLM calls (route_llm, Moonshot location batches) and embeddings are
+  deterministic stubs, with an optional simulated latency
+- raw_alerts / alerts live in a throwaway SQLite database
+
+Reports per-stage item counts, throughput, p50/p95 latency and peak traced
+memory as JSON, so runs can be diffed between commits:
+
+    python tests/performance/pipeline_benchmark.py --replicas 20 --output bench.json
+    python tests/performance/pipeline_benchmark.py --replicas 20 --baseline bench.json
+
+With --baseline, stages whose p95 or throughput regressed by more than
+--threshold are listed and the exit status is 1.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, ROOT)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'feeds')
+
+# Applied before the pipeline modules are imported; the same switches are
+# also patched on the modules in case they were imported earlier.
+OFFLINE_ENV = {
+    "RSS_USE_FULLTEXT": "false",
+    "HOST_THROTTLE_ENABLED": "false",
+    "CITYUTILS_ENABLE_GEOCODE": "false",
+    "MOONSHOT_BATCH_TIMER_ENABLED": "false",
+    "RSS_WRITE_TO_DB": "false",
+    "RSS_FAIL_CLOSED": "false",
+    "ENGINE_FAIL_CLOSED": "false",
+    "ENGINE_SEMANTIC_DEDUP": "true",
+    "NO_PROXY": "127.0.0.1,localhost",
+    "no_proxy": "127.0.0.1,localhost",
+}
+
+EMBEDDING_DIM = 64
+
+# Columns returned by utils.db_utils.fetch_raw_alerts_from_db
+RAW_ALERT_COLUMNS = (
+    "uuid", "title", "summary", "en_snippet", "link", "source", "published",
+    "region", "country", "city", "tags", "language", "ingested_at",
+    "latitude", "longitude", "source_tag", "source_kind", "source_priority",
+)
+
+
+# ---------------------------------------------------------------- measurement
+class StageStats:
+    """Latency samples and wall-clock window for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.samples_ms: List[float] = []
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+        self.items = 0
+        self.peak_mem_kb: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, start: float, end: float, items: int = 1) -> None:
+        with self._lock:
+            self.samples_ms.append((end - start) * 1000.0)
+            self.items += items
+            self.first_start = start if self.first_start is None else min(self.first_start, start)
+            self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = sorted(self.samples_ms)
+
+        def pct(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 3)
+
+        wall_s = (self.last_end - self.first_start) if self.samples_ms else 0.0
+        out = {
+            "items": self.items,
+            "calls": len(samples),
+            "wall_s": round(wall_s, 4),
+            "items_per_s": round(self.items / wall_s, 2) if wall_s > 0 else None,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(samples[-1], 3) if samples else None,
+        }
+        if self.peak_mem_kb is not None:
+            out["peak_mem_kb"] = round(self.peak_mem_kb, 1)
+        return out
+
+
+class Recorder:
+    """Collects StageStats by name; thread-safe for concurrent enrichment."""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> StageStats:
+        with self._lock:
+            if name not in self.stages:
+                self.stages[name] = StageStats(name)
+            return self.stages[name]
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a top-level phase and capture the peak memory it allocated."""
+        stats = self.stage(name)
+        baseline = 0
+        if self.trace_memory:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        box = {"items": 0}
+        try:
+            yield box
+        finally:
+            stats.record(start, time.perf_counter(), items=box["items"])
+            if self.trace_memory:
+                stats.peak_mem_kb = (tracemalloc.get_traced_memory()[1] - baseline) / 1024.0
+
+    def timed(self, name: str, fn, count=None):
+        """Wrap fn; `count(*args)` gives the items per call (default 1)."""
+        stats = self.stage(name)
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats.record(start, time.perf_counter(), items=count(*args) if count else 1)
+        return wrapper
+
+    def timed_async(self, name: str, fn):
+        stats = self.stage(name)
+
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                stats.record(start, time.perf_counter())
+        return wrapper
+
+    def report(self) -> Dict[str, Any]:
+        return {name: s.to_dict() for name, s in self.stages.items()}
+
+
+# ------------------------------------------------------------- HTTP stand-in
+def _replica_payload(payload: str, replica: int) -> str:
+    """Make every URL in a recorded feed unique per replica (changes uuids)."""
+    if replica == 0:
+        return payload
+    return re.sub(r'(https?://[^\s<>"\]]+)', lambda m: f"{m.group(1)}#r{replica}", payload)
+
+
+class FeedServer:
+    """Serves recorded feed files at /<replica>/<filename> on 127.0.0.1."""
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR):
+        self.payloads: Dict[str, str] = {}
+        for name in sorted(os.listdir(fixtures_dir)):
+            if name.endswith('.xml'):
+                with open(os.path.join(fixtures_dir, name), 'r', encoding='utf-8') as f:
+                    self.payloads[name] = f.read()
+        payloads = self.payloads
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = self.path.strip('/').split('/', 1)
+                if len(parts) != 2 or parts[1] not in payloads or not parts[0].isdigit():
+                    self.send_error(404)
+                    return
+                body = _replica_payload(payloads[parts[1]], int(parts[0])).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/xml; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_specs(self, replicas: int) -> List[Dict[str, Any]]:
+        return [
+            {"url": f"{self.base_url}/{r}/{name}", "tag": "", "kind": "global"}
+            for r in range(replicas)
+            for name in self.payloads
+        ]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# --------------------------------------------------------------- stub providers
+def _digest(text: str) -> bytes:
+    return hashlib.sha256((text or "").encode('utf-8')).digest()
+
+
+def stub_embedding(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    """Deterministic unit-scale pseudo-embedding derived from the text hash."""
+    seed = _digest(text)
+    out = []
+    while len(out) < dim:
+        seed = hashlib.sha256(seed).digest()
+        out.extend(b / 255.0 for b in seed)
+    return out[:dim]
+
+
+class StubLLM:
+    """Deterministic replacements for route_llm and the Moonshot client."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_s = max(latency_ms, 0.0) / 1000.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _tick(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def route_llm(self, messages, temperature=0.4, usage_counts=None, task_type="general"):
+        self._tick()
+        content = (messages[-1].get("content") if messages else "") or ""
+        return f"- Stub summary {_digest(content).hex()[:12]}\n- {content[:160]}", "stub"
+
+    def route_llm_search(self, query, context="", usage_counts=None):
+        return self.route_llm([{"role": "user", "content": f"{query}\n{context}"}])
+
+    def moonshot_module(self):
+        """Module object exposing a MoonshotClient for rss_processor batches."""
+        stub = self
+
+        class MoonshotClient:
+            async def acomplete(self, model=None, messages=None, temperature=None, max_tokens=None):
+                stub.calls += 1
+                if stub.latency_s:
+                    await asyncio.sleep(stub.latency_s)
+                prompt = (messages or [{}])[-1].get("content", "")
+                uuids = re.findall(r'UUID: (\w+)', prompt)
+                return json.dumps([
+                    {"alert_uuid": u, "city": None, "country": None, "region": None, "confidence": 0.5}
+                    for u in uuids
+                ])
+
+        module = type(sys)('clients.moonshot_client')
+        module.MoonshotClient = MoonshotClient
+        return module
+
+
+# ------------------------------------------------------------- SQLite adapter
+def _to_sqlite(query: str) -> str:
+    return query.replace('%s', '?')
+
+
+def _json_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+class SQLiteStore:
+    """
+    Throwaway stand-in for the Postgres helpers in utils.db_utils.
+
+    raw_alerts and alerts keep each row as a JSON payload keyed by uuid;
+    generic fetch_one/execute run on SQLite and return None / no-op for
+    Postgres-only SQL (pgvector, INTERVAL, ON CONFLICT ... feed_health).
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript("""
+                CREATE TABLE raw_alerts (uuid TEXT PRIMARY KEY, published TEXT, payload TEXT);
+                CREATE TABLE alerts (uuid TEXT PRIMARY KEY, published TEXT, category TEXT, payload TEXT);
+            """)
+
+    def close(self):
+        self.conn.close()
+
+    # generic helpers (utils.db_utils signatures)
+    def fetch_one(self, query: str, params: tuple = ()):
+        try:
+            with self.lock:
+                return self.conn.execute(_to_sqlite(query), tuple(params)).fetchone()
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def fetch_all(self, query: str, params: tuple = ()):
+        return []
+
+    def execute(self, query: str, params: tuple = ()) -> None:
+        try:
+            with self.lock:
+                self.conn.execute(_to_sqlite(query), tuple(params))
+        except (sqlite3.Error, ValueError):
+            pass
+
+    # alert storage
+    def _upsert(self, table: str, alerts: List[Dict[str, Any]]) -> int:
+        rows = []
+        for a in alerts:
+            if not a.get("uuid"):
+                continue
+            row = (a["uuid"], _json_default(a.get("published") or ""), json.dumps(a, default=_json_default))
+            if table == "alerts":
+                row = row[:2] + (a.get("category"),) + row[2:]
+            rows.append(row)
+        marks = ",".join("?" * (4 if table == "alerts" else 3))
+        with self.lock:
+            self.conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({marks})", rows)
+            self.conn.commit()
+        return len(rows)
+
+    def save_raw_alerts_to_db(self, alerts: List[Dict[str, Any]]) -> int:
+        return self._upsert("raw_alerts", alerts)
+
+    def save_alerts_to_db(self, alerts: List[Dict[str, Any]]) -> int:
+        return self._upsert("alerts", alerts)
+
+    @staticmethod
+    def _decode(payload: str) -> Dict[str, Any]:
+        alert = json.loads(payload)
+        try:
+            alert["published"] = datetime.fromisoformat(alert["published"])
+        except Exception:
+            alert["published"] = datetime.now(timezone.utc).replace(tzinfo=None)
+        return alert
+
+    def fetch_raw_alerts_from_db(self, region=None, country=None, city=None, limit=1000, english_only=True):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT payload FROM raw_alerts ORDER BY published DESC LIMIT ?", (limit,)
+            ).fetchall()
+        alerts = [self._decode(r[0]) for r in rows]
+        return [{col: a.get(col) for col in RAW_ALERT_COLUMNS} for a in alerts]
+
+    def fetch_past_incidents(self, region=None, category=None, days=7, limit=100):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT payload FROM alerts WHERE (? IS NULL OR category = ?) ORDER BY published DESC LIMIT ?",
+                (category, category, limit),
+            ).fetchall()
+        return [self._decode(r[0]) for r in rows]
+
+    def save_region_trend(self, *args, **kwargs) -> None:
+        return None
+
+    def count_incidents_by_location_category(self, pairs, window_start, window_end):
+        counts = {}
+        for loc, cat in pairs:
+            with self.lock:
+                counts[(loc, cat)] = self.conn.execute(
+                    "SELECT COUNT(*) FROM alerts WHERE (? IS NULL OR category = ?)", (cat, cat)
+                ).fetchone()[0]
+        return counts
+
+    def save_region_trends_batch(self, rows) -> int:
+        return len(rows)
+
+    def count(self, table: str) -> int:
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+# -------------------------------------------------------------------- runner
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _peak_rss_kb() -> Optional[int]:
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return None
+
+
+def run_benchmark(replicas: int = 5, llm_latency_ms: float = 0.0, trace_memory: bool = True,
+                  fixtures_dir: str = FIXTURES_DIR) -> Dict[str, Any]:
+    """
+    Run the recorded corpus `replicas` times through ingest and enrichment.
+
+    Returns the JSON-serialisable report.
+    """
+    for key, value in OFFLINE_ENV.items():
+        os.environ.setdefault(key, value)
+
+    import services.rss_processor as rss
+    import services.threat_engine as engine
+    import utils.db_utils as db_utils
+    from utils.risk_shared import embedding_manager
+    from utils.batch_state_manager import reset_batch_state_manager
+
+    recorder = Recorder(trace_memory=trace_memory)
+    llm = StubLLM(latency_ms=llm_latency_ms)
+    store = SQLiteStore()
+    cache_dir = tempfile.mkdtemp(prefix="pipeline_bench_")
+
+    def record_health(url, ok, latency_ms, error=None):
+        end = time.perf_counter()
+        recorder.stage("fetch").record(end - latency_ms / 1000.0, end)
+
+    def embed_one(text, client=None):
+        if llm.latency_s:
+            time.sleep(llm.latency_s)
+        return stub_embedding(text)
+
+    def embed_many(texts, client=None):
+        if llm.latency_s:
+            time.sleep(llm.latency_s)
+        return [stub_embedding(t) for t in texts]
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    try:
+        with ExitStack() as stack:
+            p = stack.enter_context
+            # DB -> SQLite
+            for module in (db_utils, rss, engine, sys.modules.get("services.region_trends")):
+                if module is None:
+                    continue
+                for name in ("fetch_one", "execute", "fetch_all", "save_raw_alerts_to_db",
+                             "fetch_raw_alerts_from_db", "save_alerts_to_db",
+                             "fetch_past_incidents", "save_region_trend",
+                             "count_incidents_by_location_category", "save_region_trends_batch"):
+                    if hasattr(module, name):
+                        p(patch.object(module, name, getattr(store, name)))
+            # LLM / embeddings -> deterministic stubs
+            p(patch.dict(sys.modules, {"clients.moonshot_client": llm.moonshot_module()}))
+            for module in (engine, rss, sys.modules.get("monitoring.llm_router")):
+                if module is not None and hasattr(module, "route_llm"):
+                    p(patch.object(module, "route_llm", llm.route_llm))
+            if hasattr(engine, "route_llm_search"):
+                p(patch.object(engine, "route_llm_search", llm.route_llm_search))
+            p(patch.object(embedding_manager, "get_embedding_safe", embed_one))
+            if hasattr(embedding_manager, "get_embeddings_safe"):
+                p(patch.object(embedding_manager, "get_embeddings_safe", embed_many))
+            p(patch.object(engine, "openai_client", object()))
+            p(patch.object(engine, "ENABLE_SEMANTIC_DEDUP", True))
+            # Offline switches and scratch cache
+            p(patch.object(rss, "RSS_USE_FULLTEXT", False))
+            p(patch.object(rss, "HOST_THROTTLE_ENABLED", False))
+            p(patch.object(rss, "GEOCODE_ENABLED", False))
+            p(patch.object(engine, "ENGINE_CACHE_DIR", cache_dir))
+            # Per-item stage timers
+            p(patch.object(rss, "_record_health", record_health))
+            p(patch.object(rss, "_extract_entries", recorder.timed("parse", rss._extract_entries)))
+            p(patch.object(rss, "_build_alert_from_entry",
+                           recorder.timed_async("build_alert", rss._build_alert_from_entry)))
+            p(patch.object(engine, "summarize_alert_batch",
+                           recorder.timed("enrich_batch", engine.summarize_alert_batch, count=len)))
+            enrichment_plan = None
+            try:
+                from services.enrichment_stages import get_enrichment_pipeline
+                pipeline = get_enrichment_pipeline()
+                enrichment_plan = pipeline.plan()
+                for stage in pipeline.stages:
+                    p(patch.object(stage, "process", recorder.timed(f"enrich.{stage.name}", stage.process)))
+            except ImportError:
+                pass
+
+            reset_batch_state_manager()
+            rss._reset_rss_diag()
+            server = p(FeedServer(fixtures_dir))
+            specs = server.feed_specs(replicas)
+
+            with recorder.phase("ingest") as box:
+                alerts = asyncio.run(rss.ingest_feeds(specs, limit=10 ** 9))
+                box["items"] = len(alerts)
+
+            with recorder.phase("store_raw") as box:
+                box["items"] = store.save_raw_alerts_to_db(alerts)
+
+            with recorder.phase("enrich_and_store") as box:
+                enriched = engine.enrich_and_store_alerts(limit=len(alerts) or 1, write_to_db=True)
+                box["items"] = len(enriched or [])
+
+            counts = {
+                "feeds": len(specs),
+                "entries": recorder.stage("build_alert").items,
+                "alerts_built": len(alerts),
+                "raw_stored": store.count("raw_alerts"),
+                "enriched": len(enriched or []),
+                "stored": store.count("alerts"),
+                "llm_calls": llm.calls,
+            }
+            skips = {k: v for k, v in rss._RSS_DIAG.items() if k.startswith("skip_")}
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        store.close()
+        reset_batch_state_manager()
+
+    return {
+        "benchmark": "pipeline",
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "replicas": replicas,
+            "llm_latency_ms": llm_latency_ms,
+            "tracemalloc": trace_memory,
+        },
+        "counts": counts,
+        "enrichment_plan": enrichment_plan,
+        "skips": skips,
+        "stages": recorder.report(),
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.2) -> List[str]:
+    """Stages whose p95 grew or throughput dropped by more than `threshold`."""
+    regressions = []
+    for name, cur in current.get("stages", {}).items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            continue
+        if base.get("p95_ms") and cur.get("p95_ms") is not None:
+            if cur["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {cur['p95_ms']}ms")
+        if base.get("items_per_s") and cur.get("items_per_s") is not None:
+            if cur["items_per_s"] < base["items_per_s"] * (1 - threshold):
+                regressions.append(f"{name}: throughput {base['items_per_s']}/s -> {cur['items_per_s']}/s")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline ingest -> enrich -> store benchmark")
+    parser.add_argument("--replicas", type=int, default=5,
+                        help="Times the recorded corpus is replayed (distinct URLs per replica)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0,
+                        help="Simulated latency for each stub LLM / embedding call")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Skip peak-memory tracing (timings without tracing overhead)")
+    parser.add_argument("--output", help="Write the JSON report to this path (default: stdout)")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative change counted as a regression (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(replicas=args.replicas, llm_latency_ms=args.llm_latency_ms,
+                           trace_memory=not args.no_tracemalloc)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_reports(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"❌ regression {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("✅ No regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
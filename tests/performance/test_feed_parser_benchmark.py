@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the streaming feed parser benchmark (feed_parser_benchmark.py).
+
+Scaled-up recorded feeds must give the same entries through parse_feed as
+through feedparser, and the report must be JSON-serialisable.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feed_parser_benchmark import run_benchmark
+
+
+def test_scaled_feeds_match_feedparser():
+    report = run_benchmark(items=50, iterations=1)
+    json.dumps(report)
+
+    assert report["mismatches"] == []
+    assert any(row["fast_path"] for row in report["feeds"])
+    for row in report["feeds"]:
+        assert row["parse_feed"]["feeds_per_s"] and row["feedparser"]["feeds_per_s"]
+
+
+if __name__ == "__main__":
+    test_scaled_feeds_match_feedparser()
+    print("✅ Feed parser benchmark tests passed")
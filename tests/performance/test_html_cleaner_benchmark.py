@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the RSS text cleaner micro-benchmark (html_cleaner_benchmark.py).
+
+The precompiled cleaner must reproduce the previous _clean_html_content
+output exactly on the recorded feeds, the edge cases and the fuzz corpus.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from html_cleaner_benchmark import EDGE_CASES, legacy_clean_html_content, run_benchmark
+
+
+def test_cleaner_output_identical_to_previous_implementation():
+    report = run_benchmark(iterations=2, fuzz=3000)
+    json.dumps(report)
+
+    assert report["texts"]["feeds"] > 0
+    assert report["mismatches"] == []
+    assert report["current"]["texts_per_s"] and report["legacy"]["texts_per_s"]
+
+
+def test_rss_processor_uses_shared_cleaner():
+    from services.rss_processor import _clean_html_content
+    from utils.html_cleaner import clean_html_content
+
+    assert _clean_html_content is clean_html_content
+    for text in EDGE_CASES:
+        assert _clean_html_content(text) == legacy_clean_html_content(text), text
+
+
+if __name__ == "__main__":
+    test_cleaner_output_identical_to_previous_implementation()
+    test_rss_processor_uses_shared_cleaner()
+    print("✅ HTML cleaner benchmark tests passed")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the offline pipeline benchmark (pipeline_benchmark.py).
+
+Runs one replica of the recorded corpus with stub LLM/embeddings and the
+SQLite adapter, and checks the JSON report shape and regression comparison.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline_benchmark import compare_reports, run_benchmark
+
+
+def test_benchmark_report_covers_pipeline_stages():
+    report = run_benchmark(replicas=1)
+
+    # Report must be JSON-serialisable for diffing between commits
+    json.dumps(report)
+
+    counts = report["counts"]
+    assert counts["feeds"] == 3
+    assert counts["entries"] == 20
+    assert 0 < counts["alerts_built"] <= counts["entries"]
+    assert counts["raw_stored"] == counts["alerts_built"]
+    assert counts["stored"] == counts["enriched"]
+
+    stages = report["stages"]
+    for name in ("fetch", "parse", "build_alert", "ingest", "store_raw", "enrich_batch", "enrich_and_store"):
+        assert stages[name]["items"] > 0 or name == "enrich_and_store", name
+        assert stages[name]["p95_ms"] is not None, name
+    for name in ("ingest", "store_raw", "enrich_and_store"):
+        assert "peak_mem_kb" in stages[name]
+
+
+def test_compare_reports_flags_regressions():
+    base = {"stages": {"ingest": {"p95_ms": 100.0, "items_per_s": 50.0}}}
+    same = {"stages": {"ingest": {"p95_ms": 110.0, "items_per_s": 45.0}}}
+    slow = {"stages": {"ingest": {"p95_ms": 150.0, "items_per_s": 30.0}}}
+
+    assert compare_reports(base, same, threshold=0.2) == []
+    assert len(compare_reports(base, slow, threshold=0.2)) == 2
+
+
+if __name__ == "__main__":
+    test_benchmark_report_covers_pipeline_stages()
+    test_compare_reports_flags_regressions()
+    print("✅ Pipeline benchmark tests passed")
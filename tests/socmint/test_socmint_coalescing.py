@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test SocmintService request coalescing, batching and the Redis hot tier.
+
+Apify, Postgres and Redis are faked: cache misses for several usernames
+must share one actor run, concurrent requests for one identifier must share
+one scrape, and saved profiles must be served from Redis.
+"""
+
+import os
+import sys
+import threading
+import uuid
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import utils.socmint_service as ss
+
+
+class FakeApify:
+    """Stands in for ApifyClient: actor(...).call() and dataset(...).iterate_items()."""
+
+    def __init__(self, gate=None):
+        self.runs = []
+        self.gate = gate
+
+    def actor(self, actor_id):
+        self._actor_id = actor_id
+        return self
+
+    def call(self, run_input):
+        self.runs.append(run_input)
+        if self.gate is not None:
+            self.gate.wait(5)
+        return {"defaultDatasetId": str(len(self.runs))}
+
+    def dataset(self, dataset_id):
+        self._dataset_input = self.runs[int(dataset_id) - 1]
+        return self
+
+    def iterate_items(self):
+        for username in self._dataset_input.get("usernames", []):
+            yield {"type": "profile", "username": username, "followers": 10}
+            yield {"type": "post", "ownerUsername": username, "caption": f"post by {username}"}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+def _service(client):
+    service = ss.SocmintService()
+    service.client = client
+    return service
+
+
+def _no_db():
+    return (patch.object(ss, "fetch_one", return_value=None),
+            patch.object(ss, "execute"),
+            patch.object(ss, "_get_redis", return_value=None))
+
+
+def test_cache_misses_share_one_actor_run():
+    ss.reset_cache_metrics()
+    client = FakeApify()
+    service = _service(client)
+
+    p1, p2, p3 = _no_db()
+    with p1, p2, p3:
+        results = service.scrape_many("instagram", ["alpha", "bravo", "charlie", "alpha"], results_limit=5)
+
+    assert len(client.runs) == 1
+    assert client.runs[0]["usernames"] == ["alpha", "bravo", "charlie"]
+    for name in ("alpha", "bravo", "charlie"):
+        assert results[name]["success"] is True
+        assert results[name]["source"] == "fresh"
+        assert results[name]["data"]["profile"]["username"] == name
+        assert [p["ownerUsername"] for p in results[name]["data"]["posts"]] == [name]
+    assert ss.get_cache_metrics()["apify_calls"] == 1
+
+
+def test_concurrent_requests_share_one_scrape():
+    ss.reset_cache_metrics()
+    gate = threading.Event()
+    client = FakeApify(gate=gate)
+    service = _service(client)
+    results = []
+
+    p1, p2, p3 = _no_db()
+    with p1, p2, p3:
+        threads = [threading.Thread(target=lambda: results.append(service.run_instagram_scraper("delta")))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        while ss.get_cache_metrics()["coalesced"] < 3 and any(t.is_alive() for t in threads):
+            threading.Event().wait(0.01)
+        gate.set()
+        for t in threads:
+            t.join(5)
+
+    assert len(client.runs) == 1
+    assert len(results) == 4
+    assert all(r["success"] for r in results)
+    assert ss.get_cache_metrics()["coalesced"] == 3
+    assert not ss._inflight
+
+
+def test_failed_scrape_returns_errors_and_releases_waiters():
+    ss.reset_cache_metrics()
+    service = _service(FakeApify())
+
+    def boom(platform, targets, results_limit):
+        raise RuntimeError("apify unreachable")
+
+    p1, p2, p3 = _no_db()
+    with p1, p2, p3, patch.object(service, "_scrape_claimed", boom):
+        results = service.scrape_many("instagram", ["hotel", "india"])
+
+    assert results == {name: {"success": False, "error": "apify unreachable"} for name in ("hotel", "india")}
+    assert ss.get_cache_metrics()["errors"] == 1
+    assert not ss._inflight
+
+
+def test_saved_profiles_are_served_from_redis():
+    ss.reset_cache_metrics()
+    redis = FakeRedis()
+    service = _service(FakeApify())
+
+    with patch.object(ss, "_get_redis", return_value=redis), \
+         patch.object(ss, "execute"), \
+         patch.object(ss, "fetch_one") as fetch_one:
+        service.save_socmint_data("instagram", "echo", {"profile": {"username": "echo"}, "posts": []})
+        cached = service.get_cached_socmint_data("instagram", "echo", ttl_minutes=120)
+
+    assert cached["success"] is True
+    assert cached["data"]["profile"]["username"] == "echo"
+    fetch_one.assert_not_called()
+    assert ss.get_cache_metrics()["redis_hits"] == 1
+
+
+def test_stage_prefetches_iocs_for_whole_batch():
+    from services.enrichment_stages import EnrichmentContext, SocmintEnrichmentStage
+
+    client = FakeApify()
+    service = _service(client)
+    texts = ["Claims posted on instagram.com/foxtrot", "Video shared via instagram.com/golf"]
+    alerts = [{"uuid": str(uuid.uuid4())} for _ in texts]
+    contexts = [EnrichmentContext(a["uuid"], text, text, "", None, []) for a, text in zip(alerts, texts)]
+
+    p1, p2, p3 = _no_db()
+    with p1, p2, p3, patch.object(ss, "get_socmint_service", return_value=service):
+        enriched = SocmintEnrichmentStage().process_batch(alerts, contexts)
+
+    assert len(client.runs) == 1
+    assert sorted(client.runs[0]["usernames"]) == ["foxtrot", "golf"]
+    assert [a["enrichments"]["osint"][0]["identifier"] for a in enriched] == ["foxtrot", "golf"]
+
+
+if __name__ == "__main__":
+    test_cache_misses_share_one_actor_run()
+    test_concurrent_requests_share_one_scrape()
+    test_failed_scrape_returns_errors_and_releases_waiters()
+    test_saved_profiles_are_served_from_redis()
+    test_stage_prefetches_iocs_for_whole_batch()
+    print("✅ SOCMINT coalescing tests passed")
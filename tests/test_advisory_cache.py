@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Test the shared advisory cache (services/advisory_cache.py) and its use in
+api/chat_handler.handle_user_query.
+
+Redis is replaced by a small in-memory fake: entries must be compressed,
+bounded by LRU, keyed on intent + location + alert-set version, and a repeat
+question about the same place from another user must not reach the advisor.
+"""
+
+import os
+import sys
+import time
+import zlib
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.advisory_cache import AdvisoryCache, normalize_intent
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def setex(self, key, ttl, value):
+        assert isinstance(value, bytes)
+        self.values[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def zadd(self, key, mapping, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not xx or member in zset:
+                zset[member] = score
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zrange(self, key, start, end):
+        members = sorted(self.zsets.get(key, {}).items(), key=lambda kv: kv[1])
+        return [m.encode() for m, _ in members[start:end + 1]]
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member.decode() if isinstance(member, bytes) else member, None)
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, s in zset.items() if s <= high]:
+            del zset[member]
+
+    def hincrby(self, key, field, n):
+        h = self.hashes.setdefault(key, {})
+        h[field] = h.get(field, 0) + n
+
+    def hgetall(self, key):
+        return {k.encode(): str(v).encode() for k, v in self.hashes.get(key, {}).items()}
+
+
+ALERTS = [
+    {"uuid": "a1", "published": "2026-10-01T10:00:00", "confidence": 0.9, "score": 70, "title": "Protest in Lagos"},
+    {"uuid": "a2", "published": "2026-10-02T10:00:00", "confidence": 0.8, "score": 60, "title": "Roadblock in Lagos"},
+]
+
+
+def test_key_tracks_intent_location_and_alert_set():
+    cache = AdvisoryCache(redis_client=FakeRedis())
+    assert normalize_intent("  Is Lagos\tSAFE  right now? ") == "is lagos safe right now?"
+    # Word order is part of the question
+    assert normalize_intent("Route from Lagos to Abuja") != normalize_intent("Route from Abuja to Lagos")
+
+    key = cache.advisory_key("Is Kiev safe?", country="Ukraine", city="Kiev", alerts=ALERTS)
+    assert key == cache.advisory_key("is  kiev SAFE?", country="UA", city="Kyiv", alerts=list(reversed(ALERTS)))
+    assert key != cache.advisory_key("Is Kiev safe?", country="Ukraine", city="Odesa", alerts=ALERTS)
+    assert key != cache.advisory_key("Is Kiev safe?", country="Ukraine", city="Kiev", alerts=ALERTS,
+                                     audience={"role": "journalist"})
+    # A new alert for the location is a different key
+    newer = ALERTS + [{"uuid": "a3", "published": "2026-10-03T10:00:00"}]
+    assert key != cache.advisory_key("Is Kiev safe?", country="Ukraine", city="Kiev", alerts=newer)
+
+
+def test_advice_shared_by_role_not_identity():
+    from api.chat_handler import _advice_audience
+
+    cache = AdvisoryCache(redis_client=FakeRedis())
+    base = {"role": "journalist", "location": "Lagos", "plan": "PRO", "email_verified": True}
+    alice = dict(base, email="alice@example.com", name="Alice", employer="Acme", extra_details="diabetic")
+    bob = dict(base, email="bob@example.com", name="Bob", employer="Globex", role="Journalist ")
+    carol = dict(alice, email="carol@example.com", name="Carol", role="executive")
+
+    keys = {
+        name: cache.advisory_key("Is Lagos safe?", country="Nigeria", city="Lagos", alerts=ALERTS,
+                                 audience=_advice_audience(profile))
+        for name, profile in (("alice", alice), ("bob", bob), ("carol", carol), ("anon", None))
+    }
+    assert keys["alice"] == keys["bob"]
+    assert keys["carol"] != keys["alice"]
+    assert keys["anon"] not in (keys["alice"], keys["carol"])
+
+
+def test_redis_entries_are_compressed_and_lru_bounded():
+    redis = FakeRedis()
+    cache = AdvisoryCache(redis_client=redis, max_entries=3)
+    advice = {"reply": "Avoid the ring road after dark. " * 50, "alerts": ALERTS, "meta": {"next_review": "6h"}}
+
+    cache.put("k0", advice)
+    raw = redis.values["advisory:v:a:k0"]
+    assert len(raw) < len(advice["reply"])
+    assert "alerts" not in cache.get("k0")
+    assert zlib.decompress(raw)
+
+    for i in range(1, 4):
+        time.sleep(0.001)
+        cache.put(f"k{i}", advice)
+    # k0 was least recently used and is gone; the set stays at max_entries
+    assert cache.get("k0") is None
+    assert cache.get("k3")["meta"] == {"next_review": "6h"}
+    assert redis.zcard("advisory:lru") == 3
+
+    stats = cache.stats()
+    assert stats["backend"] == "redis"
+    assert stats["shared"]["hits"] == 2 and stats["shared"]["misses"] == 1
+    assert stats["process"]["evictions"] == 1
+
+
+def test_memory_fallback_is_bounded():
+    with patch.dict(os.environ, {"REDIS_URL": ""}):
+        cache = AdvisoryCache(max_entries=2)
+        for i in range(5):
+            cache.put(f"k{i}", {"reply": f"advice {i}"})
+        assert cache.get("k0") is None
+        assert cache.get("k4") == {"reply": "advice 4"}
+        stats = cache.stats()
+    assert stats["backend"] == "memory" and stats["entries"] == 2
+    assert stats["hit_rate"] == 0.5
+
+
+def test_repeat_question_from_another_user_skips_the_advisor():
+    from api import chat_handler
+
+    calls = []
+    profiles = {
+        "a@example.com": {"email": "a@example.com", "name": "Ann", "employer": "Acme", "role": "journalist"},
+        "b@example.com": {"email": "b@example.com", "name": "Ben", "employer": "Globex", "role": "journalist"},
+    }
+
+    def fake_advice(query, alerts, user_profile=None, **kwargs):
+        calls.append((query, user_profile))
+        return {"reply": "Lagos: moderate risk.", "alerts": alerts, "meta": {}}
+
+    cache = AdvisoryCache(redis_client=FakeRedis())
+    patches = [
+        patch.object(chat_handler, "advisory_cache", cache),
+        patch.object(chat_handler, "_is_verified", lambda email: True),
+        patch.object(chat_handler, "log_security_event", lambda **kw: None),
+        patch.object(chat_handler, "enhance_geographic_query", lambda region: {"country": "Nigeria", "city": "Lagos"}),
+        patch.object(chat_handler, "fetch_alerts_from_db_strict_geo", lambda *a: [dict(a_) for a_ in ALERTS]),
+        patch.object(chat_handler, "fetch_past_incidents", lambda **kw: []),
+        patch.object(chat_handler, "fetch_user_profile", lambda email: dict(profiles[email])),
+        patch.object(chat_handler, "generate_advice", fake_advice),
+        patch.object(chat_handler, "get_plan", None),
+        patch.object(chat_handler, "get_usage", None),
+    ]
+    for p in patches:
+        p.start()
+    try:
+        first = chat_handler.handle_user_query("Is Lagos safe?", "a@example.com", region="Lagos")
+        second = chat_handler.handle_user_query("is  lagos SAFE?", "b@example.com", region="Lagos")
+    finally:
+        for p in reversed(patches):
+            p.stop()
+
+    # Two users with the same role share one advisory; the advisor never sees who asked
+    assert calls == [("Is Lagos safe?", {"role": "journalist"})]
+    assert first["reply"] == second["reply"] == "Lagos: moderate risk."
+    assert first["usage"]["advisory_cache"] == "miss"
+    assert second["usage"]["advisory_cache"] == "hit"
+    assert len(second["alerts"]) == 2
+
+
+if __name__ == "__main__":
+    test_key_tracks_intent_location_and_alert_set()
+    test_advice_shared_by_role_not_identity()
+    test_redis_entries_are_compressed_and_lru_bounded()
+    test_memory_fallback_is_bounded()
+    test_repeat_question_from_another_user_skips_the_advisor()
+    print("✅ Advisory cache tests passed")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the batch enrichment fallback in services/threat_engine.summarize_alert_batch.
+
+The modular batch executor returns None both for filtered alerts and for
+alerts that failed validation; invalid ones must still go through the
+legacy single-alert path, and every alert that fails there is reported.
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("RSS_WRITE_TO_DB", "false")
+os.environ.setdefault("RSS_FAIL_CLOSED", "false")
+os.environ.setdefault("ENGINE_FAIL_CLOSED", "false")
+
+import services.threat_engine as engine
+
+VALID = {"uuid": "ok", "title": "Explosion near the port", "summary": "Police cordoned off the area."}
+FILTERED = {"uuid": "sport", "title": "Derby ends in a draw", "summary": "Both clubs scored twice."}
+INVALID = {"title": "missing uuid"}
+
+
+def test_invalid_alerts_fall_back_and_failures_are_reported():
+    legacy_calls = []
+
+    def legacy(alert):
+        legacy_calls.append(alert.get("uuid"))
+        raise ValueError("Alert validation failed: uuid missing")
+
+    failures = []
+    with patch.object(engine, "USE_MODULAR_ENRICHMENT", True), \
+         patch.object(engine, "MODULAR_ENRICHMENT_AVAILABLE", True), \
+         patch.object(engine, "modular_enrich_batch", lambda alerts: [dict(VALID, enriched=True), None, None]), \
+         patch.object(engine, "summarize_single_alert", legacy):
+        results = engine.summarize_alert_batch([VALID, FILTERED, INVALID],
+                                               on_error=lambda alert, e: failures.append((alert, str(e))))
+
+    assert results == [dict(VALID, enriched=True), None, None]
+    # The filtered alert is not retried; the invalid one is, and its failure is reported
+    assert legacy_calls == [None]
+    assert failures == [(INVALID, "Alert validation failed: uuid missing")]
+
+
+def test_batch_failure_retries_every_alert():
+    failures = []
+
+    def broken_batch(alerts):
+        raise RuntimeError("pipeline down")
+
+    with patch.object(engine, "USE_MODULAR_ENRICHMENT", True), \
+         patch.object(engine, "MODULAR_ENRICHMENT_AVAILABLE", True), \
+         patch.object(engine, "modular_enrich_batch", broken_batch), \
+         patch.object(engine, "summarize_single_alert", lambda alert: dict(alert, legacy=True)):
+        results = engine.summarize_alert_batch([VALID, FILTERED], on_error=lambda *a: failures.append(a))
+
+    assert [r["legacy"] for r in results] == [True, True]
+    assert failures == []
+
+
+if __name__ == "__main__":
+    test_invalid_alerts_fall_back_and_failures_are_reported()
+    test_batch_failure_retries_every_alert()
+    print("✅ Batch enrichment fallback tests passed")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test per-feed polling cadence (services/feed_cadence.py) in RSS ingest.
+
+Each feed's next due time must follow its observed publish frequency,
+ingest_all_feeds_to_db must fetch only due feeds (local > country > global),
+and full_sweep must still fetch everything.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.feed_cadence import FeedCadence
+from services.feed_health import FeedHealthBuffer
+from services.fetch_scheduler import FetchScheduler
+
+HOUR = 3600.0
+NOW = 1_760_000_000.0
+
+
+def test_next_due_follows_publish_frequency():
+    cadence = FeedCadence(enabled=True, min_interval_s=600, max_interval_s=12 * HOUR, poll_factor=0.5)
+
+    # Bootstrapped from the entries already in the feed: hourly
+    cadence.observe("https://hourly.example/rss", [NOW - i * HOUR for i in range(5)], polled_at=NOW)
+    state = cadence._feeds["https://hourly.example/rss"]
+    assert state.mean_interval_s == HOUR and state.next_due_at == NOW + HOUR / 2
+
+    # Nothing new: stretch the interval
+    cadence.observe("https://hourly.example/rss", [NOW - i * HOUR for i in range(5)], polled_at=NOW + HOUR)
+    assert state.empty_polls == 1 and state.next_due_at == NOW + HOUR + 0.75 * HOUR
+
+    # New entry resets the stretch
+    cadence.observe("https://hourly.example/rss", [NOW + 2 * HOUR], polled_at=NOW + 2 * HOUR)
+    assert state.empty_polls == 0 and state.newest_entry_at == NOW + 2 * HOUR
+
+    # Monthly feed and an undated one are clamped to the bounds
+    cadence.observe("https://monthly.example/rss", [NOW - i * 30 * 24 * HOUR for i in range(3)], polled_at=NOW)
+    assert cadence._feeds["https://monthly.example/rss"].next_due_at == NOW + 12 * HOUR
+    cadence.observe("https://undated.example/rss", [], polled_at=NOW)
+    assert cadence._feeds["https://undated.example/rss"].next_due_at == NOW + 900
+
+    rows = []
+    assert cadence.flush(lambda r: rows.extend(r) or len(r)) == 3 and cadence.flush(lambda r: 1 / 0) == 0
+    assert {r[0] for r in rows} == {"https://hourly.example/rss", "https://monthly.example/rss",
+                                     "https://undated.example/rss"}
+
+
+def test_undated_feed_with_new_entries_is_not_stretched():
+    cadence = FeedCadence(enabled=True, min_interval_s=600, max_interval_s=12 * HOUR, poll_factor=0.5)
+    url = "https://undated.example/rss"
+
+    # New undated entries (unseen uuids) keep the feed at the minimum interval
+    for i in range(3):
+        cadence.observe(url, [], polled_at=NOW + i * HOUR, undated_new=2)
+    state = cadence._feeds[url]
+    assert state.empty_polls == 0 and state.next_due_at == NOW + 2 * HOUR + 600
+    assert state.mean_interval_s is None
+
+    # Only already-stored entries: now it is an empty poll
+    cadence.observe(url, [], polled_at=NOW + 3 * HOUR)
+    assert state.empty_polls == 1 and state.next_due_at == NOW + 3 * HOUR + 900
+
+
+def test_failed_flush_keeps_feeds_dirty():
+    cadence = FeedCadence(enabled=True)
+    cadence.observe("https://a.example/rss", [NOW - HOUR, NOW], polled_at=NOW)
+    cadence.mark_failed("https://b.example/rss", polled_at=NOW)
+
+    # upsert_feed_cadence returns 0 on a database error
+    assert cadence.flush(lambda rows: 0) == 0
+    rows = []
+    assert cadence.flush(lambda r: rows.extend(r) or len(r)) == 2
+    assert {r[0] for r in rows} == {"https://a.example/rss", "https://b.example/rss"}
+    assert cadence.flush(lambda r: 1 / 0) == 0
+
+
+def _undated_rss(links) -> str:
+    items = "".join(f"<item><title>t{i}</title><link>https://x/{i}</link></item>" for i in links)
+    return f"<?xml version='1.0'?><rss><channel><title>t</title>{items}</channel></rss>"
+
+
+def test_ingest_counts_unseen_undated_entries_as_new():
+    from services import rss_processor as rp
+
+    body = {"links": [0, 1]}
+    stored = set()
+
+    def handler(request):
+        return httpx.Response(200, text=_undated_rss(body["links"]))
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        kwargs.pop("limits", None)
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    url = "https://undated.example/rss"
+    cadence = FeedCadence(enabled=True)
+
+    def existing(uuids):
+        found = stored & set(uuids)
+        stored.update(uuids)
+        return found
+
+    with patch.object(rp.httpx, "AsyncClient", client_factory), \
+         patch.object(rp, "_coalesce_all_feed_specs", lambda groups=None: [{"url": url, "kind": "global", "tag": "global"}]), \
+         patch.object(rp, "get_feed_cadence", lambda: cadence), \
+         patch.object(rp, "FETCH_SCHEDULER", FetchScheduler(base_rate=100.0)), \
+         patch.object(rp, "get_feed_health_buffer", lambda: FeedHealthBuffer()), \
+         patch.object(rp, "_passes_keyword_filter", lambda text: (False, {})), \
+         patch.object(rp, "existing_raw_alert_uuids", existing), \
+         patch("utils.db_utils.fetch_feed_cadence", lambda: []), \
+         patch("utils.db_utils.upsert_feed_cadence", lambda rows: len(rows)):
+        asyncio.run(rp.ingest_all_feeds_to_db(limit=10, write_to_db=False, full_sweep=True))
+        assert cadence._feeds[url].empty_polls == 0
+
+        # Same entries again: nothing new
+        asyncio.run(rp.ingest_all_feeds_to_db(limit=10, write_to_db=False, full_sweep=True))
+        assert cadence._feeds[url].empty_polls == 1
+
+        # A new undated entry resets the stretch
+        body["links"] = [0, 1, 2]
+        asyncio.run(rp.ingest_all_feeds_to_db(limit=10, write_to_db=False, full_sweep=True))
+        assert cadence._feeds[url].empty_polls == 0
+
+
+def test_due_orders_local_country_global_and_caps():
+    from services.rss_processor import _spec_priority
+
+    cadence = FeedCadence(enabled=True, max_feeds_per_run=3)
+    specs = [
+        {"url": "https://g.example/rss", "kind": "global", "tag": "global"},
+        {"url": "https://c.example/rss", "kind": "native", "tag": "country:France"},
+        {"url": "https://l.example/rss", "kind": "native", "tag": "local:paris"},
+        {"url": "https://f.example/rss", "kind": "unknown", "tag": ""},
+        {"url": "https://quiet.example/rss", "kind": "native", "tag": "local:rome"},
+    ]
+    cadence.observe("https://quiet.example/rss", [NOW - 40 * 24 * HOUR], polled_at=NOW)
+
+    due, deferred = cadence.due(specs, priority=_spec_priority, now=NOW + 60)
+    assert [s["url"] for s in due] == ["https://l.example/rss", "https://c.example/rss", "https://g.example/rss"]
+    assert deferred == 2
+
+    due, deferred = cadence.due(specs, priority=_spec_priority, full_sweep=True, now=NOW + 60)
+    assert len(due) == 5 and deferred == 0 and due[-1]["url"] == "https://f.example/rss"
+
+
+def _rss(now: datetime, hours_apart: float) -> str:
+    items = "".join(
+        f"<item><title>t{i}</title><link>https://x/{i}</link>"
+        f"<pubDate>{format_datetime(now - timedelta(hours=i * hours_apart))}</pubDate></item>"
+        for i in range(4)
+    )
+    return f"<?xml version='1.0'?><rss><channel><title>t</title>{items}</channel></rss>"
+
+
+def test_ingest_fetches_only_due_feeds():
+    from services import rss_processor as rp
+
+    now = datetime.now(timezone.utc)
+    fetched = []
+
+    def handler(request):
+        fetched.append(request.url.host)
+        return httpx.Response(200, text=_rss(now, 2.0))
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        kwargs.pop("limits", None)
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    specs = [{"url": f"https://news{i}.example/rss", "kind": "global", "tag": "global"} for i in range(4)]
+    stored = [{"feed_url": "https://news0.example/rss", "newest_entry_at": now.replace(tzinfo=None),
+               "mean_interval_s": 7200.0, "empty_polls": 0, "last_polled_at": now.replace(tzinfo=None),
+               "next_due_at": (now + timedelta(hours=1)).replace(tzinfo=None)}]
+    upserts = []
+    cadence = FeedCadence(enabled=True)
+
+    with patch.object(rp.httpx, "AsyncClient", client_factory), \
+         patch.object(rp, "_coalesce_all_feed_specs", lambda groups=None: [dict(s) for s in specs]), \
+         patch.object(rp, "get_feed_cadence", lambda: cadence), \
+         patch.object(rp, "FETCH_SCHEDULER", FetchScheduler(base_rate=100.0)), \
+         patch.object(rp, "get_feed_health_buffer", lambda: FeedHealthBuffer()), \
+         patch.object(rp, "_passes_keyword_filter", lambda text: (False, {})), \
+         patch("utils.db_utils.fetch_feed_cadence", lambda: stored), \
+         patch("utils.db_utils.upsert_feed_cadence", lambda rows: upserts.append(rows) or len(rows)):
+        res = asyncio.run(rp.ingest_all_feeds_to_db(limit=10, write_to_db=False))
+        assert sorted(fetched) == ["news1.example", "news2.example", "news3.example"]
+        assert res["feeds_processed"] == 3 and res["feeds_deferred"] == 1 and res["feeds_total"] == 4
+        assert len(upserts) == 1 and len(upserts[0]) == 3
+        assert all(abs(row[2] - 7200.0) < 1 for row in upserts[0])
+
+        fetched.clear()
+        res = asyncio.run(rp.ingest_all_feeds_to_db(limit=10, write_to_db=False, full_sweep=True))
+        assert len(fetched) == 4 and res["feeds_deferred"] == 0
+
+
+if __name__ == "__main__":
+    test_next_due_follows_publish_frequency()
+    test_undated_feed_with_new_entries_is_not_stretched()
+    test_failed_flush_keeps_feeds_dirty()
+    test_ingest_counts_unseen_undated_entries_as_new()
+    test_due_orders_local_country_global_and_caps()
+    test_ingest_fetches_only_due_feeds()
+    print("✅ Feed cadence tests passed")
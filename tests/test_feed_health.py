@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test buffered feed-health telemetry (services/feed_health.py) in RSS ingest.
+
+Fetch outcomes must stay in memory during ingest_feeds and reach Postgres
+as a single bulk upsert at the end of the run, with per-host p50/p95 latency
+available for /admin/rss/diag.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.feed_health import FeedHealthBuffer, LatencyHistogram
+
+EMPTY_RSS = "<?xml version='1.0'?><rss><channel><title>t</title></channel></rss>"
+
+
+def test_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ms in [80] * 90 + [3000] * 10:
+        hist.add(ms)
+    assert 50 <= hist.percentile(0.50) <= 100
+    assert 1600 <= hist.percentile(0.95) <= 3000
+    assert hist.percentile(1.0) == 3000
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_buffer_aggregates_per_feed_and_host():
+    buf = FeedHealthBuffer()
+    buf.start_run()
+    buf.record("https://a.com/rss", "a.com", True, 100.0)
+    buf.record("https://a.com/rss", "a.com", True, 300.0)
+    buf.record("https://b.com/feed", "b.com", True, 50.0)
+    buf.record("https://b.com/feed", "b.com", False, 9000.0, error="timeout")
+    buf.record("https://b.com/feed", "b.com", False, 9000.0, error="timeout")
+
+    calls = []
+    assert buf.flush(lambda rows: calls.append(rows) or len(rows)) == 2
+    rows = {r[0]: r for r in calls[0]}
+    assert rows["https://a.com/rss"] == ("https://a.com/rss", "a.com", "ok", None, 2, 0, 200.0, 0)
+    assert rows["https://b.com/feed"] == ("https://b.com/feed", "b.com", "error", "timeout", 1, 2, 50.0, 2)
+    assert buf.pending() == 0 and buf.flush(lambda rows: 1 / 0) == 0
+
+    hosts = buf.host_summary()
+    assert hosts["b.com"]["fetches"] == 3 and hosts["b.com"]["errors"] == 2
+    assert hosts["a.com"]["p50_ms"] is not None and hosts["a.com"]["p95_ms"] <= 300.0
+
+
+def test_failed_flush_keeps_counters_for_next_flush():
+    buf = FeedHealthBuffer()
+    buf.record("https://a.com/rss", "a.com", True, 100.0)
+    buf.record("https://b.com/feed", "b.com", False, 9000.0, error="timeout")
+
+    # upsert_feed_health returns 0 on a database error
+    assert buf.flush(lambda rows: 0) == 0
+    assert buf.pending() == 2
+
+    # Outcomes recorded after the failed flush merge with the restored ones
+    buf.record("https://b.com/feed", "b.com", False, 9000.0, error="reset")
+    calls = []
+    assert buf.flush(lambda rows: calls.append(rows) or len(rows)) == 2
+    rows = {r[0]: r for r in calls[0]}
+    assert rows["https://a.com/rss"] == ("https://a.com/rss", "a.com", "ok", None, 1, 0, 100.0, 0)
+    assert rows["https://b.com/feed"] == ("https://b.com/feed", "b.com", "error", "reset", 0, 2, None, 2)
+    assert buf.pending() == 0
+
+
+def test_ingest_flushes_once_per_run_without_per_feed_queries():
+    from services import rss_processor as rp
+
+    def handler(request):
+        if request.url.host == "down.example":
+            return httpx.Response(503)
+        return httpx.Response(200, text=EMPTY_RSS)
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        kwargs.pop("limits", None)
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    specs = [{"url": f"https://news{i}.example/rss", "tag": "global"} for i in range(5)]
+    specs.append({"url": "https://down.example/rss", "tag": "global"})
+    upserts = []
+    buffer = FeedHealthBuffer()
+
+    with patch.object(rp.httpx, "AsyncClient", client_factory), \
+         patch.object(rp, "get_feed_health_buffer", lambda: buffer), \
+         patch.object(rp, "_db_execute") as per_feed_sql, \
+         patch("utils.db_utils.upsert_feed_health", lambda rows: upserts.append(rows) or len(rows)):
+        assert asyncio.run(rp.ingest_feeds(specs, limit=10)) == []
+
+    per_feed_sql.assert_not_called()
+    assert len(upserts) == 1 and len(upserts[0]) == 6
+    statuses = {row[0]: row[2] for row in upserts[0]}
+    assert statuses["https://down.example/rss"] == "error"
+    hosts = buffer.host_summary()
+    assert hosts["down.example"]["errors"] == 1 and hosts["news0.example"]["p95_ms"] is not None
+
+
+if __name__ == "__main__":
+    test_histogram_percentiles()
+    test_buffer_aggregates_per_feed_and_host()
+    test_failed_flush_keeps_counters_for_next_flush()
+    test_ingest_flushes_once_per_run_without_per_feed_queries()
+    print("✅ Feed health buffering tests passed")
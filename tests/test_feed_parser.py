@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test the streaming feed parser (utils/feed_parser.py).
+
+_extract_entries must produce the same entries whether a feed goes through
+parse_feed or feedparser, and parse_feed must hand anything it can't map
+exactly (scripts, DTDs, odd dates, broken XML) back to feedparser.
+"""
+
+import glob
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.feed_parser import parse_feed
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'performance', 'fixtures', 'feeds')
+
+RSS1 = b"""<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel rdf:about="https://rdf.example.org/"><title>RDF</title><link>https://rdf.example.org/</link></channel>
+  <item rdf:about="https://rdf.example.org/1">
+    <title> Curfew declared in Bamako </title>
+    <link>https://rdf.example.org/1</link>
+    <description>Authorities &amp; police announced a curfew.</description>
+    <dc:date>2025-03-03T08:00:00+01:00</dc:date>
+  </item>
+</rdf:RDF>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Atom</title>
+  <link rel="self" href="https://atom.example.org/feed.xml"/>
+  <link href="https://atom.example.org/"/>
+  <entry>
+    <title type="html">Flooding &lt;em&gt;closes&lt;/em&gt; border crossing</title>
+    <link rel="enclosure" href="https://atom.example.org/1.jpg"/>
+    <link rel="alternate" href="https://atom.example.org/1"/>
+    <content type="html">&lt;p&gt;Heavy rain closed the crossing.&lt;/p&gt;</content>
+    <updated>2025-03-03T10:00:00Z</updated>
+  </entry>
+</feed>"""
+
+RSS2 = b"""<?xml version="1.0" encoding="iso-8859-1"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/">
+  <channel>
+    <title>RSS</title><link>https://rss.example.org/</link>
+    <item>
+      <title>Caf\xe9 attack in Kabul</title>
+      <guid>https://rss.example.org/permalink/1</guid>
+      <content:encoded><![CDATA[<p>An attack on a caf\xe9 wounded six.</p>]]></content:encoded>
+      <dc:date>2025-03-03T07:00:00Z</dc:date>
+      <pubDate>Mon, 03 Mar 2025 09:30:00 +0300</pubDate>
+    </item>
+    <item>
+      <title>Undated item</title>
+      <guid isPermaLink="false">tag:rss.example.org,2025:2</guid>
+      <description>No link, no date.</description>
+    </item>
+  </channel>
+</rss>"""
+
+
+def _entries(data: bytes, fast: bool, content_type: str = ""):
+    from services import rss_processor as rp
+
+    with patch.object(rp, "RSS_FAST_PARSER", fast), patch.object(rp, "_now_utc", lambda: "now"):
+        return rp._extract_entries(data, "https://fallback.example/feed", content_type)
+
+
+def _assert_parity(data: bytes):
+    assert parse_feed(data) is not None
+    assert _entries(data, fast=True) == _entries(data, fast=False)
+
+
+def test_recorded_feeds_match_feedparser():
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.xml")))
+    assert paths
+    fast = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        fast += parse_feed(data) is not None
+        assert _entries(data, fast=True) == _entries(data, fast=False), path
+    assert fast >= 2
+
+
+def test_crafted_feeds_match_feedparser():
+    for data in (RSS1, ATOM, RSS2):
+        _assert_parity(data)
+
+    link, entries = parse_feed(RSS2)
+    assert link == "https://rss.example.org/"
+    assert entries[0]["link"] == "https://rss.example.org/permalink/1"
+    assert entries[0]["published_parsed"][:6] == (2025, 3, 3, 6, 30, 0)
+    assert entries[1]["link"] is None and entries[1]["published_parsed"] is None
+
+    link, entries = parse_feed(ATOM)
+    assert link == "https://atom.example.org/" and entries[0]["link"] == "https://atom.example.org/1"
+
+
+def test_unsupported_feeds_fall_back_to_feedparser():
+    script = RSS2.replace(b"wounded six.</p>", b"wounded six.</p><script>track()</script>")
+    entity = RSS2.replace(b"No link, no date.", b"No link&nbsp;no date.")
+    doctype = RSS2.replace(b"<rss ", b"<!DOCTYPE rss [<!ENTITY x \"y\">]>\n<rss ", 1)
+    bad_date = RSS2.replace(b"Mon, 03 Mar 2025 09:30:00 +0300", b"sometime last week")
+    xhtml = ATOM.replace(b'<content type="html">&lt;p&gt;Heavy rain closed the crossing.&lt;/p&gt;</content>',
+                         b'<content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">Rain</div></content>')
+    truncated = RSS2[:-40]
+    for data in (script, entity, doctype, bad_date, xhtml, truncated, b"", b"<html><body>Not a feed</body></html>"):
+        assert parse_feed(data) is None
+    assert parse_feed(RSS2.decode("iso-8859-1")) is None
+
+    # The feedparser path still yields entries for them
+    entries, _ = _entries(script, fast=True)
+    assert entries[0]["summary"] == "An attack on a café wounded six."
+
+
+def test_http_charset_is_honoured():
+    cp1251 = RSS2.replace(b' encoding="iso-8859-1"', b"").replace(
+        b"Caf\xe9 attack in Kabul", "Взрыв в Киеве".encode("cp1251"))
+    header = "application/rss+xml; charset=windows-1251"
+    assert parse_feed(cp1251, charset="windows-1251") is None
+    for fast in (True, False):
+        entries, _ = _entries(cp1251, fast=fast, content_type=header)
+        assert entries[0]["title"] == "Взрыв в Киеве"
+
+    # A header that agrees with the declaration keeps the fast path
+    assert parse_feed(RSS2, charset="ISO-8859-1") is not None
+    assert _entries(RSS2, fast=True, content_type="text/xml; charset=latin-1") == _entries(RSS2, fast=False)
+
+
+if __name__ == "__main__":
+    test_recorded_feeds_match_feedparser()
+    test_crafted_feeds_match_feedparser()
+    test_unsupported_feeds_fall_back_to_feedparser()
+    test_http_charset_is_honoured()
+    print("✅ Feed parser tests passed")
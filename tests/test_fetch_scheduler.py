@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test adaptive per-host fetch scheduling (services/fetch_scheduler.py) in RSS ingest.
+
+Hosts that throttle us must be slowed down (and honoured when they send
+Retry-After), dead hosts must stop costing every run a timeout per feed,
+per-host concurrency must stay capped, and feeds are fetched in
+KIND_PRIORITY order. Cooldowns and latency must carry over to the next
+(cron) process through feed_health.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.feed_health import FeedHealthBuffer
+from services.fetch_scheduler import FetchScheduler, parse_retry_after
+
+EMPTY_RSS = "<?xml version='1.0'?><rss><channel><title>t</title></channel></rss>"
+
+
+def test_rate_adapts_and_dead_hosts_cool_down():
+    sched = FetchScheduler(base_rate=1.0, max_rate=4.0, failure_threshold=3,
+                           backoff_base_s=60, backoff_max_s=600, default_timeout=20, min_timeout=2)
+    for _ in range(10):
+        sched.record("ok.example", 200.0, status=200)
+    assert sched.host("ok.example").rate == 4.0
+    assert sched.timeout_for("ok.example") == 2 and sched.timeout_for("new.example") == 20
+
+    sched.record("ok.example", 50.0, status=429, retry_after="30")
+    state = sched.host("ok.example")
+    assert state.rate == 2.0 and state.throttled == 1 and state.consecutive_failures == 0
+    assert sched.should_skip("ok.example") and 25 <= state.cooldown_until - time.time() <= 30
+
+    # 404 is the feed's problem, not the host's
+    sched.record("dead.example", 100.0, status=404)
+    assert sched.host("dead.example").rate == 1.0 and not sched.should_skip("dead.example")
+    sched.record("dead.example", 20000.0, status=None)
+    sched.record("dead.example", 20000.0, status=502)
+    assert not sched.should_skip("dead.example")
+    sched.record("dead.example", 20000.0, status=None)
+    assert sched.should_skip("dead.example")
+    assert 55 <= sched.host("dead.example").cooldown_until - time.time() <= 60
+    sched.record("dead.example", 20000.0, status=None)
+    assert sched.host("dead.example").cooldown_until - time.time() > 100
+
+    assert parse_retry_after("garbage") is None and parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_per_host_concurrency_and_pacing():
+    sched = FetchScheduler(base_rate=20.0, burst=1, max_per_host=2)
+    in_flight = {"now": 0, "peak": 0}
+
+    async def fetch():
+        async with sched.slot("a.example"):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.1)
+            in_flight["now"] -= 1
+
+    async def run():
+        sched.begin_run()
+        start = time.monotonic()
+        await asyncio.gather(*[fetch() for _ in range(6)])
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    assert in_flight["peak"] == 2
+    # 1 burst token + 5 paced at 20/s; concurrent callers must not overdraw the bucket
+    assert elapsed >= 0.2
+
+
+def test_ingest_orders_by_priority_and_skips_cooling_hosts():
+    from services import rss_processor as rp
+
+    fetched = []
+
+    def handler(request):
+        fetched.append(request.url.host)
+        if request.url.host == "busy.example":
+            return httpx.Response(429, headers={"Retry-After": "120"})
+        return httpx.Response(200, text=EMPTY_RSS)
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        kwargs.pop("limits", None)
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    specs = [
+        {"url": "https://fallback.example/rss", "kind": "unknown"},
+        {"url": "https://busy.example/rss", "kind": "global"},
+        {"url": "https://news.example/rss", "kind": "native"},
+    ]
+    sched = FetchScheduler(base_rate=100.0)
+
+    with patch.object(rp.httpx, "AsyncClient", client_factory), \
+         patch.object(rp, "FETCH_SCHEDULER", sched), \
+         patch.object(rp, "MAX_CONCURRENCY", 1), \
+         patch.object(rp, "get_feed_health_buffer", lambda: FeedHealthBuffer()):
+        asyncio.run(rp.ingest_feeds(specs, limit=10))
+        assert fetched[-1] == "fallback.example" and len(fetched) == 3
+        assert rp._should_skip_by_backoff("https://busy.example/other.xml")
+
+        fetched.clear()
+        asyncio.run(rp.ingest_feeds(specs, limit=10))
+        assert "busy.example" not in fetched and len(fetched) == 2
+
+    snap = sched.snapshot()
+    assert snap["busy.example"]["throttled"] == 1 and snap["busy.example"]["cooldown_s"] > 100
+    assert snap["news.example"]["ewma_ms"] is not None
+
+
+def test_host_state_survives_a_new_process():
+    from services import rss_processor as rp
+
+    fetched = []
+
+    def handler(request):
+        fetched.append(request.url.host)
+        if request.url.host == "busy.example":
+            return httpx.Response(429, headers={"Retry-After": "600"})
+        return httpx.Response(200, text=EMPTY_RSS)
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        kwargs.pop("limits", None)
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    specs = [{"url": "https://busy.example/rss", "kind": "global"},
+             {"url": "https://news.example/rss", "kind": "native"}]
+    persisted = []
+    stored = []
+
+    def run(sched):
+        with patch.object(rp.httpx, "AsyncClient", client_factory), \
+             patch.object(rp, "FETCH_SCHEDULER", sched), \
+             patch.object(rp, "_load_host_schedule", lambda: list(stored)), \
+             patch.object(rp, "get_feed_health_buffer", lambda: FeedHealthBuffer()), \
+             patch("utils.db_utils.update_host_schedule", lambda rows: persisted.extend(rows) or len(rows)):
+            asyncio.run(rp.ingest_feeds(specs, limit=10))
+
+    # Cron run 1 learns the cooldown and latency; they are written to feed_health
+    run(FetchScheduler(base_rate=100.0, default_timeout=20, min_timeout=1))
+    rows = {host: (ewma, until) for host, ewma, until in persisted}
+    assert rows["busy.example"][1] is not None and rows["news.example"][1] is None
+    assert rows["news.example"][0] is not None
+
+    # Cron run 2 is a fresh process seeded from feed_health
+    stored.extend({"host": host, "latency_ewma_ms": ewma, "backoff_until": until, "consecutive_fail": 0}
+                  for host, (ewma, until) in rows.items())
+    fetched.clear()
+    fresh = FetchScheduler(base_rate=100.0, default_timeout=20, min_timeout=1)
+    run(fresh)
+    assert fetched == ["news.example"]
+    assert fresh.snapshot()["busy.example"]["cooldown_s"] > 500
+    assert fresh.timeout_for("news.example") < 20
+
+
+if __name__ == "__main__":
+    test_rate_adapts_and_dead_hosts_cool_down()
+    test_per_host_concurrency_and_pacing()
+    test_ingest_orders_by_priority_and_skips_cooling_hosts()
+    test_host_state_survives_a_new_process()
+    print("✅ Fetch scheduler tests passed")
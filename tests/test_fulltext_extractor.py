@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test bounded-memory fulltext fetching (services/fulltext_extractor.py).
+
+Article downloads must stop reading at the byte cap, extraction must run in
+the worker pool (not on the event loop), and identical pages must be
+extracted once thanks to the content-hash cache.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.fulltext_extractor import FulltextExtractor, _extract_in_worker, fetch_capped
+
+PAGE = (b"<html><head><style>p{color:red}</style><script>var x = 1;</script></head>"
+        b"<body><p>Explosion reported near the port of Beirut.</p></body></html>")
+
+
+def _client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_download_stops_at_byte_cap():
+    produced = []
+
+    async def body():
+        for _ in range(100):
+            produced.append(1)
+            yield b"x" * 65536
+
+    def handler(request):
+        if request.url.path == "/report.pdf":
+            return httpx.Response(200, headers={"content-type": "application/pdf"}, content=body())
+        return httpx.Response(200, headers={"content-type": "text/html; charset=iso-8859-1"}, content=body())
+
+    async def run():
+        async with _client(handler) as client:
+            raw, charset = await fetch_capped(client, "https://x.example/a", 200_000, 5)
+            assert len(raw) == 200_000 and charset == "iso-8859-1"
+            assert len(produced) < 10
+            produced.clear()
+            assert await fetch_capped(client, "https://x.example/report.pdf", 200_000, 5) == (b"", None)
+            assert len(produced) == 0
+
+    asyncio.run(run())
+
+
+def test_identical_pages_extracted_once():
+    gate = threading.Event()
+    calls = []
+
+    def fake_extract(raw, charset, max_chars):
+        calls.append(raw)
+        gate.wait(5)
+        return raw.decode()[:max_chars]
+
+    extractor = FulltextExtractor(use_processes=False, extract_fn=fake_extract)
+
+    async def run():
+        first = asyncio.gather(*[extractor.extract(b"same page", None, 4) for _ in range(3)])
+        await asyncio.sleep(0.05)
+        gate.set()
+        assert await first == ["same"] * 3
+        assert await extractor.extract(b"same page", None, 4) == "same"
+        assert await extractor.extract(b"", None, 4) == ""
+
+    asyncio.run(run())
+    stats = extractor.stats()
+    assert len(calls) == 1 and stats["dedupe_inflight"] == 2 and stats["cache_hits"] == 1
+    assert stats["inflight"] == 0 and stats["cache_entries"] == 1
+    extractor.shutdown()
+
+
+def test_fulltext_extracted_in_process_pool():
+    text = _extract_in_worker(PAGE, "utf-8", 1000)
+    assert "Explosion reported near the port of Beirut." in text
+    assert "var x" not in text and "color:red" not in text
+
+    from services import rss_processor as rp
+
+    extractor = FulltextExtractor(max_workers=1)
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=PAGE)
+
+    async def run():
+        async with _client(handler) as client:
+            return await rp._fetch_article_fulltext(client, "https://x.example/story")
+
+    try:
+        with patch.object(rp, "RSS_USE_FULLTEXT", True), \
+             patch.object(rp, "get_fulltext_extractor", lambda: extractor):
+            assert asyncio.run(run()) == text
+    finally:
+        extractor.shutdown()
+    assert extractor.stats()["extracted"] == 1
+
+
+if __name__ == "__main__":
+    test_download_stops_at_byte_cap()
+    test_identical_pages_extracted_once()
+    test_fulltext_extracted_in_process_pool()
+    print("✅ Fulltext extractor tests passed")
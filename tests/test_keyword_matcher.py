@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the compiled keyword filter (utils/keyword_matcher.py) behind
+rss_processor._passes_keyword_filter.
+
+Matches must agree with the old per-keyword `\\b<kw>\\b` regex search, keep
+reporting base vs translated hits, and pick up edits to the keyword file.
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import keyword_matcher
+from utils.keyword_matcher import KeywordFilter, get_keyword_filter
+from utils.keywords_loader import KEYWORD_DATA
+
+SAMPLES = [
+    "PARIS: Shooting near government building\nPolice respond to gunfire downtown.",
+    "Cardinals win the game after a late hot shot",
+    "Массовая стрельба в Москве, убийство у вокзала",
+    "Tiroteo masivo en Bogotá deja tres heridos",
+    "Schüsse in Berlin: Polizei ermittelt wegen Mord",
+    "Ransomware_attack hits hospital; explosion reported at port",
+    "Coup attempt foiled as protesters clash with riot police",
+    "Weather update: sunny skies expected all weekend",
+]
+
+
+def _regex_matches(data, text_lower):
+    base = data["keywords"]
+    translated = [t for cat in data["translated"].values() for terms in cat.values() for t in terms]
+    return {k.lower() for k in set(base + translated)
+            if re.search(r"\b" + re.escape(k.lower()) + r"\b", text_lower)}
+
+
+def test_matches_agree_with_regex_search():
+    kw_filter = KeywordFilter(KEYWORD_DATA)
+    for text in SAMPLES:
+        text_lower = text.lower()
+        found = {payload[0].lower() for _s, _e, payload in kw_filter._automaton.iter_matches(text_lower)}
+        assert found == _regex_matches(KEYWORD_DATA, text_lower), text
+
+
+def test_match_type_and_word_boundaries():
+    data = {"keywords": ["shooting", "ot"], "translated": {"x": {"es": ["tiroteo"], "hi": ["हत्या"]}}}
+    kw_filter = KeywordFilter(data)
+    assert kw_filter.match("tiroteo y shooting en la plaza") == ("shooting", "base")
+    assert kw_filter.match("tiroteo en la plaza") == ("tiroteo", "translated")
+    assert kw_filter.match("a hotshot shot") is None
+    assert kw_filter.match("दिल्ली में हत्या की खबर") == ("हत्या", "translated")
+
+    from services.rss_processor import _passes_keyword_filter
+    with patch.object(keyword_matcher, "get_keyword_filter", lambda: kw_filter):
+        assert _passes_keyword_filter("Shooting near the embassy") == \
+            (True, {"keyword": "shooting", "match_type": "base", "rule": "direct"})
+        # Sentencing stories are not filtered out by the keyword pass
+        assert _passes_keyword_filter("Activist sentenced to 8 years in Belarus after shooting protest") == \
+            (True, {"keyword": "shooting", "match_type": "base", "rule": "direct"})
+        assert _passes_keyword_filter("Tiroteo: man sentenced to 5 years for tax fraud") == \
+            (True, {"keyword": "tiroteo", "match_type": "translated", "rule": "direct"})
+
+
+def test_filter_rebuilt_when_keyword_file_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "threat_keywords.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"keywords": ["explosion"], "translated": {}}, f)
+
+        with patch("utils.keywords_loader.find_keywords_file", lambda: path), \
+             patch("utils.keywords_loader.KEYWORD_DATA", {"keywords": ["explosion"], "translated": {}}), \
+             patch.object(keyword_matcher, "KEYWORD_FILTER_RELOAD_SECONDS", 0.01), \
+             patch.object(keyword_matcher, "_instance", None):
+            assert get_keyword_filter().match("roadblock on the highway") is None
+
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"keywords": ["explosion", "roadblock"], "translated": {}}, f)
+            os.utime(path, (time.time() + 5, time.time() + 5))
+            time.sleep(0.02)
+            assert get_keyword_filter().match("roadblock on the highway") == ("roadblock", "base")
+
+            # A broken edit keeps the last good filter
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{not json")
+            os.utime(path, (time.time() + 10, time.time() + 10))
+            time.sleep(0.02)
+            assert get_keyword_filter().match("roadblock on the highway") == ("roadblock", "base")
+
+
+if __name__ == "__main__":
+    test_matches_agree_with_regex_search()
+    test_match_type_and_word_boundaries()
+    test_filter_rebuilt_when_keyword_file_changes()
+    print("✅ Keyword matcher tests passed")
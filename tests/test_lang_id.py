@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the shared language identifier (utils/lang_id.py) and its use in RSS
+language gating and the threat scorer's script check.
+
+Short English headlines full of foreign names must stay "en" (langdetect
+sent them to da/de/nl, hence the old allowlist hack), other languages must
+be told apart within their script, and answers must not vary between calls.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import lang_id
+from utils.lang_id import detect, detect_many, dominant_script
+
+SAMPLES = {
+    "Hezbollah drone strike kills two in Nabatieh": "en",
+    "Danish police arrest man after Copenhagen stabbing": "en",
+    "Coup attempt in Niamey foiled, army says": "en",
+    "Tiroteo masivo en Bogotá deja tres heridos": "es",
+    "Fusillade à Marseille: deux morts dans un quartier nord": "fr",
+    "Schüsse in Berlin: Polizei ermittelt wegen Mordes": "de",
+    "Tiroteio em São Paulo deixa um morto": "pt",
+    "Atak nożownika w Warszawie": "pl",
+    "İstanbul'da patlama: iki ölü": "tr",
+    "Массовая стрельба в Москве, убийство у вокзала": "ru",
+    "Вибух у Києві: є загиблі": "uk",
+    "نقيب الأطباء في بيروت": "ar",
+    "انفجار در تهران چند کشته برجای گذاشت": "fa",
+    "दिल्ली में हत्या की खबर": "hi",
+    "大規模槍擊 事件": "zh",
+    "東京で爆発事件が発生しました": "ja",
+    "서울에서 폭발 사고": "ko",
+}
+
+
+def test_languages_identified_within_and_across_scripts():
+    for text, expected in SAMPLES.items():
+        assert detect(text) == expected, (text, detect(text))
+    assert dominant_script("Взрыв in Kyiv") == "latin"
+    assert detect("") == "en" and detect("12:45 — !!", default="und") == "und"
+
+
+SHORT_ENGLISH_TITLES = ["Kyiv under attack", "Hezbollah strikes near Nabatieh", "Protest in Lagos turns violent"]
+
+
+def test_short_latin_text_returns_default():
+    for title in SHORT_ENGLISH_TITLES:
+        assert detect(title) == "en", title
+    assert detect("Kyiv under attack", default="und") == "und"
+    # Short Telegram posts, tagged in batches
+    posts = ["Air raid alert", "Explosions heard in Kharkiv", "Breaking: drone strike near Odesa port",
+             "Bomba explode em Lisboa", "Взрыв в Москве"]
+    assert detect_many(posts) == ["en", "en", "en", "pt", "ru"]
+
+
+def test_detect_many_is_deterministic_and_cached():
+    texts = list(SAMPLES) * 3
+    lang_id._detect_normalized.cache_clear()
+    first = detect_many(texts)
+    assert first == [SAMPLES[t] for t in texts]
+    # Whitespace/case variants normalize to the same cache entry
+    assert detect_many([t.upper() + "  " for t in SAMPLES]) == list(SAMPLES.values())
+    stats = lang_id.stats()
+    assert stats["misses"] == len(SAMPLES) and stats["hits"] >= len(SAMPLES)
+    assert detect_many(texts) == first
+
+
+def test_rss_gating_uses_shared_detector():
+    from services import rss_processor as rp
+
+    def build(title):
+        entry = {"title": title, "summary": "", "link": f"http://example.com/{abs(hash(title))}"}
+        return asyncio.run(rp._build_alert_from_entry(entry, "http://example.com", None, "global"))
+
+    with patch.dict(os.environ, {"RSS_ALLOWED_LANGS": "en"}), \
+         patch.object(rp, "existing_raw_alert_uuids", lambda uuids: set()), \
+         patch.object(rp, "_passes_keyword_filter", lambda text: (True, {"keyword": "strike"})), \
+         patch.object(rp, "_should_use_moonshot_for_location", lambda *a: False), \
+         patch.object(rp, "_extract_location_fallback", lambda text, tag=None: {}):
+        kept = build("Hezbollah drone strike kills two in Nabatieh")
+        assert kept and kept["language"] == "en"
+        for title in SHORT_ENGLISH_TITLES:
+            kept = build(title)
+            assert kept and kept["language"] == "en", title
+        assert build("Tiroteo masivo en Bogotá deja tres heridos") is None
+
+
+def test_scorer_script_check_uses_shared_counts():
+    from services.threat_scorer import _detect_noise_content
+
+    assert _detect_noise_content("", title="نقيب الأطباء في بيروت") == (True, "non_english_arabic")
+    assert _detect_noise_content("", title="Взрыв в Москве") == (True, "non_english_cyrillic")
+
+
+if __name__ == "__main__":
+    test_languages_identified_within_and_across_scripts()
+    test_short_latin_text_returns_default()
+    test_detect_many_is_deterministic_and_cached()
+    test_rss_gating_uses_shared_detector()
+    test_scorer_script_check_uses_shared_counts()
+    print("✅ Language identification tests passed")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test normalized location keys (utils/location_keys.py) and the keyed chat
+retrieval query in fetch_alerts_from_db_strict_geo.
+
+The DB connection is faked: the query must filter on country_code /
+city_key / is_sports_noise equality instead of ILIKE patterns.
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import db_utils
+from utils.location_keys import alert_location_keys, city_key, country_code, is_sports_noise
+
+
+class FakeCursor:
+    def __init__(self, log, rows):
+        self.log = log
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.log.append((" ".join(query.split()), params))
+
+    def fetchall(self):
+        return self.rows
+
+
+def _fake_db(log, rows=()):
+    class FakeConn:
+        def cursor(self, cursor_factory=None):
+            return FakeCursor(log, [dict(r) for r in rows])
+
+    @contextmanager
+    def conn():
+        yield FakeConn()
+
+    return patch.object(db_utils, "_get_db_connection", conn)
+
+
+def test_country_codes_resolve_names_codes_and_aliases():
+    assert country_code("Nigeria") == "NG"
+    assert country_code(" nigeria ") == "NG"
+    assert country_code("NGA") == "NG"
+    assert country_code("Russia") == "RU"
+    assert country_code("UK") == "GB"
+    assert country_code("Türkiye") == "TR"
+    assert country_code("Middle East") is None
+    assert country_code(None) is None
+
+
+def test_city_keys_are_canonical():
+    assert city_key("São Paulo") == "sao-paulo"
+    assert city_key("  SAO PAULO ") == "sao-paulo"
+    assert city_key("Kiev") == city_key("Kyiv") == "kyiv"
+    assert city_key("") is None
+
+
+def test_sports_noise_flag_matches_old_filter_terms():
+    assert is_sports_noise("UCL final: Madrid win")
+    assert is_sports_noise("Hat-trick sends club through")
+    assert not is_sports_noise("Protest near embassy in Lagos")
+    # Word prefixes, minus the exception words
+    assert is_sports_noise("Champions League tie moved after unrest")
+    assert is_sports_noise("Championship decider postponed")
+    assert is_sports_noise("Footballer detained at airport")
+    assert is_sports_noise("Footballers evacuated from stadium")
+    assert is_sports_noise("Europa League draw")
+    assert not is_sports_noise("Nuclear plant shelled near Zaporizhzhia")
+    assert not is_sports_noise("Contract awarded for border wall")
+    assert not is_sports_noise("Minister championed the ceasefire")
+    assert not is_sports_noise("European Union extends sanctions")
+    assert alert_location_keys({"country": "Kenya", "city": "Nairobi", "title": "Curfew"}) == ("KE", "nairobi", False)
+
+
+def test_strict_geo_queries_on_indexed_keys():
+    log = []
+    with _fake_db(log, rows=[{"uuid": "a", "trend_direction": None}]):
+        rows = db_utils.fetch_alerts_from_db_strict_geo(country="Ukraine", city="Kiev", category="Terrorism", limit=5)
+        db_utils.fetch_alerts_from_db_strict_geo(region="Nigeria")
+        db_utils.fetch_alerts_from_db_strict_geo(region="Middle East")
+
+    (country_sql, country_params), (region_sql, region_params), (named_sql, named_params) = log
+    assert "NOT is_sports_noise AND country_code = %s AND city_key = %s AND category = %s" in country_sql
+    assert country_params == ("UA", "kyiv", "Terrorism", 5)
+    assert "ILIKE" not in country_sql
+    assert "(country_code = %s OR (region ILIKE %s AND country IS NOT NULL))" in region_sql
+    assert region_params == ("NG", "%Nigeria%", 20)
+    # Non-country regions keep the substring match ("Africa" covers "West Africa")
+    assert "(country ILIKE %s OR (region ILIKE %s AND country IS NOT NULL))" in named_sql
+    assert named_params == ("%Middle East%", "%Middle East%", 20)
+    assert rows[0]["trend_direction"] == "stable"
+
+
+if __name__ == "__main__":
+    test_country_codes_resolve_names_codes_and_aliases()
+    test_city_keys_are_canonical()
+    test_sports_noise_flag_matches_old_filter_terms()
+    test_strict_geo_queries_on_indexed_keys()
+    print("✅ Location key tests passed")
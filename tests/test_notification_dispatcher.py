@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test the shared notification queue (services/notification_dispatcher.py).
+
+Channels are faked or given fake HTTP sessions: a fan-out must be delivered
+in batches by the fixed worker pool, transient failures retried with
+backoff, and email sent as one Brevo request per sender, with a rejected
+request split until only the bad address fails.
+"""
+
+import json
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.notification_dispatcher import (
+    DELIVERED,
+    REJECTED,
+    RETRY,
+    EmailChannel,
+    Notification,
+    NotificationChannel,
+    NotificationDispatcher,
+)
+
+
+class FakeChannel(NotificationChannel):
+    name = "fake"
+    batch_size = 50
+
+    def __init__(self, outcomes=None):
+        self.batches = []
+        self.outcomes = outcomes or {}
+        self.lock = threading.Lock()
+
+    def _outcome(self, target):
+        # Outcomes are consumed in order; the last one repeats
+        seq = self.outcomes.get(target)
+        if not seq:
+            return DELIVERED
+        return seq.pop(0) if len(seq) > 1 else seq[0]
+
+    def send_batch(self, items):
+        with self.lock:
+            self.batches.append([item.target for item in items])
+        return [self._outcome(item.target) for item in items]
+
+
+def test_fanout_is_batched_on_fixed_workers():
+    channel = FakeChannel()
+    dispatcher = NotificationDispatcher(channels={"fake": channel}, workers=2)
+    threads_before = threading.active_count()
+
+    for i in range(500):
+        assert dispatcher.submit("fake", f"user{i}@example.com", {"n": i})
+    assert dispatcher.flush(timeout=10)
+
+    delivered = [target for batch in channel.batches for target in batch]
+    assert sorted(delivered) == sorted(f"user{i}@example.com" for i in range(500))
+    assert all(len(batch) <= 50 for batch in channel.batches)
+    assert len(channel.batches) < 500
+    # Two workers and one retry thread, however many notifications
+    assert threading.active_count() - threads_before <= 3
+
+    stats = dispatcher.stats()
+    assert stats["channels"]["fake"]["sent"] == 500
+    assert stats["outstanding"] == 0
+    dispatcher.shutdown()
+
+
+def test_transient_failures_are_retried_then_given_up():
+    channel = FakeChannel(outcomes={
+        "flaky": [RETRY, RETRY, DELIVERED],
+        "down": [RETRY],
+        "bad": [REJECTED],
+    })
+    dispatcher = NotificationDispatcher(channels={"fake": channel}, workers=1,
+                                        max_attempts=3, retry_base=0.01)
+    for target in ("flaky", "down", "bad"):
+        dispatcher.submit("fake", target, {})
+    assert dispatcher.flush(timeout=10)
+
+    attempts = [t for batch in channel.batches for t in batch]
+    assert attempts.count("flaky") == 3
+    assert attempts.count("down") == 3
+    assert attempts.count("bad") == 1
+    counts = dispatcher.stats()["channels"]["fake"]
+    assert counts["sent"] == 1
+    assert counts["failed"] == 2
+    assert counts["retried"] == 4
+    dispatcher.shutdown()
+
+
+def test_email_channel_sends_one_brevo_request_per_sender():
+    class FakeSession:
+        def __init__(self):
+            self.posts = []
+
+        def post(self, url, headers=None, data=None, timeout=None):
+            self.posts.append(json.loads(data))
+            return SimpleNamespace(status_code=201, text="")
+
+    config = SimpleNamespace(email=SimpleNamespace(
+        email_from="alerts@sentinel.test", email_from_name="Sentinel",
+        smtp_host="", smtp_user="", smtp_pass="", smtp_port=587, smtp_tls=True))
+    session = FakeSession()
+    channel = EmailChannel(config=config, brevo_api_key="key", session=session)
+    dispatcher = NotificationDispatcher(channels={"email": channel}, workers=1)
+
+    # Hold the worker until everything is queued so one pass sees the whole fan-out
+    gate = threading.Event()
+    send_batch = channel.send_batch
+    channel.send_batch = lambda items: (gate.wait(5), send_batch(items))[1]
+    for i in range(5):
+        dispatcher.submit("email", f"u{i}@example.com",
+                          {"subject": f"Alert {i}", "html_body": "<p>x</p>", "from_addr": None})
+    dispatcher.submit("email", "ops@example.com",
+                      {"subject": "Ops", "html_body": "<p>y</p>", "from_addr": "ops@sentinel.test"})
+    gate.set()
+    assert dispatcher.flush(timeout=10)
+
+    recipients = sorted(v["to"][0]["email"] for post in session.posts for v in post["messageVersions"])
+    assert recipients == sorted([f"u{i}@example.com" for i in range(5)] + ["ops@example.com"])
+    assert len(session.posts) <= 3  # first item alone, then one request per sender
+    assert dispatcher.stats()["channels"]["email"]["sent"] == 6
+    dispatcher.shutdown()
+
+
+def test_brevo_rejection_isolates_the_bad_address():
+    class FakeSession:
+        def __init__(self):
+            self.posts = 0
+
+        def post(self, url, headers=None, data=None, timeout=None):
+            self.posts += 1
+            emails = [v["to"][0]["email"] for v in json.loads(data)["messageVersions"]]
+            if "bad@example" in emails:
+                return SimpleNamespace(status_code=400, text="invalid email")
+            return SimpleNamespace(status_code=201, text="")
+
+    config = SimpleNamespace(email=SimpleNamespace(
+        email_from="alerts@sentinel.test", email_from_name="Sentinel",
+        smtp_host="", smtp_user="", smtp_pass="", smtp_port=587, smtp_tls=True))
+    session = FakeSession()
+    channel = EmailChannel(config=config, brevo_api_key="key", session=session)
+    items = [Notification("email", target, {"subject": "Alert", "html_body": "<p>x</p>", "from_addr": None})
+             for target in [f"u{i}@example.com" for i in range(7)] + ["bad@example"]]
+
+    outcomes = channel.send_batch(items)
+    assert outcomes == [DELIVERED] * 7 + [REJECTED]
+    assert session.posts < 2 * len(items)
+
+
+if __name__ == "__main__":
+    test_fanout_is_batched_on_fixed_workers()
+    test_transient_failures_are_retried_then_given_up()
+    test_email_channel_sends_one_brevo_request_per_sender()
+    test_brevo_rejection_isolates_the_bad_address()
+    print("✅ Notification dispatcher tests passed")
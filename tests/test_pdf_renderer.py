@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the off-request PDF render service (services/pdf/renderer.py).
+
+Runs the service on threads with a fake render function, so WeasyPrint and
+its system libraries are not needed: jobs complete and write their output,
+identical renders are deduped, and the queue bound is enforced.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pdf.renderer import PdfRenderQueueFull, PdfRenderService
+
+
+class FakeRender:
+    def __init__(self, gate=None, fail=False):
+        self.calls = []
+        self.gate = gate
+        self.fail = fail
+
+    def __call__(self, spec):
+        self.calls.append(spec)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("layout exploded")
+        return f"%PDF {spec['template']} {spec['context']['n']}".encode(), 12.5
+
+
+def _service(render, **kwargs):
+    return PdfRenderService(use_processes=False, render_fn=render, **kwargs)
+
+
+def test_job_renders_to_output_path():
+    render = FakeRender()
+    service = _service(render)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "sub", "report.pdf")
+        job_id = service.submit("threat_alert.html", {"n": 1}, output_path=out, job_id="abc")
+        status = service.wait(job_id, timeout=5)
+
+        assert job_id == "abc"
+        assert status["state"] == "done"
+        assert status["render_ms"] == 12.5
+        with open(out, "rb") as f:
+            assert f.read() == b"%PDF threat_alert.html 1"
+
+    stats = service.stats()
+    assert stats["rendered"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["render_ms_p50"] == 12.5
+    service.shutdown()
+
+
+def test_identical_renders_are_deduped():
+    gate = threading.Event()
+    render = FakeRender(gate=gate)
+    service = _service(render)
+    with tempfile.TemporaryDirectory() as tmp:
+        first = service.submit("t.html", {"n": 1}, output_path=os.path.join(tmp, "a.pdf"))
+        second = service.submit("t.html", {"n": 1}, output_path=os.path.join(tmp, "b.pdf"))
+        other = service.submit("t.html", {"n": 2}, output_path=os.path.join(tmp, "c.pdf"))
+        assert service.stats()["queue_depth"] == 2
+        gate.set()
+        for job_id in (first, second, other):
+            assert service.wait(job_id, timeout=5)["state"] == "done"
+
+        # Served from the result cache once rendered
+        cached = service.submit("t.html", {"n": 1}, output_path=os.path.join(tmp, "d.pdf"))
+        assert service.wait(cached, timeout=5)["deduped"] is True
+
+        assert len(render.calls) == 2
+        for name in "abd":
+            with open(os.path.join(tmp, f"{name}.pdf"), "rb") as f:
+                assert f.read() == b"%PDF t.html 1"
+
+    stats = service.stats()
+    assert stats["dedupe_inflight"] == 1
+    assert stats["dedupe_cache"] == 1
+    service.shutdown()
+
+
+def test_queue_bound_rejects_new_renders():
+    gate = threading.Event()
+    service = _service(FakeRender(gate=gate), max_queue=1)
+    service.submit("t.html", {"n": 1})
+
+    with pytest.raises(PdfRenderQueueFull):
+        service.submit("t.html", {"n": 2})
+    # An identical render joins the pending job instead of being rejected
+    service.submit("t.html", {"n": 1})
+
+    gate.set()
+    assert service.stats()["rejected"] == 1
+    service.shutdown()
+
+
+def test_failed_render_reports_and_calls_back():
+    done = []
+    service = _service(FakeRender(fail=True))
+    job_id = service.submit("t.html", {"n": 1}, on_done=done.append)
+    status = service.wait(job_id, timeout=5)
+
+    assert status["state"] == "failed"
+    assert "layout exploded" in status["error"]
+    assert [job.state for job in done] == ["failed"]
+    assert service.stats()["failed"] == 1
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    test_job_renders_to_output_path()
+    test_identical_renders_are_deduped()
+    test_queue_bound_rejects_new_renders()
+    test_failed_render_reports_and_calls_back()
+    print("✅ PDF renderer tests passed")
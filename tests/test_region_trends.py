@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the run-scoped region trend aggregator (services/region_trends.py).
+
+DB helpers are patched: a batch of alerts must produce one COUNT query over
+the distinct (location, category) pairs and one batched upsert, and a run()
+must defer both until it exits.
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.region_trends as rt
+
+
+class FakeTrendDB:
+    def __init__(self, counts):
+        self.counts = counts
+        self.count_calls = []
+        self.saved = []
+
+    def count(self, pairs, window_start, window_end):
+        self.count_calls.append(sorted(pairs, key=str))
+        return {p: self.counts.get(p, 0) for p in pairs}
+
+    def save(self, rows):
+        self.saved.append(rows)
+        return len(rows)
+
+    def patches(self):
+        return (patch.object(rt, "count_incidents_by_location_category", side_effect=self.count),
+                patch.object(rt, "save_region_trends_batch", side_effect=self.save))
+
+
+def test_flush_counts_distinct_pairs_once():
+    db = FakeTrendDB({("Kyiv", "Terrorism"): 7, ("Kyiv", "Civil Unrest"): 3, ("Lagos", None): 5})
+    agg = rt.RegionTrendAggregator()
+    for _ in range(10):
+        agg.add("Kyiv", "Terrorism")
+    agg.add("Kyiv", "Civil Unrest")
+    agg.add("Lagos", "")
+    agg.add(None, "Terrorism")
+
+    p1, p2 = db.patches()
+    with p1, p2:
+        written = agg.flush()
+        assert agg.flush() == 0
+
+    assert written == 2
+    assert db.count_calls == [[("Kyiv", "Civil Unrest"), ("Kyiv", "Terrorism"), ("Lagos", None)]]
+    rows = {r["city"]: r for r in db.saved[0]}
+    assert rows["Kyiv"]["incident_count"] == 10
+    assert rows["Kyiv"]["categories"] == ["Civil Unrest", "Terrorism"]
+    assert rows["Lagos"]["incident_count"] == 5
+
+
+def test_run_defers_flush_until_outermost_exit():
+    db = FakeTrendDB({})
+    agg = rt.RegionTrendAggregator()
+
+    p1, p2 = db.patches()
+    with p1, p2:
+        with agg.run():
+            agg.add("Kyiv", "Terrorism")
+            assert agg.flush_if_idle() == 0
+            with agg.run():
+                agg.add("Lagos", "Terrorism")
+            assert db.saved == []
+        assert len(db.saved) == 1
+        assert {r["city"] for r in db.saved[0]} == {"Kyiv", "Lagos"}
+
+
+def test_window_is_day_aligned():
+    start, end = rt.RegionTrendAggregator(window_days=365).window(datetime(2025, 3, 4, 15, 30))
+
+    assert end == datetime(2025, 3, 5)
+    assert (end - start).days == 365
+
+
+def test_stage_flushes_once_per_batch():
+    from services.enrichment_stages import EnrichmentContext, RegionTrendStage
+
+    db = FakeTrendDB({("Kyiv", "Terrorism"): 4})
+    stage = RegionTrendStage(aggregator=rt.RegionTrendAggregator())
+    alerts = [{"uuid": str(uuid.uuid4()), "city": "Kyiv", "category": "Terrorism"} for _ in range(10)]
+    contexts = [EnrichmentContext(a["uuid"], "", "", "", None, []) for a in alerts]
+
+    p1, p2 = db.patches()
+    with p1, p2:
+        stage.process_batch(alerts, contexts)
+
+    assert len(db.count_calls) == 1
+    assert len(db.saved) == 1
+    assert db.saved[0][0]["incident_count"] == 4
+
+
+if __name__ == "__main__":
+    test_flush_counts_distinct_pairs_once()
+    test_run_defers_flush_until_outermost_exit()
+    test_window_is_day_aligned()
+    test_stage_flushes_once_per_batch()
+    print("✅ Region trend aggregator tests passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the batched duplicate check in services/rss_processor.py.
+
+ingest_feeds must ask the database about a feed's entries with one
+`uuid = ANY(...)` query run off the event loop, skip entries that already
+exist, and build a story that appears twice in one run only once.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import rss_processor as rp
+
+
+def _entry(n):
+    return {"title": f"Explosion near embassy {n}", "summary": "Police cordon off the area.",
+            "link": f"http://example.com/{n}", "published": None}
+
+
+class FakeLookup:
+    """Stands in for db_utils.existing_raw_alert_uuids."""
+
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.calls = []
+        self.threads = []
+
+    def __call__(self, uuids):
+        self.calls.append(list(uuids))
+        self.threads.append(threading.current_thread())
+        return {u for u in uuids if u in self.existing}
+
+
+def _build_all(entries, lookup, seen):
+    async def go():
+        await seen.prefetch(rp._entry_uuid(e, "http://example.com") for e in entries)
+        return [await rp._build_alert_from_entry(e, "http://example.com", None, "global", seen=seen)
+                for e in entries]
+
+    with patch.object(rp, "existing_raw_alert_uuids", lookup), \
+         patch.object(rp, "_passes_keyword_filter", lambda text: (True, {"keyword": "explosion"})), \
+         patch.object(rp, "_should_use_moonshot_for_location", lambda *a: False), \
+         patch.object(rp, "_extract_location_fallback", lambda text, tag=None: {"city": None}):
+        return asyncio.run(go())
+
+
+def test_one_query_per_feed_and_existing_skipped():
+    entries = [_entry(n) for n in range(5)]
+    old_uuid = rp._entry_uuid(entries[1], "http://example.com")
+    lookup = FakeLookup(existing={old_uuid})
+
+    alerts = _build_all(entries, lookup, rp._SeenUuids())
+
+    assert len(lookup.calls) == 1 and len(lookup.calls[0]) == 5
+    assert lookup.threads[0] is not threading.main_thread()
+    assert alerts[1] is None
+    assert [a["link"] for a in alerts if a] == [e["link"] for i, e in enumerate(entries) if i != 1]
+
+
+def test_repeat_within_run_is_built_once():
+    seen = rp._SeenUuids()
+    lookup = FakeLookup()
+    first = _build_all([_entry(1), _entry(2)], lookup, seen)
+    # A second feed syndicating story 2: known uuids are not queried again
+    second = _build_all([_entry(2), _entry(3)], lookup, seen)
+
+    assert all(first)
+    assert second[0] is None and second[1] is not None
+    assert [len(c) for c in lookup.calls] == [2, 1]
+
+
+def test_without_seen_set_falls_back_to_single_lookup():
+    entry = _entry(7)
+    lookup = FakeLookup(existing={rp._entry_uuid(entry, "http://example.com")})
+
+    async def go():
+        return await rp._build_alert_from_entry(entry, "http://example.com", None, "global")
+
+    with patch.object(rp, "existing_raw_alert_uuids", lookup):
+        assert asyncio.run(go()) is None
+    assert lookup.calls == [[rp._entry_uuid(entry, "http://example.com")]]
+
+
+if __name__ == "__main__":
+    test_one_query_per_feed_and_existing_skipped()
+    test_repeat_within_run_is_built_once()
+    test_without_seen_set_falls_back_to_single_lookup()
+    print("✅ RSS duplicate check tests passed")
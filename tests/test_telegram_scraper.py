@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test incremental, parallel Telegram harvesting (utils/telegram_scraper.py).
+
+Runs must only request messages above the stored per-channel high-water
+mark, fetch channels concurrently, pause everyone on FloodWait, save in
+batches, and only advance marks for channels whose alerts were saved.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telethon.errors import FloodWaitError
+
+import utils.telegram_scraper as ts
+
+
+class FakeClient:
+    """Serves GetHistoryRequest pages (newest first, honouring min_id/offset_id) per channel."""
+
+    def __init__(self, channels, flood=None, delay=0.02):
+        self.channels = channels
+        self.flood = dict(flood or {})
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+
+    async def start(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def get_entity(self, ch):
+        return SimpleNamespace(username=ch.lstrip("@").lower())
+
+    async def __call__(self, req):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            name = req.peer.username
+            if self.flood.get(name):
+                raise FloodWaitError(request=None, capture=self.flood.pop(name))
+            self.requests.append((name, req.min_id, req.offset_id, req.limit))
+            ids = [i for i in sorted(self.channels[name], reverse=True)
+                   if i > req.min_id and (not req.offset_id or i < req.offset_id)]
+            now = datetime.now(timezone.utc)
+            return SimpleNamespace(messages=[
+                SimpleNamespace(id=i, message=f"{name} report {i}", date=now - timedelta(minutes=1))
+                for i in ids[:req.limit]
+            ])
+        finally:
+            self.active -= 1
+
+
+def _run(client, offsets, channels, save_result=len, write=True, **settings):
+    stored = []
+    saved = []
+
+    def save(batch):
+        saved.append(len(batch))
+        return save_result(batch)
+
+    with ExitStack() as stack:
+        enter = stack.enter_context
+        enter(patch.object(ts, "TELEGRAM_ENABLED", True))
+        enter(patch.object(ts, "_HAVE_TELETHON", True))
+        enter(patch.object(ts, "CONFIG", SimpleNamespace(telegram=SimpleNamespace(api_id="1", api_hash="h", session="s"))))
+        enter(patch.object(ts, "TelegramClient", lambda *args, **kwargs: client))
+        enter(patch.object(ts, "detect_many", lambda texts: ["en" for _ in texts]))
+        enter(patch.object(ts, "fetch_telegram_offsets",
+                           lambda: [{"channel": k, "last_message_id": v} for k, v in offsets.items()]))
+        enter(patch.object(ts, "upsert_telegram_offsets", lambda rows: stored.extend(rows) or len(rows)))
+        enter(patch.object(ts, "save_raw_alerts_to_db", save))
+        for name, value in settings.items():
+            enter(patch.object(ts, name, value))
+        result = asyncio.run(ts.ingest_telegram_channels_to_db(channels, limit=150, write_to_db=write))
+    return result, dict(stored), saved
+
+
+def test_only_new_messages_fetched_after_first_run():
+    client = FakeClient({"alpha": range(1, 251), "bravo": range(1, 41)})
+    result, stored, saved = _run(client, {}, ["@Alpha", "bravo"], SAVE_BATCH_SIZE=1000)
+    assert stored == {"alpha": 250, "bravo": 40}
+    assert result["count"] == 190 and result["fetched"] == 190 and saved == [190]
+    assert ("alpha", 0, 151, 50) in client.requests  # second page under the per-run cap
+
+    client.channels["alpha"] = range(1, 256)
+    client.requests.clear()
+    result, stored, _ = _run(client, {"alpha": 250, "bravo": 40}, ["alpha", "bravo"])
+    assert result["count"] == 5 and stored == {"alpha": 255}
+    assert sorted(client.requests) == [("alpha", 250, 0, 100), ("bravo", 40, 0, 100)]
+
+
+def test_channels_fetched_concurrently_and_saved_in_batches():
+    client = FakeClient({f"ch{i}": range(1, 31) for i in range(8)}, delay=0.05)
+    result, stored, saved = _run(client, {}, [f"ch{i}" for i in range(8)], CONCURRENCY=3, SAVE_BATCH_SIZE=60)
+    assert 1 < client.peak <= 3
+    assert result["count"] == 240 and sum(saved) == 240 and max(saved) < 240
+    assert len(stored) == 8
+
+
+def test_flood_wait_pauses_and_failures_keep_marks():
+    client = FakeClient({"alpha": range(1, 11), "charlie": range(1, 11)}, flood={"alpha": 1})
+    start = time.monotonic()
+    result, stored, _ = _run(client, {}, ["alpha", "charlie"], FLOOD_WAIT_MAX_S=5)
+    assert time.monotonic() - start >= 1
+    assert result["flood_waits"] == 1 and result["channels_failed"] == []
+    assert stored == {"alpha": 10, "charlie": 10}
+
+    # A wait above the cap gives up on the channel instead of sleeping through it
+    client = FakeClient({"bravo": range(1, 11)}, flood={"bravo": 3600})
+    result, stored, _ = _run(client, {}, ["bravo"], FLOOD_WAIT_MAX_S=5)
+    assert result["channels_failed"] == ["bravo"] and stored == {}
+
+    client = FakeClient({"alpha": range(1, 11), "bravo": range(1, 11)})
+    result, stored, _ = _run(client, {}, ["alpha", "bravo"], save_result=lambda batch: 0)
+    assert result["count"] == 0 and stored == {}
+
+    client = FakeClient({"alpha": range(1, 11)})
+    result, stored, _ = _run(client, {}, ["alpha"], write=False)
+    assert result["count"] == 10 and len(result["preview"]) == 3 and stored == {}
+
+
+if __name__ == "__main__":
+    test_only_new_messages_fetched_after_first_run()
+    test_channels_fetched_concurrently_and_saved_in_batches()
+    test_flood_wait_pauses_and_failures_keep_marks()
+    print("✅ Telegram scraper tests passed")
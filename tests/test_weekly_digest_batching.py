@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test shared-query weekly digest processing (utils/weekly_digest_scheduler.py).
+
+DB, email and the PDF pool are patched: schedules with equivalent filters
+must share one rollup, every subscriber still gets a render and an email,
+and schedule updates are written in batches.
+"""
+
+import os
+import sys
+from datetime import datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.weekly_digest_generator as gen
+import utils.weekly_digest_scheduler as sched
+from services.pdf.renderer import PdfRenderService
+
+
+def _schedule(schedule_id, filters):
+    return {"id": schedule_id, "user_id": 100 + schedule_id, "email": f"u{schedule_id}@example.com",
+            "timezone": "UTC", "hour": 6, "day_of_week": 0, "filters": filters,
+            "next_run": datetime(2025, 1, 6)}
+
+
+SCHEDULES = [
+    _schedule(1, {"countries": ["France", "Germany"]}),
+    _schedule(2, {"countries": ["Germany", "France", "France"], "severity": []}),
+    _schedule(3, '{"countries": ["Germany", "France"]}'),
+    _schedule(4, {"severity": ["high", "CRITICAL"]}),
+    _schedule(5, {"severity": ["CRITICAL", "HIGH"]}),
+    _schedule(6, {"categories": ["Cyber"]}),
+]
+
+
+def test_normalized_filter_keys():
+    keys = {sched.digest_filter_key(s["filters"]) for s in SCHEDULES}
+
+    assert len(keys) == 3
+    assert gen.normalize_digest_filters({"severity": ["high"], "countries": []}) == {"severity": ["HIGH"]}
+
+
+def test_rollup_is_one_query_per_filter_set():
+    calls = []
+    row = {"prev_count": 4, "alerts": [{"title": "A", "published_at": "2025-01-05T10:00:00"}],
+           "geo_breakdown": [{"country": "France", "total": 1}], "category_breakdown": []}
+
+    def fake_fetch_all(query, params):
+        calls.append(params)
+        return [row]
+
+    with patch.object(gen, "fetch_all", side_effect=fake_fetch_all):
+        rollup = gen.fetch_digest_rollup({"countries": ["Germany", "France"]},
+                                         datetime(2025, 1, 1), datetime(2025, 1, 8))
+
+    assert len(calls) == 1
+    assert calls[0]["countries"] == ["France", "Germany"]
+    assert rollup["prev_count"] == 4
+    assert rollup["alerts"][0]["published_at"] == datetime(2025, 1, 5, 10)
+
+
+def test_severity_filter_matches_title_case_labels():
+    # Stored labels are title-case (threat_scorer._label_from_score)
+    stored = [{"title": "Blast", "label": "Critical"}, {"title": "Fraud", "label": "Low"}]
+
+    def fake_fetch_all(query, params):
+        assert "upper(label) = ANY(%(severity)s)" in query
+        matched = [a for a in stored if a["label"].upper() in params["severity"]]
+        return [{"prev_count": 0, "geo_breakdown": [], "category_breakdown": [],
+                 "alerts": [{"title": a["title"], "severity": a["label"],
+                             "published_at": "2025-01-05T10:00:56.12"} for a in matched]}]
+
+    with patch.object(gen, "fetch_all", side_effect=fake_fetch_all):
+        rollup = gen.fetch_digest_rollup({"severity": ["critical"]}, datetime(2025, 1, 1), datetime(2025, 1, 8))
+
+    assert [a["title"] for a in rollup["alerts"]] == ["Blast"]
+    assert rollup["alerts"][0]["published_at"] == datetime(2025, 1, 5, 10, 0, 56, 120000)
+    data = gen.build_digest_template_data(rollup, "u@example.com", datetime(2025, 1, 1), datetime(2025, 1, 8))
+    assert data["summary"]["critical_count"] == 1
+
+
+def test_process_groups_schedules_by_filters():
+    rollups = []
+
+    def fake_rollup(filters, week_start, week_end):
+        rollups.append(filters)
+        alerts = [] if filters == {"categories": ["Cyber"]} else [{"title": "A", "severity": "HIGH"}]
+        return {"alerts": alerts, "prev_count": 0, "geo_breakdown": [], "category_breakdown": []}
+
+    renderer = PdfRenderService(use_processes=False, max_queue=2,
+                                render_fn=lambda spec: (b"%PDF", 1.0))
+    sent, exports, batches = [], [], []
+
+    with patch.object(sched, "fetch_all", return_value=SCHEDULES), \
+         patch.object(sched, "fetch_digest_rollup", side_effect=fake_rollup), \
+         patch.object(sched, "get_pdf_renderer", return_value=renderer), \
+         patch.object(gen, "get_pdf_renderer", return_value=renderer), \
+         patch.object(sched, "record_digest_exports", side_effect=exports.extend), \
+         patch.object(sched, "brevo_email_client", return_value=object()), \
+         patch.object(sched, "send_digest_email", side_effect=lambda **kw: sent.append(kw["email"]) or True), \
+         patch.object(sched, "execute_batch", side_effect=lambda q, rows: batches.append((q, rows))):
+        sched.process_weekly_digests()
+    renderer.shutdown()
+
+    assert len(rollups) == 3
+    assert sorted(sent) == [f"u{i}@example.com" for i in range(1, 6)]
+    assert sorted(user_id for _, user_id, _ in exports) == [101, 102, 103, 104, 105]
+    # One UPDATE batch for sent schedules, one for the empty group
+    updated = {tuple(sorted(r[1] for r in rows)) for _, rows in batches}
+    assert updated == {(1, 2, 3, 4, 5), (6,)}
+    for path in {p for _, _, p in exports}:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    test_normalized_filter_keys()
+    test_rollup_is_one_query_per_filter_set()
+    test_severity_filter_matches_title_case_labels()
+    test_process_groups_schedules_by_filters()
+    print("✅ Weekly digest batching tests passed")
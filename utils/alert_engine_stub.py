@@ -15,8 +15,8 @@ Integration points:
 
 from __future__ import annotations
 from typing import List, Dict, Any, Tuple
-import math
 import logging
+from utils.geo_utils import haversine_distance, within_radius
 from alert_rate_limiter import (
     is_alert_debounced,
     mark_alert_sent,
@@ -28,12 +28,7 @@ from alert_rate_limiter import (
 logger = logging.getLogger(__name__)
 
 def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    R = 6371.0
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1))*math.cos(math.radians(lat2))*math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
+    return haversine_distance(lat1, lon1, lat2, lon2)
 
 def evaluate_threats(
     threats: List[Dict[str, Any]], 
@@ -91,6 +86,14 @@ def evaluate_threats(
         'per_itinerary': {}
     }
     
+    # Threats with usable coordinates, as arrays for vectorized radius checks
+    located = [
+        t for t in threats
+        if t.get('latitude') is not None and t.get('longitude') is not None and t.get('id') is not None
+    ]
+    threat_lats = [float(t['latitude']) for t in located]
+    threat_lons = [float(t['longitude']) for t in located]
+    
     for itin in itineraries:
         itin_uuid = itin.get('itinerary_uuid')
         if not itin_uuid:
@@ -127,63 +130,61 @@ def evaluate_threats(
             if glat is None or glon is None or gid is None:
                 continue
                 
-            for threat in threats:
-                tlat = threat.get('latitude')
-                tlon = threat.get('longitude')
+            if not located:
+                continue
+            
+            nearby, distances = within_radius(glat, glon, threat_lats, threat_lons, radius)
+            for idx, dist in zip(nearby.tolist(), distances.tolist()):
+                threat = located[idx]
                 tid = threat.get('id')
-                if tlat is None or tlon is None or tid is None:
-                    continue
+                # Candidate alert (within geofence radius)
+                stats['total_candidates'] += 1
+                itin_stats['candidates'] += 1
                     
-                dist = _haversine_km(glat, glon, tlat, tlon)
-                if dist <= radius:
-                    # Candidate alert (within geofence radius)
-                    stats['total_candidates'] += 1
-                    itin_stats['candidates'] += 1
+                # Check debounce (has this exact alert been sent recently?)
+                if apply_debounce and is_alert_debounced(itin_uuid, gid, tid):
+                    stats['debounced'] += 1
+                    itin_stats['debounced'] += 1
+                    logger.debug(
+                        "[alert_engine] Debounced: itinerary=%s geofence=%s threat=%s", 
+                        itin_uuid, gid, tid
+                    )
+                    continue
                     
-                    # Check debounce (has this exact alert been sent recently?)
-                    if apply_debounce and is_alert_debounced(itin_uuid, gid, tid):
-                        stats['debounced'] += 1
-                        itin_stats['debounced'] += 1
-                        logger.debug(
-                            "[alert_engine] Debounced: itinerary=%s geofence=%s threat=%s", 
-                            itin_uuid, gid, tid
+                # Check rate limit (has itinerary exceeded 5 alerts/hour?)
+                if apply_rate_limiting:
+                    allowed, current_count, limit = check_rate_limit(itin_uuid)
+                    if not allowed:
+                        stats['rate_limited'] += 1
+                        itin_stats['rate_limited'] += 1
+                        logger.warning(
+                            "[alert_engine] Rate limited: itinerary=%s (count=%d/%d)", 
+                            itin_uuid, current_count, limit
                         )
                         continue
                     
-                    # Check rate limit (has itinerary exceeded 5 alerts/hour?)
-                    if apply_rate_limiting:
-                        allowed, current_count, limit = check_rate_limit(itin_uuid)
-                        if not allowed:
-                            stats['rate_limited'] += 1
-                            itin_stats['rate_limited'] += 1
-                            logger.warning(
-                                "[alert_engine] Rate limited: itinerary=%s (count=%d/%d)", 
-                                itin_uuid, current_count, limit
-                            )
-                            continue
+                # Alert allowed - add to results
+                alert_event = {
+                    'itinerary_uuid': itin_uuid,
+                    'geofence_id': gid,
+                    'distance_km': round(dist, 2),
+                    'channels': channels,
+                    'threat_ref': threat
+                }
+                alerts.append(alert_event)
+                stats['allowed'] += 1
+                itin_stats['allowed'] += 1
                     
-                    # Alert allowed - add to results
-                    alert_event = {
-                        'itinerary_uuid': itin_uuid,
-                        'geofence_id': gid,
-                        'distance_km': round(dist, 2),
-                        'channels': channels,
-                        'threat_ref': threat
-                    }
-                    alerts.append(alert_event)
-                    stats['allowed'] += 1
-                    itin_stats['allowed'] += 1
+                # Mark as sent (update debounce + rate limit)
+                if apply_debounce:
+                    mark_alert_sent(itin_uuid, gid, tid)
+                if apply_rate_limiting:
+                    increment_rate_limit(itin_uuid)
                     
-                    # Mark as sent (update debounce + rate limit)
-                    if apply_debounce:
-                        mark_alert_sent(itin_uuid, gid, tid)
-                    if apply_rate_limiting:
-                        increment_rate_limit(itin_uuid)
-                    
-                    logger.info(
-                        "[alert_engine] Alert allowed: itinerary=%s geofence=%s threat=%s distance=%.2fkm",
-                        itin_uuid, gid, tid, dist
-                    )
+                logger.info(
+                    "[alert_engine] Alert allowed: itinerary=%s geofence=%s threat=%s distance=%.2fkm",
+                    itin_uuid, gid, tid, dist
+                )
         
         # Store per-itinerary stats
         if itin_stats['candidates'] > 0:
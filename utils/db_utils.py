@@ -16,6 +16,8 @@ import psycopg2.extras
 from psycopg2 import pool
 from psycopg2.extras import execute_values, RealDictCursor, Json
 
+from utils.location_keys import alert_location_keys, city_key, country_code
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("db_utils")
 
@@ -439,6 +441,28 @@ def log_security_event(event_type: str, details: str) -> None:
 # RAW ALERTS (ingest side)
 # ---------------------------------------------------------------------
 
+def existing_raw_alert_uuids(uuids: List[str]) -> set:
+    """
+    Which of these uuids are already in raw_alerts (one indexed ANY() query).
+
+    Args:
+        uuids: Candidate alert uuids
+
+    Returns:
+        Set of uuids that already exist
+    """
+    unique = list({u for u in uuids if u})
+    if not unique:
+        return set()
+    start_time = time.time()
+    with _get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT uuid FROM raw_alerts WHERE uuid = ANY(%s)", (unique,))
+            found = {row[0] for row in cur.fetchall()}
+    _log_query_performance("SELECT uuid FROM raw_alerts WHERE uuid = ANY(%s)", (len(unique),),
+                           time.time() - start_time, len(found))
+    return found
+
 def save_raw_alerts_to_db(alerts: List[Dict[str, Any]]) -> int:
     """
     Bulk upsert raw alerts. Expected fields:
@@ -583,6 +607,192 @@ def save_raw_alerts_to_db(alerts: List[Dict[str, Any]]) -> int:
         logger.error("DB insert to raw_alerts failed: %s", e)
         return 0
 
+def upsert_feed_health(rows: List[tuple]) -> int:
+    """
+    Bulk upsert one ingest run's per-feed health into feed_health.
+
+    Each row is (feed_url, host, last_status, last_error, ok_count,
+    error_count, avg_latency_ms, trailing_failures) aggregated over the run;
+    counters and the running latency average are merged into the stored row.
+
+    Returns:
+        Number of feeds written (0 on failure)
+    """
+    if not rows:
+        return 0
+    sql = """
+    INSERT INTO feed_health (feed_url, host, last_status, last_error, last_ok, last_checked,
+                             ok_count, error_count, avg_latency_ms, consecutive_fail, backoff_until)
+    VALUES %s
+    ON CONFLICT (feed_url) DO UPDATE SET
+      host=EXCLUDED.host,
+      last_status=EXCLUDED.last_status,
+      last_error=EXCLUDED.last_error,
+      last_ok=COALESCE(EXCLUDED.last_ok, feed_health.last_ok),
+      last_checked=EXCLUDED.last_checked,
+      avg_latency_ms = CASE WHEN EXCLUDED.ok_count=0 THEN feed_health.avg_latency_ms
+                            WHEN COALESCE(feed_health.ok_count,0)=0 OR feed_health.avg_latency_ms IS NULL
+                                 THEN EXCLUDED.avg_latency_ms
+                            ELSE (feed_health.avg_latency_ms*feed_health.ok_count + EXCLUDED.avg_latency_ms*EXCLUDED.ok_count)
+                                 / (feed_health.ok_count+EXCLUDED.ok_count)
+                       END,
+      ok_count=COALESCE(feed_health.ok_count,0)+EXCLUDED.ok_count,
+      error_count=COALESCE(feed_health.error_count,0)+EXCLUDED.error_count,
+      consecutive_fail = CASE WHEN EXCLUDED.ok_count>0 THEN EXCLUDED.consecutive_fail
+                              ELSE COALESCE(feed_health.consecutive_fail,0)+EXCLUDED.consecutive_fail
+                         END
+    """
+    template = "(%s,%s,%s,%s,CASE WHEN %s>0 THEN NOW() END,NOW(),%s,%s,%s,%s,NULL)"
+    values = [
+        (url, host, status, error, ok_count, ok_count, error_count, avg_latency, trailing)
+        for url, host, status, error, ok_count, error_count, avg_latency, trailing in rows
+    ]
+    start_time = time.time()
+    try:
+        with _get_db_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, sql, values, template=template)
+        _log_query_performance("INSERT INTO feed_health ... ON CONFLICT", (f"{len(values)} feeds",),
+                               time.time() - start_time, len(values))
+        return len(values)
+    except Exception as e:
+        logger.error("feed_health upsert failed: %s", e)
+        return 0
+
+def fetch_host_schedule() -> List[Dict[str, Any]]:
+    """
+    Stored per-host fetch state for services/fetch_scheduler.py, aggregated
+    over each host's feeds.
+
+    Returns:
+        Rows with host, latency_ewma_ms, backoff_until and consecutive_fail
+    """
+    return fetch_all(
+        "SELECT host, MAX(host_latency_ewma_ms) AS latency_ewma_ms, MAX(backoff_until) AS backoff_until, "
+        "MIN(consecutive_fail) AS consecutive_fail "
+        "FROM feed_health WHERE host IS NOT NULL AND host <> '' GROUP BY host"
+    )
+
+def update_host_schedule(rows: List[tuple]) -> int:
+    """
+    Persist fetch_scheduler host state onto every feed_health row of the host.
+    The EWMA goes to host_latency_ewma_ms; the per-feed avg_latency_ms kept
+    by upsert_feed_health is left alone (migrations/migrate_host_schedule.sql).
+
+    Each row is (host, latency_ewma_ms, backoff_until); latency None keeps
+    the stored value, backoff_until None clears the cooldown.
+
+    Returns:
+        Number of hosts written (0 on failure)
+    """
+    if not rows:
+        return 0
+    sql = """
+    UPDATE feed_health AS f SET
+      host_latency_ewma_ms=COALESCE(v.ewma_ms, f.host_latency_ewma_ms),
+      backoff_until=v.backoff_until
+    FROM (VALUES %s) AS v(host, ewma_ms, backoff_until)
+    WHERE f.host = v.host
+    """
+    start_time = time.time()
+    try:
+        with _get_db_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, sql, rows, template="(%s, %s::double precision, %s::timestamp)")
+        _log_query_performance("UPDATE feed_health (host schedule) FROM VALUES", (f"{len(rows)} hosts",),
+                               time.time() - start_time, len(rows))
+        return len(rows)
+    except Exception as e:
+        logger.error("host schedule update failed: %s", e)
+        return 0
+
+def fetch_feed_cadence() -> List[Dict[str, Any]]:
+    """
+    Stored polling cadence for every feed (see services/feed_cadence.py).
+
+    Returns:
+        Rows with feed_url, newest_entry_at, mean_interval_s, empty_polls,
+        last_polled_at and next_due_at
+    """
+    return fetch_all(
+        "SELECT feed_url, newest_entry_at, mean_interval_s, empty_polls, last_polled_at, next_due_at "
+        "FROM feed_health"
+    )
+
+def upsert_feed_cadence(rows: List[tuple]) -> int:
+    """
+    Bulk upsert per-feed polling cadence into feed_health.
+
+    Each row is (feed_url, newest_entry_at, mean_interval_s, empty_polls,
+    last_polled_at, next_due_at); health counters are left untouched.
+
+    Returns:
+        Number of feeds written (0 on failure)
+    """
+    if not rows:
+        return 0
+    sql = """
+    INSERT INTO feed_health (feed_url, newest_entry_at, mean_interval_s, empty_polls, last_polled_at, next_due_at)
+    VALUES %s
+    ON CONFLICT (feed_url) DO UPDATE SET
+      newest_entry_at=EXCLUDED.newest_entry_at,
+      mean_interval_s=EXCLUDED.mean_interval_s,
+      empty_polls=EXCLUDED.empty_polls,
+      last_polled_at=EXCLUDED.last_polled_at,
+      next_due_at=EXCLUDED.next_due_at
+    """
+    start_time = time.time()
+    try:
+        with _get_db_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, sql, rows)
+        _log_query_performance("INSERT INTO feed_health (cadence) ... ON CONFLICT", (f"{len(rows)} feeds",),
+                               time.time() - start_time, len(rows))
+        return len(rows)
+    except Exception as e:
+        logger.error("feed cadence upsert failed: %s", e)
+        return 0
+
+def fetch_telegram_offsets() -> List[Dict[str, Any]]:
+    """
+    Per-channel Telegram high-water marks (see utils/telegram_scraper.py).
+
+    Returns:
+        Rows with channel and last_message_id
+    """
+    return fetch_all("SELECT channel, last_message_id FROM telegram_channel_offsets")
+
+def upsert_telegram_offsets(rows: List[tuple]) -> int:
+    """
+    Bulk upsert Telegram high-water marks; a stored mark never moves backwards.
+
+    Each row is (channel, last_message_id).
+
+    Returns:
+        Number of channels written (0 on failure)
+    """
+    if not rows:
+        return 0
+    sql = """
+    INSERT INTO telegram_channel_offsets (channel, last_message_id, updated_at)
+    VALUES %s
+    ON CONFLICT (channel) DO UPDATE SET
+      last_message_id=GREATEST(telegram_channel_offsets.last_message_id, EXCLUDED.last_message_id),
+      updated_at=EXCLUDED.updated_at
+    """
+    now = datetime.utcnow()
+    start_time = time.time()
+    try:
+        with _get_db_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, sql, [(channel, int(last_id), now) for channel, last_id in rows])
+        _log_query_performance("INSERT INTO telegram_channel_offsets ... ON CONFLICT", (f"{len(rows)} channels",),
+                               time.time() - start_time, len(rows))
+        return len(rows)
+    except Exception as e:
+        logger.error("telegram offsets upsert failed: %s", e)
+        return 0
+
 # Allowed languages for processing (English and Arabic for Middle East coverage)
 ALLOWED_LANGUAGES = {'en', 'English', '', None}
 
@@ -685,7 +895,8 @@ def save_alerts_to_db(alerts: List[Dict[str, Any]]) -> int:
         "reports_analyzed","sources","cluster_id",
         "latitude","longitude","location_method","location_confidence","location_sharing",
         "source_kind","source_tag","threat_score_components",
-        "embedding"
+        "embedding",
+        "country_code","city_key","is_sports_noise"
     ]
 
     def _json(v):
@@ -819,6 +1030,7 @@ def save_alerts_to_db(alerts: List[Dict[str, Any]]) -> int:
             a.get("source_tag") or '',
             _json(a.get("threat_score_components")),  # JSONB
             pgvector_embedding,   # REAL[1536] pgvector-compatible array
+            *alert_location_keys(a),  # country_code, city_key, is_sports_noise
         )
 
     rows = [_coerce_row(a) for a in alerts]
@@ -888,7 +1100,10 @@ def save_alerts_to_db(alerts: List[Dict[str, Any]]) -> int:
         source_kind = EXCLUDED.source_kind,
         source_tag = EXCLUDED.source_tag,
         threat_score_components = EXCLUDED.threat_score_components,
-        embedding = EXCLUDED.embedding
+        embedding = EXCLUDED.embedding,
+        country_code = EXCLUDED.country_code,
+        city_key = EXCLUDED.city_key,
+        is_sports_noise = EXCLUDED.is_sports_noise
     """
     try:
         with _get_db_connection() as conn:
@@ -976,38 +1191,53 @@ def fetch_alerts_from_db_strict_geo(
     """
     Enhanced version with strict geographic filtering to prevent cross-contamination.
     Only returns alerts where the primary location fields match the query.
+
+    Locations are normalized with utils.location_keys and matched on the
+    country_code / city_key columns written at ingest, so the query is an
+    index range scan on (key, published DESC) that skips is_sports_noise
+    rows. Region keeps its substring match, served by a trigram index
+    (migrations/008_alerts_location_keys.sql).
     """
-    where = []
+    where = ["NOT is_sports_noise"]
     params: List[Any] = []
 
+    def _match_country(name: str) -> None:
+        code = country_code(name)
+        if code:
+            where.append("country_code = %s")
+            params.append(code)
+        else:
+            # Unrecognized name: nothing to key on, keep the old substring match
+            where.append("country ILIKE %s")
+            params.append(f"%{name}%")
+
     # Build WHERE conditions with priority logic
     # When country and city are specified, prioritize them over region
     if country and city:
-        where.append("country ILIKE %s AND city ILIKE %s")
-        params.extend([f"%{country}%", f"%{city}%"])
+        _match_country(country)
+        where.append("city_key = %s")
+        params.append(city_key(city))
     elif country:
-        where.append("country ILIKE %s")
-        params.append(f"%{country}%")
+        _match_country(country)
     elif region:
-        # More precise matching - check if it's a country name first
-        where.append("(country ILIKE %s OR (region ILIKE %s AND country IS NOT NULL))")
-        params.extend([f"%{region}%", f"%{region}%"])
+        # Region stays a substring match ("Africa" covers "West Africa"); a region
+        # that names a country also matches that country's key
+        code = country_code(region)
+        if code:
+            where.append("(country_code = %s OR (region ILIKE %s AND country IS NOT NULL))")
+            params.extend([code, f"%{region}%"])
+        else:
+            where.append("(country ILIKE %s OR (region ILIKE %s AND country IS NOT NULL))")
+            params.extend([f"%{region}%", f"%{region}%"])
     elif city:
-        where.append("city ILIKE %s")
-        params.append(f"%{city}%")
+        where.append("city_key = %s")
+        params.append(city_key(city))
     
     if category:
         where.append("category = %s")
         params.append(category)
 
-    # Add relevance filter to exclude obvious sports/entertainment
-    # ✅ SAFE: Proper parameterized query construction
-    sports_terms = ['football', 'soccer', 'champion', 'award', 'hat-trick', 'hatrrick', 'UCL', 'europa']
-    for term in sports_terms:
-        where.append("title NOT ILIKE %s")
-        params.append(f"%{term}%")
-
-    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    where_sql = f"WHERE {' AND '.join(where)}"
     # Optimized query - select only essential fields for faster chat responses
     q = f"""
       SELECT uuid, title, summary, gpt_summary, link, source, published,
@@ -1023,69 +1253,75 @@ def fetch_alerts_from_db_strict_geo(
     """
     params.append(limit)
     
+    start = time.perf_counter()
     with _get_db_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(q, tuple(params))
             rows = cur.fetchall()
+    _log_query_performance(q, tuple(params), time.perf_counter() - start, len(rows))
             
-            # Supply safe defaults for missing keys
-            for r in rows:
-                if r.get("incident_count_30d") is None:
-                    r["incident_count_30d"] = 0
-                if r.get("recent_count_7d") is None:
-                    r["recent_count_7d"] = 0
-                if r.get("baseline_avg_7d") is None:
-                    r["baseline_avg_7d"] = 0
-                if r.get("baseline_ratio") is None:
-                    r["baseline_ratio"] = 1.0
-                if r.get("trend_direction") is None:
-                    r["trend_direction"] = "stable"
-                    
-            # Enhanced post-query geographic relevance filtering
-            if (region or country or city) and rows:
-                filtered_rows = []
-                
-                for row in rows:
-                    row_country = (row.get("country") or "").lower()
-                    row_city = (row.get("city") or "").lower()
-                    row_region = (row.get("region") or "").lower()
-                    row_source = (row.get("source") or "").lower()
-                    
-                    is_relevant = False
-                    
-                    # Exact country match has highest priority
-                    if country and country.lower() in row_country:
-                        is_relevant = True
-                    
-                    # City match (if specified)
-                    elif city and city.lower() in row_city:
-                        is_relevant = True
-                    
-                    # Region-based matching (fallback)
-                    elif region:
-                        region_lower = region.lower()
-                        is_relevant = (
-                            region_lower in row_country or
-                            region_lower in row_city or
-                            region_lower in row_region or
-                            # Source geography check (e.g., Nigerian source for Nigeria query)
-                            (region_lower in row_source and row_country and region_lower in row_country)
-                        )
-                    
-                    # If no geographic filters specified, include all
-                    elif not region and not country and not city:
-                        is_relevant = True
-                    
-                    if is_relevant:
-                        filtered_rows.append(row)
-                
-                # Log filtering results for debugging
-                if len(filtered_rows) != len(rows):
-                    logger.info(f"Geographic filtering: {len(rows)} → {len(filtered_rows)} alerts (region={region}, country={country}, city={city})")
-                        
-                return filtered_rows
-                    
-            return rows
+    # Supply safe defaults for missing keys
+    for r in rows:
+        if r.get("incident_count_30d") is None:
+            r["incident_count_30d"] = 0
+        if r.get("recent_count_7d") is None:
+            r["recent_count_7d"] = 0
+        if r.get("baseline_avg_7d") is None:
+            r["baseline_avg_7d"] = 0
+        if r.get("baseline_ratio") is None:
+            r["baseline_ratio"] = 1.0
+        if r.get("trend_direction") is None:
+            r["trend_direction"] = "stable"
+    return rows
+
+def backfill_alert_location_keys(batch_size: int = 5000) -> int:
+    """
+    Fill country_code / city_key / is_sports_noise on alerts written before
+    migration 008. Runs in batches until no row is missing its keys.
+
+    Returns:
+        Number of alerts updated
+    """
+    total = 0
+    last_uuid = ""
+    while True:
+        # Keyset pagination: rows whose country cannot be resolved stay NULL
+        rows = fetch_all(
+            """
+            SELECT uuid::text AS uuid, country, city, title FROM alerts
+            WHERE uuid > %s
+              AND ((country_code IS NULL AND country IS NOT NULL AND country <> '')
+                   OR (city_key IS NULL AND city IS NOT NULL AND city <> ''))
+            ORDER BY uuid
+            LIMIT %s
+            """,
+            (last_uuid, batch_size),
+        )
+        if not rows:
+            return total
+        last_uuid = rows[-1]["uuid"]
+        values = []
+        for r in rows:
+            code, key, noise = alert_location_keys(r)
+            values.append((r["uuid"], code or "", key or "", noise))
+        with _get_db_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    UPDATE alerts a
+                       SET country_code = NULLIF(v.country_code, ''),
+                           city_key = NULLIF(v.city_key, ''),
+                           is_sports_noise = v.is_sports_noise
+                      FROM (VALUES %s) AS v(uuid, country_code, city_key, is_sports_noise)
+                     WHERE a.uuid::text = v.uuid::text
+                    """,
+                    values,
+                )
+        total += len(values)
+        logger.info(f"Backfilled location keys for {total} alerts")
+        if len(rows) < batch_size:
+            return total
 
 def fetch_alerts_by_location_fuzzy(
     city: Optional[str] = None,
@@ -1251,6 +1487,9 @@ def fetch_past_incidents(
 # Region trend (optional helper; safe if table missing)
 # ---------------------------------------------------------------------
 
+# Matches the unique index from migrations/007_region_trends_window_key.sql
+_REGION_TREND_CONFLICT = "((COALESCE(region, '')), (COALESCE(city, '')), window_start, window_end)"
+
 def save_region_trend(
     region: Optional[str],
     city: Optional[str],
@@ -1272,12 +1511,14 @@ def save_region_trend(
         updated_at timestamp default now(),
         PRIMARY KEY (region, city, window_start, window_end)
       );
+    The conflict target matches the unique index from
+    migrations/007_region_trends_window_key.sql.
     """
     try:
-        sql = """
+        sql = f"""
         INSERT INTO region_trends (region, city, window_start, window_end, incident_count, categories, updated_at)
         VALUES (%s,%s,%s,%s,%s,%s,NOW())
-        ON CONFLICT (region, city, window_start, window_end) DO UPDATE SET
+        ON CONFLICT {_REGION_TREND_CONFLICT} DO UPDATE SET
             incident_count = EXCLUDED.incident_count,
             categories = EXCLUDED.categories,
             updated_at = NOW()
@@ -1289,6 +1530,87 @@ def save_region_trend(
     except Exception as e:
         logger.info("save_region_trend skipped (table may not exist): %s", e)
 
+def count_incidents_by_location_category(
+    pairs: List[Tuple[Optional[str], Optional[str]]],
+    window_start: datetime,
+    window_end: datetime,
+) -> Dict[Tuple[Optional[str], Optional[str]], int]:
+    """
+    Count alerts in [window_start, window_end) for many (location, category)
+    pairs in one query. Location matches region, city or country as in
+    fetch_past_incidents; a None category counts every category.
+    Returns {pair: count}; pairs with no location are skipped.
+    """
+    pairs = list(dict.fromkeys(p for p in pairs if p[0]))
+    if not pairs:
+        return {}
+
+    query = """
+        SELECT v.loc, v.cat, COUNT(a.uuid)
+        FROM (VALUES %s) AS v(loc, cat, window_start, window_end)
+        LEFT JOIN alerts a
+          ON a.published >= v.window_start AND a.published < v.window_end
+         AND (a.region = v.loc OR a.city = v.loc OR a.country = v.loc)
+         AND (v.cat IS NULL OR a.category = v.cat)
+        GROUP BY v.loc, v.cat
+    """
+    rows = [(loc, cat, window_start, window_end) for loc, cat in pairs]
+    start_time = time.time()
+    try:
+        with _get_db_connection() as conn:
+            with conn.cursor() as cur:
+                result = execute_values(
+                    cur, query, rows,
+                    template="(%s::text, %s::text, %s::timestamp, %s::timestamp)",
+                    page_size=len(rows), fetch=True,
+                )
+        duration = time.time() - start_time
+        _log_db_operation("EXECUTE_VALUES", query, (f"{len(rows)} pairs",), duration, len(result))
+        _log_query_performance(query, (f"{len(rows)} pairs",), duration, len(result))
+    except Exception as e:
+        duration = time.time() - start_time
+        _log_db_operation("EXECUTE_VALUES", query, (f"{len(rows)} pairs",), duration, error=e)
+        raise
+    return {(loc, cat): int(count) for loc, cat, count in result}
+
+def save_region_trends_batch(rows: List[Dict[str, Any]]) -> int:
+    """
+    Upsert many region trend rows with one INSERT ... VALUES statement.
+    Each row has region, city, window_start, window_end, incident_count and
+    categories. Rows sharing a key are merged (last one wins) since a single
+    ON CONFLICT statement cannot update the same row twice.
+    Returns the number of rows written (0 if the table is missing).
+    """
+    merged: Dict[Tuple, tuple] = {}
+    for r in rows:
+        key = (r.get("region") or "", r.get("city") or "", r["window_start"], r["window_end"])
+        merged[key] = (
+            r.get("region"), r.get("city"), r["window_start"], r["window_end"],
+            _coerce_numeric(r.get("incident_count"), 0, 0, None), r.get("categories") or [],
+        )
+    if not merged:
+        return 0
+
+    sql = f"""
+        INSERT INTO region_trends (region, city, window_start, window_end, incident_count, categories, updated_at)
+        VALUES %s
+        ON CONFLICT {_REGION_TREND_CONFLICT} DO UPDATE SET
+            incident_count = EXCLUDED.incident_count,
+            categories = EXCLUDED.categories,
+            updated_at = NOW()
+    """
+    values = list(merged.values())
+    try:
+        with _get_db_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, sql, values,
+                               template="(%s, %s, %s, %s, %s, %s::text[], NOW())",
+                               page_size=len(values))
+        return len(values)
+    except Exception as e:
+        logger.info("save_region_trends_batch skipped (table may not exist): %s", e)
+        return 0
+
 # ---------------------------------------------------------------------
 # Standalone Embedding Functions
 # ---------------------------------------------------------------------
@@ -1336,6 +1658,52 @@ def store_alert_embedding(alert_uuid: str, embedding: List[float]) -> bool:
         return False
 
 
+def store_alert_embeddings_bulk(items: List[Tuple[str, List[float]]]) -> int:
+    """
+    Store embeddings for many alerts with a single UPDATE ... FROM (VALUES ...).
+    
+    Args:
+        items: (alert_uuid, embedding) pairs; embeddings are padded/truncated
+               to 1536 dimensions like store_alert_embedding
+        
+    Returns:
+        Number of alert rows updated
+    """
+    rows = []
+    for alert_uuid, embedding in items:
+        if not embedding or not isinstance(embedding, list):
+            logger.warning(f"Invalid embedding format for alert {alert_uuid}")
+            continue
+        if len(embedding) < 1536:
+            embedding = embedding + [0.0] * (1536 - len(embedding))
+        rows.append((alert_uuid, embedding[:1536]))
+    
+    if not rows:
+        return 0
+    
+    query = """
+        UPDATE alerts AS a
+        SET embedding = v.embedding
+        FROM (VALUES %s) AS v(uuid, embedding)
+        WHERE a.uuid = v.uuid
+    """
+    start_time = time.time()
+    try:
+        with _get_db_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, query, rows, template="(%s, %s::real[])", page_size=len(rows))
+                updated = cur.rowcount
+        duration = time.time() - start_time
+        _log_db_operation("EXECUTE_VALUES", query, (f"{len(rows)} rows",), duration, updated)
+        _log_query_performance(query, (f"{len(rows)} rows",), duration, updated)
+        return updated
+    except Exception as e:
+        duration = time.time() - start_time
+        _log_db_operation("EXECUTE_VALUES", query, (f"{len(rows)} rows",), duration, error=e)
+        logger.error(f"Bulk embedding store failed for {len(rows)} alerts: {e}")
+        return 0
+
+
 def upsert_alert_embedding(alert_uuid: str, embedding: List[float]) -> bool:
     """
     Upsert embedding for an alert (insert alert if it doesn't exist).
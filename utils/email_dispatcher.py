@@ -1,12 +1,7 @@
 # email_dispatcher.py — paid-only, unmetered • v2025-08-13
 from __future__ import annotations
 import os
-import smtplib
 import logging
-import json
-import socket
-import threading
-from email.mime.text import MIMEText
 from typing import Optional, List, Dict
 from core.config import CONFIG
 
@@ -22,83 +17,29 @@ except Exception:
     def _is_paid(_email: str) -> bool:
         return False
 
-def send_email(user_email: str, to_addr: str, subject: str, html_body: str, from_addr: Optional[str] = None) -> bool:
-    """
-    Paid-only, opt-in email. Unmetered. First try Brevo; fallback to SMTP.
-    Runs in background thread to prevent blocking.
-    """
+def _email_allowed(user_email: str) -> bool:
     if not _is_paid(user_email):
         logger.debug("email dispatch denied: user not on paid plan (%s)", user_email)
         return False
     if not EMAIL_PUSH_ENABLED:
         logger.debug("email dispatch disabled via env")
         return False
+    return True
 
-    def _send_async():
-        # Prefer Brevo transactional API
-        if BREVO_API_KEY:
-            try:
-                import requests
-                sender_email = from_addr or CONFIG.email.email_from or "no-reply@sentinel.local"
-                payload = {
-                    "sender": {"email": sender_email, "name": CONFIG.email.email_from_name or "Sentinel"},
-                    "to": [{"email": to_addr}],
-                    "subject": subject,
-                    "htmlContent": html_body,
-                }
-                resp = requests.post(
-                    "https://api.brevo.com/v3/smtp/email",
-                    headers={
-                        "api-key": BREVO_API_KEY,
-                        "accept": "application/json",
-                        "content-type": "application/json",
-                    },
-                    data=json.dumps(payload),
-                    timeout=20,
-                )
-                if 200 <= resp.status_code < 300:
-                    logger.debug("Brevo email sent successfully to %s", to_addr)
-                    return
-                logger.warning("Brevo send failed: %s %s", resp.status_code, resp.text[:300])
-            except Exception as e:
-                logger.error("Brevo send_email error: %s", e)
-
-        # Fallback to SMTP if configured
-        host = CONFIG.email.smtp_host
-        port = CONFIG.email.smtp_port
-        user = CONFIG.email.smtp_user
-        pwd  = CONFIG.email.smtp_pass
-        use_tls = CONFIG.email.smtp_tls
-        _from_addr = from_addr or CONFIG.email.email_from or user or "no-reply@sentinel.local"
-
-        if not host or not user or not pwd:
-            logger.warning("SMTP creds missing; skipping email dispatch")
-            return
-
-        try:
-            msg = MIMEText(html_body, "html", "utf-8")
-            msg["Subject"] = subject
-            msg["From"] = _from_addr
-            msg["To"] = to_addr
+def _queue_email(to_addr: str, subject: str, html_body: str, from_addr: Optional[str]) -> bool:
+    from services.notification_dispatcher import get_notification_dispatcher
+    return get_notification_dispatcher().submit(
+        "email", to_addr, {"subject": subject, "html_body": html_body, "from_addr": from_addr}
+    )
 
-            # Create socket with timeout BEFORE SMTP connection
-            sock = socket.create_connection((host, port), timeout=10)
-            with smtplib.SMTP(host, port, timeout=15) as s:
-                s.sock = sock
-                if use_tls:
-                    s.starttls()
-                s.login(user, pwd)
-                s.sendmail(_from_addr, [to_addr], msg.as_string())
-            logger.debug("SMTP email sent successfully to %s", to_addr)
-        except socket.timeout:
-            logger.warning("SMTP connection timeout to %s:%s", host, port)
-        except Exception as e:
-            logger.error("SMTP send_email failed: %s", e)
-
-    # Send in background thread to prevent blocking
-    thread = threading.Thread(target=_send_async, daemon=True)
-    thread.start()
-    return True  # Return immediately after spawning thread
+def send_email(user_email: str, to_addr: str, subject: str, html_body: str, from_addr: Optional[str] = None) -> bool:
+    """
+    Paid-only, opt-in email. Unmetered. First try Brevo; fallback to SMTP.
+    Queued on the shared notification dispatcher to prevent blocking.
+    """
+    if not _email_allowed(user_email):
+        return False
+    return _queue_email(to_addr, subject, html_body, from_addr)
 
 def send_pdf_report(email: str, region: Optional[str] = None) -> dict:
     """
@@ -128,11 +69,11 @@ def send_pdf_report(email: str, region: Optional[str] = None) -> dict:
 
 def send_bulk(user_email: str, recipients: List[str], subject: str, html_body: str, from_addr: Optional[str] = None) -> Dict[str, bool]:
     """
-    Send a generic email to multiple recipients. Uses Brevo if available, else SMTP in a loop.
-    Returns a map of recipient -> success boolean.
-    All sends are non-blocking (spawned as background threads).
+    Send a generic email to multiple recipients.
+    Returns a map of recipient -> queued boolean.
+    Recipients are queued together, so the dispatcher sends them as one Brevo
+    batch (or over one SMTP connection).
     """
-    results: Dict[str, bool] = {}
-    for r in recipients:
-        results[r] = send_email(user_email=user_email, to_addr=r, subject=subject, html_body=html_body, from_addr=from_addr)
-    return results
+    if not _email_allowed(user_email):
+        return {r: False for r in recipients}
+    return {r: _queue_email(r, subject, html_body, from_addr) for r in recipients}
@@ -0,0 +1,262 @@
+"""
+feed_parser.py — Lightweight streaming RSS/Atom parser for ingest.
+
+_extract_entries handed every fetched feed to feedparser.parse. That builds
+a FeedParserDict tree for every element, with HTML sanitization and date
+parsing for every field, and ingest then reads only title, summary, link
+and published. parse_feed() makes one iterparse pass over the raw bytes
+(lxml when installed, xml.etree otherwise). It reads only those fields and
+clears each item/entry element once it has been read, so a large feed is
+never held as a full object graph.
+
+Entries are returned as plain dicts shaped like the feedparser fields
+_extract_entries reads (title, summary, link, published_parsed,
+updated_parsed). The field mapping follows feedparser:
+
+- RSS 2.0 / RSS 1.0: summary = description, else content:encoded;
+  link = link, else a permalink guid; pubDate -> published, dc:date -> updated
+- Atom: summary = summary, else content; link = the first alternate link;
+  published/issued -> published, updated/modified -> updated
+
+parse_feed() returns None when feedparser should handle the feed instead:
+malformed XML, undefined entities or DOCTYPEs, other formats, xml:base,
+XHTML content, dates it cannot read, or markup that feedparser's
+sanitizer would drop along with its content (<script>, <style>, <applet>).
+It also returns None when the HTTP charset disagrees with the encoding the
+document declares; feedparser resolves that conflict from the response
+headers.
+
+    parsed = parse_feed(body_bytes, charset=response.charset_encoding)
+    if parsed is None:
+        fp = feedparser.parse(body_bytes, response_headers={"content-type": content_type})
+    else:
+        feed_link, entries = parsed
+"""
+
+import codecs
+import io
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from lxml import etree as _etree
+
+    def _iterparse(data: bytes):
+        return _etree.iterparse(io.BytesIO(data), events=("start", "end"),
+                                resolve_entities=False, no_network=True)
+
+    _PARSE_ERRORS: Tuple[type, ...] = (_etree.XMLSyntaxError,)
+except ImportError:  # pragma: no cover - depends on the environment
+    import xml.etree.ElementTree as _etree
+
+    def _iterparse(data: bytes):
+        return _etree.iterparse(io.BytesIO(data), events=("start", "end"))
+
+    _PARSE_ERRORS = (_etree.ParseError,)
+
+RSS1_NS = "http://purl.org/rss/1.0/"
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+_XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+# RSS 2.0 elements are un-namespaced, RSS 1.0 ones live in RSS1_NS
+_RSS_NS = ("", RSS1_NS)
+
+# feedparser's sanitizer removes these together with their content
+_DROPPED_MARKUP_RE = re.compile(rb"<\s*/?\s*(?:script|style|applet)\b|&lt;\s*/?\s*(?:script|style|applet)\b",
+                                re.IGNORECASE)
+# DTDs can declare entities; leave those feeds to feedparser
+_DTD_RE = re.compile(rb"<!(?:DOCTYPE|ENTITY)", re.IGNORECASE)
+_XML_DECL_ENCODING_RE = re.compile(rb"""^\s*<\?xml[^>]*?\bencoding\s*=\s*["']([A-Za-z0-9._:-]+)["']""")
+
+
+class _Unsupported(Exception):
+    """The feed uses something parse_feed leaves to feedparser."""
+
+
+def _split(tag: Any) -> Tuple[str, str]:
+    if not isinstance(tag, str):
+        return "", ""  # comments / processing instructions (lxml)
+    if tag[:1] == "{":
+        ns, _, local = tag[1:].partition("}")
+        return ns, local
+    return "", tag
+
+
+def _text(elem) -> str:
+    if len(elem):
+        raise _Unsupported("nested markup in a text field")
+    return elem.text or ""
+
+
+def _parse_date(value: str):
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        dt = None
+    if dt is None:
+        try:
+            dt = datetime.fromisoformat(value[:-1] + "+00:00" if value[-1:] in "Zz" else value)
+        except ValueError:
+            raise _Unsupported(f"date {value!r}")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.utctimetuple()
+
+
+def _rss_item(elem) -> Dict[str, Any]:
+    title = description = content = link = guid = pub_date = dc_date = None
+    for child in elem:
+        ns, local = _split(child.tag)
+        if ns in _RSS_NS:
+            if local == "title" and title is None:
+                title = _text(child)
+            elif local == "description" and description is None:
+                description = _text(child)
+            elif local == "link" and link is None:
+                link = _text(child)
+            elif local == "guid" and guid is None and child.get("isPermaLink", "true").lower() != "false":
+                guid = _text(child)
+            elif local == "pubDate" and pub_date is None:
+                pub_date = _text(child)
+        elif ns == CONTENT_NS and local == "encoded" and content is None:
+            content = _text(child)
+        elif ns == DC_NS and local == "date" and dc_date is None:
+            dc_date = _text(child)
+        elif ns == DC_NS and local in ("title", "description"):
+            raise _Unsupported(f"dc:{local}")
+    summary = description if description is not None else content
+    return {
+        "title": title.strip() if title is not None else None,
+        "summary": summary.strip() if summary is not None else None,
+        "link": (link if link is not None else guid or "").strip() or None,
+        "published_parsed": _parse_date(pub_date) if pub_date else None,
+        "updated_parsed": _parse_date(dc_date) if dc_date else None,
+    }
+
+
+def _atom_text(elem) -> str:
+    if elem.get("type", "text").lower() in ("xhtml", "application/xhtml+xml") or elem.get("src"):
+        raise _Unsupported("xhtml or out-of-line content")
+    return _text(elem)
+
+
+def _atom_entry(elem) -> Dict[str, Any]:
+    title = summary = content = link = published = updated = None
+    for child in elem:
+        ns, local = _split(child.tag)
+        if ns != ATOM_NS:
+            continue
+        if local == "title" and title is None:
+            title = _atom_text(child)
+        elif local == "summary" and summary is None:
+            summary = _atom_text(child)
+        elif local == "content" and content is None:
+            content = _atom_text(child)
+        elif local == "link" and link is None and child.get("rel", "alternate") == "alternate":
+            link = child.get("href")
+        elif local in ("published", "issued") and published is None:
+            published = _text(child)
+        elif local in ("updated", "modified") and updated is None:
+            updated = _text(child)
+    summary = summary if summary is not None else content
+    return {
+        "title": title.strip() if title is not None else None,
+        "summary": summary.strip() if summary is not None else None,
+        "link": link.strip() if link else None,
+        "published_parsed": _parse_date(published) if published else None,
+        "updated_parsed": _parse_date(updated) if updated else None,
+    }
+
+
+def _parse(data: bytes) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    stack: List[Tuple[str, str]] = []
+    kind = None
+    feed_link = None
+    entries: List[Dict[str, Any]] = []
+    for event, elem in _iterparse(data):
+        ns, local = _split(elem.tag)
+        if event == "start":
+            if not stack:
+                if local == "rss" and ns == "" or local == "RDF" and ns == RDF_NS:
+                    kind = "rss"
+                elif local == "feed" and ns == ATOM_NS:
+                    kind = "atom"
+                else:
+                    raise _Unsupported(f"root element {local}")
+            if elem.get(_XML_BASE) is not None:
+                raise _Unsupported("xml:base")
+            stack.append((ns, local))
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if kind == "rss":
+            if local == "item" and ns in _RSS_NS:
+                entries.append(_rss_item(elem))
+                elem.clear()
+            elif feed_link is None and local == "link" and ns in _RSS_NS and parent and parent[1] == "channel":
+                feed_link = _text(elem).strip()
+        else:
+            if local == "entry" and ns == ATOM_NS:
+                entries.append(_atom_entry(elem))
+                elem.clear()
+            elif (feed_link is None and local == "link" and ns == ATOM_NS and parent == (ATOM_NS, "feed")
+                  and elem.get("rel", "alternate") == "alternate"):
+                feed_link = (elem.get("href") or "").strip()
+    return feed_link or None, entries
+
+
+def _declared_encoding(data: bytes) -> str:
+    """Encoding the document itself announces (BOM, then XML declaration, else UTF-8)."""
+    if data[:3] == codecs.BOM_UTF8:
+        return "utf-8"
+    if data[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+        return "utf-16"
+    m = _XML_DECL_ENCODING_RE.match(data[:512])
+    return m.group(1).decode("ascii") if m else "utf-8"
+
+
+def _same_encoding(a: str, b: str) -> bool:
+    try:
+        return codecs.lookup(a).name == codecs.lookup(b).name
+    except LookupError:
+        return False
+
+
+def parse_feed(data: bytes, charset: Optional[str] = None) -> Optional[Tuple[Optional[str], List[Dict[str, Any]]]]:
+    """
+    Parse an RSS 2.0, RSS 1.0 or Atom document.
+
+    Args:
+        data: Raw feed bytes as fetched (encoding per the XML declaration)
+        charset: charset from the HTTP Content-Type header, if any
+
+    Returns:
+        (feed link or None, entry dicts), or None if feedparser should handle it
+    """
+    if not isinstance(data, (bytes, bytearray)) or not data:
+        return None
+    if charset and not _same_encoding(charset, _declared_encoding(data)):
+        return None
+    if _DTD_RE.search(data, 0, 4096) or _DROPPED_MARKUP_RE.search(data):
+        return None
+    try:
+        return _parse(bytes(data))
+    except _Unsupported:
+        return None
+    except _PARSE_ERRORS:
+        return None
+    except (ValueError, LookupError):
+        # Unknown/invalid declared encodings
+        return None
+
+
+__all__ = ["parse_feed"]
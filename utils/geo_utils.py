@@ -2,10 +2,21 @@
 
 Geographic utilities without PostGIS dependency.
 Haversine distance, bounding boxes, coordinate validation.
+
+Scalar helpers work on single points; the batch helpers (haversine_many,
+haversine_matrix, within_radius, nearest_k, bounding_boxes) take sequences or
+NumPy arrays and compute every distance in one vectorized pass.
 """
 
 import math
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, Sequence, Union
+
+import numpy as np
+
+# Mean Earth radius in kilometers (shared by scalar and batch helpers)
+EARTH_RADIUS_KM = 6371.0
+
+ArrayLike = Union[Sequence[float], np.ndarray]
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -18,8 +29,7 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Returns:
         Distance in kilometers
     """
-    # Earth's radius in kilometers
-    R = 6371.0
+    R = EARTH_RADIUS_KM
     
     # Convert degrees to radians
     lat1_rad = math.radians(lat1)
@@ -38,6 +48,90 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return distance
 
 
+def _as_radians(values: ArrayLike) -> np.ndarray:
+    return np.radians(np.asarray(values, dtype=float))
+
+
+def haversine_many(lat: float, lon: float, lats: ArrayLike, lons: ArrayLike) -> np.ndarray:
+    """
+    Distances in kilometers from one point to many points (many-to-one).
+    
+    Args:
+        lat, lon: Reference point
+        lats, lons: Candidate coordinates (same length)
+    
+    Returns:
+        1-D array of distances, aligned with the inputs
+    """
+    lat1 = math.radians(lat)
+    lon1 = math.radians(lon)
+    lat2 = _as_radians(lats)
+    lon2 = _as_radians(lons)
+    
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(lats1: ArrayLike, lons1: ArrayLike,
+                     lats2: ArrayLike, lons2: ArrayLike) -> np.ndarray:
+    """
+    Pairwise distance matrix in kilometers (many-to-many).
+    
+    Returns:
+        Array of shape (len(lats1), len(lats2)); element [i, j] is the
+        distance between point i of the first set and point j of the second
+    """
+    lat1 = _as_radians(lats1)[:, None]
+    lon1 = _as_radians(lons1)[:, None]
+    lat2 = _as_radians(lats2)[None, :]
+    lon2 = _as_radians(lons2)[None, :]
+    
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def within_radius(lat: float, lon: float, lats: ArrayLike, lons: ArrayLike,
+                  radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Filter candidate points to those within radius_km of a reference point.
+    
+    Returns:
+        (indices, distances) - positions of the matching candidates in the
+        input order and their distances in kilometers
+    """
+    distances = haversine_many(lat, lon, lats, lons)
+    indices = np.flatnonzero(distances <= radius_km)
+    return indices, distances[indices]
+
+
+def nearest_k(lat: float, lon: float, lats: ArrayLike, lons: ArrayLike,
+              k: int, max_km: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the k closest candidate points to a reference point.
+    
+    Args:
+        k: Number of neighbours to return (fewer if not enough candidates)
+        max_km: Optional cutoff; candidates farther away are ignored
+    
+    Returns:
+        (indices, distances) sorted by ascending distance
+    """
+    distances = haversine_many(lat, lon, lats, lons)
+    if max_km is not None:
+        candidates = np.flatnonzero(distances <= max_km)
+    else:
+        candidates = np.arange(distances.size)
+    if k <= 0 or candidates.size == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=float)
+    
+    if candidates.size > k:
+        part = np.argpartition(distances[candidates], k - 1)[:k]
+        candidates = candidates[part]
+    order = np.argsort(distances[candidates], kind="stable")
+    candidates = candidates[order]
+    return candidates, distances[candidates]
+
+
 def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
     """
     Calculate bounding box for proximity search.
@@ -68,6 +162,31 @@ def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float
     )
 
 
+def bounding_boxes(lats: ArrayLike, lons: ArrayLike,
+                   radius_km: Union[float, ArrayLike]) -> np.ndarray:
+    """
+    Batch version of bounding_box.
+    
+    Args:
+        lats, lons: Center coordinates
+        radius_km: Single radius or one radius per center
+    
+    Returns:
+        Array of shape (n, 4) with columns (min_lat, max_lat, min_lon, max_lon)
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    radius = np.broadcast_to(np.asarray(radius_km, dtype=float), lats.shape)
+    
+    lat_delta = radius / 111.0
+    lon_km = 111.0 * np.cos(np.radians(lats))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lon_delta = np.where(lon_km > 0, radius / lon_km, 0.0)
+    
+    return np.column_stack((lats - lat_delta, lats + lat_delta,
+                            lons - lon_delta, lons + lon_delta))
+
+
 def validate_coordinates(lat: Optional[float], lon: Optional[float]) -> bool:
     """
     Validate that coordinates are within valid ranges.
@@ -0,0 +1,88 @@
+"""
+html_cleaner.py — Precompiled cleaner for RSS titles and summaries.
+
+rss_processor._clean_html_content ran for every title and summary in
+_extract_entries. On each call it imported html and re, compiled eight
+footer regexes and made about a dozen full passes over the text.
+clean_html_content() produces the same output with:
+
+- all patterns compiled once at import
+- the three "Continue reading / Read more / Full article" truncations
+  merged into one pass (each cuts to the end of the text, so the earliest
+  match wins either way)
+- a fast path: html.unescape and the tag passes only run when the text
+  contains "&" or "<", which plain-text titles usually don't
+- the bracket/paren passes only run when "[" or "(" is present
+
+The remaining passes keep their original order. Removing one marker can
+create the next one (for example "[()]" or nested "[…]"), so merging
+those into a single alternation would change the output.
+tests/performance/html_cleaner_benchmark.py checks output parity and
+throughput against the previous implementation.
+"""
+
+import html
+import re
+
+# "The post <title> appeared first on <site>." footer (WordPress)
+_POST_FOOTER_RE = re.compile(r'The post.*?appeared first on.*?\.', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+# Truncation markers, applied in this order: [&#8230;] [...] and their decoded forms
+_ELLIPSIS_RES = (
+    re.compile(r'\[&#?8230;?\]', re.IGNORECASE | re.DOTALL),
+    re.compile(r'\[…\]', re.IGNORECASE | re.DOTALL),
+    re.compile(r'\[\.\.\.\]', re.IGNORECASE | re.DOTALL),
+)
+_LINK_RE = re.compile(r'<a\s+href[^>]*>.*?</a>', re.IGNORECASE | re.DOTALL)
+_READ_MORE_RE = re.compile(r'(?:Continue reading|Read more|Full article).*', re.IGNORECASE | re.DOTALL)
+_WS_RE = re.compile(r'\s+')
+_EMPTY_PARENS_RE = re.compile(r'\(\s*\)')
+_EMPTY_BRACKETS_RE = re.compile(r'\[\s*\]')
+
+
+def clean_html_content(text: str) -> str:
+    """
+    Clean HTML tags, entities, and unwanted content from RSS text.
+
+    Args:
+        text: Raw HTML/RSS content
+
+    Returns:
+        Clean, readable text suitable for frontend display
+    """
+    if not text:
+        return ""
+
+    # Decode entities first (&#8211; → –, &lt;b&gt; → <b>), then drop tags
+    if '&' in text:
+        text = html.unescape(text)
+    has_tags = '<' in text
+    if has_tags:
+        text = _TAG_RE.sub(' ', text)
+
+    text = _POST_FOOTER_RE.sub('', text)
+    if '[' in text:
+        for pattern in _ELLIPSIS_RES:
+            text = pattern.sub('', text)
+    if has_tags:
+        text = _LINK_RE.sub('', text)
+    text = _READ_MORE_RE.sub('', text)
+
+    text = _WS_RE.sub(' ', text).strip()
+
+    # Drop empty parentheses/brackets left behind
+    if '(' in text:
+        text = _EMPTY_PARENS_RE.sub('', text)
+    if '[' in text:
+        text = _EMPTY_BRACKETS_RE.sub('', text)
+
+    # Trim a trailing incomplete sentence, if that keeps most of the content
+    if text and text[-1] not in '.!?':
+        last_sentence_end = max(text.rfind('.'), text.rfind('!'), text.rfind('?'))
+        if last_sentence_end > len(text) * 0.5:
+            text = text[:last_sentence_end + 1]
+
+    return text.strip()
+
+
+__all__ = ["clean_html_content"]
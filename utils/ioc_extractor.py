@@ -5,7 +5,7 @@ Integrates with threat engine enrichment pipeline.
 
 import re
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -112,26 +112,67 @@ def extract_social_media_iocs(text: str) -> List[Dict[str, str]]:
     return iocs
 
 
-def enrich_alert_with_socmint(alert: dict, iocs: List[Dict[str, str]]) -> dict:
+# Platforms SOCMINT scrapes today
+SCRAPED_PLATFORMS = ('instagram', 'facebook')
+
+
+def fetch_socmint_for_iocs(iocs: List[Dict[str, str]], results_limit: int = 10) -> Dict[Tuple[str, str], dict]:
+    """
+    Look up or scrape SOCMINT data for many IOCs at once.
+    
+    Cache misses are sent to Apify as one multi-target run per platform
+    (see SocmintService.scrape_many), so IOCs gathered across a whole
+    enrichment batch cost one actor call instead of one per handle.
+    
+    Args:
+        iocs: Social media IOCs, possibly from many alerts
+        results_limit: Posts to fetch per profile/page
+        
+    Returns:
+        Dict of (platform, value) -> scrape result
+    """
+    from utils.socmint_service import get_socmint_service
+    socmint = get_socmint_service()
+    
+    results = {}
+    for platform in SCRAPED_PLATFORMS:
+        targets = {}
+        for ioc in iocs:
+            if ioc['platform'] == platform:
+                target = ioc['value'] if platform == 'instagram' else ioc['url']
+                targets.setdefault(target, ioc['value'])
+        if not targets:
+            continue
+        scraped = socmint.scrape_many(platform, list(targets), results_limit=results_limit)
+        for target, value in targets.items():
+            results[(platform, value)] = scraped[target]
+    return results
+
+
+def enrich_alert_with_socmint(alert: dict, iocs: List[Dict[str, str]],
+                              results: Optional[Dict[Tuple[str, str], dict]] = None) -> dict:
     """
     Enrich alert with SOCMINT data for extracted social media IOCs.
     
     Args:
         alert: Alert dict to enrich
         iocs: List of social media IOCs from extract_social_media_iocs
+        results: Prefetched fetch_socmint_for_iocs output; looked up here if omitted
         
     Returns:
         Alert dict with 'enrichments.osint' populated
     """
+    # Only scrape Instagram and Facebook for now
+    iocs = [ioc for ioc in iocs if ioc['platform'] in SCRAPED_PLATFORMS]
     if not iocs:
         return alert
     
-    try:
-        from socmint_service import SocmintService
-        socmint = SocmintService()
-    except Exception as e:
-        logger.warning(f"SOCMINT service unavailable: {e}")
-        return alert
+    if results is None:
+        try:
+            results = fetch_socmint_for_iocs(iocs)
+        except Exception as e:
+            logger.warning(f"SOCMINT service unavailable: {e}")
+            return alert
     
     alert.setdefault('enrichments', {})
     alert['enrichments'].setdefault('osint', [])
@@ -139,46 +180,23 @@ def enrich_alert_with_socmint(alert: dict, iocs: List[Dict[str, str]]) -> dict:
     for ioc in iocs:
         platform = ioc['platform']
         identifier = ioc['value']
-        
-        # Only scrape Instagram and Facebook for now
-        if platform not in ['instagram', 'facebook']:
+        result = results.get((platform, identifier))
+        if result is None:
             continue
         
-        try:
-            # Use cached value if available (2-hour TTL)
-            cached = socmint.get_cached_socmint_data(platform, identifier, ttl_minutes=120)
-            if cached.get('success'):
-                result = cached
-                logger.info(f"[SOCMINT Enrichment] Using cached data: {platform}/{identifier}")
-            else:
-                logger.info(f"[SOCMINT Enrichment] Cache miss, initiating fresh scrape: {platform}/{identifier}")
-                if platform == 'instagram':
-                    result = socmint.run_instagram_scraper(identifier, results_limit=10)
-                elif platform == 'facebook':
-                    result = socmint.run_facebook_scraper(ioc['url'], results_limit=10)
-                else:
-                    continue
-            
-            if result.get('success'):
-                osint_data = {
-                    'platform': platform,
-                    'identifier': identifier,
-                    'url': ioc['url'],
-                    'data': result['data'],
-                    'scraped_at': result.get('scraped_at')
-                }
-                alert['enrichments']['osint'].append(osint_data)
-                
-                # Persist to DB for correlation if fresh scrape
-                if not cached.get('success'):
-                    socmint.save_socmint_data(platform, identifier, result['data'])
-                
-                logger.info(f"SOCMINT enriched: {platform}/{identifier} for alert {alert.get('uuid', 'N/A')}")
-            else:
-                logger.warning(f"[SOCMINT Enrichment] Scrape failed: {platform}/{identifier} - {result.get('error')}")
-                
-        except Exception as e:
-            logger.error(f"[SOCMINT Enrichment] Error for {platform}/{identifier}: {e}", exc_info=True)
+        if result.get('success'):
+            osint_data = {
+                'platform': platform,
+                'identifier': identifier,
+                'url': ioc['url'],
+                'data': result['data'],
+                'scraped_at': result.get('scraped_at')
+            }
+            alert['enrichments']['osint'].append(osint_data)
+            logger.info(f"SOCMINT enriched: {platform}/{identifier} for alert {alert.get('uuid', 'N/A')} "
+                       f"(source={result.get('source', 'cache')})")
+        else:
+            logger.warning(f"[SOCMINT Enrichment] Scrape failed: {platform}/{identifier} - {result.get('error')}")
     
     # Log enrichment summary
     osint_count = len(alert['enrichments'].get('osint', []))
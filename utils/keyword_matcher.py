@@ -0,0 +1,198 @@
+"""
+keyword_matcher.py - Compiled multilingual keyword filter for RSS ingest
+
+rss_processor._passes_keyword_filter used to rebuild the keyword set from
+KEYWORD_DATA and run one `\\b<kw>\\b` regex per keyword on every entry:
+well over a thousand searches per headline, and more patterns than the `re`
+cache holds, so most of them were recompiled each time.
+
+KeywordFilter compiles base + translated keywords from threat_keywords.json
+into one Aho-Corasick automaton, so a headline is scanned once whatever the
+number of keywords or languages. Hits are accepted only at Unicode word
+boundaries, with the same rule as the regex `\\b` (a word character is
+alphanumeric or "_"), so "ot" still does not match "shooting". Combining
+marks also count as word characters: `\\b` treats the trailing vowel sign
+of Devanagari words such as "हत्या" as a non-word character, so those
+keywords could never match.
+
+get_keyword_filter() builds the filter once and rebuilds it when the
+keyword file's mtime changes.
+
+Environment:
+- KEYWORD_FILTER_RELOAD_SECONDS  (default: 30) how often the file mtime is checked; 0 disables reloads
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_FILTER_RELOAD_SECONDS = float(os.getenv("KEYWORD_FILTER_RELOAD_SECONDS", "30"))
+
+
+def _is_word(ch: str) -> bool:
+    # `\w` for str patterns in `re`, plus combining marks (Mn/Mc/Me)
+    return ch.isalnum() or ch == "_" or unicodedata.category(ch)[0] == "M"
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over lowercased keywords."""
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self.size = 0
+        for pattern, payload in keywords:
+            if pattern:
+                self._add(pattern, payload)
+        self._link()
+
+    def _add(self, pattern: str, payload: Any) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), payload))
+        self.size += 1
+
+    def _link(self) -> None:
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit matches that end here via the failure link
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """(start, end, payload) for each keyword occurrence on word boundaries."""
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(text)
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            after = _is_word(text[end]) if end < n else False
+            for length, payload in out[node]:
+                start = end - length
+                before = _is_word(text[start - 1]) if start > 0 else False
+                if before != _is_word(text[start]) and _is_word(text[i]) != after:
+                    yield start, end, payload
+
+
+class KeywordFilter:
+    """Base + translated keywords from threat_keywords.json, compiled once."""
+
+    def __init__(self, keyword_data: Dict[str, Any]):
+        base = [k for k in keyword_data.get("keywords", []) if isinstance(k, str) and k.strip()]
+        translated = []
+        for category_translations in (keyword_data.get("translated") or {}).values():
+            for lang_terms in (category_translations or {}).values():
+                translated.extend(t for t in lang_terms if isinstance(t, str) and t.strip())
+
+        # lowercased keyword -> (original keyword, match type); base wins over translated
+        entries: Dict[str, Tuple[str, str]] = {}
+        for kw in base:
+            entries.setdefault(kw.lower(), (kw, "base"))
+        for kw in translated:
+            entries.setdefault(kw.lower(), (kw, "translated"))
+
+        self.base_count = len(base)
+        self.translated_count = len(translated)
+        self._automaton = KeywordAutomaton(entries.items())
+
+    def match(self, text_lower: str) -> Optional[Tuple[str, str]]:
+        """
+        (keyword, match_type) for lowercased text, or None.
+
+        A base keyword anywhere in the text is preferred over a translated
+        one; otherwise the first match in the text wins.
+        """
+        first_translated = None
+        for _start, _end, (kw, match_type) in self._automaton.iter_matches(text_lower):
+            if match_type == "base":
+                return kw, match_type
+            if first_translated is None:
+                first_translated = (kw, match_type)
+        return first_translated
+
+
+class _ReloadingFilter:
+    """KeywordFilter that is rebuilt when the keyword file changes on disk."""
+
+    def __init__(self):
+        from utils.keywords_loader import KEYWORD_DATA, find_keywords_file
+        self._lock = threading.Lock()
+        self._path = find_keywords_file()
+        self._mtime = self._stat()
+        self._checked_at = time.monotonic()
+        self.filter = KeywordFilter(KEYWORD_DATA)
+
+    def _stat(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self._path) if self._path else None
+        except OSError:
+            return None
+
+    def current(self) -> KeywordFilter:
+        if KEYWORD_FILTER_RELOAD_SECONDS <= 0 or time.monotonic() - self._checked_at < KEYWORD_FILTER_RELOAD_SECONDS:
+            return self.filter
+        with self._lock:
+            if time.monotonic() - self._checked_at < KEYWORD_FILTER_RELOAD_SECONDS:
+                return self.filter
+            self._checked_at = time.monotonic()
+            mtime = self._stat()
+            if mtime is not None and mtime != self._mtime:
+                self._reload(mtime)
+        return self.filter
+
+    def _reload(self, mtime: float) -> None:
+        from utils.keywords_loader import validate_keywords
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            validate_keywords(data)
+            self.filter = KeywordFilter(data)
+            logger.info(f"Keyword filter rebuilt from {self._path}: "
+                        f"{self.filter.base_count} base, {self.filter.translated_count} translated")
+        except Exception as e:
+            # Keep serving the previous filter until the file is fixed
+            logger.error(f"Keyword filter reload from {self._path} failed: {e}")
+        self._mtime = mtime
+
+
+_instance: Optional[_ReloadingFilter] = None
+_instance_lock = threading.Lock()
+
+
+def get_keyword_filter() -> KeywordFilter:
+    """Process-wide KeywordFilter, rebuilt when threat_keywords.json changes."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = _ReloadingFilter()
+    return _instance.current()
+
+
+__all__ = ["KeywordAutomaton", "KeywordFilter", "get_keyword_filter"]
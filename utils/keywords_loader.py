@@ -13,7 +13,7 @@ All other modules should import from here to maintain consistency.
 import json
 import os
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 # Setup logger for keywords validation
 logger = logging.getLogger(__name__)
@@ -77,6 +77,21 @@ def validate_keywords(data: Any) -> None:
     logger.info(f"Keywords validation passed: {len(keywords)} base keywords, "
                 f"{len(data.get('translated', {}))} translation categories")
 
+# Locations tried, in order, for threat_keywords.json
+KEYWORD_FILE_CANDIDATES = [
+    "config/threat_keywords.json",
+    "threat_keywords.json", 
+    os.path.join(os.path.dirname(__file__), "config/threat_keywords.json"),
+    os.path.join(os.path.dirname(__file__), "threat_keywords.json")
+]
+
+def find_keywords_file() -> Optional[str]:
+    """Path of the threat_keywords.json in use, or None if none exists."""
+    for path in KEYWORD_FILE_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
 def _load_keyword_data() -> Dict:
     """
     Load and validate keyword data from threat_keywords.json.
@@ -84,13 +99,7 @@ def _load_keyword_data() -> Dict:
     Returns:
         Dict: Validated keyword data
     """
-    # Try different possible paths
-    possible_paths = [
-        "config/threat_keywords.json",
-        "threat_keywords.json", 
-        os.path.join(os.path.dirname(__file__), "config/threat_keywords.json"),
-        os.path.join(os.path.dirname(__file__), "threat_keywords.json")
-    ]
+    possible_paths = KEYWORD_FILE_CANDIDATES
     
     for path in possible_paths:
         if os.path.exists(path):
@@ -469,5 +478,6 @@ __all__ = [
     'CONDITIONAL_KEYWORDS', 'BROAD_TERMS', 'IMPACT_TERMS',
     'TRANSLATED_KEYWORDS', 'KEYWORD_DATA',
     'get_all_keywords', 'get_keywords_by_category', 'get_keywords_by_domain',
-    'get_translated_keywords', 'get_categories_for_keyword', 'get_domains_for_keyword'
+    'get_translated_keywords', 'get_categories_for_keyword', 'get_domains_for_keyword',
+    'validate_keywords', 'find_keywords_file'
 ]
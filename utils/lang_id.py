@@ -0,0 +1,283 @@
+"""
+lang_id.py - Deterministic, script-aware language identification for ingest
+
+langdetect.detect() samples n-grams at random, so the same headline can come
+back as "en" on one run and "da" on the next, and each call costs
+milliseconds. RSS, Telegram and the threat scorer now share this module:
+
+1. Unicode-script pre-classifier. Letters are counted per script. Scripts
+   used by one language we ingest (Hangul, kana, Han, Thai, Greek, Hebrew,
+   Indic scripts, ...) decide the language on their own.
+2. For scripts shared by several languages (Latin, Cyrillic, Arabic,
+   Devanagari) a naive-Bayes score over 1-3 character n-grams picks the
+   language. The n-gram counts come from the profiles bundled with
+   langdetect (requirements.txt). They are loaded once, lowercased, and
+   packed into one numpy matrix per script. Scoring is a sum, with no
+   sampling, so the answer is the same every run.
+
+The n-gram answer is only trusted with enough evidence. Text shorter than
+LANG_ID_MIN_WORDS words gets the script's fallback (for Latin, the caller's
+default). So does text whose best language leads the script's prior
+language (en for Latin, hi for Devanagari) by less than LANG_ID_MIN_MARGIN
+log-odds. Without this, "Kyiv under attack" scored as sv and "Protest in
+Lagos turns violent" as fr, and RSS_ALLOWED_LANGS gating dropped them.
+
+Results are memoized on the normalized text (lowercased letters, at most
+LANG_ID_MAX_CHARS). detect() and detect_many() are thread-safe.
+
+Without the langdetect profiles, shared-script text returns the caller's
+default (Cyrillic text still returns "ru", Arabic "ar").
+
+Environment:
+- LANG_ID_MAX_CHARS      (default: 300) letters of each text that are scored
+- LANG_ID_CACHE_SIZE     (default: 8192) memoized normalized texts
+- LANG_ID_PRIORS         (default: "en:6,hi:6") log-odds head start for the usual
+                         language of a script in our feeds; short headlines made
+                         of proper nouns ("Hezbollah ... Nabatieh") otherwise tip
+                         into de/nl, and short Hindi into Marathi
+- LANG_ID_MIN_WORDS      (default: 4) fewer words than this return the script fallback / default
+- LANG_ID_MIN_MARGIN     (default: 10.0) log-odds lead over the script's prior language (en, hi)
+                         needed before another language is answered
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LANG_ID_MAX_CHARS = int(os.getenv("LANG_ID_MAX_CHARS", "300"))
+LANG_ID_CACHE_SIZE = int(os.getenv("LANG_ID_CACHE_SIZE", "8192"))
+LANG_ID_PRIORS = {
+    lang.strip(): float(weight)
+    for lang, _, weight in (p.partition(":") for p in os.getenv("LANG_ID_PRIORS", "en:6,hi:6").split(","))
+    if lang.strip() and weight
+}
+LANG_ID_MIN_WORDS = int(os.getenv("LANG_ID_MIN_WORDS", "4"))
+LANG_ID_MIN_MARGIN = float(os.getenv("LANG_ID_MIN_MARGIN", "10.0"))
+
+# Fewer letters than this carry no usable signal
+_MIN_LETTERS = 3
+
+# (first, last, script); sorted by first code point
+_SCRIPT_RANGES: List[Tuple[int, int, str]] = sorted([
+    (0x0041, 0x005A, "latin"), (0x0061, 0x007A, "latin"),
+    (0x00C0, 0x024F, "latin"), (0x1E00, 0x1EFF, "latin"),
+    (0x0370, 0x03FF, "greek"),
+    (0x0400, 0x052F, "cyrillic"),
+    (0x0530, 0x058F, "armenian"),
+    (0x0590, 0x05FF, "hebrew"),
+    (0x0600, 0x06FF, "arabic"), (0x0750, 0x077F, "arabic"),
+    (0xFB50, 0xFDFF, "arabic"), (0xFE70, 0xFEFF, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x0980, 0x09FF, "bengali"),
+    (0x0A00, 0x0A7F, "gurmukhi"),
+    (0x0A80, 0x0AFF, "gujarati"),
+    (0x0B80, 0x0BFF, "tamil"),
+    (0x0C00, 0x0C7F, "telugu"),
+    (0x0C80, 0x0CFF, "kannada"),
+    (0x0D00, 0x0D7F, "malayalam"),
+    (0x0E00, 0x0E7F, "thai"),
+    (0x10A0, 0x10FF, "georgian"),
+    (0x1100, 0x11FF, "hangul"), (0x3130, 0x318F, "hangul"), (0xAC00, 0xD7AF, "hangul"),
+    (0x3040, 0x30FF, "kana"),
+    (0x3400, 0x4DBF, "han"), (0x4E00, 0x9FFF, "han"),
+])
+_RANGE_STARTS = [r[0] for r in _SCRIPT_RANGES]
+
+# Scripts that identify the language by themselves
+SCRIPT_LANGUAGE = {
+    "greek": "el", "armenian": "hy", "hebrew": "he", "bengali": "bn",
+    "gurmukhi": "pa", "gujarati": "gu", "tamil": "ta", "telugu": "te",
+    "kannada": "kn", "malayalam": "ml", "thai": "th", "georgian": "ka",
+    "hangul": "ko", "kana": "ja", "han": "zh",
+}
+
+# Shared scripts: answer when the n-gram model is unavailable (None = caller default)
+_SCRIPT_FALLBACK = {"latin": None, "cyrillic": "ru", "arabic": "ar", "devanagari": "hi"}
+
+
+@lru_cache(maxsize=4096)
+def _script_of(ch: str) -> Optional[str]:
+    cp = ord(ch)
+    i = bisect.bisect_right(_RANGE_STARTS, cp) - 1
+    if i >= 0 and cp <= _SCRIPT_RANGES[i][1]:
+        return _SCRIPT_RANGES[i][2]
+    return None
+
+
+def script_counts(text: str) -> Dict[str, int]:
+    """Number of letters per Unicode script in text."""
+    counts: Dict[str, int] = {}
+    for ch in text or "":
+        if ch.isalpha():
+            script = _script_of(ch)
+            if script:
+                counts[script] = counts.get(script, 0) + 1
+    return counts
+
+
+def dominant_script(text: str) -> Optional[str]:
+    """Script with the most letters, or None for text without letters."""
+    counts = script_counts(text)
+    return max(counts, key=counts.get) if counts else None
+
+
+def _normalize_char(ch: str) -> str:
+    # Lowercase (one char out, so "İ" stays one letter) and apply the same
+    # folding langdetect used when its profiles were built
+    if not ch.isalpha():
+        return " "
+    ch = ch.lower()[0]
+    if ch == "ș":
+        return "ş"
+    if ch == "ț":
+        return "ţ"
+    if "Ạ" <= ch <= "ỿ":
+        return "ể"
+    return ch
+
+
+def _normalize(text: str) -> str:
+    folded = "".join(_normalize_char(ch) for ch in (text or ""))
+    return " ".join(folded.split())[:LANG_ID_MAX_CHARS]
+
+
+def _ngrams(normalized: str) -> List[str]:
+    grams = []
+    for word in normalized.split(" "):
+        padded = f" {word} "
+        grams.extend(word)
+        grams.extend(padded[i:i + 2] for i in range(len(padded) - 1))
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _ScriptModel:
+    """Log-probabilities of n-grams for the languages written in one script."""
+
+    def __init__(self, languages: List[str], counts: Dict[str, Dict[str, int]], totals: Dict[str, List[int]]):
+        import numpy as np
+
+        self.languages = languages
+        vocab = sorted({g for lang in languages for g in counts[lang]})
+        self.index = {g: i for i, g in enumerate(vocab)}
+        matrix = np.empty((len(vocab), len(languages)), dtype=np.float32)
+        for j, lang in enumerate(languages):
+            # Profiles were pruned below a frequency cutoff, so an n-gram missing
+            # from one scores just under that language's rarest kept n-gram
+            denom = [math.log(max(t, 1)) for t in totals[lang]]
+            rarest = [min((c for g, c in counts[lang].items() if len(g) == n), default=1) for n in (1, 2, 3)]
+            floor = [math.log(rarest[n] / 2) - denom[n] for n in range(3)]
+            column = [floor[len(g) - 1] for g in vocab]
+            for g, c in counts[lang].items():
+                column[self.index[g]] = math.log(c) - denom[len(g) - 1]
+            matrix[:, j] = column
+        self.matrix = matrix
+        self.prior = np.array([LANG_ID_PRIORS.get(lang, 0.0) for lang in languages], dtype=np.float32)
+        self.anchor = int(self.prior.argmax()) if self.prior.max() > 0 else None
+
+    def best(self, grams: List[str]) -> Optional[str]:
+        rows = [self.index[g] for g in grams if g in self.index]
+        if not rows:
+            return None
+        scores = self.matrix[rows].sum(axis=0) + self.prior
+        best = int(scores.argmax())
+        # A close call against the script's usual language (the prior) is not
+        # evidence of another language; es-vs-pt style ties are still answered
+        if self.anchor is not None and best != self.anchor:
+            if float(scores[best] - scores[self.anchor]) < LANG_ID_MIN_MARGIN:
+                return None
+        return self.languages[best]
+
+
+class _Model:
+    def __init__(self):
+        self.by_script: Dict[str, _ScriptModel] = {}
+        try:
+            self._load()
+        except Exception as e:
+            logger.warning(f"Language profiles unavailable, script-only detection: {e}")
+
+    def _load(self) -> None:
+        import langdetect
+
+        profile_dir = os.path.join(os.path.dirname(langdetect.__file__), "profiles")
+        counts: Dict[str, Dict[str, int]] = {}
+        totals: Dict[str, List[int]] = {}
+        scripts: Dict[str, List[str]] = {}
+        for name in sorted(os.listdir(profile_dir)):
+            with open(os.path.join(profile_dir, name), "r", encoding="utf-8") as f:
+                profile = json.load(f)
+            lang = profile["name"].split("-")[0]
+            letters = "".join(g for g in profile["freq"] if len(g) == 1)
+            script = dominant_script(letters)
+            if script not in _SCRIPT_FALLBACK or lang in counts:
+                continue
+            merged: Dict[str, int] = {}
+            for gram, count in profile["freq"].items():
+                gram = "".join(_normalize_char(ch) if ch != " " else ch for ch in gram)
+                if gram.strip():
+                    merged[gram] = merged.get(gram, 0) + count
+            counts[lang] = merged
+            totals[lang] = profile["n_words"]
+            scripts.setdefault(script, []).append(lang)
+        for script, languages in scripts.items():
+            if len(languages) > 1:
+                self.by_script[script] = _ScriptModel(languages, counts, totals)
+            else:
+                _SCRIPT_FALLBACK[script] = languages[0]
+
+
+_model: Optional[_Model] = None
+_model_lock = threading.Lock()
+
+
+def _get_model() -> _Model:
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _Model()
+    return _model
+
+
+@lru_cache(maxsize=LANG_ID_CACHE_SIZE)
+def _detect_normalized(normalized: str) -> Optional[str]:
+    counts = script_counts(normalized)
+    if sum(counts.values()) < _MIN_LETTERS:
+        return None
+    script = max(counts, key=counts.get)
+    if script == "han" and counts.get("kana"):
+        return "ja"
+    if script in SCRIPT_LANGUAGE:
+        return SCRIPT_LANGUAGE[script]
+    model = _get_model().by_script.get(script)
+    if model is None or len(normalized.split(" ")) < LANG_ID_MIN_WORDS:
+        return _SCRIPT_FALLBACK.get(script)
+    return model.best(_ngrams(normalized)) or _SCRIPT_FALLBACK.get(script)
+
+
+def detect(text: str, default: str = "en") -> str:
+    """ISO 639-1 code for text, or default when it cannot be identified."""
+    return _detect_normalized(_normalize(text)) or default
+
+
+def detect_many(texts: Iterable[str], default: str = "en") -> List[str]:
+    """detect() for a batch; repeated texts are scored once."""
+    normalized = [_normalize(t) for t in texts]
+    found = {n: _detect_normalized(n) for n in set(normalized)}
+    return [found[n] or default for n in normalized]
+
+
+def stats() -> Dict[str, int]:
+    info = _detect_normalized.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "cached": info.currsize}
+
+
+__all__ = ["detect", "detect_many", "dominant_script", "script_counts", "SCRIPT_LANGUAGE", "stats"]
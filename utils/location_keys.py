@@ -0,0 +1,162 @@
+"""
+location_keys.py - Normalized location keys for indexed alert retrieval
+
+Alerts store free-text country/city names ("Nigeria", "nigeria ", "NG",
+"Kiev"), which can only be matched with ILIKE '%x%' scans. At ingest we also
+write:
+
+- country_code:    ISO 3166-1 alpha-2 ("NG"), via pycountry plus common aliases
+- city_key:        canonical city ID: lowercase ASCII slug ("sao-paulo", "kyiv")
+- is_sports_noise: title mentions sports/entertainment terms the chat
+                   retrieval has always excluded
+
+The same helpers normalize the query side, so retrieval is an equality
+match on (country_code | city_key, published DESC) indexes.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# Names pycountry does not resolve (lowercased)
+_COUNTRY_ALIASES = {
+    "russia": "RU",
+    "uk": "GB",
+    "u.k.": "GB",
+    "britain": "GB",
+    "great britain": "GB",
+    "england": "GB",
+    "scotland": "GB",
+    "wales": "GB",
+    "northern ireland": "GB",
+    "us": "US",
+    "u.s.": "US",
+    "u.s.a.": "US",
+    "america": "US",
+    "turkey": "TR",
+    "ivory coast": "CI",
+    "drc": "CD",
+    "dr congo": "CD",
+    "democratic republic of congo": "CD",
+    "congo-kinshasa": "CD",
+    "republic of congo": "CG",
+    "congo-brazzaville": "CG",
+    "palestine": "PS",
+    "palestinian territories": "PS",
+    "gaza": "PS",
+    "gaza strip": "PS",
+    "west bank": "PS",
+    "kosovo": "XK",
+    "macedonia": "MK",
+    "burma": "MM",
+    "cape verde": "CV",
+    "swaziland": "SZ",
+    "vatican": "VA",
+    "vatican city": "VA",
+    "micronesia": "FM",
+    "uae": "AE",
+    "holland": "NL",
+    "the netherlands": "NL",
+    "east timor": "TL",
+    "south korea": "KR",
+    "north korea": "KP",
+}
+
+# Alternate spellings mapped to one canonical city slug
+_CITY_ALIASES = {
+    "kiev": "kyiv",
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "madras": "chennai",
+    "peking": "beijing",
+    "saigon": "ho-chi-minh-city",
+    "ho-chi-minh": "ho-chi-minh-city",
+    "rangoon": "yangon",
+    "new-york-city": "new-york",
+    "nyc": "new-york",
+    "washington-dc": "washington",
+    "washington-d-c": "washington",
+    "mexico-df": "mexico-city",
+    "ciudad-de-mexico": "mexico-city",
+    "al-quds": "jerusalem",
+}
+
+# Terms whose presence in a title marks sports/entertainment noise
+SPORTS_NOISE_TERMS = ("football", "soccer", "champion", "award", "hat-trick", "hatrrick", "ucl", "europa")
+# Words starting with a term that are not sports noise
+SPORTS_NOISE_EXCEPTIONS = ("awarded", "awarding", "championed", "championing", "european", "europeans")
+# Terms as word prefixes ("championship", "footballers") minus the exceptions;
+# a plain substring match flagged "Nuclear" (ucl). Mirrored in migration 008.
+_SPORTS_NOISE_RE = re.compile(
+    r"\b(?!(?:" + "|".join(SPORTS_NOISE_EXCEPTIONS) + r")\b)"
+    r"(?:" + "|".join(re.escape(term) for term in SPORTS_NOISE_TERMS) + r")\w*", re.IGNORECASE)
+
+_SLUG_STRIP = re.compile(r"[^a-z0-9]+")
+
+
+def _ascii_fold(value: str) -> str:
+    return unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+
+
+@lru_cache(maxsize=4096)
+def country_code(country: Optional[str]) -> Optional[str]:
+    """
+    ISO 3166-1 alpha-2 code for a country name or code.
+
+    Args:
+        country: Country name, alpha-2 or alpha-3 code
+
+    Returns:
+        Upper-case alpha-2 code, or None if unrecognized
+    """
+    if not country or not isinstance(country, str):
+        return None
+    raw = country.strip()
+    if not raw:
+        return None
+    alias = _COUNTRY_ALIASES.get(raw.lower())
+    if alias:
+        return alias
+    try:
+        import pycountry
+        return pycountry.countries.lookup(raw).alpha_2
+    except (LookupError, ImportError):
+        pass
+    folded = _ascii_fold(raw).lower()
+    return _COUNTRY_ALIASES.get(folded)
+
+
+@lru_cache(maxsize=16384)
+def city_key(city: Optional[str]) -> Optional[str]:
+    """
+    Canonical city ID: accent-folded, lowercase, hyphen-separated slug.
+
+    Args:
+        city: Raw city name
+
+    Returns:
+        Slug such as "sao-paulo", or None for empty input
+    """
+    if not city or not isinstance(city, str):
+        return None
+    slug = _SLUG_STRIP.sub("-", _ascii_fold(city).lower()).strip("-")
+    if not slug:
+        return None
+    return _CITY_ALIASES.get(slug, slug)
+
+
+def is_sports_noise(title: Optional[str]) -> bool:
+    """True if a word in the title starts with a SPORTS_NOISE_TERMS entry and is not an exception."""
+    if not title:
+        return False
+    return _SPORTS_NOISE_RE.search(title) is not None
+
+
+def alert_location_keys(alert: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], bool]:
+    """(country_code, city_key, is_sports_noise) to store with an alert."""
+    return (
+        country_code(alert.get("country")),
+        city_key(alert.get("city")),
+        is_sports_noise(alert.get("title")),
+    )
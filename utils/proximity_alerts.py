@@ -7,7 +7,7 @@ Two-phase approach: bounding box filter + precise distance calculation.
 import logging
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from utils.geo_utils import haversine_distance, bounding_box, validate_coordinates
+from utils.geo_utils import bounding_box, validate_coordinates, within_radius
 
 logger = logging.getLogger("proximity_alerts")
 
@@ -106,29 +106,31 @@ def find_threats_near_traveler(traveler_id: int, hours_lookback: int = 24) -> Li
                 (cutoff_time, min_lat, max_lat, min_lon, max_lon)
             )
             
-            for row in cur.fetchall():
+            rows = cur.fetchall()
+            nearby, distances = within_radius(
+                float(t_lat), float(t_lon),
+                [float(row[7]) for row in rows],
+                [float(row[8]) for row in rows],
+                radius_km
+            )
+            
+            for idx, distance_km in zip(nearby.tolist(), distances.tolist()):
+                row = rows[idx]
                 threat_lat = float(row[7])
                 threat_lon = float(row[8])
-                
-                distance_km = haversine_distance(
-                    float(t_lat), float(t_lon), 
-                    threat_lat, threat_lon
-                )
-                
-                if distance_km <= radius_km:
-                    threats.append({
-                        'source': 'GDELT',
-                        'id': row[0],
-                        'date': str(row[1]),
-                        'actor1': row[2],
-                        'actor2': row[3],
-                        'country': row[4],
-                        'severity': float(row[5]),
-                        'articles': row[6],
-                        'distance_km': round(distance_km, 1),
-                        'lat': threat_lat,
-                        'lon': threat_lon
-                    })
+                threats.append({
+                    'source': 'GDELT',
+                    'id': row[0],
+                    'date': str(row[1]),
+                    'actor1': row[2],
+                    'actor2': row[3],
+                    'country': row[4],
+                    'severity': float(row[5]),
+                    'articles': row[6],
+                    'distance_km': round(distance_km, 1),
+                    'lat': threat_lat,
+                    'lon': threat_lon
+                })
             
             # ================================================================
             # TODO: Add RSS threats query here
@@ -224,27 +226,32 @@ def find_threats_near_location(lat: float, lon: float, radius_km: int = 50,
                     (int(cutoff_date), min_lat, max_lat, min_lon, max_lon)
                 )
                 
-                for row in cur.fetchall():
+                rows = cur.fetchall()
+                nearby, distances = within_radius(
+                    lat, lon,
+                    [float(row[8]) for row in rows],
+                    [float(row[9]) for row in rows],
+                    radius_km
+                )
+                
+                for idx, distance_km in zip(nearby.tolist(), distances.tolist()):
+                    row = rows[idx]
                     threat_lat = float(row[8])
                     threat_lon = float(row[9])
-                    
-                    distance_km = haversine_distance(lat, lon, threat_lat, threat_lon)
-                    
-                    if distance_km <= radius_km:
-                        threats.append({
-                            'source': 'GDELT',
-                            'event_id': row[0],
-                            'date': str(row[1]),
-                            'actor1': row[2],
-                            'actor2': row[3],
-                            'country': row[4],
-                            'severity': float(row[5]),
-                            'articles': row[6],
-                            'sources': row[7],
-                            'distance_km': round(distance_km, 1),
-                            'lat': threat_lat,
-                            'lon': threat_lon
-                        })
+                    threats.append({
+                        'source': 'GDELT',
+                        'event_id': row[0],
+                        'date': str(row[1]),
+                        'actor1': row[2],
+                        'actor2': row[3],
+                        'country': row[4],
+                        'severity': float(row[5]),
+                        'articles': row[6],
+                        'sources': row[7],
+                        'distance_km': round(distance_km, 1),
+                        'lat': threat_lat,
+                        'lon': threat_lon
+                    })
             
             # ================================================================
             # TODO: Add RSS, ACLED queries
@@ -415,7 +422,7 @@ def _send_threat_alert(traveler_id: int, email: str, name: str, threats: List[Di
         
         # Send push notification
         try:
-            from webpush_send import broadcast_to_user
+            from utils.webpush_send import broadcast_to_user
             broadcast_to_user(
                 user_email=email,
                 title=f"⚠️ {len(threats)} Threats Nearby",
@@ -15,10 +15,10 @@ except Exception:
     def _is_paid(_email: str) -> bool:
         return False
 
-# Optional: wire your actual FCM/APNS libs here
 def send_push(user_email: str, device_token: str, payload: Dict[str, Any]) -> bool:
     """
     Paid-only, opt-in mobile push. Unmetered.
+    Queued on the shared notification dispatcher (FCM/APNS wiring lives in its PushChannel).
     """
     if not _is_paid(user_email):
         logger.debug("push denied: user not on paid plan (%s)", user_email)
@@ -28,9 +28,8 @@ def send_push(user_email: str, device_token: str, payload: Dict[str, Any]) -> bo
         return False
 
     try:
-        # TODO: implement real FCM/APNS call here
-        logger.info("Pretend push to %s: %s", device_token, payload)
-        return True
+        from services.notification_dispatcher import get_notification_dispatcher
+        return get_notification_dispatcher().submit("push", device_token, payload)
     except Exception as e:
         logger.error("send_push failed: %s", e)
         return False
@@ -522,8 +522,14 @@ class EmbeddingManager:
         self.request_limit = CONFIG.app.embedding_requests_daily
         self.lock = threading.Lock()
         
-    def _check_quota(self, text: str) -> bool:
-        """Check if we have quota for this request."""
+    def _count_tokens(self, text: str) -> int:
+        if self.tokenizer:
+            return len(self.tokenizer.encode(text))
+        # Rough estimation: ~4 chars per token
+        return len(text) // 4
+    
+    def _reserve_quota(self, tokens: int, requests: int = 1) -> bool:
+        """Reserve tokens/requests against the daily quota (thread-safe)."""
         with self.lock:
             now = datetime.utcnow()
             
@@ -534,13 +540,6 @@ class EmbeddingManager:
                 self.quota.daily_requests = 0
                 self.quota.last_reset = now
                 
-            # Calculate tokens for this request
-            if self.tokenizer:
-                tokens = len(self.tokenizer.encode(text))
-            else:
-                # Rough estimation: ~4 chars per token
-                tokens = len(text) // 4
-                
             # Check token limit
             if self.quota.daily_tokens + tokens > self.daily_limit:
                 import logging
@@ -551,7 +550,7 @@ class EmbeddingManager:
                 return False
                 
             # Check request limit
-            if self.quota.daily_requests >= self.request_limit:
+            if self.quota.daily_requests + requests > self.request_limit:
                 import logging
                 logger = logging.getLogger("risk_shared.embedding")
                 logger.warning(
@@ -561,9 +560,13 @@ class EmbeddingManager:
                 
             # Update quota
             self.quota.daily_tokens += tokens
-            self.quota.daily_requests += 1
+            self.quota.daily_requests += requests
             return True
     
+    def _check_quota(self, text: str) -> bool:
+        """Check if we have quota for this request."""
+        return self._reserve_quota(self._count_tokens(text))
+    
     def get_embedding_safe(self, text: str, client) -> List[float]:
         """
         Get embedding with quota and fallback protection.
@@ -597,6 +600,47 @@ class EmbeddingManager:
             logger.error(f"Embedding API error: {e}, using fallback")
             return self._fallback_hash(text)
     
+    def get_embeddings_safe(self, texts: List[str], client) -> List[List[float]]:
+        """
+        Embed many texts with one multi-input API request.
+        
+        The whole batch counts as a single request against the daily request
+        limit and its summed tokens against the token limit. Empty texts, or
+        the entire batch when quota is short or the API call fails, get the
+        deterministic fallback.
+        
+        Args:
+            texts: Texts to embed
+            client: OpenAI client instance
+            
+        Returns:
+            Embeddings aligned with texts
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending = [(i, t[:8192]) for i, t in enumerate(texts) if t]
+        
+        if pending and client is not None:
+            tokens = sum(self._count_tokens(t) for _, t in pending)
+            if self._reserve_quota(tokens):
+                try:
+                    resp = client.embeddings.create(
+                        model="text-embedding-3-small",
+                        input=[t for _, t in pending],
+                        timeout=30.0
+                    )
+                    # Results carry their input index; don't rely on ordering
+                    for item in resp.data:
+                        results[pending[item.index][0]] = item.embedding
+                except Exception as e:
+                    import logging
+                    logger = logging.getLogger("risk_shared.embedding")
+                    logger.error(f"Batch embedding API error ({len(pending)} inputs): {e}, using fallback")
+        
+        return [
+            emb if emb is not None else self._fallback_hash(texts[i])
+            for i, emb in enumerate(results)
+        ]
+    
     def _fallback_hash(self, text: str) -> List[float]:
         """
         Generate deterministic hash-based embedding fallback.
@@ -648,3 +692,19 @@ def get_embedding(text: str, client=None) -> List[float]:
     else:
         # No client available, use deterministic fallback
         return embedding_manager._fallback_hash(text)
+
+
+def get_embeddings(texts: List[str], client=None) -> List[List[float]]:
+    """
+    Batch counterpart of get_embedding: one API request for all texts.
+    
+    Args:
+        texts: Texts to embed
+        client: OpenAI client instance (optional)
+        
+    Returns:
+        List of embeddings aligned with texts
+    """
+    if client and OpenAI:
+        return embedding_manager.get_embeddings_safe(texts, client)
+    return [embedding_manager._fallback_hash(t) for t in texts]
@@ -2,8 +2,11 @@ import os
 from apify_client import ApifyClient
 import logging
 import json
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
 from psycopg2.extras import Json
 from utils.db_utils import execute
 from utils.db_utils import fetch_one
@@ -17,7 +20,9 @@ _cache_metrics = {
     'total_requests': 0,
     'apify_calls': 0,
     'cache_saves': 0,
-    'errors': 0
+    'errors': 0,
+    'redis_hits': 0,
+    'coalesced': 0
 }
 
 # Daily quota tracking
@@ -94,7 +99,9 @@ def reset_cache_metrics():
         'total_requests': 0,
         'apify_calls': 0,
         'cache_saves': 0,
-        'errors': 0
+        'errors': 0,
+        'redis_hits': 0,
+        'coalesced': 0
     }
     logger.info("[SOCMINT] Cache metrics reset")
 
@@ -116,6 +123,8 @@ def log_cache_performance_summary():
     logger.info(f"Fresh Apify Calls: {metrics['apify_calls']:,}")
     logger.info(f"New Cache Saves: {metrics['cache_saves']:,}")
     logger.info(f"Errors: {metrics['errors']:,}")
+    logger.info(f"Redis Hot-Tier Hits: {metrics['redis_hits']:,}")
+    logger.info(f"Coalesced Requests: {metrics['coalesced']:,}")
     
     # Calculate efficiency
     if metrics['apify_calls'] > 0:
@@ -124,6 +133,142 @@ def log_cache_performance_summary():
     
     logger.info("=" * 60)
 
+# Apify actors per platform
+_ACTORS = {
+    'instagram': "apify/instagram-scraper",
+    'facebook': "apify/facebook-posts-scraper",
+}
+
+# Max usernames/page URLs sent to one actor run in batch mode
+SOCMINT_BATCH_MAX_TARGETS = int(os.getenv('SOCMINT_BATCH_MAX_TARGETS', 10))
+# How long a coalesced caller waits for the scrape it joined
+SOCMINT_SINGLEFLIGHT_TIMEOUT = float(os.getenv('SOCMINT_SINGLEFLIGHT_TIMEOUT', 300))
+
+def _cache_ttl_minutes() -> int:
+    return int(os.getenv('SOCMINT_CACHE_TTL_MINUTES', 120))
+
+def _facebook_identifier(page_url: str) -> str:
+    """Cache key for a Facebook page URL."""
+    return page_url.replace("https://www.facebook.com/", "").replace("https://facebook.com/", "").split("?")[0]
+
+def _is_facebook_url(page_url: str) -> bool:
+    return page_url.startswith(("https://www.facebook.com/", "https://facebook.com/"))
+
+# ---------------------------------------------------------------------------
+# Redis hot tier in front of socmint_profiles
+# ---------------------------------------------------------------------------
+
+_redis_client = None
+_redis_retry_at = 0.0
+
+def _get_redis():
+    """Shared Redis connection, or None if REDIS_URL is unset or unreachable."""
+    global _redis_client, _redis_retry_at
+    if _redis_client is not None:
+        return _redis_client
+    redis_url = os.getenv("REDIS_URL")
+    if not redis_url or time.monotonic() < _redis_retry_at:
+        return None
+    try:
+        import redis
+        client = redis.from_url(redis_url, decode_responses=True)
+        client.ping()
+        _redis_client = client
+        return client
+    except Exception as e:
+        # Don't pay a connect timeout on every lookup while Redis is down
+        _redis_retry_at = time.monotonic() + 60
+        logger.debug(f"[SOCMINT] Redis unavailable: {e}")
+        return None
+
+def _redis_key(platform: str, identifier: str) -> str:
+    return f"socmint:{platform}:{identifier}"
+
+def _age_seconds(scraped_at) -> Optional[float]:
+    """Age of a scraped_at value (datetime or ISO string, naive = UTC)."""
+    try:
+        if isinstance(scraped_at, str):
+            scraped_at = datetime.fromisoformat(scraped_at)
+        if scraped_at is None:
+            return None
+        if scraped_at.tzinfo is not None:
+            scraped_at = scraped_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return (datetime.utcnow() - scraped_at).total_seconds()
+    except Exception:
+        return None
+
+def _redis_get(platform: str, identifier: str, ttl_minutes: int) -> Optional[dict]:
+    """Cached {'data', 'scraped_at'} from Redis if younger than ttl_minutes."""
+    r = _get_redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(_redis_key(platform, identifier))
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        age = _age_seconds(entry.get('scraped_at'))
+        if age is None or age > ttl_minutes * 60:
+            return None
+        return entry
+    except Exception as e:
+        logger.debug(f"[SOCMINT] Redis read failed for {platform}/{identifier}: {e}")
+        return None
+
+def _redis_put(platform: str, identifier: str, data: dict, scraped_at) -> None:
+    """Write through to Redis for the rest of the default cache TTL."""
+    r = _get_redis()
+    if r is None:
+        return
+    age = _age_seconds(scraped_at) or 0
+    ttl_seconds = int(_cache_ttl_minutes() * 60 - age)
+    if ttl_seconds <= 0:
+        return
+    if isinstance(scraped_at, datetime):
+        scraped_at = scraped_at.isoformat()
+    try:
+        r.setex(_redis_key(platform, identifier), ttl_seconds,
+                json.dumps({'data': data, 'scraped_at': scraped_at}, default=str))
+    except Exception as e:
+        logger.debug(f"[SOCMINT] Redis write failed for {platform}/{identifier}: {e}")
+
+# ---------------------------------------------------------------------------
+# Single-flight: one scrape per (platform, identifier) at a time
+# ---------------------------------------------------------------------------
+
+class _Flight:
+    __slots__ = ('event', 'result')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+_inflight: Dict[Tuple[str, str], _Flight] = {}
+_inflight_lock = threading.Lock()
+
+def _claim_flights(platform: str, identifiers: Iterable[str]) -> Tuple[List[str], Dict[str, _Flight]]:
+    """Split identifiers into ones this caller now owns and ones already being scraped.
+
+    The caller must _land_flight() every owned identifier, even on failure.
+    """
+    mine, theirs = [], {}
+    with _inflight_lock:
+        for identifier in identifiers:
+            flight = _inflight.get((platform, identifier))
+            if flight is None:
+                _inflight[(platform, identifier)] = _Flight()
+                mine.append(identifier)
+            else:
+                theirs[identifier] = flight
+    return mine, theirs
+
+def _land_flight(platform: str, identifier: str, result: dict) -> None:
+    with _inflight_lock:
+        flight = _inflight.pop((platform, identifier), None)
+    if flight is not None:
+        flight.result = result
+        flight.event.set()
+
 class SocmintService:
     def __init__(self):
         token = os.getenv('APIFY_API_TOKEN')
@@ -149,191 +294,228 @@ class SocmintService:
 
     def run_instagram_scraper(self, username: str, results_limit: int = 20) -> dict:
         """Scrape Instagram profile and posts for threat intel with cache-first pattern."""
-        
-        # 1. Try cache first (2-hour TTL)
-        ttl_minutes = int(os.getenv('SOCMINT_CACHE_TTL_MINUTES', 120))
-        cached = self.get_cached_socmint_data('instagram', username, ttl_minutes)
-        
-        if cached.get('success'):
-            logger.info(f"[SOCMINT] Cache hit for Instagram/{username}")
-            return {
-                "success": True,
-                "data": cached['data'],
-                "source": "cache",
-                "scraped_at": cached.get('scraped_at')
+        return self.scrape_many('instagram', [username], results_limit)[username]
+
+    def run_facebook_scraper(self, page_url: str, results_limit: int = 20) -> dict:
+        """Scrape Facebook page/group posts with cache-first pattern."""
+        return self.scrape_many('facebook', [page_url], results_limit)[page_url]
+
+    def scrape_many(self, platform: str, targets: List[str], results_limit: int = 20) -> Dict[str, dict]:
+        """Cache-first scrape of several Instagram usernames or Facebook page URLs.
+
+        Each target is looked up in Redis, then socmint_profiles. A target that
+        another caller is already scraping is waited on instead of scraped
+        again, and the remaining misses go to Apify together, up to
+        SOCMINT_BATCH_MAX_TARGETS per actor run.
+
+        Returns:
+            dict: target -> result in the run_instagram_scraper/run_facebook_scraper shape
+        """
+        if platform not in _ACTORS:
+            raise ValueError(f"Unsupported SOCMINT platform: {platform}")
+
+        label = platform.capitalize()
+        results: Dict[str, dict] = {}
+        target_ids: Dict[str, str] = {}
+        id_targets: Dict[str, str] = {}
+        for target in targets:
+            if platform == 'facebook':
+                if not _is_facebook_url(target):
+                    logger.warning(f"[SOCMINT] Invalid Facebook URL format: {target}")
+                    _cache_metrics['errors'] += 1
+                    results[target] = {"success": False, "error": "Invalid Facebook URL format"}
+                    continue
+                identifier = _facebook_identifier(target)
+            else:
+                identifier = target
+            target_ids[target] = identifier
+            id_targets.setdefault(identifier, target)
+
+        # 1. Try cache first (Redis, then DB)
+        ttl_minutes = _cache_ttl_minutes()
+        by_id: Dict[str, dict] = {}
+        misses = []
+        for identifier in id_targets:
+            cached = self.get_cached_socmint_data(platform, identifier, ttl_minutes)
+            if cached.get('success'):
+                logger.info(f"[SOCMINT] Cache hit for {label}/{identifier}")
+                by_id[identifier] = {
+                    "success": True,
+                    "data": cached['data'],
+                    "source": "cache",
+                    "scraped_at": cached.get('scraped_at')
+                }
+            else:
+                misses.append(identifier)
+
+        # 2. Cache misses - scrape the ones nobody else is scraping, join the rest
+        if misses:
+            mine, theirs = _claim_flights(platform, misses)
+            try:
+                if mine:
+                    by_id.update(self._scrape_claimed(platform, {i: id_targets[i] for i in mine}, results_limit))
+            except Exception as e:
+                logger.error(f"[SOCMINT] {label} scrape failed for {len(mine)} targets: {e}")
+                _cache_metrics['errors'] += 1
+                for identifier in mine:
+                    by_id.setdefault(identifier, {"success": False, "error": str(e)})
+            finally:
+                for identifier in mine:
+                    _land_flight(platform, identifier, by_id.get(identifier) or {"success": False, "error": "Scrape aborted"})
+
+            for identifier, flight in theirs.items():
+                _cache_metrics['coalesced'] += 1
+                logger.info(f"[SOCMINT] Joining in-flight {label} scrape: {identifier}")
+                if flight.event.wait(SOCMINT_SINGLEFLIGHT_TIMEOUT):
+                    by_id[identifier] = flight.result
+                else:
+                    by_id[identifier] = {"success": False, "error": "Timed out waiting for in-flight scrape"}
+
+        for target, identifier in target_ids.items():
+            results[target] = by_id[identifier]
+        return results
+
+    def _scrape_claimed(self, platform: str, targets: Dict[str, str], results_limit: int) -> Dict[str, dict]:
+        """Quota-check and scrape identifier -> target in as few actor runs as possible."""
+        label = platform.capitalize()
+        out: Dict[str, dict] = {}
+        allowed = []
+        for identifier in targets:
+            logger.info(f"[SOCMINT] Cache miss for {label}/{identifier}, checking quota")
+            if not check_daily_quota(platform):
+                logger.warning(f"[SOCMINT] {label} quota exceeded, cannot scrape {targets[identifier]}")
+                _cache_metrics['errors'] += 1
+                out[identifier] = {
+                    "success": False,
+                    "error": f"Daily quota exceeded - {label} SOCMINT temporarily disabled"
+                }
+                continue
+            # Quota stays per profile/page, however many share a run
+            increment_daily_usage(platform)
+            allowed.append(identifier)
+
+        for start in range(0, len(allowed), SOCMINT_BATCH_MAX_TARGETS):
+            chunk = {i: targets[i] for i in allowed[start:start + SOCMINT_BATCH_MAX_TARGETS]}
+            out.update(self._run_actor(platform, chunk, results_limit))
+        return out
+
+    def _run_actor(self, platform: str, chunk: Dict[str, str], results_limit: int) -> Dict[str, dict]:
+        """One Apify run for every target in chunk; results distributed back per identifier."""
+        label = platform.capitalize()
+        if platform == 'instagram':
+            run_input = {
+                "usernames": list(chunk.values()),
+                "resultsLimit": results_limit,
+                "searchType": "user"
             }
-        
-        # 2. Cache miss - log and check quota
-        logger.info(f"[SOCMINT] Cache miss for Instagram/{username}, checking quota")
-        
-        if not check_daily_quota('instagram'):
-            logger.warning(f"[SOCMINT] Instagram quota exceeded, cannot scrape {username}")
-            _cache_metrics['errors'] += 1
-            return {
-                "success": False,
-                "error": "Daily quota exceeded - Instagram SOCMINT temporarily disabled"
+        else:
+            run_input = {
+                "startUrls": [{"url": url} for url in chunk.values()],
+                "resultsLimit": results_limit,
+                "proxyConfig": {
+                    "useApifyProxy": True,
+                    "apifyProxyGroups": ["RESIDENTIAL"]
+                }
             }
-        
-        # 3. Quota available - proceed with fresh scrape
-        actor_id = "apify/instagram-scraper"
-        
-        run_input = {
-            "usernames": [username],
-            "resultsLimit": results_limit,
-            "searchType": "user"
-        }
-        
+
         try:
-            logger.info(f"[SOCMINT] Starting fresh Instagram scrape: {username} (limit={results_limit})")
+            logger.info(f"[SOCMINT] Starting fresh {label} scrape: {', '.join(chunk.values())} (limit={results_limit})")
             _cache_metrics['apify_calls'] += 1
-            self.platform_metrics['instagram']['apify_calls'] += 1
-            increment_daily_usage('instagram')
-            
-            run = self.client.actor(actor_id).call(run_input=run_input)
+            self.platform_metrics[platform]['apify_calls'] += 1
+
+            run = self.client.actor(_ACTORS[platform]).call(run_input=run_input)
             items = [i for i in self.client.dataset(run["defaultDatasetId"]).iterate_items()]
-            
-            if not items:
-                logger.warning(f"[SOCMINT] Instagram scrape returned no data: {username}")
-                _cache_metrics['errors'] += 1
-                self.platform_metrics['instagram']['errors'] += 1
+        except Exception as e:
+            logger.error(f"[SOCMINT] {label} scraper failed: {', '.join(chunk.values())} - {str(e)}", exc_info=True)
+            _cache_metrics['errors'] += 1
+            self.platform_metrics[platform]['errors'] += 1
+            for identifier in chunk:
                 self.error_buffer.append({
                     'ts': datetime.utcnow().isoformat(),
-                    'platform': 'instagram',
-                    'identifier': username,
-                    'error': 'empty-result'
+                    'platform': platform,
+                    'identifier': identifier,
+                    'error': str(e)
                 })
-                return {"success": False, "error": "No data returned"}
-                
-            # Extract profile and posts
-            profile = next((item for item in items if item.get("type") == "profile"), items[0])
-            posts = [item for item in items if item.get("type") == "post"]
-            
-            logger.info(f"[SOCMINT] Instagram scrape successful: {username} - "
-                       f"profile={bool(profile)}, posts={len(posts)}")
-            
-            result_data = {
-                "profile": profile,
-                "posts": posts
-            }
-            
-            # 4. Save to cache for future requests
-            self.save_socmint_data('instagram', username, result_data)
-            
-            return {
-                "success": True,
-                "data": result_data,
-                "source": "fresh"
-            }
-        except Exception as e:
-            logger.error(f"[SOCMINT] Instagram scraper failed: {username} - {str(e)}", exc_info=True)
-            _cache_metrics['errors'] += 1
-            self.platform_metrics['instagram']['errors'] += 1
-            self.error_buffer.append({
-                'ts': datetime.utcnow().isoformat(),
-                'platform': 'instagram',
-                'identifier': username,
-                'error': str(e)
-            })
-            return {"success": False, "error": str(e)}
+            return {identifier: {"success": False, "error": str(e)} for identifier in chunk}
 
-    def run_facebook_scraper(self, page_url: str, results_limit: int = 20) -> dict:
-        """Scrape Facebook page/group posts with cache-first pattern."""
-        
-        # Validate URL format early
-        if not page_url.startswith(("https://www.facebook.com/", "https://facebook.com/")):
-            logger.warning(f"[SOCMINT] Invalid Facebook URL format: {page_url}")
-            _cache_metrics['errors'] += 1
-            return {"success": False, "error": "Invalid Facebook URL format"}
-        
-        # Extract identifier from URL for cache key
-        identifier = page_url.replace("https://www.facebook.com/", "").replace("https://facebook.com/", "").split("?")[0]
-        
-        # 1. Try cache first (2-hour TTL)
-        ttl_minutes = int(os.getenv('SOCMINT_CACHE_TTL_MINUTES', 120))
-        cached = self.get_cached_socmint_data('facebook', identifier, ttl_minutes)
-        
-        if cached.get('success'):
-            logger.info(f"[SOCMINT] Cache hit for Facebook/{identifier}")
-            return {
-                "success": True,
-                "data": cached['data'],
-                "source": "cache",
-                "scraped_at": cached.get('scraped_at')
-            }
-        
-        # 2. Cache miss - log and check quota
-        logger.info(f"[SOCMINT] Cache miss for Facebook/{identifier}, checking quota")
-        
-        if not check_daily_quota('facebook'):
-            logger.warning(f"[SOCMINT] Facebook quota exceeded, cannot scrape {page_url}")
-            _cache_metrics['errors'] += 1
-            return {
-                "success": False,
-                "error": "Daily quota exceeded - Facebook SOCMINT temporarily disabled"
-            }
-        
-        # 3. Quota available - proceed with fresh scrape
-        actor_id = "apify/facebook-posts-scraper"
-        
-        run_input = {
-            "startUrls": [{"url": page_url}],
-            "resultsLimit": results_limit,
-            "proxyConfig": {
-                "useApifyProxy": True,
-                "apifyProxyGroups": ["RESIDENTIAL"]
-            }
-        }
-        
-        try:
-            logger.info(f"[SOCMINT] Starting fresh Facebook scrape: {page_url} (limit={results_limit})")
-            _cache_metrics['apify_calls'] += 1
-            self.platform_metrics['facebook']['apify_calls'] += 1
-            increment_daily_usage('facebook')
-            
-            run = self.client.actor(actor_id).call(run_input=run_input)
-            items = [i for i in self.client.dataset(run["defaultDatasetId"]).iterate_items()]
-            
-            if not items:
-                logger.warning(f"[SOCMINT] Facebook scrape returned no data: {page_url}")
+        grouped = self._group_items(platform, chunk, items)
+        out = {}
+        for identifier, target in chunk.items():
+            own = grouped.get(identifier)
+            if not own:
+                logger.warning(f"[SOCMINT] {label} scrape returned no data: {target}")
                 _cache_metrics['errors'] += 1
-                self.platform_metrics['facebook']['errors'] += 1
+                self.platform_metrics[platform]['errors'] += 1
                 self.error_buffer.append({
                     'ts': datetime.utcnow().isoformat(),
-                    'platform': 'facebook',
+                    'platform': platform,
                     'identifier': identifier,
                     'error': 'empty-result'
                 })
-                return {"success": False, "error": "No data returned or page is private"}
-            
-            logger.info(f"[SOCMINT] Facebook scrape successful: {page_url} - posts={len(items)}")
-            
-            result_data = {
-                "page_info": {
-                    "url": page_url,
-                    "total_posts": len(items)
-                },
-                "posts": items
-            }
-            
-            # 4. Save to cache for future requests
-            self.save_socmint_data('facebook', identifier, result_data)
-            
-            return {
+                error = "No data returned" if platform == 'instagram' else "No data returned or page is private"
+                out[identifier] = {"success": False, "error": error}
+                continue
+
+            if platform == 'instagram':
+                # Extract profile and posts
+                profile = next((item for item in own if item.get("type") == "profile"), own[0])
+                posts = [item for item in own if item.get("type") == "post"]
+                logger.info(f"[SOCMINT] Instagram scrape successful: {target} - "
+                           f"profile={bool(profile)}, posts={len(posts)}")
+                result_data = {
+                    "profile": profile,
+                    "posts": posts
+                }
+            else:
+                logger.info(f"[SOCMINT] Facebook scrape successful: {target} - posts={len(own)}")
+                result_data = {
+                    "page_info": {
+                        "url": target,
+                        "total_posts": len(own)
+                    },
+                    "posts": own
+                }
+
+            # Save to cache for future requests
+            self.save_socmint_data(platform, identifier, result_data)
+            out[identifier] = {
                 "success": True,
                 "data": result_data,
                 "source": "fresh"
             }
-        except Exception as e:
-            logger.error(f"[SOCMINT] Facebook scraper failed: {page_url} - {str(e)}", exc_info=True)
-            _cache_metrics['errors'] += 1
-            self.platform_metrics['facebook']['errors'] += 1
-            self.error_buffer.append({
-                'ts': datetime.utcnow().isoformat(),
-                'platform': 'facebook',
-                'identifier': identifier,
-                'error': str(e)
-            })
-            return {"success": False, "error": str(e)}
+        return out
+
+    @staticmethod
+    def _group_items(platform: str, chunk: Dict[str, str], items: List[dict]) -> Dict[str, List[dict]]:
+        """Assign dataset items of a multi-target run to the identifier they belong to."""
+        if len(chunk) == 1:
+            return {next(iter(chunk)): items}
+
+        if platform == 'instagram':
+            owners = {identifier.lower(): identifier for identifier in chunk}
+            fields = ("ownerUsername", "username")
+            key_of = lambda value: value.lower()
+        else:
+            owners = {identifier.lower().rstrip("/"): identifier for identifier in chunk}
+            fields = ("facebookUrl", "inputUrl", "pageUrl")
+            key_of = lambda value: _facebook_identifier(value.replace("://m.", "://www.")).lower().rstrip("/")
+
+        grouped: Dict[str, List[dict]] = {}
+        unmatched = 0
+        for item in items:
+            owner = None
+            for field in fields:
+                value = item.get(field)
+                if isinstance(value, str) and key_of(value) in owners:
+                    owner = owners[key_of(value)]
+                    break
+            if owner is None:
+                unmatched += 1
+                continue
+            grouped.setdefault(owner, []).append(item)
+        if unmatched:
+            logger.warning(f"[SOCMINT] {unmatched} {platform} items could not be matched to a target")
+        return grouped
 
     def save_socmint_data(self, platform: str, identifier: str, data: dict) -> bool:
         """Persist SOCMINT data into socmint_profiles via UPSERT."""
@@ -359,6 +541,7 @@ class SocmintService:
                 Json(profile_data) if profile_data is not None else None,
                 Json(posts_data) if posts_data is not None else None,
             ))
+            _redis_put(platform, identifier, data, datetime.utcnow())
             _cache_metrics['cache_saves'] += 1
             logger.info("[SOCMINT] Persisted %s for %s (profile=%s, posts=%s)", 
                        platform, identifier, 
@@ -371,7 +554,9 @@ class SocmintService:
             return False
 
     def get_cached_socmint_data(self, platform: str, identifier: str, ttl_minutes: int = 120) -> dict:
-        """Return cached SOCMINT data from DB if within TTL.
+        """Return cached SOCMINT data from Redis or the DB if within TTL.
+
+        DB hits are copied into Redis so repeat lookups skip Postgres.
         
         Args:
             platform: 'instagram' or 'facebook'
@@ -382,6 +567,15 @@ class SocmintService:
             dict: { 'success': bool, 'data': {...}, 'scraped_at': iso_ts } if cached
         """
         _cache_metrics['total_requests'] += 1
+
+        hot = _redis_get(platform, identifier, ttl_minutes)
+        if hot is not None:
+            _cache_metrics['hits'] += 1
+            _cache_metrics['redis_hits'] += 1
+            if platform in self.platform_metrics:
+                self.platform_metrics[platform]['cache_hits'] += 1
+            logger.debug(f"[SOCMINT] Redis hit: {platform}/{identifier}")
+            return {"success": True, "data": hot['data'], "scraped_at": hot.get('scraped_at')}
         
         try:
             row = fetch_one(
@@ -417,6 +611,7 @@ class SocmintService:
             else:
                 data["profile"] = profile_data
             data["posts"] = posts_data or []
+            _redis_put(platform, identifier, data, scraped_ts)
             return {"success": True, "data": data, "scraped_at": scraped_ts.isoformat() if scraped_ts else None}
         except Exception as e:
             logger.warning(f"[SOCMINT] Cache lookup failed: {platform}/{identifier} - {e}")
@@ -529,3 +724,16 @@ class SocmintService:
             'recent_errors': list(self.error_buffer)[-20:],
             'insights': self.generate_insights(ig_stats, fb_stats)
         }
+
+
+_instance: Optional[SocmintService] = None
+_instance_lock = threading.Lock()
+
+def get_socmint_service() -> SocmintService:
+    """Process-wide SocmintService, shared by enrichment and the API."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = SocmintService()
+    return _instance
@@ -17,22 +17,16 @@ except Exception:
     def _is_paid(_email: str) -> bool:  # fallback denies if plan_utils missing
         return False
 
-try:
-    from telegram import Bot
-    _HAVE_TG = True
-except Exception as e:
-    logger.info("python-telegram-bot not available: %s", e)
-    _HAVE_TG = False
-
 def send_telegram_message(user_email: str, chat_id: str, text: str, parse_mode: Optional[str] = None) -> bool:
     """
     Paid-only, opt-in push. Unmetered. Returns False if not allowed or disabled.
+    Queued on the shared notification dispatcher, which sends via the Bot API.
     """
     if not _is_paid(user_email):
         logger.debug("telegram push denied: user not on paid plan (%s)", user_email)
         return False
-    if not TELEGRAM_PUSH_ENABLED or not _HAVE_TG:
-        logger.debug("telegram push disabled or missing deps")
+    if not TELEGRAM_PUSH_ENABLED:
+        logger.debug("telegram push disabled")
         return False
 
     token = CONFIG.telegram.bot_token
@@ -41,9 +35,10 @@ def send_telegram_message(user_email: str, chat_id: str, text: str, parse_mode:
         return False
 
     try:
-        bot = Bot(token=token)
-        bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode or "HTML", disable_web_page_preview=True)
-        return True
+        from services.notification_dispatcher import get_notification_dispatcher
+        return get_notification_dispatcher().submit(
+            "telegram", str(chat_id), {"text": text, "parse_mode": parse_mode or "HTML"}
+        )
     except Exception as e:
         logger.error("send_telegram_message failed: %s", e)
         return False
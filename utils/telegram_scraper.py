@@ -1,13 +1,16 @@
 # telegram_scraper.py — OSINT ingestion (unmetered) • v2025-08-13
 from __future__ import annotations
 import os
+import time
 import uuid
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from core.config import CONFIG
 
-from utils.db_utils import save_raw_alerts_to_db
+from utils.db_utils import save_raw_alerts_to_db, fetch_telegram_offsets, upsert_telegram_offsets
+from utils.lang_id import detect_many
 
 logger = logging.getLogger("telegram_scraper")
 logging.basicConfig(level=CONFIG.security.log_level)
@@ -19,11 +22,21 @@ TELEGRAM_ENABLED = CONFIG.telegram.enabled
 MAX_MSG_AGE_DAYS = CONFIG.telegram.max_msg_age_days
 BATCH_LIMIT = CONFIG.telegram.batch_limit
 
+# Channels fetched in parallel, raw_alerts rows per save, and the longest
+# FloodWait we sleep through before giving up on the rest of the run
+CONCURRENCY = CONFIG.telegram.concurrency
+SAVE_BATCH_SIZE = CONFIG.telegram.save_batch_size
+FLOOD_WAIT_MAX_S = CONFIG.telegram.flood_wait_max_s
+
+# GetHistoryRequest returns at most 100 messages per call
+PAGE_SIZE = 100
+
 # Try import Telethon (recommended), else soft-disable
 try:
     from telethon import TelegramClient
     from telethon.tl.functions.messages import GetHistoryRequest
     from telethon.tl.types import PeerChannel
+    from telethon.errors import FloodWaitError
     _HAVE_TELETHON = True
 except Exception as e:
     logger.info("Telethon not available: %s", e)
@@ -74,7 +87,7 @@ def _coerce_alert(ch_name: str, msg: Any) -> Optional[Dict[str, Any]]:
             "country": None,
             "city": None,
             "tags": ["telegram","osint"],
-            "language": "en",    # or attempt language detect in risk_shared if you want
+            "language": "en",    # replaced per batch by detect_many() in _AlertSink._save
             "ingested_at": datetime.utcnow(),
         }
     except Exception as e:
@@ -82,9 +95,147 @@ def _coerce_alert(ch_name: str, msg: Any) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _channel_key(ch: str) -> str:
+    return (ch or "").strip().lstrip("@").lower()
+
+
+class _FloodLimiter:
+    """
+    Caps concurrent Telegram requests and honours FloodWait for all of them.
+
+    A FloodWaitError pauses every caller until the wait has passed and the
+    request is retried once. A wait above max_wait_s ends the run instead:
+    later calls raise the same error rather than queueing behind it.
+    """
+
+    def __init__(self, concurrency: int, max_wait_s: float):
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._resume_at = 0.0
+        self._abort: Optional[Exception] = None
+        self.max_wait_s = max_wait_s
+        self.flood_waits = 0
+
+    async def call(self, fn, *args):
+        for attempt in range(2):
+            async with self._sem:
+                if self._abort is not None:
+                    raise self._abort
+                delay = self._resume_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    return await fn(*args)
+                except FloodWaitError as e:
+                    wait = float(getattr(e, "seconds", 0) or 0)
+                    self.flood_waits += 1
+                    logger.warning("Telegram FloodWait of %ss", wait)
+                    if wait > self.max_wait_s:
+                        self._abort = e
+                        raise
+                    self._resume_at = max(self._resume_at, time.monotonic() + wait)
+                    if attempt:
+                        raise
+
+
+class _AlertSink:
+    """Buffers harvested alerts and saves them in batches while channels are still being fetched."""
+
+    def __init__(self, batch_size: int, write_to_db: bool):
+        self.batch_size = max(1, batch_size)
+        self.write_to_db = write_to_db
+        self.harvested = 0
+        self.wrote = 0
+        self.preview: List[Dict[str, Any]] = []
+        self.failed_channels: Set[str] = set()
+        self._buffer: List[Dict[str, Any]] = []
+        self._channels: Set[str] = set()
+        self._lock = asyncio.Lock()
+
+    async def add(self, channel: str, alerts: List[Dict[str, Any]]) -> None:
+        if not alerts:
+            return
+        self.harvested += len(alerts)
+        self._buffer.extend(alerts)
+        self._channels.add(channel)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            batch, channels = self._buffer, self._channels
+            self._buffer, self._channels = [], set()
+            if not batch:
+                return
+            wrote = await asyncio.to_thread(self._save, batch)
+            if len(self.preview) < 3:
+                self.preview.extend(batch[:3 - len(self.preview)])
+            if self.write_to_db and not wrote:
+                # Keep these channels' marks so the next run fetches them again
+                self.failed_channels |= channels
+            self.wrote += wrote
+
+    def _save(self, batch: List[Dict[str, Any]]) -> int:
+        for alert, language in zip(batch, detect_many(a["summary"] for a in batch)):
+            alert["language"] = language
+        if not self.write_to_db:
+            return 0
+        try:
+            return save_raw_alerts_to_db(batch)
+        except Exception as e:
+            logger.error("Telegram batch save failed: %s", e)
+            return 0
+
+
+async def _fetch_channel(client, limiter: _FloodLimiter, ch: str, min_id: int,
+                         limit: int, max_age: datetime) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Page through messages newer than min_id, newest first.
+
+    Stops after `limit` messages or at the first one older than max_age.
+    A backlog longer than `limit` is skipped, as the old latest-`limit` pull did.
+
+    Returns:
+        (alerts, highest message id seen, messages fetched)
+    """
+    entity = await limiter.call(client.get_entity, ch)
+    name = (getattr(entity, "username", None) or _channel_key(ch)).lower()
+    alerts: List[Dict[str, Any]] = []
+    high, fetched, offset_id = min_id, 0, 0
+    while fetched < limit:
+        page = min(PAGE_SIZE, limit - fetched)
+        history = await limiter.call(client, GetHistoryRequest(
+            peer=entity, limit=page, offset_date=None,
+            offset_id=offset_id, max_id=0, min_id=min_id, add_offset=0, hash=0
+        ))
+        messages = list(history.messages or [])
+        if not messages:
+            break
+        fetched += len(messages)
+        reached_old = False
+        for msg in messages:
+            high = max(high, getattr(msg, "id", 0) or 0)
+            dt = getattr(msg, "date", None)
+            if dt and _utc(dt) < max_age:
+                reached_old = True
+                continue
+            alert = _coerce_alert(name, msg)
+            if alert:
+                alerts.append(alert)
+        offset_id = min(getattr(m, "id", 0) or 0 for m in messages)
+        if reached_old or len(messages) < page or offset_id <= min_id + 1:
+            break
+    return alerts, high, fetched
+
+
 async def ingest_telegram_channels_to_db(channels: List[str], limit: int = BATCH_LIMIT, write_to_db: bool = True) -> Dict[str, Any]:
     """
-    Async entry: scrapes recent messages from channels into raw_alerts (unmetered).
+    Async entry: scrapes new messages from channels into raw_alerts (unmetered).
+
+    Only messages above each channel's stored high-water mark are requested
+    (min_id). Channels are fetched concurrently under a FloodWait-aware
+    limiter, and alerts are saved in batches as channels finish. Marks are
+    advanced only for channels that were fetched and saved, and only when
+    write_to_db is set.
     """
     if not TELEGRAM_ENABLED:
         return {"ok": False, "reason": "TELEGRAM_ENABLED is false", "count": 0}
@@ -99,34 +250,56 @@ async def ingest_telegram_channels_to_db(channels: List[str], limit: int = BATCH
     if not api_id or not api_hash:
         return {"ok": False, "reason": "TELEGRAM_API_ID/TELEGRAM_API_HASH missing", "count": 0}
 
-    client = TelegramClient(session, int(api_id), api_hash)
+    try:
+        offsets = {r["channel"]: int(r["last_message_id"] or 0)
+                   for r in await asyncio.to_thread(fetch_telegram_offsets)}
+    except Exception as e:
+        logger.warning("Telegram offsets unavailable, fetching latest messages: %s", e)
+        offsets = {}
+
+    # FloodWaits are handled by _FloodLimiter rather than slept through inside Telethon
+    client = TelegramClient(session, int(api_id), api_hash, flood_sleep_threshold=0)
     await client.start()
 
     max_age = _today_utc() - timedelta(days=MAX_MSG_AGE_DAYS)
-    harvested: List[Dict[str, Any]] = []
+    per_channel = min(limit, BATCH_LIMIT)
+    limiter = _FloodLimiter(CONCURRENCY, FLOOD_WAIT_MAX_S)
+    sink = _AlertSink(SAVE_BATCH_SIZE, write_to_db)
+    marks: Dict[str, int] = {}
+    failed: List[str] = []
+    fetched_total = 0
 
-    for ch in (channels or []):
+    async def _harvest(ch: str) -> None:
+        nonlocal fetched_total
+        key = _channel_key(ch)
         try:
-            entity = await client.get_entity(ch)
-            # simple page pull
-            history = await client(GetHistoryRequest(
-                peer=entity, limit=min(limit, BATCH_LIMIT), offset_date=None,
-                offset_id=0, max_id=0, min_id=0, add_offset=0, hash=0
-            ))
-            for msg in history.messages:
-                dt = getattr(msg, "date", None)
-                if dt and _utc(dt) < max_age:
-                    continue
-                alert = _coerce_alert(getattr(entity, 'username', ch).lower(), msg)
-                if alert:
-                    harvested.append(alert)
+            alerts, high, fetched = await _fetch_channel(client, limiter, ch, offsets.get(key, 0), per_channel, max_age)
         except Exception as e:
             logger.warning("Channel '%s' fetch failed: %s", ch, e)
+            failed.append(ch)
+            return
+        fetched_total += fetched
+        if high > offsets.get(key, 0):
+            marks[key] = high
+        await sink.add(key, alerts)
 
-    await client.disconnect()
+    try:
+        await asyncio.gather(*[_harvest(ch) for ch in dict.fromkeys(channels or [])])
+        await sink.flush()
+    finally:
+        await client.disconnect()
 
-    wrote = 0
-    if write_to_db and harvested:
-        wrote = save_raw_alerts_to_db(harvested)
+    advanced = 0
+    if write_to_db:
+        rows = [(key, high) for key, high in marks.items() if key not in sink.failed_channels]
+        advanced = await asyncio.to_thread(upsert_telegram_offsets, rows) if rows else 0
 
-    return {"ok": True, "count": wrote if write_to_db else len(harvested), "preview": harvested[:3]}
+    return {
+        "ok": True,
+        "count": sink.wrote if write_to_db else sink.harvested,
+        "fetched": fetched_total,
+        "channels_failed": failed,
+        "offsets_advanced": advanced,
+        "flood_waits": limiter.flood_waits,
+        "preview": sink.preview,
+    }
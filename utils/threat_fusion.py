@@ -4,13 +4,79 @@ Unified threat intelligence fusion for Sentinel AI.
 Combines RSS alerts + GDELT events + ACLED data + SOCMINT into cohesive threat assessments.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 import logging
-from math import radians, cos, sin, asin, sqrt
+import math
+import os
+
+from utils.geo_utils import bounding_box, haversine_distance, haversine_many
 
 logger = logging.getLogger("threat_fusion")
 
+# Upper bound on how long assess_location waits for any single source
+SOURCE_TIMEOUT = float(os.getenv("THREAT_FUSION_SOURCE_TIMEOUT", "10"))
+
+# Cross-source matching: same day and within this distance
+MATCH_DISTANCE_KM = 10.0
+# Grid cell size (degrees latitude) used to bucket threats for matching
+_GRID_CELL_DEG = 0.1
+
+class _ThreatGrid:
+    """Spatial index bucketing threats by (date, lat cell, lon cell).
+    
+    Replaces a linear scan over every accepted threat when looking for a
+    same-day match within MATCH_DISTANCE_KM; only neighbouring cells are checked.
+    """
+    
+    def __init__(self, cell_deg: float = _GRID_CELL_DEG, max_km: float = MATCH_DISTANCE_KM):
+        self.cell_deg = cell_deg
+        self.max_km = max_km
+        self._cells: Dict[Tuple[str, int, int], List[Tuple[int, Dict]]] = {}
+        self._count = 0
+    
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+    
+    def add(self, threat: Dict) -> None:
+        date = str(threat.get('date', ''))[:8]
+        key = (date,) + self._cell(threat.get('lat', 0) or 0, threat.get('lon', 0) or 0)
+        self._cells.setdefault(key, []).append((self._count, threat))
+        self._count += 1
+    
+    def find(self, threat: Dict) -> Optional[Dict]:
+        """Return the earliest-added threat matching by date and distance, if any."""
+        date = str(threat.get('date', ''))[:8]
+        lat = threat.get('lat', 0) or 0
+        lon = threat.get('lon', 0) or 0
+        
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, self.max_km)
+        lat_lo, lon_lo = self._cell(min_lat, min_lon)
+        lat_hi, lon_hi = self._cell(max_lat, max_lon)
+        # Wrap longitude cells so matches across the antimeridian are found;
+        # near the poles the box can span every column.
+        n_lon = int(round(360 / self.cell_deg))
+        half = n_lon // 2
+        if lon_hi - lon_lo + 1 >= n_lon:
+            lon_cells = range(-half, n_lon - half)
+        else:
+            lon_cells = [((c + half) % n_lon) - half for c in range(lon_lo, lon_hi + 1)]
+        
+        best = None
+        for lat_cell in range(lat_lo, lat_hi + 1):
+            for lon_cell in lon_cells:
+                for order, candidate in self._cells.get((date, lat_cell, lon_cell), ()):
+                    if best is not None and order >= best[0]:
+                        continue
+                    distance = ThreatFusion._haversine_distance(
+                        lat, lon, candidate.get('lat', 0), candidate.get('lon', 0)
+                    )
+                    if distance < self.max_km:
+                        best = (order, candidate)
+        return best[1] if best else None
+
+
 class ThreatFusion:
     
     @staticmethod
@@ -27,23 +93,14 @@ class ThreatFusion:
         Returns structured assessment with risk level, categories, and actionable intel.
         """
         
-        # 1. Gather GDELT threats
-        gdelt_threats = ThreatFusion._get_gdelt_threats(lat, lon, radius_km, days)
-        
-        # 2. Gather RSS alerts from your alerts table
-        rss_threats = ThreatFusion._get_rss_threats(lat, lon, radius_km, days)
-        
-        # 3. Get ACLED data if available
-        acled_threats = ThreatFusion._get_acled_threats(lat, lon, radius_km, days)
-        
-        # 4. Get SOCMINT signals if available
-        socmint_signals = ThreatFusion._get_socmint_signals(lat, lon, radius_km, days)
-        
-        # 5. Get country-level summary if country code provided
-        country_summary = None
-        if country_code:
-            from gdelt_query import GDELTQuery
-            country_summary = GDELTQuery.get_country_summary(country_code, days=30)
+        # 1-5. Gather all sources concurrently; each fetcher swallows its own
+        # errors, so assessment latency is bounded by the slowest source.
+        sources = ThreatFusion._gather_sources(lat, lon, country_code, radius_km, days)
+        gdelt_threats = sources['gdelt']
+        rss_threats = sources['rss']
+        acled_threats = sources['acled']
+        socmint_signals = sources['socmint']
+        country_summary = sources['country_summary']
         
         # 6. Deduplicate (same event from multiple sources)
         all_threats = ThreatFusion._deduplicate_threats(
@@ -83,6 +140,62 @@ class ThreatFusion:
             'verified_by_multiple_sources': len([t for t in all_threats if t.get('source_count', 0) > 1])
         }
     
+    @staticmethod
+    def _gather_sources(lat: float, lon: float, country_code: Optional[str],
+                        radius_km: int, days: int) -> Dict:
+        """Run the per-source fetchers in parallel and collect their results.
+        
+        A source that fails or exceeds THREAT_FUSION_SOURCE_TIMEOUT contributes
+        an empty result instead of stalling the whole assessment.
+        """
+        fetchers = {
+            'gdelt': (ThreatFusion._get_gdelt_threats, (lat, lon, radius_km, days)),
+            'rss': (ThreatFusion._get_rss_threats, (lat, lon, radius_km, days)),
+            'acled': (ThreatFusion._get_acled_threats, (lat, lon, radius_km, days)),
+            'socmint': (ThreatFusion._get_socmint_signals, (lat, lon, radius_km, days)),
+        }
+        if country_code:
+            fetchers['country_summary'] = (ThreatFusion._get_country_summary, (country_code,))
+        
+        results = {name: [] for name in ('gdelt', 'rss', 'acled', 'socmint')}
+        results['country_summary'] = None
+        
+        executor = ThreadPoolExecutor(max_workers=len(fetchers), thread_name_prefix="threat_fusion")
+        try:
+            futures = {
+                executor.submit(fn, *args): name
+                for name, (fn, args) in fetchers.items()
+            }
+            try:
+                for future in as_completed(futures, timeout=SOURCE_TIMEOUT):
+                    name = futures[future]
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        logger.error("[threat_fusion] %s fetch failed: %s", name, e)
+                        continue
+                    if value is not None:
+                        results[name] = value
+            except FuturesTimeout:
+                pending = [name for f, name in futures.items() if not f.done()]
+                logger.warning("[threat_fusion] Sources timed out after %ss: %s",
+                               SOURCE_TIMEOUT, ", ".join(pending))
+        finally:
+            # Don't block the request on stragglers; their results are discarded
+            executor.shutdown(wait=False)
+        
+        return results
+    
+    @staticmethod
+    def _get_country_summary(country_code: str) -> Optional[Dict]:
+        """Fetch GDELT country-level summary"""
+        try:
+            from gdelt_query import GDELTQuery
+            return GDELTQuery.get_country_summary(country_code, days=30)
+        except Exception as e:
+            logger.error("[threat_fusion] Country summary failed: %s", e)
+            return None
+    
     @staticmethod
     def _get_gdelt_threats(lat: float, lon: float, radius_km: int, days: int) -> List[Dict]:
         """Fetch GDELT threats near location"""
@@ -101,6 +214,14 @@ class ThreatFusion:
             
             cutoff_date = datetime.utcnow() - timedelta(days=days)
             
+            # Bounding-box prefilter lets idx_alerts_geo_bbox narrow the scan
+            # before the exact great-circle check runs on the survivors.
+            min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+            min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+            if min_lon < -180 or max_lon > 180:
+                # Box crosses the antimeridian; only latitude can be bounded
+                min_lon, max_lon = -180.0, 180.0
+            
             query = """
             SELECT 
                 uuid,
@@ -124,12 +245,14 @@ class ThreatFusion:
                 latitude IS NOT NULL 
                 AND longitude IS NOT NULL
                 AND published >= %s
+                AND latitude BETWEEN %s AND %s
+                AND longitude BETWEEN %s AND %s
                 AND (
-                    6371 * acos(
+                    6371 * acos(LEAST(1.0,
                         cos(radians(%s)) * cos(radians(latitude)) *
                         cos(radians(longitude) - radians(%s)) +
                         sin(radians(%s)) * sin(radians(latitude))
-                    )
+                    ))
                 ) <= %s
             ORDER BY published DESC
             LIMIT 100
@@ -137,11 +260,20 @@ class ThreatFusion:
             
             with _get_db_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(query, (cutoff_date, lat, lon, lat, radius_km))
+                cur.execute(query, (
+                    cutoff_date, min_lat, max_lat, min_lon, max_lon,
+                    lat, lon, lat, radius_km
+                ))
                 rows = cur.fetchall()
                 
+                distances = haversine_many(
+                    lat, lon,
+                    [float(row[8]) if row[8] else 0 for row in rows],
+                    [float(row[9]) if row[9] else 0 for row in rows]
+                ).tolist()
+                
                 threats = []
-                for row in rows:
+                for row, distance_km in zip(rows, distances):
                     threats.append({
                         'event_id': row[0],  # uuid
                         'date': row[5].strftime('%Y%m%d') if row[5] else '',  # published
@@ -161,11 +293,7 @@ class ThreatFusion:
                         'source_url': row[3],  # link
                         'confidence': row[14],  # confidence
                         'label': row[13],  # label
-                        'distance_km': ThreatFusion._haversine_distance(
-                            lat, lon, 
-                            float(row[8]) if row[8] else 0, 
-                            float(row[9]) if row[9] else 0
-                        )
+                        'distance_km': distance_km
                     })
                 
                 return threats
@@ -220,6 +348,7 @@ class ThreatFusion:
         """
         all_threats = []
         seen_signatures = set()
+        grid = _ThreatGrid()
         
         # GDELT events
         for threat in gdelt:
@@ -229,13 +358,14 @@ class ThreatFusion:
                 threat['source_count'] = 1
                 threat['verified'] = False
                 all_threats.append(threat)
+                grid.add(threat)
                 seen_signatures.add(sig)
         
         # RSS alerts (Sentinel AI curated)
         for threat in rss:
             sig = ThreatFusion._threat_signature(threat, 'rss')
             # Check if similar GDELT event exists (same day, ~same location)
-            match = ThreatFusion._find_matching_threat(threat, all_threats)
+            match = grid.find(threat)
             if match:
                 match['source'] = f"{match['source']}, RSS"
                 match['source_count'] += 1
@@ -250,12 +380,13 @@ class ThreatFusion:
                 threat['source_count'] = 1
                 threat['verified'] = False
                 all_threats.append(threat)
+                grid.add(threat)
                 seen_signatures.add(sig)
         
         # ACLED events
         for threat in acled:
             sig = ThreatFusion._threat_signature(threat, 'acled')
-            match = ThreatFusion._find_matching_threat(threat, all_threats)
+            match = grid.find(threat)
             if match:
                 match['source'] = f"{match['source']}, ACLED"
                 match['source_count'] += 1
@@ -265,6 +396,7 @@ class ThreatFusion:
                 threat['source_count'] = 1
                 threat['verified'] = False
                 all_threats.append(threat)
+                grid.add(threat)
                 seen_signatures.add(sig)
         
         # Sort by: verified (multi-source) first, then source count, then severity
@@ -285,38 +417,10 @@ class ThreatFusion:
         country = threat.get('country', '')
         return f"{date}_{lat}_{lon}_{country}_{source}"
     
-    @staticmethod
-    def _find_matching_threat(new_threat: Dict, existing: List[Dict]) -> Optional[Dict]:
-        """Find if threat already exists (similar date + location)"""
-        new_date = str(new_threat.get('date', ''))[:8]
-        new_lat = new_threat.get('lat', 0)
-        new_lon = new_threat.get('lon', 0)
-        
-        for existing_threat in existing:
-            exist_date = str(existing_threat.get('date', ''))[:8]
-            exist_lat = existing_threat.get('lat', 0)
-            exist_lon = existing_threat.get('lon', 0)
-            
-            # Same day + within 10km
-            if exist_date == new_date:
-                distance = ThreatFusion._haversine_distance(
-                    new_lat, new_lon, exist_lat, exist_lon
-                )
-                if distance < 10:  # 10km threshold
-                    return existing_threat
-        
-        return None
-    
     @staticmethod
     def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two points in km"""
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        km = 6371 * c
-        return km
+        return haversine_distance(lat1, lon1, lat2, lon2)
     
     @staticmethod
     def _categorize_threats(threats: List[Dict]) -> Dict:
@@ -184,7 +184,7 @@ def send_trial_reminder(user_id: int, user_email: str, plan: str, trial_day: int
             
             # Send push notification
             try:
-                from webpush_send import broadcast_to_user
+                from utils.webpush_send import broadcast_to_user
                 push_messages = {
                     1: "Welcome! Your trial has started",
                     3: "Day 3: Set up location monitoring",
@@ -4,14 +4,19 @@ Replaces O(N²) semantic similarity with efficient REAL[1536] vector operations.
 Uses the current pgvector-compatible system with cosine similarity.
 """
 
+import json
 import logging
 import math
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 
 # Import database utilities and embedding functionality
-from utils.db_utils import _get_db_connection, fetch_one, fetch_all
-from utils.risk_shared import get_embedding, embedding_manager
+from utils.db_utils import _get_db_connection, fetch_one, fetch_all, store_alert_embeddings_bulk
+from utils.risk_shared import get_embedding, get_embeddings, embedding_manager
 
 logger = logging.getLogger(__name__)
 
@@ -248,88 +253,145 @@ class VectorDeduplicator:
         self, 
         openai_client=None,
         batch_size: int = 20,
-        max_alerts: int = 1000
+        max_alerts: int = 1000,
+        checkpoint_path: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        max_failed_pages: int = 3
     ) -> int:
         """
-        Populate embeddings for existing alerts that don't have them.
+        Backfill embeddings for existing alerts that don't have them.
+        
+        Alerts are read in keyset pages (id DESC). Each batch is embedded with
+        one multi-input API request and written with one bulk UPDATE. Up to
+        `concurrency` batches are in flight at once, capped by the remaining
+        daily request quota.
         
         Args:
             openai_client: OpenAI client for embedding generation
-            batch_size: Number of alerts to process per batch
-            max_alerts: Maximum number of alerts to process
+            batch_size: Alerts per embedding request / UPDATE
+            max_alerts: Maximum number of alerts to process in this run
+            checkpoint_path: Optional JSON file recording the id below which
+                every alert is embedded; a later run resumes below it. It only
+                moves past batches that were fully stored, so alerts whose
+                batch failed are picked up again by the next run
+            concurrency: Batches in flight (default EMBEDDING_BACKFILL_CONCURRENCY)
+            max_failed_pages: Stop after this many consecutive pages in which
+                nothing was stored (e.g. an embedding API outage)
             
         Returns:
             Number of embeddings successfully created
         """
         logger.info("Starting batch embedding population for existing alerts")
         
+        if concurrency is None:
+            from core.config import CONFIG
+            concurrency = CONFIG.app.embedding_backfill_concurrency
+        concurrency = max(1, concurrency)
+        batch_size = max(1, batch_size)
+        
+        checkpoint = _load_backfill_checkpoint(checkpoint_path)
+        last_id = checkpoint.get("last_id")
+        # last_id is this run's keyset cursor; checkpoint_id stops at the first failed batch
+        checkpoint_id = last_id
+        checkpoint_held = False
+        failed_pages = 0
+        success_count = 0
+        processed = 0
+        page_size = batch_size * concurrency
+        
         try:
-            # Get alerts without embeddings (current REAL[] system)
-            query = """
-                SELECT uuid, title, summary, en_snippet
-                FROM alerts 
-                WHERE embedding IS NULL
-                ORDER BY created_at DESC
-                LIMIT %s
-            """
-            
-            alerts = fetch_all(query, (max_alerts,))
-            if not alerts:
-                logger.info("No alerts found without embeddings")
-                return 0
-            
-            logger.info(f"Found {len(alerts)} alerts without embeddings")
-            
-            success_count = 0
-            
-            # Process in batches to respect quota limits
-            for i in range(0, len(alerts), batch_size):
-                batch = alerts[i:i + batch_size]
-                batch_success = self._process_embedding_batch(batch, openai_client)
-                success_count += batch_success
-                
-                logger.info(f"Processed batch {i//batch_size + 1}: {batch_success}/{len(batch)} embeddings created")
-                
-                # Check quota status
-                status = embedding_manager.get_quota_status()
-                if status["tokens_remaining"] < 1000:
-                    logger.warning("Embedding quota running low, stopping batch processing")
-                    break
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed_backfill") as executor:
+                while processed < max_alerts:
+                    status = embedding_manager.get_quota_status()
+                    if status["tokens_remaining"] < 1000 or status["requests_remaining"] < 1:
+                        logger.warning("Embedding quota running low, stopping batch processing")
+                        break
+                    
+                    alerts = self._fetch_alerts_missing_embeddings(
+                        last_id, min(page_size, max_alerts - processed)
+                    )
+                    if not alerts:
+                        if processed == 0:
+                            logger.info("No alerts found without embeddings")
+                        break
+                    
+                    batches = [alerts[i:i + batch_size] for i in range(0, len(alerts), batch_size)]
+                    # Never have more requests in flight than the quota allows
+                    batches = batches[:max(1, status["requests_remaining"])]
+                    
+                    stored = list(executor.map(
+                        lambda b: self._process_embedding_batch(b, openai_client), batches
+                    ))
+                    page_success = sum(stored)
+                    page_count = sum(len(b) for b in batches)
+                    success_count += page_success
+                    processed += page_count
+                    last_id = batches[-1][-1]["id"]
+                    for batch, count in zip(batches, stored):
+                        if count < len(batch):
+                            checkpoint_held = True
+                        if checkpoint_held:
+                            break
+                        checkpoint_id = batch[-1]["id"]
+                    
+                    _save_backfill_checkpoint(checkpoint_path, {
+                        "last_id": checkpoint_id,
+                        "processed": checkpoint.get("processed", 0) + processed,
+                        "embedded": checkpoint.get("embedded", 0) + success_count,
+                    })
+                    logger.info(f"Embedding backfill: {success_count}/{processed} embedded "
+                                f"(last id {last_id}, checkpoint {checkpoint_id})")
+                    
+                    failed_pages = failed_pages + 1 if page_success == 0 else 0
+                    if failed_pages >= max_failed_pages:
+                        logger.error(f"Embedding backfill stopping: {failed_pages} consecutive pages failed")
+                        break
             
             logger.info(f"Batch embedding population complete: {success_count} embeddings created")
             return success_count
             
         except Exception as e:
             logger.error(f"Error in batch embedding population: {e}")
-            return 0
+            return success_count
+    
+    def _fetch_alerts_missing_embeddings(self, before_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+        """Next keyset page of alerts without embeddings, newest id first."""
+        if before_id is None:
+            query = """
+                SELECT id, uuid, title, summary, en_snippet
+                FROM alerts 
+                WHERE embedding IS NULL
+                ORDER BY id DESC
+                LIMIT %s
+            """
+            return fetch_all(query, (limit,))
+        query = """
+            SELECT id, uuid, title, summary, en_snippet
+            FROM alerts 
+            WHERE embedding IS NULL AND id < %s
+            ORDER BY id DESC
+            LIMIT %s
+        """
+        return fetch_all(query, (before_id, limit))
     
     def _process_embedding_batch(
         self, 
         alerts: List[Dict[str, Any]], 
         openai_client=None
     ) -> int:
-        """Process a batch of alerts for embedding generation."""
-        success_count = 0
-        
-        for alert in alerts:
-            try:
-                # Prepare content
-                content = self._prepare_alert_content(alert)
-                
-                # Generate embedding
-                embedding = get_embedding(content, openai_client)
-                
-                # Store in database
-                if self.store_alert_embedding(alert["uuid"], embedding):
-                    success_count += 1
-                else:
-                    logger.warning(f"Failed to store embedding for alert {alert['uuid']}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing embedding for alert {alert.get('uuid', 'unknown')}: {e}")
-                continue
-        
-        return success_count
+        """Embed a batch with one API request and store it with one UPDATE."""
+        try:
+            contents = [self._prepare_alert_content(alert) for alert in alerts]
+            embeddings = get_embeddings(contents, openai_client)
+            stored = store_alert_embeddings_bulk(
+                [(alert["uuid"], emb) for alert, emb in zip(alerts, embeddings)]
+            )
+            if stored < len(alerts):
+                logger.warning(f"Stored {stored}/{len(alerts)} embeddings for batch")
+            return stored
+        except Exception as e:
+            logger.error(f"Error processing embedding batch of {len(alerts)} alerts: {e}")
+            return 0
     
     def create_vector_index(self, index_type: str = "gin") -> bool:
         """
@@ -395,6 +457,43 @@ class VectorDeduplicator:
             return {"error": str(e)}
 
 
+_checkpoint_lock = threading.Lock()
+
+
+def _load_backfill_checkpoint(path: Optional[str]) -> Dict[str, Any]:
+    """Read the embedding backfill checkpoint ({} if absent or unreadable)."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        logger.info(f"Resuming embedding backfill below id {data.get('last_id')}")
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable backfill checkpoint {path}: {e}")
+        return {}
+
+
+def _save_backfill_checkpoint(path: Optional[str], data: Dict[str, Any]) -> None:
+    """Atomically write the embedding backfill checkpoint."""
+    if not path:
+        return
+    with _checkpoint_lock:
+        dir_path = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dir_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=dir_path)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write backfill checkpoint {path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
 # Global instance for use throughout the application
 vector_deduplicator = VectorDeduplicator()
 
@@ -422,7 +521,9 @@ def deduplicate_alerts_vector(
 def populate_missing_embeddings(
     openai_client=None,
     batch_size: int = 20,
-    max_alerts: int = 1000
+    max_alerts: int = 1000,
+    checkpoint_path: Optional[str] = None,
+    concurrency: Optional[int] = None
 ) -> int:
     """
     Utility function to populate embeddings for existing alerts.
@@ -431,10 +532,13 @@ def populate_missing_embeddings(
         openai_client: OpenAI client for embedding generation
         batch_size: Alerts to process per batch
         max_alerts: Maximum alerts to process
+        checkpoint_path: Optional resume checkpoint file
+        concurrency: Batches in flight at once
         
     Returns:
         Number of embeddings created
     """
     return vector_deduplicator.populate_embeddings_batch(
-        openai_client, batch_size, max_alerts
+        openai_client, batch_size, max_alerts,
+        checkpoint_path=checkpoint_path, concurrency=concurrency
     )
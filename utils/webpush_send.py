@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from pywebpush import webpush, WebPushException
 
@@ -14,9 +14,10 @@ VAPID_PRIVATE_KEY = os.getenv("VAPID_PRIVATE_KEY")
 VAPID_PUBLIC_KEY  = os.getenv("VAPID_PUBLIC_KEY")
 VAPID_EMAIL       = os.getenv("VAPID_EMAIL", "mailto:security@example.com")
 
-def send_web_push(subscription: Dict[str, Any], payload: Dict[str, Any]) -> Optional[bool]:
+def send_web_push(subscription: Dict[str, Any], payload: Dict[str, Any], requests_session=None) -> Optional[bool]:
     """
     Send a Web Push to a single browser subscription.
+    Pass requests_session to reuse pooled connections across sends.
 
     Returns:
       True  -> delivered
@@ -35,6 +36,7 @@ def send_web_push(subscription: Dict[str, Any], payload: Dict[str, Any]) -> Opti
             vapid_public_key=VAPID_PUBLIC_KEY,
             vapid_claims={"sub": VAPID_EMAIL},
             timeout=10,
+            requests_session=requests_session,
         )
         return True
     except WebPushException as e:
@@ -48,9 +50,34 @@ def send_web_push(subscription: Dict[str, Any], payload: Dict[str, Any]) -> Opti
         logger.error("webpush failed: %s", e)
         return None
 
+def remove_subscriptions(endpoints: List[str]) -> int:
+    """Delete expired/invalid subscriptions in one statement; returns rows removed."""
+    import psycopg2
+
+    DATABASE_URL = os.getenv("DATABASE_URL")
+    if not endpoints or not DATABASE_URL:
+        return 0
+    try:
+        with psycopg2.connect(DATABASE_URL) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM web_push_subscriptions WHERE endpoint = ANY(%s)",
+                    (list(endpoints),)
+                )
+                removed = cur.rowcount
+            conn.commit()
+        logger.info(f"Removed {removed} expired push subscriptions")
+        return removed
+    except Exception as e:
+        logger.error(f"remove_subscriptions failed: {e}")
+        return 0
+
 def broadcast_to_user(user_email: str, title: str, body: str, url: str = "/dashboard", icon: str = "/logo192.png") -> int:
     """
-    Send push notification to all of a user's browser subscriptions.
+    Queue a push notification to all of a user's browser subscriptions.
+    
+    Sends go through the shared notification dispatcher, which reuses one
+    HTTP session and removes subscriptions that come back expired.
     
     Args:
         user_email: User email address
@@ -60,7 +87,7 @@ def broadcast_to_user(user_email: str, title: str, body: str, url: str = "/dashb
         icon: Notification icon URL
     
     Returns:
-        Number of successful sends
+        Number of notifications queued
     """
     import psycopg2
     
@@ -68,6 +95,9 @@ def broadcast_to_user(user_email: str, title: str, body: str, url: str = "/dashb
     if not DATABASE_URL:
         logger.warning("DATABASE_URL not set; skipping push broadcast")
         return 0
+    if not VAPID_PRIVATE_KEY or not VAPID_PUBLIC_KEY:
+        logger.warning("Missing VAPID keys; web push disabled.")
+        return 0
     
     try:
         with psycopg2.connect(DATABASE_URL) as conn:
@@ -90,30 +120,15 @@ def broadcast_to_user(user_email: str, title: str, body: str, url: str = "/dashb
             "icon": icon
         }
         
-        dead = []
-        sent = 0
-        
-        for row in subs:
-            sub = {"endpoint": row[0], "keys": {"p256dh": row[1], "auth": row[2]}}
-            result = send_web_push(sub, payload)
-            if result is True:
-                sent += 1
-            elif result is False:
-                dead.append(row[0])
-        
-        # Cleanup expired subscriptions
-        if dead:
-            with psycopg2.connect(DATABASE_URL) as conn:
-                with conn.cursor() as cur:
-                    cur.executemany(
-                        "DELETE FROM web_push_subscriptions WHERE endpoint=%s",
-                        [(e,) for e in dead]
-                    )
-                    conn.commit()
-            logger.info(f"Removed {len(dead)} expired push subscriptions for {user_email}")
+        from services.notification_dispatcher import get_notification_dispatcher
+        queued = get_notification_dispatcher().submit_many("webpush", [
+            (row[0], {"subscription": {"endpoint": row[0], "keys": {"p256dh": row[1], "auth": row[2]}},
+                      "message": payload})
+            for row in subs
+        ])
         
-        logger.info(f"Sent {sent} push notifications to {user_email}")
-        return sent
+        logger.info(f"Queued {queued} push notifications to {user_email}")
+        return queued
     except Exception as e:
         logger.error(f"broadcast_to_user failed for {user_email}: {e}")
         return 0
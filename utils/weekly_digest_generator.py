@@ -6,18 +6,214 @@ Generates and emails weekly threat digest PDFs on schedule
 import os
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import pytz
 import json
+from dateutil import parser as date_parser
 
-from utils.db_utils import fetch_all, fetch_one, execute
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
+from utils.db_utils import fetch_all, fetch_one, execute, execute_batch
+from services.pdf.renderer import get_pdf_renderer
 import uuid
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_digest_filters(filters) -> Dict[str, List[str]]:
+    """
+    Canonical form of a schedule's JSONB filters: only countries, severity
+    and categories, de-duplicated and sorted, empty lists dropped. Schedules
+    with equal normalized filters get identical digest data.
+
+    Severities are upper-cased for grouping; stored labels are title-case
+    ("Critical"), so queries compare them against upper(label).
+    """
+    if isinstance(filters, str):
+        try:
+            filters = json.loads(filters)
+        except ValueError:
+            filters = {}
+    filters = filters or {}
+    normalized = {}
+    for key in ('countries', 'severity', 'categories'):
+        values = filters.get(key) or []
+        if isinstance(values, str):
+            values = [values]
+        values = sorted({str(v).strip() for v in values if v and str(v).strip()})
+        if key == 'severity':
+            values = sorted({v.upper() for v in values})
+        if values:
+            normalized[key] = values
+    return normalized
+
+
+def digest_filter_key(filters) -> str:
+    """Stable grouping key for a schedule's filters."""
+    return json.dumps(normalize_digest_filters(filters), sort_keys=True)
+
+
+def fetch_digest_rollup(filters: Dict, week_start: datetime, week_end: datetime) -> Dict[str, Any]:
+    """
+    All data a weekly digest needs, from one scan of the alerts matching the
+    filters over the current and previous week.
+
+    The filtered two-week window is a CTE referenced several times, so
+    Postgres materializes it once; the alert list, previous-week count,
+    geographic and category breakdowns are all computed from it.
+
+    Returns:
+        {'alerts': [...up to 100, newest first], 'prev_count': int,
+         'geo_breakdown': [...top 10], 'category_breakdown': [...top 10]}
+    """
+    filters = normalize_digest_filters(filters)
+    where_clauses = ["published >= %(prev_start)s", "published < %(week_end)s"]
+    params: Dict[str, Any] = {
+        'prev_start': week_start - timedelta(days=7),
+        'week_start': week_start,
+        'week_end': week_end,
+    }
+    if filters.get('countries'):
+        where_clauses.append("country = ANY(%(countries)s)")
+        params['countries'] = filters['countries']
+    if filters.get('severity'):
+        where_clauses.append("upper(label) = ANY(%(severity)s)")
+        params['severity'] = filters['severity']
+    if filters.get('categories'):
+        where_clauses.append("category = ANY(%(categories)s)")
+        params['categories'] = filters['categories']
+    where_sql = " AND ".join(where_clauses)
+
+    rows = fetch_all(f"""
+        WITH scoped AS (
+            SELECT id, title, summary, label, score, city, country, published,
+                   source, category, subcategory
+            FROM alerts
+            WHERE {where_sql}
+        ),
+        cur AS (
+            SELECT * FROM scoped WHERE published >= %(week_start)s
+        )
+        SELECT
+            (SELECT COUNT(*) FROM scoped WHERE published < %(week_start)s) AS prev_count,
+            (SELECT COALESCE(json_agg(a), '[]'::json) FROM (
+                SELECT id, title, summary, label AS severity, score AS threat_score,
+                       city, country, published AS published_at, source AS source_name,
+                       category, subcategory
+                FROM cur
+                ORDER BY published DESC
+                LIMIT 100
+            ) a) AS alerts,
+            (SELECT COALESCE(json_agg(g), '[]'::json) FROM (
+                SELECT country,
+                       COUNT(*) AS total,
+                       SUM(CASE WHEN upper(label)='CRITICAL' THEN 1 ELSE 0 END) AS critical,
+                       SUM(CASE WHEN upper(label)='HIGH' THEN 1 ELSE 0 END) AS high,
+                       SUM(CASE WHEN upper(label) IN ('MEDIUM', 'MODERATE') THEN 1 ELSE 0 END) AS medium,
+                       SUM(CASE WHEN upper(label)='LOW' THEN 1 ELSE 0 END) AS low
+                FROM cur
+                GROUP BY country
+                ORDER BY total DESC
+                LIMIT 10
+            ) g) AS geo_breakdown,
+            (SELECT COALESCE(json_agg(c), '[]'::json) FROM (
+                SELECT category, COUNT(*) AS count
+                FROM cur
+                WHERE category IS NOT NULL
+                GROUP BY category
+                ORDER BY count DESC
+                LIMIT 10
+            ) c) AS category_breakdown
+    """, params)
+    row = rows[0] if rows else {}
+
+    alerts = row.get('alerts') or []
+    for alert in alerts:
+        # json_agg serializes timestamps as ISO strings, with fractional
+        # seconds when present (datetime.fromisoformat rejects those on 3.10)
+        if isinstance(alert.get('published_at'), str):
+            try:
+                alert['published_at'] = date_parser.isoparse(alert['published_at'])
+            except ValueError:
+                pass
+    return {
+        'alerts': alerts,
+        'prev_count': int(row.get('prev_count') or 0),
+        'geo_breakdown': row.get('geo_breakdown') or [],
+        'category_breakdown': row.get('category_breakdown') or [],
+    }
+
+
+def build_digest_template_data(rollup: Dict[str, Any], email: str,
+                               week_start: datetime, week_end: datetime) -> Dict[str, Any]:
+    """Template variables for weekly_digest.html from a digest rollup."""
+    alerts = rollup['alerts']
+    
+    # Calculate summary statistics
+    total_alerts = len(alerts)
+    # Stored labels are title-case ("Critical", "Moderate")
+    severities = [str(a.get('severity') or a.get('label') or '').upper() for a in alerts]
+    critical_count = severities.count('CRITICAL')
+    high_count = severities.count('HIGH')
+    medium_count = severities.count('MEDIUM') + severities.count('MODERATE')
+    low_count = severities.count('LOW')
+    
+    # Trend against the previous week
+    prev_count = rollup['prev_count']
+    if prev_count > 0:
+        trend_percent = int(((total_alerts - prev_count) / prev_count) * 100)
+        trend = 'up' if trend_percent > 5 else ('down' if trend_percent < -5 else 'stable')
+    else:
+        trend_percent = 0
+        trend = 'stable'
+    
+    # Get top 5 highest severity threats
+    top_threats = alerts[:5]
+    
+    return {
+        'week_start': week_start.strftime('%Y-%m-%d'),
+        'week_end': week_end.strftime('%Y-%m-%d'),
+        'generated_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC'),
+        'user_email': email,
+        'summary': {
+            'total_alerts': total_alerts,
+            'critical_count': critical_count,
+            'high_count': high_count,
+            'medium_count': medium_count,
+            'low_count': low_count,
+            'trend': trend,
+            'trend_percent': abs(trend_percent),
+            'executive_summary': f"This week saw {total_alerts} threat alerts across monitored regions. "
+                               f"{critical_count} critical and {high_count} high-severity incidents were detected. "
+                               f"Threat activity is {trend} compared to the previous week.",
+            'source_count': len(set(a.get('source_name') or 'Unknown' for a in alerts))
+        },
+        'top_threats': [format_alert(a) for a in top_threats],
+        'geographic_breakdown': [format_geo(g) for g in rollup['geo_breakdown']],
+        'category_breakdown': [format_category(c) for c in rollup['category_breakdown']],
+        'all_alerts': [format_alert(a) for a in alerts],
+        'recommendations': generate_recommendations(alerts, critical_count, high_count),
+        'primary_color': '#2563eb'
+    }
+
+
+def submit_digest_pdf(template_data: Dict[str, Any], week_start: datetime) -> Tuple[str, str, str]:
+    """Queue a digest render in the shared PDF pool; returns (job_id, file_path, file_id)."""
+    file_id = str(uuid.uuid4())
+    filename = f"weekly_digest_{week_start.strftime('%Y%m%d')}_{file_id}.pdf"
+    file_path = os.path.join('downloads', filename)
+    job_id = get_pdf_renderer().submit('weekly_digest.html', template_data, output_path=file_path)
+    return job_id, file_path, file_id
+
+
+def record_digest_exports(rows: List[Tuple[str, int, str]]) -> None:
+    """Insert pdf_exports rows for rendered digests: (file_id, user_id, file_path) tuples."""
+    expires_at = datetime.utcnow() + timedelta(days=7)  # 7-day expiry for digests
+    execute_batch("""
+        INSERT INTO pdf_exports (id, user_id, filename, template, expires_at)
+        VALUES (%s, %s, %s, %s, %s)
+    """, [(file_id, user_id, os.path.basename(path), 'weekly_digest', expires_at)
+          for file_id, user_id, path in rows])
+
+
 def generate_weekly_digest_pdf(user_id: int, email: str, filters: Dict, week_start: datetime, week_end: datetime) -> tuple[str, str]:
     """
     Generate a weekly digest PDF for the specified user and date range.
@@ -33,136 +229,22 @@ def generate_weekly_digest_pdf(user_id: int, email: str, filters: Dict, week_sta
         Tuple of (file_path, file_id)
     """
     try:
-        # Build query filters
-        where_clauses = ["published >= %s", "published < %s"]
-        params = [week_start, week_end]
-        
-        if filters.get('countries'):
-            where_clauses.append("country = ANY(%s)")
-            params.append(filters['countries'])
-        
-        if filters.get('severity'):
-            where_clauses.append("label = ANY(%s)")
-            params.append(filters['severity'])
-        
-        if filters.get('categories'):
-            where_clauses.append("category = ANY(%s)")
-            params.append(filters['categories'])
-        
-        where_sql = " AND ".join(where_clauses)
-        
-        # Fetch alerts for the week
-        alerts = fetch_all(f"""
-            SELECT id, title, summary, label as severity, score as threat_score,
-                   city, country, published as published_at, source as source_name,
-                   category, subcategory
-            FROM alerts
-            WHERE {where_sql}
-            ORDER BY published DESC
-            LIMIT 100
-        """, tuple(params))
-        
-        if not alerts:
+        rollup = fetch_digest_rollup(filters, week_start, week_end)
+        if not rollup['alerts']:
             logger.info(f"No alerts found for weekly digest: user={email}, filters={filters}")
             return None, None
         
-        # Calculate summary statistics
-        total_alerts = len(alerts)
-        critical_count = sum(1 for a in alerts if (a.get('severity') or a.get('label')) == 'CRITICAL')
-        high_count = sum(1 for a in alerts if (a.get('severity') or a.get('label')) == 'HIGH')
-        medium_count = sum(1 for a in alerts if (a.get('severity') or a.get('label')) == 'MEDIUM')
-        low_count = sum(1 for a in alerts if (a.get('severity') or a.get('label')) == 'LOW')
-        
-        # Get previous week for trend
-        prev_week_start = week_start - timedelta(days=7)
-        prev_week_count = fetch_one(f"""
-            SELECT COUNT(*) as count FROM alerts WHERE {where_sql}
-        """, (prev_week_start, week_start) + tuple(params[2:]))
-        
-        prev_count = prev_week_count['count'] if isinstance(prev_week_count, dict) else prev_week_count[0]
-        if prev_count > 0:
-            trend_percent = int(((total_alerts - prev_count) / prev_count) * 100)
-            trend = 'up' if trend_percent > 5 else ('down' if trend_percent < -5 else 'stable')
-        else:
-            trend_percent = 0
-            trend = 'stable'
-        
-        # Geographic breakdown
-        geo_breakdown = fetch_all(f"""
-            SELECT country,
-                   COUNT(*) as total,
-                   SUM(CASE WHEN label='CRITICAL' THEN 1 ELSE 0 END) as critical,
-                   SUM(CASE WHEN label='HIGH' THEN 1 ELSE 0 END) as high,
-                   SUM(CASE WHEN label='MEDIUM' THEN 1 ELSE 0 END) as medium,
-                   SUM(CASE WHEN label='LOW' THEN 1 ELSE 0 END) as low
-            FROM alerts
-            WHERE {where_sql}
-            GROUP BY country
-            ORDER BY total DESC
-            LIMIT 10
-        """, tuple(params))
-        
-        # Category breakdown
-        cat_breakdown = fetch_all(f"""
-            SELECT category,
-                   COUNT(*) as count
-            FROM alerts
-            WHERE {where_sql} AND category IS NOT NULL
-            GROUP BY category
-            ORDER BY count DESC
-            LIMIT 10
-        """, tuple(params))
-        
-        # Get top 5 highest severity threats
-        top_threats = alerts[:5]
-        
-        # Format data for template
-        template_data = {
-            'week_start': week_start.strftime('%Y-%m-%d'),
-            'week_end': week_end.strftime('%Y-%m-%d'),
-            'generated_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC'),
-            'user_email': email,
-            'summary': {
-                'total_alerts': total_alerts,
-                'critical_count': critical_count,
-                'high_count': high_count,
-                'medium_count': medium_count,
-                'low_count': low_count,
-                'trend': trend,
-                'trend_percent': abs(trend_percent),
-                'executive_summary': f"This week saw {total_alerts} threat alerts across monitored regions. "
-                                   f"{critical_count} critical and {high_count} high-severity incidents were detected. "
-                                   f"Threat activity is {trend} compared to the previous week.",
-                'source_count': len(set(a.get('source_name') or 'Unknown' for a in alerts))
-            },
-            'top_threats': [format_alert(a) for a in top_threats],
-            'geographic_breakdown': [format_geo(g) for g in geo_breakdown],
-            'category_breakdown': [format_category(c) for c in cat_breakdown],
-            'all_alerts': [format_alert(a) for a in alerts],
-            'recommendations': generate_recommendations(alerts, critical_count, high_count),
-            'primary_color': '#2563eb'
-        }
-        
-        # Render template
-        env = Environment(loader=FileSystemLoader('templates/pdf'))
-        template = env.get_template('weekly_digest.html')
-        html_content = template.render(**template_data)
-        
-        # Generate PDF
-        file_id = str(uuid.uuid4())
-        filename = f"weekly_digest_{week_start.strftime('%Y%m%d')}_{file_id}.pdf"
-        file_path = os.path.join('downloads', filename)
-        
-        HTML(string=html_content).write_pdf(file_path)
+        template_data = build_digest_template_data(rollup, email, week_start, week_end)
+        job_id, file_path, file_id = submit_digest_pdf(template_data, week_start)
+        status = get_pdf_renderer().wait(job_id, timeout=300)
+        if not status or status['state'] != 'done':
+            logger.error(f"Weekly digest PDF render failed: user={email}")
+            return None, None
         
-        # Save to database
-        expires_at = datetime.utcnow() + timedelta(days=7)  # 7-day expiry for digests
-        execute("""
-            INSERT INTO pdf_exports (id, user_id, filename, template, expires_at)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (file_id, user_id, filename, 'weekly_digest', expires_at))
+        record_digest_exports([(file_id, user_id, file_path)])
         
-        logger.info(f"Weekly digest PDF generated: user={email}, file={filename}, alerts={total_alerts}")
+        logger.info(f"Weekly digest PDF generated: user={email}, file={os.path.basename(file_path)}, "
+                    f"alerts={len(rollup['alerts'])}")
         return file_path, file_id
         
     except Exception as e:
@@ -243,21 +325,34 @@ def generate_recommendations(alerts: List[Dict], critical_count: int, high_count
     return recs
 
 
-def send_digest_email(email: str, file_path: str, week_start: datetime, week_end: datetime):
-    """Send weekly digest PDF via email using Brevo."""
+def brevo_email_client():
+    """Brevo TransactionalEmailsApi, or None if BREVO_API_KEY is not set.
+
+    Batch senders create one and pass it to every send_digest_email call.
+    """
+    import sib_api_v3_sdk
+    
+    api_key = os.getenv('BREVO_API_KEY')
+    if not api_key:
+        logger.error("BREVO_API_KEY not configured")
+        return None
+    
+    configuration = sib_api_v3_sdk.Configuration()
+    configuration.api_key['api-key'] = api_key
+    return sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+
+
+def send_digest_email(email: str, file_path: str, week_start: datetime, week_end: datetime,
+                      api_instance=None):
+    """Send weekly digest PDF via email using Brevo (reusing api_instance if given)."""
     try:
         # Import Brevo client
         import sib_api_v3_sdk
-        from sib_api_v3_sdk.rest import ApiException
-        
-        api_key = os.getenv('BREVO_API_KEY')
-        if not api_key:
-            logger.error("BREVO_API_KEY not configured")
-            return False
         
-        configuration = sib_api_v3_sdk.Configuration()
-        configuration.api_key['api-key'] = api_key
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+        if api_instance is None:
+            api_instance = brevo_email_client()
+            if api_instance is None:
+                return False
         
         # Read PDF file and encode
         import base64
@@ -304,7 +399,7 @@ def send_digest_email(email: str, file_path: str, week_start: datetime, week_end
         
         # Send push notification
         try:
-            from webpush_send import broadcast_to_user
+            from utils.webpush_send import broadcast_to_user
             broadcast_to_user(
                 user_email=email,
                 title="📧 Weekly Digest Ready",
@@ -4,25 +4,66 @@ Runs daily to check for schedules that need execution
 """
 
 import os
+import json
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Any, Dict, List
 import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
-from utils.db_utils import fetch_all, execute
-from utils.weekly_digest_generator import generate_weekly_digest_pdf, send_digest_email
+from utils.db_utils import fetch_all, execute, execute_batch
+from utils.weekly_digest_generator import (
+    brevo_email_client,
+    build_digest_template_data,
+    digest_filter_key,
+    fetch_digest_rollup,
+    record_digest_exports,
+    send_digest_email,
+    submit_digest_pdf,
+)
+from services.pdf.renderer import PdfRenderQueueFull, get_pdf_renderer
 
 logger = logging.getLogger(__name__)
 
+# Digest emails sent concurrently in one run
+DIGEST_EMAIL_CONCURRENCY = int(os.getenv('DIGEST_EMAIL_CONCURRENCY', '8'))
+# Seconds to wait for one digest PDF render
+DIGEST_RENDER_TIMEOUT = int(os.getenv('DIGEST_RENDER_TIMEOUT', '300'))
+
 # Global scheduler instance
 _scheduler = None
 
 
+def _schedule_field(schedule, name: str, index: int):
+    return schedule[name] if isinstance(schedule, dict) else schedule[index]
+
+
+def plan_digest_batches(schedules) -> Dict[str, List]:
+    """
+    Group due schedules by normalized filter set.
+    
+    Every schedule in a group gets the same digest data, so each group costs
+    one rollup query however many subscribers share it.
+    """
+    batches: Dict[str, List] = {}
+    for schedule in schedules:
+        key = digest_filter_key(_schedule_field(schedule, 'filters', 6))
+        batches.setdefault(key, []).append(schedule)
+    return batches
+
+
 def process_weekly_digests():
     """
     Process all weekly digest schedules that are due for execution.
     Called daily at 6am UTC by APScheduler.
+    
+    Due schedules are grouped by filter set (plan_digest_batches); each group
+    gets one rollup scan, personalized PDFs render in parallel in the shared
+    PDF pool, emails go out concurrently through one Brevo client, and
+    schedule updates are written in batches.
     """
     try:
         logger.info("Starting weekly digest processing...")
@@ -41,87 +82,109 @@ def process_weekly_digests():
             logger.info("No weekly digests due for processing")
             return
         
-        logger.info(f"Processing {len(schedules)} weekly digest schedule(s)...")
-        success_count = 0
-        failure_count = 0
+        # Calculate date range (last 7 days), shared by every schedule in this run
+        now_utc = datetime.now(pytz.UTC)
+        week_end = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = week_end - timedelta(days=7)
+        
+        batches = plan_digest_batches(schedules)
+        logger.info(f"Processing {len(schedules)} weekly digest schedule(s) in {len(batches)} filter group(s)...")
+        
+        renderer = get_pdf_renderer()
+        outcomes: Dict[Any, str] = {}
+        renders: List[tuple] = []          # (schedule, job_id, file_path, file_id)
+        unwaited: deque = deque()         # job ids to wait on when the render queue is full
         
-        for schedule in schedules:
-            schedule_id = schedule['id'] if isinstance(schedule, dict) else schedule[0]
-            user_id = schedule['user_id'] if isinstance(schedule, dict) else schedule[1]
-            email = schedule['email'] if isinstance(schedule, dict) else schedule[2]
-            filters = schedule['filters'] if isinstance(schedule, dict) else schedule[6]
+        def submit_render(template_data):
+            while True:
+                try:
+                    return submit_digest_pdf(template_data, week_start)
+                except PdfRenderQueueFull:
+                    if not unwaited:
+                        raise
+                    renderer.wait(unwaited.popleft(), timeout=DIGEST_RENDER_TIMEOUT)
+        
+        # 1. One rollup per filter group, then queue every subscriber's render
+        for key, group in batches.items():
+            try:
+                rollup = fetch_digest_rollup(json.loads(key), week_start, week_end)
+            except Exception as e:
+                logger.error(f"Weekly digest rollup failed: filters={key}, schedules={len(group)}, error={e}")
+                for schedule in group:
+                    outcomes[_schedule_field(schedule, 'id', 0)] = 'failed'
+                continue
+            
+            if not rollup['alerts']:
+                # No alerts is not a failure: just move next_run
+                logger.info(f"No alerts for weekly digest group: filters={key}, schedules={len(group)}")
+                for schedule in group:
+                    outcomes[_schedule_field(schedule, 'id', 0)] = 'empty'
+                continue
             
+            for schedule in group:
+                schedule_id = _schedule_field(schedule, 'id', 0)
+                email = _schedule_field(schedule, 'email', 2)
+                try:
+                    template_data = build_digest_template_data(rollup, email, week_start, week_end)
+                    job_id, file_path, file_id = submit_render(template_data)
+                    renders.append((schedule, job_id, file_path, file_id))
+                    unwaited.append(job_id)
+                except Exception as e:
+                    logger.error(f"Error queueing weekly digest: schedule_id={schedule_id}, email={email}, error={e}")
+                    outcomes[schedule_id] = 'failed'
+        
+        # 2. Collect renders and record all pdf_exports rows at once
+        ready = []
+        for schedule, job_id, file_path, file_id in renders:
+            status = renderer.wait(job_id, timeout=DIGEST_RENDER_TIMEOUT)
+            if status and status['state'] == 'done':
+                ready.append((schedule, file_path, file_id))
+            else:
+                logger.error(f"Weekly digest render failed: schedule_id={_schedule_field(schedule, 'id', 0)}, "
+                             f"status={status}")
+                outcomes[_schedule_field(schedule, 'id', 0)] = 'failed'
+        if ready:
             try:
-                # Calculate date range (last 7 days)
-                now_utc = datetime.now(pytz.UTC)
-                week_end = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-                week_start = week_end - timedelta(days=7)
-                
-                logger.info(f"Generating weekly digest: schedule_id={schedule_id}, email={email}")
-                
-                # Generate PDF
-                file_path, file_id = generate_weekly_digest_pdf(
-                    user_id=user_id,
-                    email=email,
-                    filters=filters,
-                    week_start=week_start,
-                    week_end=week_end
-                )
-                
-                if not file_path:
-                    logger.warning(f"No alerts found for weekly digest: schedule_id={schedule_id}, email={email}")
-                    # Update schedule but don't increment failure count (no alerts is not a failure)
-                    update_schedule_next_run(schedule)
-                    continue
-                
-                # Send email
-                email_sent = send_digest_email(
-                    email=email,
-                    file_path=file_path,
-                    week_start=week_start,
-                    week_end=week_end
-                )
-                
-                if email_sent:
-                    # Update schedule: reset failure count, update last_run and next_run
-                    execute("""
-                        UPDATE weekly_digest_schedules
-                        SET last_run = NOW(),
-                            next_run = %s,
-                            failure_count = 0
-                        WHERE id = %s
-                    """, (calculate_next_run(schedule), schedule_id))
-                    
-                    success_count += 1
-                    logger.info(f"Weekly digest sent successfully: schedule_id={schedule_id}, email={email}")
-                else:
-                    # Increment failure count
-                    execute("""
-                        UPDATE weekly_digest_schedules
-                        SET failure_count = failure_count + 1,
-                            next_run = %s
-                        WHERE id = %s
-                    """, (calculate_next_run(schedule), schedule_id))
-                    
-                    failure_count += 1
-                    logger.error(f"Failed to send weekly digest email: schedule_id={schedule_id}, email={email}")
-                
+                record_digest_exports([(file_id, _schedule_field(schedule, 'user_id', 1), file_path)
+                                       for schedule, file_path, file_id in ready])
             except Exception as e:
-                logger.error(f"Error processing weekly digest: schedule_id={schedule_id}, email={email}, error={e}")
-                import traceback
-                traceback.print_exc()
-                
-                # Increment failure count
-                execute("""
-                    UPDATE weekly_digest_schedules
-                    SET failure_count = failure_count + 1,
-                        next_run = %s
-                    WHERE id = %s
-                """, (calculate_next_run(schedule), schedule_id))
-                
-                failure_count += 1
-        
-        logger.info(f"Weekly digest processing complete: success={success_count}, failures={failure_count}")
+                logger.error(f"Failed to record weekly digest exports: {e}")
+        
+        # 3. Send emails concurrently through one Brevo client
+        try:
+            client = brevo_email_client()
+        except Exception as e:
+            logger.error(f"Brevo client unavailable for weekly digests: {e}")
+            client = None
+        
+        def send(item):
+            schedule, file_path, _ = item
+            if client is None:
+                return False
+            return send_digest_email(
+                email=_schedule_field(schedule, 'email', 2),
+                file_path=file_path,
+                week_start=week_start,
+                week_end=week_end,
+                api_instance=client
+            )
+        
+        if ready:
+            with ThreadPoolExecutor(max_workers=max(1, DIGEST_EMAIL_CONCURRENCY)) as pool:
+                for (schedule, _, _), sent in zip(ready, pool.map(send, ready)):
+                    schedule_id = _schedule_field(schedule, 'id', 0)
+                    outcomes[schedule_id] = 'sent' if sent else 'failed'
+                    if not sent:
+                        logger.error(f"Failed to send weekly digest email: schedule_id={schedule_id}, "
+                                     f"email={_schedule_field(schedule, 'email', 2)}")
+        
+        # 4. Batched schedule updates
+        _apply_digest_outcomes(schedules, outcomes)
+        
+        success_count = sum(1 for o in outcomes.values() if o == 'sent')
+        failure_count = sum(1 for o in outcomes.values() if o == 'failed')
+        logger.info(f"Weekly digest processing complete: success={success_count}, failures={failure_count}, "
+                    f"groups={len(batches)}")
         
     except Exception as e:
         logger.error(f"Weekly digest processing error: {e}")
@@ -129,6 +192,43 @@ def process_weekly_digests():
         traceback.print_exc()
 
 
+def _apply_digest_outcomes(schedules, outcomes: Dict[Any, str]) -> None:
+    """Write last_run/next_run/failure_count for a run with one batch per outcome."""
+    updates = {
+        'sent': """
+            UPDATE weekly_digest_schedules
+            SET last_run = NOW(),
+                next_run = %s,
+                failure_count = 0
+            WHERE id = %s
+        """,
+        'failed': """
+            UPDATE weekly_digest_schedules
+            SET failure_count = failure_count + 1,
+                next_run = %s
+            WHERE id = %s
+        """,
+        'empty': """
+            UPDATE weekly_digest_schedules
+            SET next_run = %s
+            WHERE id = %s
+        """,
+    }
+    params: Dict[str, List[tuple]] = {outcome: [] for outcome in updates}
+    for schedule in schedules:
+        schedule_id = _schedule_field(schedule, 'id', 0)
+        outcome = outcomes.get(schedule_id)
+        if outcome in params:
+            params[outcome].append((calculate_next_run(schedule), schedule_id))
+    for outcome, rows in params.items():
+        if not rows:
+            continue
+        try:
+            execute_batch(updates[outcome], rows)
+        except Exception as e:
+            logger.error(f"Error updating {len(rows)} weekly digest schedule(s) ({outcome}): {e}")
+
+
 def calculate_next_run(schedule) -> datetime:
     """Calculate the next run time for a schedule."""
     try: